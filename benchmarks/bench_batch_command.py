@@ -0,0 +1,106 @@
+"""
+Benchmark for batched child commands: one RPC per meter update vs. ``RunCommandBatch``.
+
+A ``TaklerService`` runs in a background thread on localhost. The client sends the same
+meter updates with a persistent channel, first one by one, then through ``ChildCommandBuffer``.
+
+Usage::
+
+    python benchmarks/bench_batch_command.py
+"""
+import asyncio
+import contextlib
+import io
+import socket
+import threading
+import time
+
+from takler.core import Bunch, Flow
+from takler.server.scheduler import Scheduler
+from takler.server.network_service import TaklerService
+from takler.client.service_client import TaklerServiceClient
+from takler.client.batch import ChildCommandBuffer
+
+
+COUNT = 2000
+FLUSH_SIZE = 50
+
+
+def create_scheduler() -> Scheduler:
+    with Flow("flow1") as flow1:
+        with flow1.add_task("task1") as task1:
+            task1.add_meter("meter1", 0, COUNT)
+    flow1.requeue()
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    return Scheduler(bunch)
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def run_service(service: TaklerService, started: threading.Event, loop: asyncio.AbstractEventLoop):
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(service.start())
+    started.set()
+    loop.run_forever()
+
+
+def main():
+    # silence per-command logs in service.
+    import logging
+    logging.getLogger("takler").setLevel(logging.WARNING)
+    try:
+        from loguru import logger
+        logger.remove()
+    except ImportError:
+        pass
+
+    scheduler = create_scheduler()
+    port = get_free_port()
+    service = TaklerService(scheduler, host="localhost", port=port)
+    started = threading.Event()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=run_service, args=(service, started, loop), daemon=True)
+    thread.start()
+    started.wait()
+
+    node_path = "/flow1/task1"
+    client = TaklerServiceClient(host="localhost", port=port, persistent=True)
+    client.start()
+    # warm up channel
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.meter(node_path=node_path, meter_name="meter1", meter_value="0")
+
+        start = time.perf_counter()
+        for i in range(COUNT):
+            client.meter(node_path=node_path, meter_name="meter1", meter_value=str(i + 1))
+        single_cost = time.perf_counter() - start
+
+    scheduler.bunch.find_node(node_path).find_meter("meter1").reset()
+
+    buffer = ChildCommandBuffer(client, flush_size=FLUSH_SIZE, flush_interval=None)
+    start = time.perf_counter()
+    for i in range(COUNT):
+        buffer.meter(node_path=node_path, meter_name="meter1", meter_value=str(i + 1))
+    buffer.flush()
+    batch_cost = time.perf_counter() - start
+    buffer.close()
+
+    assert scheduler.bunch.find_node(node_path).find_meter("meter1").value == COUNT
+
+    print(f"meter updates: {COUNT}")
+    print(f"  one rpc per update:    {single_cost * 1000:8.1f} ms ({COUNT / single_cost:8.0f} updates/s)")
+    print(f"  batch of {FLUSH_SIZE:<4d}:         {batch_cost * 1000:8.1f} ms ({COUNT / batch_cost:8.0f} updates/s)")
+    print(f"  speedup: {single_cost / batch_cost:.1f}x")
+
+    asyncio.run_coroutine_threadsafe(service.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
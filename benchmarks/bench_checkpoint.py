@@ -0,0 +1,123 @@
+"""
+Benchmark for binary checkpoint of a bunch with 50000 tasks.
+
+Measure time to encode the bunch at once, to pickle and write the file in a worker thread,
+and to restore the bunch from the file. JSON from ``to_dict`` is listed for comparison.
+
+Restore time includes the garbage collection of new nodes after ``gc_paused`` and varies between runs,
+so it is measured several times, and the min, median and max are printed.
+
+``Scheduler.checkpoint`` encodes the bunch in chunks of ``resolve_batch_size`` nodes,
+so the longest time event loop is blocked by a checkpoint is measured too.
+
+Usage::
+
+    python benchmarks/bench_checkpoint.py
+"""
+import asyncio
+import gc
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from takler.core import Bunch, Flow
+from takler.core.checkpoint import (
+    encode_bunch, dumps_payload, loads_checkpoint, write_checkpoint_file, read_checkpoint_file
+)
+from takler.server.scheduler import Scheduler
+
+
+CONTAINER_COUNT = 250
+TASK_COUNT = 200
+RESTORE_ROUND_COUNT = 5
+
+
+def create_bunch() -> Bunch:
+    with Flow("flow1") as flow1:
+        for i in range(CONTAINER_COUNT):
+            with flow1.add_container(f"container_{i:03d}") as container:
+                for j in range(TASK_COUNT):
+                    with container.add_task(f"task_{j:03d}") as task:
+                        task.add_event("event1")
+                        task.add_meter("meter1", 0, 10)
+                        if j > 0:
+                            task.add_trigger(f"./task_{j - 1:03d} == complete")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+async def measure_checkpoint_stall(scheduler: Scheduler) -> float:
+    """
+    Run a checkpoint of scheduler, and return the longest interval between two steps of another coroutine.
+    """
+    max_stall = 0.0
+
+    async def probe():
+        nonlocal max_stall
+        last_time = time.perf_counter()
+        while True:
+            await asyncio.sleep(0)
+            current_time = time.perf_counter()
+            max_stall = max(max_stall, current_time - last_time)
+            last_time = current_time
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    await scheduler.checkpoint()
+    probe_task.cancel()
+    return max_stall
+
+
+def main():
+    bunch = create_bunch()
+    node_count = len(bunch.node_index)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir, "takler.checkpoint")
+
+        # measured before the restored bunch is created, which doubles the heap scanned by a full garbage collection.
+        scheduler = Scheduler(bunch, checkpoint_path=str(file_path))
+        start = time.perf_counter()
+        max_stall = asyncio.run(measure_checkpoint_stall(scheduler))
+        checkpoint_cost = time.perf_counter() - start
+
+        start = time.perf_counter()
+        payload = encode_bunch(bunch)
+        encode_cost = time.perf_counter() - start
+
+        start = time.perf_counter()
+        write_checkpoint_file(dumps_payload(payload), file_path)
+        write_cost = time.perf_counter() - start
+        file_size = file_path.stat().st_size
+
+        restore_costs = []
+        for _ in range(RESTORE_ROUND_COUNT):
+            start = time.perf_counter()
+            new_bunch = Bunch()
+            loads_checkpoint(read_checkpoint_file(file_path), new_bunch)
+            restore_costs.append(time.perf_counter() - start)
+            assert len(new_bunch.node_index) == node_count
+            # restored bunch of last round is garbage with reference cycles, not left to next round.
+            del new_bunch
+            gc.collect()
+
+    start = time.perf_counter()
+    json_string = json.dumps(bunch.find_node("/flow1").to_dict())
+    json_cost = time.perf_counter() - start
+
+    print(f"{node_count} nodes:")
+    print(f"  encode at once:            {encode_cost * 1000:8.1f} ms")
+    print(f"  pickle and write (thread): {write_cost * 1000:8.1f} ms, {file_size / 1024 / 1024:.1f} MiB")
+    print(f"  restore (min/median/max):  {min(restore_costs) * 1000:8.1f} ms, "
+          f"{statistics.median(restore_costs) * 1000:.1f} ms, {max(restore_costs) * 1000:.1f} ms")
+    print(f"  scheduler checkpoint:      {checkpoint_cost * 1000:8.1f} ms, "
+          f"max event loop stall {max_stall * 1000:.1f} ms")
+    print(f"  to_dict json (reference):  {json_cost * 1000:8.1f} ms, {len(json_string) / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
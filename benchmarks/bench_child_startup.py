@@ -0,0 +1,38 @@
+"""
+Benchmark for child command startup time.
+
+Compare the lean child entry point (``python -m takler.client.child``) with the full typer CLI
+(``python -m takler.client``). Both commands only print help, so no server is needed.
+
+Usage::
+
+    python benchmarks/bench_child_startup.py
+"""
+import subprocess
+import sys
+import time
+
+
+REPEAT = 10
+
+
+def measure(args) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        subprocess.run([sys.executable, *args], capture_output=True, check=True)
+    return (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    baseline = measure(["-c", "pass"])
+    child = measure(["-m", "takler.client.child", "init", "--help"])
+    cli = measure(["-m", "takler.client", "init", "--help"])
+
+    print(f"python startup:         {baseline * 1000:8.1f} ms")
+    print(f"takler.client.child:    {child * 1000:8.1f} ms")
+    print(f"takler.client (typer):  {cli * 1000:8.1f} ms")
+    print(f"speedup (without interpreter startup): {(cli - baseline) / (child - baseline):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark for 500 ``complete`` commands arriving together at a scheduler with a flow of 100000 tasks.
+
+Compare resolving after each command, like handlers changing the tree and triggering resolution themselves,
+with commands going through ``Scheduler.command_queue``, where main loop applies them in one batch and
+resolves the batch in one pass.
+
+Usage::
+
+    python benchmarks/bench_command_queue.py
+"""
+import asyncio
+import time
+
+from bench_flow_load import create_flow
+from takler.core import Bunch
+from takler.server.scheduler import Scheduler
+
+
+COMMAND_COUNT = 500
+
+
+def create_scheduler() -> Scheduler:
+    flow = create_flow()
+    bunch = Bunch()
+    bunch.add_flow(flow)
+    flow.requeue()
+    return Scheduler(bunch, interval_main_loop=100)
+
+
+def command_paths():
+    return [f"/flow1/container_{i:03d}/task_000" for i in range(COMMAND_COUNT)]
+
+
+async def run_per_command(scheduler: Scheduler):
+    await scheduler.resolve_bunch()
+    start = time.perf_counter()
+    for node_path in command_paths():
+        scheduler.run_command_complete(node_path)
+        await scheduler.resolve_bunch()
+    return time.perf_counter() - start
+
+
+async def run_queued(scheduler: Scheduler):
+    main_loop = asyncio.create_task(scheduler.run())
+    while scheduler.resolve_count == 0:
+        await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        scheduler.submit_command("complete", node_path=node_path) for node_path in command_paths()
+    ])
+    # wait for the pass resolving the batch.
+    while scheduler.resolve_count < 2:
+        await asyncio.sleep(0)
+    cost = time.perf_counter() - start
+
+    await scheduler.stop()
+    await main_loop
+    return cost
+
+
+def main():
+    for name, run in (("per command", run_per_command), ("command queue", run_queued)):
+        scheduler = create_scheduler()
+        cost = asyncio.run(run(scheduler))
+        assert scheduler.bunch.find_node("/flow1/container_499/task_001").state.node_status.name == "submitted"
+        metrics = scheduler.get_metrics()
+        print(
+            f"{name:14s} total {cost * 1000:8.1f} ms, resolution passes {scheduler.resolve_count:4d}, "
+            f"drains {metrics['command_queue.drain_count']:3.0f}, "
+            f"drain time {metrics['command_queue.total_drain_seconds'] * 1000:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark for latency of child commands while the scheduler travels a flow with 100000 tasks.
+
+A client thread sends ``meter`` commands into the event loop at a fixed rate, like RPCs arriving
+from the network, while the event loop travels the bunch (non-incremental resolution) and renders ``show``.
+Compare blocking traversal with cooperative traversal in ``Scheduler.resolve_bunch`` and
+``Scheduler.handle_request_show``.
+
+Usage::
+
+    python benchmarks/bench_event_loop_latency.py
+"""
+import asyncio
+import statistics
+import threading
+import time
+from io import StringIO
+from typing import List
+
+from bench_flow_load import create_flow
+from takler.core import Bunch
+from takler.server.scheduler import Scheduler
+from takler.visitor import pre_order_travel, PrintVisitor
+
+
+COMMAND_INTERVAL_SECONDS = 0.002
+ROUND_COUNT = 2
+
+
+def create_scheduler() -> Scheduler:
+    flow = create_flow()
+    bunch = Bunch()
+    bunch.add_flow(flow)
+    flow.requeue()
+    return Scheduler(bunch, incremental=False)
+
+
+def blocking_travel(scheduler: Scheduler):
+    for flow in scheduler.bunch.flows.values():
+        flow.resolve_dependencies()
+
+
+def blocking_show(scheduler: Scheduler):
+    stream = StringIO()
+    for flow in scheduler.bunch.flows.values():
+        pre_order_travel(flow, PrintVisitor(stream=stream))
+    return stream.getvalue()
+
+
+async def cooperative_show(scheduler: Scheduler):
+    return await scheduler.handle_request_show(
+        show_parameter=False, show_trigger=False, show_limit=True, show_event=True, show_meter=True)
+
+
+async def run_work(scheduler: Scheduler, cooperative: bool):
+    for _ in range(ROUND_COUNT):
+        if cooperative:
+            await scheduler.resolve_bunch()
+            await cooperative_show(scheduler)
+        else:
+            blocking_travel(scheduler)
+            blocking_show(scheduler)
+        await asyncio.sleep(0)
+
+
+def send_commands(loop: asyncio.AbstractEventLoop, scheduler: Scheduler, stop: threading.Event) -> List[float]:
+    latencies = []
+
+    async def command(value: int):
+        scheduler.run_command_meter("/flow1/container_000/task_000", "meter1", str(value % 10))
+
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        asyncio.run_coroutine_threadsafe(command(i), loop).result()
+        latencies.append(time.perf_counter() - start)
+        i += 1
+        time.sleep(COMMAND_INTERVAL_SECONDS)
+    return latencies
+
+
+async def measure(cooperative: bool) -> List[float]:
+    scheduler = create_scheduler()
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+    client = asyncio.ensure_future(asyncio.to_thread(send_commands, loop, scheduler, stop))
+    await asyncio.sleep(0.1)
+    await run_work(scheduler, cooperative)
+    stop.set()
+    return await client
+
+
+def main():
+    for name, cooperative in (("blocking", False), ("cooperative", True)):
+        latencies = sorted(asyncio.run(measure(cooperative)))
+        p50 = statistics.median(latencies)
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(
+            f"{name:12s} {len(latencies):6d} commands, "
+            f"p50 {p50 * 1000:8.2f} ms, p99 {p99 * 1000:8.2f} ms, max {latencies[-1] * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark for compiled trigger expressions.
+
+Compare ``AstRoot.evaluate`` (tree-walking interpreter) with ``CompiledExpression.evaluate``
+over trigger expressions used in expression and trigger tests.
+The flow is attached to a bunch, so compiled expressions check the bunch's structure version as in the scheduler.
+
+Usage::
+
+    python benchmarks/bench_expression_compile.py
+"""
+import time
+from typing import Callable
+
+from takler.core import Bunch, Flow
+from takler.core.expression import Expression
+
+
+REPEAT = 100000
+
+EXPRESSIONS = [
+    "./task1 == complete",
+    "/flow1/container1/task1 == aborted",
+    "./task1:event1 == set",
+    "./task1:event1 == unset",
+    "./task1:meter1 > 5",
+    "./task1:meter1 >= 5",
+    "./task1:meter1 <= 5",
+    "./task1:param1 == 1",
+    "./task1:meter1 + ./task2:meter2 >= ./task1:meter1",
+    "./task1:meter1 >= 5 or ./task1 == complete",
+    "./task1:meter1 >= 5 and ./task2 == complete",
+    "./task1:meter1 >= 5 and (./task1 == complete or ./task1:event1 == set)",
+]
+
+
+def build_flow() -> Flow:
+    with Flow("flow1") as flow1:
+        with flow1.add_container("container1") as container1:
+            with container1.add_task("task1") as task1:
+                task1.add_event("event1")
+                task1.add_meter("meter1", 0, 10)
+                task1.add_parameter("param1", 1)
+            with container1.add_task("task2") as task2:
+                task2.add_meter("meter2", 0, 10)
+            container1.add_task("task3")
+    flow1.requeue()
+    task1.set_meter("meter1", 6)
+    return flow1
+
+
+def measure(func: Callable[[], bool]) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func()
+    return (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    flow1 = build_flow()
+    bunch = Bunch()
+    bunch.compile_expressions = True
+    bunch.add_flow(flow1)
+    task3 = flow1.find_node("/flow1/container1/task3")
+
+    total_interpreted = 0.0
+    total_compiled = 0.0
+    print(f"{'expression':<75} {'ast(ns)':>9} {'compiled(ns)':>13} {'speedup':>8}")
+    for expr_string in EXPRESSIONS:
+        expr = Expression(expr_string)
+        expr.create_ast(task3)
+        assert expr.ast.evaluate() == expr.compiled.evaluate()
+
+        interpreted = measure(expr.ast.evaluate)
+        compiled = measure(expr.compiled.evaluate)
+        total_interpreted += interpreted
+        total_compiled += compiled
+        print(f"{expr_string:<75} {interpreted * 1e9:9.0f} {compiled * 1e9:13.0f} {interpreted / compiled:7.1f}x")
+
+    print(f"{'total':<75} {total_interpreted * 1e9:9.0f} {total_compiled * 1e9:13.0f} "
+          f"{total_interpreted / total_compiled:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
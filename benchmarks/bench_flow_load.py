@@ -0,0 +1,89 @@
+"""
+Benchmark for loading a flow with 100000 tasks, like ``Scheduler.run_command_load``.
+
+Measure ``json.loads`` and ``Flow.from_dict`` for JSON, ``loads_compact_flow`` for the compact format,
+and the whole ``run_command_load`` for both, which also adds the flow into bunch,
+parses triggers and requeues the flow.
+
+Ratios of payload size and decoding time (JSON to compact) are printed at last.
+Decoding time of both formats includes the garbage collection of new nodes after ``gc_paused``.
+
+Usage::
+
+    python benchmarks/bench_flow_load.py
+"""
+import gc
+import json
+import time
+
+from takler.core import Bunch, Flow, SerializationType
+from takler.core.compact_flow import dumps_compact_flow, loads_compact_flow
+from takler.core.protocol import compact_flow_pb2
+from takler.server.scheduler import Scheduler
+
+
+CONTAINER_COUNT = 500
+TASK_COUNT = 200
+
+
+def create_flow() -> Flow:
+    with Flow("flow1") as flow1:
+        for i in range(CONTAINER_COUNT):
+            with flow1.add_container(f"container_{i:03d}") as container:
+                for j in range(TASK_COUNT):
+                    with container.add_task(f"task_{j:03d}") as task:
+                        task.add_event("event1")
+                        task.add_meter("meter1", 0, 10)
+                        if j > 0:
+                            task.add_trigger(f"./task_{j - 1:03d} == complete")
+    return flow1
+
+
+def main():
+    flow = create_flow()
+    flow_bytes = json.dumps(flow.to_dict()).encode("utf-8")
+    compact_bytes = dumps_compact_flow(flow)
+    node_count = 1 + CONTAINER_COUNT * (TASK_COUNT + 1)
+
+    start = time.perf_counter()
+    flow_dict = json.loads(flow_bytes)
+    json_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Flow.from_dict(flow_dict, method=SerializationType.Tree)
+    gc.collect(0)
+    from_dict_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compact_flow_pb2.CompactFlow.FromString(compact_bytes)
+    parse_compact_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loads_compact_flow(compact_bytes)
+    gc.collect(0)
+    loads_compact_cost = time.perf_counter() - start
+
+    load_costs = []
+    for flow_type, data in (("json", flow_bytes), ("compact", compact_bytes)):
+        scheduler = Scheduler(Bunch())
+        start = time.perf_counter()
+        scheduler.run_command_load(flow_type, data)
+        load_costs.append(time.perf_counter() - start)
+        assert len(scheduler.bunch.node_index) == node_count
+
+    print(f"{node_count} nodes")
+    print(f"json:    {len(flow_bytes) / 1024 / 1024:8.2f} MiB")
+    print(f"  json.loads:          {json_cost * 1000:8.1f} ms")
+    print(f"  Flow.from_dict:      {from_dict_cost * 1000:8.1f} ms")
+    print(f"  run_command_load:    {load_costs[0] * 1000:8.1f} ms")
+    print(f"compact: {len(compact_bytes) / 1024 / 1024:8.2f} MiB")
+    print(f"  protobuf parse:      {parse_compact_cost * 1000:8.1f} ms")
+    print(f"  loads_compact_flow:  {loads_compact_cost * 1000:8.1f} ms")
+    print(f"  run_command_load:    {load_costs[1] * 1000:8.1f} ms")
+    print(f"json / compact:")
+    print(f"  payload size:        {len(flow_bytes) / len(compact_bytes):8.1f} x")
+    print(f"  decoding:            {(json_cost + from_dict_cost) / loads_compact_cost:8.1f} x")
+
+
+if __name__ == "__main__":
+    main()
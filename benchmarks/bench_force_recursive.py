@@ -0,0 +1,63 @@
+"""
+Benchmark for propagating status changes of many nodes in one family.
+
+A family has 200 sub-families, each with 100 tasks (20000 tasks). Force all tasks to complete, compare
+
+* immediate: set status of each task with side effects, status swims up after each change.
+* batched: the same changes in one propagation transaction (``Bunch.status_propagation.batch``),
+  each ancestor is recomputed once when the transaction commits.
+* force recursive: ``force --recursive`` on the family (``NodeContainer.sink_status_change``).
+
+Usage::
+
+    python benchmarks/bench_force_recursive.py
+"""
+import time
+from contextlib import nullcontext
+
+from takler.core import Bunch, Flow, NodeStatus
+
+
+FAMILY_COUNT = 200
+TASK_COUNT = 100
+
+
+def create_bunch() -> Bunch:
+    with Flow("flow1") as flow1:
+        with flow1.add_container("family1") as family1:
+            for i in range(FAMILY_COUNT):
+                with family1.add_container(f"family_{i:03d}") as family:
+                    for j in range(TASK_COUNT):
+                        family.add_task(f"task_{j:03d}")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+def measure(name: str) -> float:
+    bunch = create_bunch()
+    family1 = bunch.find_node("/flow1/family1")
+    tasks = [task for family in family1.children for task in family.children]
+
+    start = time.perf_counter()
+    if name == "force recursive":
+        family1.sink_status_change(NodeStatus.complete)
+    else:
+        with bunch.status_propagation.batch() if name == "batched" else nullcontext():
+            for task in tasks:
+                task.set_node_status(NodeStatus.complete)
+    cost = time.perf_counter() - start
+
+    assert bunch.find_flow("flow1").state.node_status == NodeStatus.complete
+    return cost
+
+
+def main():
+    for name in ("immediate", "batched", "force recursive"):
+        cost = measure(name)
+        print(f"{name:16s} {FAMILY_COUNT * TASK_COUNT} tasks: {cost * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark for the command journal with group fsync.
+
+Concurrent clients run child commands through ``Scheduler.run_command_meter`` and wait for the journal
+like ``TaklerService`` does. Compare with one ``fsync`` for each command.
+
+Usage::
+
+    python benchmarks/bench_journal.py
+"""
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from takler.core import Bunch, Flow
+from takler.server.scheduler import Scheduler
+
+
+TASK_COUNT = 100
+COMMAND_COUNT = 20
+
+
+def create_bunch() -> Bunch:
+    with Flow("flow1") as flow1:
+        for i in range(TASK_COUNT):
+            with flow1.add_task(f"task_{i:03d}") as task:
+                task.add_meter("meter1", 0, COMMAND_COUNT)
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+async def run_clients(scheduler: Scheduler, fsync_each: bool) -> float:
+    await scheduler.start()
+
+    async def client(node_path: str):
+        for i in range(COMMAND_COUNT):
+            scheduler.run_command_meter(node_path, "meter1", str(i + 1))
+            if fsync_each:
+                os.fsync(scheduler.journal.segment_file.fileno())
+            else:
+                await scheduler.sync_journal()
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(f"/flow1/task_{i:03d}") for i in range(TASK_COUNT)])
+    cost = time.perf_counter() - start
+    scheduler.journal.close()
+    return cost
+
+
+def main():
+    command_count = TASK_COUNT * COMMAND_COUNT
+    print(f"{TASK_COUNT} clients, {command_count} commands:")
+    for name, fsync_each in (("fsync each command", True), ("group fsync", False)):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            scheduler = Scheduler(create_bunch(), journal_path=str(Path(temp_dir, "takler.journal")))
+            cost = asyncio.run(run_clients(scheduler, fsync_each))
+        print(f"  {name:20s} {cost * 1000:8.1f} ms, {command_count / cost:10.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Simulator for allocation policies of a ``Limit`` under contention.
+
+A flow has a limit of 10 tokens used by all tasks:
+
+* bulk: a post-processing family early in the tree, 400 tasks of 10 time units.
+* family_1 ... family_4: 4 families, each with 50 tasks of 10 time units.
+* urgent: 20 tasks of 2 time units with ``TAKLER_PRIORITY`` 10, arriving every 20 time units from time 50.
+
+The simulation runs in virtual time with the incremental resolver. In each time unit, arrived urgent tasks are
+resumed, dirty nodes are resolved until nothing changes, and tasks reaching their end time are completed.
+For each policy, report throughput and waiting time (from arrival to submission) of each group.
+
+Usage::
+
+    python benchmarks/bench_limit_policy.py
+"""
+import statistics
+import time
+
+from takler.core import Bunch, Flow, NodeStatus, AllocationPolicy
+
+
+LIMIT_COUNT = 10
+BULK_TASK_COUNT = 400
+FAMILY_COUNT = 4
+FAMILY_TASK_COUNT = 50
+URGENT_TASK_COUNT = 20
+TASK_DURATION = 10
+URGENT_TASK_DURATION = 2
+URGENT_START_TIME = 50
+URGENT_INTERVAL = 20
+
+
+def create_bunch(policy: AllocationPolicy) -> Bunch:
+    with Flow("flow1") as flow1:
+        flow1.add_limit("limit1", LIMIT_COUNT, policy=policy)
+        flow1.add_in_limit("limit1")
+        with flow1.add_container("bulk") as bulk:
+            for i in range(BULK_TASK_COUNT):
+                bulk.add_task(f"task_{i:03d}")
+        for i in range(FAMILY_COUNT):
+            with flow1.add_container(f"family_{i + 1}") as family:
+                for j in range(FAMILY_TASK_COUNT):
+                    family.add_task(f"task_{j:03d}")
+        with flow1.add_container("urgent") as urgent:
+            urgent.add_parameter("TAKLER_PRIORITY", 10)
+            for i in range(URGENT_TASK_COUNT):
+                urgent.add_task(f"task_{i:03d}")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    for task in urgent.children:
+        task.suspend()
+    return bunch
+
+
+def simulate(policy: AllocationPolicy):
+    bunch = create_bunch(policy)
+    flow1 = bunch.find_flow("flow1")
+    urgent_tasks = bunch.find_node("/flow1/urgent").children
+    tasks = [task for family in flow1.children for task in family.children]
+
+    arrival_times = {task: 0 for task in tasks}
+    for i, task in enumerate(urgent_tasks):
+        arrival_times[task] = URGENT_START_TIME + i * URGENT_INTERVAL
+
+    start_times = dict()
+    end_times = dict()
+    current_time = 0
+    cost = time.perf_counter()
+    while flow1.state.node_status != NodeStatus.complete:
+        for task in urgent_tasks:
+            if arrival_times[task] == current_time:
+                task.resume()
+
+        while bunch.resolver.has_dirty_nodes():
+            bunch.resolve_dirty_nodes()
+
+        for task in tasks:
+            if task not in start_times and task.state.node_status == NodeStatus.submitted:
+                start_times[task] = current_time
+                duration = URGENT_TASK_DURATION if task.parent.name == "urgent" else TASK_DURATION
+                end_times[task] = current_time + duration
+                task.init(str(current_time))
+
+        current_time += 1
+        for task, end_time in list(end_times.items()):
+            if end_time == current_time:
+                task.complete()
+                del end_times[task]
+    cost = time.perf_counter() - cost
+
+    waits = dict()
+    for task in tasks:
+        group = task.parent.name if task.parent.name in ("bulk", "urgent") else "families"
+        waits.setdefault(group, []).append(start_times[task] - arrival_times[task])
+    return current_time, waits, cost
+
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    task_count = BULK_TASK_COUNT + FAMILY_COUNT * FAMILY_TASK_COUNT + URGENT_TASK_COUNT
+    for policy in AllocationPolicy:
+        makespan, waits, cost = simulate(policy)
+        print(f"{policy.value:10s} makespan {makespan:5d}, throughput {task_count / makespan:.3f} tasks/unit, "
+              f"simulated in {cost:.2f} s")
+        for group in ("bulk", "families", "urgent"):
+            values = waits[group]
+            print(f"    {group:8s} wait p50 {statistics.median(values):7.1f}  p95 {percentile(values, 0.95):7.1f}  "
+                  f"max {max(values):7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark for running many tasks sharing a small ``Limit``.
+
+A flow has a limit of 10 tokens and a family with 5000 tasks using the limit by node path.
+Run all tasks with the incremental resolver: in each round, resolve dirty nodes, then complete all submitted tasks.
+Report total time, number of rounds, and number of nodes checked by the resolver.
+
+Usage::
+
+    python benchmarks/bench_limit_waiters.py
+"""
+import time
+
+from takler.core import Bunch, Flow, NodeStatus
+
+
+TASK_COUNT = 5000
+LIMIT_COUNT = 10
+
+
+def create_bunch() -> Bunch:
+    with Flow("flow1") as flow1:
+        flow1.add_limit("limit1", LIMIT_COUNT)
+        with flow1.add_container("family1") as family1:
+            for i in range(TASK_COUNT):
+                with family1.add_task(f"task_{i:04d}") as task:
+                    task.add_in_limit("limit1", node_path="/flow1")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+def main():
+    bunch = create_bunch()
+    family1 = bunch.find_node("/flow1/family1")
+    tasks = family1.children
+
+    check_count = 0
+    round_count = 0
+    start = time.perf_counter()
+    while family1.state.node_status != NodeStatus.complete:
+        round_count += 1
+        for _ in bunch.resolver.iter_resolve():
+            check_count += 1
+        for task in tasks:
+            if task.state.node_status == NodeStatus.submitted:
+                task.init(str(round_count))
+                task.complete()
+    cost = time.perf_counter() - start
+
+    print(f"{TASK_COUNT} tasks with limit {LIMIT_COUNT}: {round_count} rounds, "
+          f"{check_count} node checks, total {cost:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
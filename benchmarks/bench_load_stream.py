@@ -0,0 +1,67 @@
+"""
+Benchmark for event loop stall when loading a flow with 100000 tasks.
+
+A ticker coroutine stands for other RPCs served by the scheduler. Measure the longest time the ticker
+waits while a flow is loaded by ``Scheduler.run_command_load`` in the event loop, and by
+``Scheduler.run_command_load_stream`` which builds the flow in a worker thread.
+
+Usage::
+
+    python benchmarks/bench_load_stream.py
+"""
+import asyncio
+import time
+
+from bench_flow_load import create_flow
+from takler.core import Bunch
+from takler.core.compact_flow import dumps_compact_flow
+from takler.server.scheduler import Scheduler
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+async def iter_chunks(data: bytes):
+    for i in range(0, len(data), CHUNK_SIZE):
+        yield data[i:i + CHUNK_SIZE]
+        await asyncio.sleep(0)
+
+
+async def measure(flow_bytes: bytes, stream: bool):
+    scheduler = Scheduler(Bunch())
+    done = False
+    max_stall = 0.0
+
+    async def ticker():
+        nonlocal max_stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            max_stall = max(max_stall, now - last)
+            last = now
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    if stream:
+        await scheduler.run_command_load_stream("compact", iter_chunks(flow_bytes))
+    else:
+        scheduler.run_command_load("compact", flow_bytes)
+    cost = time.perf_counter() - start
+
+    done = True
+    await ticker_task
+    return cost, max_stall
+
+
+def main():
+    flow_bytes = dumps_compact_flow(create_flow())
+    for name, stream in (("run_command_load", False), ("run_command_load_stream", True)):
+        cost, max_stall = asyncio.run(measure(flow_bytes, stream))
+        print(f"{name:25s} total {cost * 1000:8.1f} ms, max event loop stall {max_stall * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
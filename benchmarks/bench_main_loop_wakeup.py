@@ -0,0 +1,92 @@
+"""
+Benchmark for main loop wakeup of the scheduler.
+
+* latency: a chain of tasks, each triggered by the previous one. A client completes each task as soon as it is
+  submitted, measure time from ``complete`` to the successor being submitted, with ``interval_main_loop`` of 10 s.
+* idle cost: time of one idle main loop for a flow with 100000 tasks, updating calendars by walking all nodes
+  (``Flow.update_calendar``) and by visiting only nodes with time attributes (``Bunch.update_calendar``).
+
+Usage::
+
+    python benchmarks/bench_main_loop_wakeup.py
+"""
+import asyncio
+import datetime
+import statistics
+import time
+
+from bench_flow_load import create_flow
+from takler.core import Bunch, Flow, NodeStatus
+from takler.server.scheduler import Scheduler
+
+
+CHAIN_LENGTH = 50
+IDLE_ROUND_COUNT = 10
+
+
+def create_chain_bunch() -> Bunch:
+    with Flow("flow1") as flow1:
+        for i in range(CHAIN_LENGTH):
+            with flow1.add_task(f"task_{i:03d}") as task:
+                if i > 0:
+                    task.add_trigger(f"./task_{i - 1:03d} == complete")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+async def measure_latency():
+    bunch = create_chain_bunch()
+    scheduler = Scheduler(bunch, interval_main_loop=10)
+    main_loop = asyncio.create_task(scheduler.run())
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(CHAIN_LENGTH):
+        task = bunch.find_node(f"/flow1/task_{i:03d}")
+        while task.state.node_status != NodeStatus.submitted:
+            await asyncio.sleep(0.0001)
+        if i > 0:
+            latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        await scheduler.submit_command("complete", node_path=task.node_path)
+
+    await scheduler.stop()
+    await main_loop
+    return latencies
+
+
+def measure_idle_cost():
+    flow = create_flow()
+    bunch = Bunch()
+    bunch.add_flow(flow)
+    flow.requeue()
+    flow.find_node("/flow1/container_000/task_000").add_time("23:59")
+
+    costs = dict()
+    for name in ("Flow.update_calendar", "Bunch.update_calendar"):
+        start = time.perf_counter()
+        for _ in range(IDLE_ROUND_COUNT):
+            time_now = datetime.datetime.now()
+            if name == "Flow.update_calendar":
+                for flow in bunch.flows.values():
+                    flow.update_calendar(time_now)
+            else:
+                bunch.update_calendar(time_now)
+        costs[name] = (time.perf_counter() - start) / IDLE_ROUND_COUNT
+    return costs
+
+
+def main():
+    latencies = asyncio.run(measure_latency())
+    print(
+        f"complete -> successor submitted: {len(latencies)} tasks, "
+        f"p50 {statistics.median(latencies) * 1000:.2f} ms, max {max(latencies) * 1000:.2f} ms"
+    )
+    for name, cost in measure_idle_cost().items():
+        print(f"idle loop calendar update with {name:22s} {cost * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark for ``Node.node_path`` on a 10-level, 50k-node tree.
+
+Compare cached ``node_path`` with the uncached implementation which walks to the root on every access.
+
+Usage::
+
+    python benchmarks/bench_node_path.py
+"""
+import time
+from pathlib import PurePosixPath
+from typing import List, Tuple
+
+from takler.core import Flow
+from takler.core.node import Node
+
+
+LEVEL_COUNT = 10
+NODE_COUNT = 50000
+REPEAT = 5
+
+
+def build_tree() -> Tuple[Flow, List[Node]]:
+    """
+    Build a flow with ``LEVEL_COUNT`` levels under the flow, each level has ``NODE_COUNT / LEVEL_COUNT`` nodes.
+    """
+    flow = Flow("flow1")
+    width = NODE_COUNT // LEVEL_COUNT
+    nodes = []
+    parents: List[Node] = [flow]
+    for level in range(LEVEL_COUNT):
+        current_level = []
+        for i in range(width):
+            parent = parents[i % len(parents)]
+            if level == LEVEL_COUNT - 1:
+                node = parent.add_task(f"task_{level}_{i}")
+            else:
+                node = parent.add_container(f"container_{level}_{i}")
+            current_level.append(node)
+        nodes.extend(current_level)
+        parents = current_level
+    return flow, nodes
+
+
+def uncached_node_path(node: Node) -> str:
+    cur_node = node
+    node_list = []
+    while cur_node is not None:
+        node_list.insert(0, cur_node.name)
+        cur_node = cur_node.parent
+    return str(PurePosixPath("/", *node_list))
+
+
+def run(name: str, func, nodes: List[Node]) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for node in nodes:
+            func(node)
+    cost = (time.perf_counter() - start) / REPEAT
+    print(f"{name:<20} {cost * 1000:10.2f} ms/pass")
+    return cost
+
+
+def main():
+    flow, nodes = build_tree()
+    print(f"nodes: {len(nodes)}, levels: {LEVEL_COUNT}, repeat: {REPEAT}")
+
+    uncached_cost = run("uncached", uncached_node_path, nodes)
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        flow.invalidate_node_path()
+        for node in nodes:
+            node.node_path
+    cold_cost = (time.perf_counter() - start) / REPEAT
+    print(f"{'cached (cold)':<20} {cold_cost * 1000:10.2f} ms/pass")
+
+    cached_cost = run("cached (warm)", lambda node: node.node_path, nodes)
+
+    print(f"speedup (cold): {uncached_cost / cold_cost:.1f}x")
+    print(f"speedup (warm): {uncached_cost / cached_cost:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
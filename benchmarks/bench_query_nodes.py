@@ -0,0 +1,69 @@
+"""
+Benchmark for structured node query: ``show`` text rendering vs. ``QueryNodes`` with filters.
+
+A bunch with 40000 tasks has 3 aborted tasks. Compare rendering the whole bunch into text
+with querying aborted nodes, and fetching the first page of a subtree.
+
+Usage::
+
+    python benchmarks/bench_query_nodes.py
+"""
+import asyncio
+import time
+
+from takler.core import Bunch, Flow
+from takler.server.scheduler import Scheduler
+from takler.server.network_service import TaklerService
+from takler.server.protocol import takler_pb2
+
+
+CONTAINER_COUNT = 200
+TASK_COUNT = 200
+REPEAT = 5
+
+
+def create_scheduler() -> Scheduler:
+    with Flow("flow1") as flow1:
+        for i in range(CONTAINER_COUNT):
+            with flow1.add_container(f"container_{i:03d}") as container:
+                for j in range(TASK_COUNT):
+                    with container.add_task(f"task_{j:03d}") as task:
+                        task.add_meter("meter1", 0, 10)
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    for i in (10, 100, 190):
+        bunch.find_node(f"/flow1/container_{i:03d}/task_050").abort("test")
+    return Scheduler(bunch)
+
+
+def measure(function) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        function()
+    return (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    scheduler = create_scheduler()
+    service = TaklerService(scheduler)
+
+    def show():
+        return asyncio.run(scheduler.handle_request_show(
+            show_parameter=False, show_trigger=False, show_limit=True, show_event=True, show_meter=True))
+
+    def query(**kwargs):
+        return asyncio.run(service.QueryNodes(takler_pb2.QueryNodesRequest(**kwargs), None))
+
+    show_cost = measure(show)
+    aborted_cost = measure(lambda: query(status=["aborted"], attributes=["meter"]))
+    page_cost = measure(lambda: query(node_path="/flow1/container_100", attributes=["meter"], page_size=50))
+
+    print(f"{CONTAINER_COUNT * TASK_COUNT} tasks:")
+    print(f"  show (text):                  {show_cost * 1000:8.2f} ms")
+    print(f"  query aborted nodes:          {aborted_cost * 1000:8.2f} ms")
+    print(f"  query first page of subtree:  {page_cost * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
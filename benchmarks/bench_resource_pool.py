@@ -0,0 +1,71 @@
+"""
+Benchmark for resource pools shared by many flows in a bunch.
+
+A bunch has a resource pool ``hpc`` with 256 cpu and 1024 memory units. 20 flows each have 500 tasks,
+every task uses 16 cpu and 48 memory units from the pool.
+Run all tasks with the incremental resolver: in each round, resolve dirty nodes, then complete all running tasks.
+Report total time, peak usage of the pool, and cost of checking limits of one task.
+
+Usage::
+
+    python benchmarks/bench_resource_pool.py
+"""
+import time
+
+from takler.core import Bunch, Flow, NodeStatus
+
+
+FLOW_COUNT = 20
+TASK_COUNT = 500
+POOL_RESOURCES = dict(cpu=256, memory=1024)
+TASK_RESOURCES = dict(cpu=16, memory=48)
+CHECK_COUNT = 100000
+
+
+def create_bunch() -> Bunch:
+    bunch = Bunch()
+    bunch.add_resource_pool("hpc", POOL_RESOURCES)
+    for i in range(FLOW_COUNT):
+        with Flow(f"flow_{i:02d}") as flow:
+            for j in range(TASK_COUNT):
+                with flow.add_task(f"task_{j:03d}") as task:
+                    task.add_resource_usage("hpc", TASK_RESOURCES)
+        bunch.add_flow(flow)
+        flow.requeue()
+    return bunch
+
+
+def main():
+    bunch = create_bunch()
+    flows = list(bunch.flows.values())
+    cpu_limit = bunch.find_limit("hpc.cpu")
+    memory_limit = bunch.find_limit("hpc.memory")
+
+    task = flows[-1].children[-1]
+    start = time.perf_counter()
+    for _ in range(CHECK_COUNT):
+        task.check_in_limit_up()
+    check_cost = (time.perf_counter() - start) / CHECK_COUNT
+
+    peak = dict(cpu=0, memory=0)
+    round_count = 0
+    start = time.perf_counter()
+    while any(flow.state.node_status != NodeStatus.complete for flow in flows):
+        round_count += 1
+        bunch.resolve_dirty_nodes()
+        peak["cpu"] = max(peak["cpu"], cpu_limit.value)
+        peak["memory"] = max(peak["memory"], memory_limit.value)
+        # running tasks are the ones holding resources.
+        for node_path in sorted(cpu_limit.node_paths):
+            task = bunch.find_node(node_path)
+            task.init(str(round_count))
+            task.complete()
+    cost = time.perf_counter() - start
+
+    print(f"{FLOW_COUNT * TASK_COUNT} tasks in {FLOW_COUNT} flows: {round_count} rounds, total {cost:.2f} s")
+    print(f"peak usage: cpu {peak['cpu']}/{cpu_limit.limit}, memory {peak['memory']}/{memory_limit.limit}")
+    print(f"check limits of one task: {check_cost * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
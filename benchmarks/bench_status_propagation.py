@@ -0,0 +1,67 @@
+"""
+Benchmark for swimming status changes up the tree when tasks in a large family complete.
+
+A flow has 10 families, each with 2000 tasks. Complete all tasks of one family one by one, compare
+scanning all children at each ancestor (``compute_most_significant_status``) with
+per-status child counters (``Node.most_significant_child_status``).
+
+Usage::
+
+    python benchmarks/bench_status_propagation.py
+"""
+import time
+
+from takler.core import Bunch, Flow, NodeContainer, NodeStatus
+from takler.core.node import compute_most_significant_status
+
+
+FAMILY_COUNT = 10
+TASK_COUNT = 2000
+
+
+def create_bunch() -> Bunch:
+    with Flow("flow1") as flow1:
+        for i in range(FAMILY_COUNT):
+            with flow1.add_container(f"family_{i:02d}") as family:
+                for j in range(TASK_COUNT):
+                    family.add_task(f"task_{j:04d}")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+def scan_computed_status(self, immediate: bool) -> NodeStatus:
+    if len(self.children) == 0:
+        return self.state.node_status
+    return compute_most_significant_status(self.children, immediate)
+
+
+def measure() -> float:
+    bunch = create_bunch()
+    family = bunch.find_node("/flow1/family_00")
+    start = time.perf_counter()
+    for task in family.children:
+        task.set_node_status(NodeStatus.complete)
+    cost = time.perf_counter() - start
+    assert family.state.node_status == NodeStatus.complete
+    return cost
+
+
+def main():
+    counter_cost = measure()
+
+    computed_status = NodeContainer.computed_status
+    NodeContainer.computed_status = scan_computed_status
+    try:
+        scan_cost = measure()
+    finally:
+        NodeContainer.computed_status = computed_status
+
+    for name, cost in (("scan children", scan_cost), ("child counters", counter_cost)):
+        print(f"{name:15s} {TASK_COUNT} completes: total {cost * 1000:8.1f} ms, "
+              f"{cost / TASK_COUNT * 1e6:8.1f} us per complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark for status subscription: watchers polling ``show`` vs. ``SubscriptionHub`` deltas.
+
+A flow with 1000 tasks changes 20 meters in each tick. Each of the watchers either renders
+the whole bunch with ``Scheduler.handle_request_show`` (what ``RunRequestShow`` does),
+or receives deltas from ``SubscriptionHub``. Only the cost inside the scheduler process is measured.
+
+Usage::
+
+    python benchmarks/bench_subscription.py
+"""
+import asyncio
+import time
+
+from takler.core import Bunch, Flow
+from takler.server.scheduler import Scheduler
+from takler.server.subscription import SubscriptionHub
+
+
+CONTAINER_COUNT = 20
+TASK_COUNT = 50
+WATCHER_COUNT = 50
+TICK_COUNT = 20
+CHANGES_PER_TICK = 20
+
+
+def create_scheduler() -> Scheduler:
+    with Flow("flow1") as flow1:
+        for i in range(CONTAINER_COUNT):
+            with flow1.add_container(f"container_{i:02d}") as container:
+                for j in range(TASK_COUNT):
+                    with container.add_task(f"task_{j:03d}") as task:
+                        task.add_meter("meter1", 0, TICK_COUNT)
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return Scheduler(bunch)
+
+
+def change_meters(scheduler: Scheduler, tick: int):
+    for i in range(CHANGES_PER_TICK):
+        task = scheduler.bunch.find_node(f"/flow1/container_{i:02d}/task_{tick:03d}")
+        task.set_meter("meter1", tick + 1)
+
+
+async def run_polling(scheduler: Scheduler) -> float:
+    start = time.perf_counter()
+    for tick in range(TICK_COUNT):
+        change_meters(scheduler, tick)
+        for _ in range(WATCHER_COUNT):
+            await scheduler.handle_request_show(
+                show_parameter=False,
+                show_trigger=False,
+                show_limit=True,
+                show_event=True,
+                show_meter=True,
+            )
+    return time.perf_counter() - start
+
+
+async def run_subscription(scheduler: Scheduler) -> float:
+    hub = SubscriptionHub(scheduler.bunch)
+    hub.start()
+    received = [0] * WATCHER_COUNT
+
+    async def watch(index: int):
+        async for response in hub.subscribe():
+            received[index] += len(response.deltas.deltas)
+
+    watchers = [asyncio.create_task(watch(i)) for i in range(WATCHER_COUNT)]
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    for tick in range(TICK_COUNT):
+        change_meters(scheduler, tick)
+        # let hub publish and watchers receive deltas.
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+    cost = time.perf_counter() - start
+
+    for t in watchers:
+        t.cancel()
+    await asyncio.gather(*watchers, return_exceptions=True)
+    hub.stop()
+    assert all(r == TICK_COUNT * CHANGES_PER_TICK for r in received), received
+    return cost
+
+
+def main():
+    polling_cost = asyncio.run(run_polling(create_scheduler()))
+    subscription_cost = asyncio.run(run_subscription(create_scheduler()))
+
+    print(f"{CONTAINER_COUNT * TASK_COUNT} tasks, {WATCHER_COUNT} watchers, "
+          f"{TICK_COUNT} ticks with {CHANGES_PER_TICK} meter changes:")
+    print(f"  polling show:   {polling_cost * 1000:10.1f} ms ({polling_cost / TICK_COUNT * 1000:8.2f} ms/tick)")
+    print(f"  subscription:   {subscription_cost * 1000:10.1f} ms "
+          f"({subscription_cost / TICK_COUNT * 1000:8.2f} ms/tick)")
+    print(f"  speedup: {polling_cost / subscription_cost:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
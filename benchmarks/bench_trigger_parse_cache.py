@@ -0,0 +1,48 @@
+"""
+Benchmark for trigger parse cache.
+
+Parse triggers of a flow generated from a template, where many nodes share the same trigger text.
+
+Usage::
+
+    python benchmarks/bench_trigger_parse_cache.py
+"""
+import time
+
+from takler.core.expression_parser import trigger_parse_cache, parse_trigger_text, parse_trigger
+
+
+NODE_COUNT = 2000
+
+TEMPLATE_TRIGGERS = [
+    "../prepare == complete",
+    "./pre_data == complete",
+    "./model:step >= 12",
+    "./model:output_ready == set",
+    "./post == complete and ./archive == complete",
+]
+
+
+def main():
+    triggers = [TEMPLATE_TRIGGERS[i % len(TEMPLATE_TRIGGERS)] for i in range(NODE_COUNT)]
+
+    start = time.perf_counter()
+    for trigger in triggers:
+        parse_trigger_text(trigger)
+    no_cache_cost = time.perf_counter() - start
+
+    trigger_parse_cache.clear()
+    start = time.perf_counter()
+    for trigger in triggers:
+        parse_trigger(trigger)
+    cache_cost = time.perf_counter() - start
+
+    print(f"triggers: {len(triggers)}, unique: {len(TEMPLATE_TRIGGERS)}")
+    print(f"without cache: {no_cache_cost * 1000:10.2f} ms")
+    print(f"with cache:    {cache_cost * 1000:10.2f} ms")
+    print(f"speedup: {no_cache_cost / cache_cost:.1f}x")
+    print(trigger_parse_cache.cache_info())
+
+
+if __name__ == "__main__":
+    main()
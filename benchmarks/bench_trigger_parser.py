@@ -0,0 +1,79 @@
+"""
+Benchmark for trigger parsers: LALR parser with cached parse tables vs. Earley parser.
+
+Measure parser construction time and parse throughput without parse cache.
+
+Usage::
+
+    python benchmarks/bench_trigger_parser.py
+"""
+import time
+
+from lark import Lark
+
+from takler.core.expression_parser import (
+    ExpressionTransformer,
+    LalrExpressionTransformer,
+    LALR_TRIGGER_GRAMMAR,
+    create_earley_trigger_parser,
+)
+
+
+REPEAT = 200
+
+EXPRESSIONS = [
+    "/flow1/task1 == complete",
+    "../../container1/task_001 == complete",
+    "./task1:event1 == set",
+    "./task1:meter1 >= 5",
+    "./task1:meter1 >= ./task2:meter2",
+    "/flow1/container1:YMD + /flow1/container2:LAG_DATE",
+    "./task2 == complete and ./container1 == complete",
+    "(/flow1/task1 == complete and /flow1/task2:meter1 >= 20) or /flow1/task3 == complete",
+    "./task1:meter1 >= 5 and (./task1 == complete or ./task1:event1 == set)",
+]
+
+
+def main():
+    start = time.perf_counter()
+    earley_parser = create_earley_trigger_parser()
+    earley_create_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lalr_parser = Lark(
+        LALR_TRIGGER_GRAMMAR, start="expression", parser="lalr", transformer=LalrExpressionTransformer())
+    lalr_create_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Lark(
+        LALR_TRIGGER_GRAMMAR, start="expression", parser="lalr", transformer=LalrExpressionTransformer(),
+        cache=True)
+    lalr_cached_create_cost = time.perf_counter() - start
+
+    print("parser construction:")
+    print(f"  earley:             {earley_create_cost * 1000:8.2f} ms")
+    print(f"  lalr:               {lalr_create_cost * 1000:8.2f} ms")
+    print(f"  lalr (disk cache):  {lalr_cached_create_cost * 1000:8.2f} ms")
+
+    transformer = ExpressionTransformer()
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for expr_string in EXPRESSIONS:
+            transformer.transform(earley_parser.parse(expr_string))
+    earley_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for expr_string in EXPRESSIONS:
+            lalr_parser.parse(expr_string)
+    lalr_cost = time.perf_counter() - start
+
+    count = REPEAT * len(EXPRESSIONS)
+    print(f"parse throughput ({count} expressions):")
+    print(f"  earley: {count / earley_cost:10.0f} expr/s")
+    print(f"  lalr:   {count / lalr_cost:10.0f} expr/s")
+    print(f"  speedup: {earley_cost / lalr_cost:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
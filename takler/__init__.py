@@ -1,7 +1,11 @@
-from importlib.metadata import version, PackageNotFoundError
-
-try:
-    __version__ = version("takler")
-except PackageNotFoundError:
-    # package is not installed
-    pass
+def __getattr__(name: str):
+    # package version is loaded lazily, because importlib.metadata is slow to import
+    # and child commands in job scripts should start fast.
+    if name == "__version__":
+        from importlib.metadata import version, PackageNotFoundError
+        try:
+            return version("takler")
+        except PackageNotFoundError:
+            # package is not installed
+            pass
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
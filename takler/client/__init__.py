@@ -1 +1,14 @@
-from .service_client import TaklerServiceClient
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .service_client import TaklerServiceClient
+
+__all__ = ["TaklerServiceClient"]
+
+
+def __getattr__(name: str):
+    # service client is imported lazily, so child commands (takler.client.child) start fast.
+    if name == "TaklerServiceClient":
+        from . import service_client
+        return service_client.TaklerServiceClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,169 @@
+"""
+Buffer child commands on the client side and send them in one ``RunCommandBatch`` request.
+
+Long-running tasks may update events and meters many times. ``ChildCommandBuffer`` collects
+these updates and sends them together when the buffer is full or after an interval,
+which reduces round trips to the server. Status commands (init, complete, abort)
+flush the buffer immediately so the order of all commands is kept on the server side.
+
+Actions are removed from the buffer only after they are sent. If the request fails, actions are kept
+and sent in the next flush. If server rejects the batch, actions are sent again one by one,
+so valid actions are applied, and ``BatchRejectedError`` is raised for rejected ones.
+
+Like ``takler.client.child``, this module only imports gRPC and protocol stubs.
+"""
+import threading
+from typing import Optional, List
+
+from takler.server.protocol import takler_pb2
+from takler.client.service_client import TaklerServiceClient, BatchRejectedError
+
+
+class ChildCommandBuffer:
+    """
+    Client side buffer for child commands.
+
+    Examples
+    --------
+    Send meter updates in batches of 20 commands, or every 5 seconds.
+
+    >>> client = TaklerServiceClient(host="login_a06", port=33083, persistent=True)
+    >>> with ChildCommandBuffer(client, flush_size=20, flush_interval=5) as buffer:
+    ...     buffer.init(node_path="/flow1/task1", task_id="1234")
+    ...     for step in range(0, 240, 3):
+    ...         buffer.meter(node_path="/flow1/task1", meter_name="forecast_hour", meter_value=str(step))
+    ...     buffer.complete(node_path="/flow1/task1")
+
+    Attributes
+    ----------
+    client
+        service client, persistent mode is recommended.
+    flush_size
+        flush the buffer when it has this number of actions.
+    flush_interval
+        flush the buffer after this seconds since the first buffered action. None to disable timer.
+    """
+    def __init__(
+            self,
+            client: TaklerServiceClient,
+            flush_size: int = 50,
+            flush_interval: Optional[float] = 1.0,
+    ):
+        self.client: TaklerServiceClient = client
+        self.flush_size: int = flush_size
+        self.flush_interval: Optional[float] = flush_interval
+
+        self.actions: List[takler_pb2.ChildAction] = []
+        self.lock = threading.RLock()
+        self.timer: Optional[threading.Timer] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # Child command -------------------------------------------------
+
+    def init(self, node_path: str, task_id: str):
+        self.add_action(
+            takler_pb2.ChildAction(init=takler_pb2.InitCommand(
+                child_options=takler_pb2.ChildCommandOptions(node_path=node_path),
+                task_id=task_id,
+            )),
+            flush=True,
+        )
+
+    def complete(self, node_path: str):
+        self.add_action(
+            takler_pb2.ChildAction(complete=takler_pb2.CompleteCommand(
+                child_options=takler_pb2.ChildCommandOptions(node_path=node_path),
+            )),
+            flush=True,
+        )
+
+    def abort(self, node_path: str, reason: str):
+        self.add_action(
+            takler_pb2.ChildAction(abort=takler_pb2.AbortCommand(
+                child_options=takler_pb2.ChildCommandOptions(node_path=node_path),
+                reason=reason,
+            )),
+            flush=True,
+        )
+
+    def event(self, node_path: str, event_name: str):
+        self.add_action(
+            takler_pb2.ChildAction(event=takler_pb2.EventCommand(
+                child_options=takler_pb2.ChildCommandOptions(node_path=node_path),
+                event_name=event_name,
+            ))
+        )
+
+    def meter(self, node_path: str, meter_name: str, meter_value: str):
+        self.add_action(
+            takler_pb2.ChildAction(meter=takler_pb2.MeterCommand(
+                child_options=takler_pb2.ChildCommandOptions(node_path=node_path),
+                meter_name=meter_name,
+                meter_value=str(meter_value),
+            ))
+        )
+
+    # Buffer -------------------------------------------------
+
+    def add_action(self, action: takler_pb2.ChildAction, flush: bool = False):
+        with self.lock:
+            self.actions.append(action)
+            if flush or len(self.actions) >= self.flush_size:
+                self.flush()
+            elif self.timer is None and self.flush_interval is not None:
+                self.timer = threading.Timer(self.flush_interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """
+        Send all buffered actions in one request.
+
+        Raises
+        ------
+        BatchRejectedError
+            If some actions are rejected by server, other actions are applied.
+        grpc.RpcError
+            If request fails, unsent actions are kept in the buffer.
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if len(self.actions) == 0:
+                return
+            try:
+                self.client.batch(self.actions)
+            except BatchRejectedError:
+                self.flush_one_by_one()
+            else:
+                self.actions = []
+
+    def flush_one_by_one(self):
+        """
+        Send buffered actions one in each request after a batch is rejected, and drop rejected actions.
+        """
+        errors = []
+        count = len(self.actions)
+        while len(self.actions) > 0:
+            try:
+                self.client.batch(self.actions[:1])
+            except BatchRejectedError as e:
+                errors.append(str(e))
+            self.actions.pop(0)
+        if len(errors) > 0:
+            raise BatchRejectedError(f"{len(errors)} of {count} actions are rejected: {errors[0]}")
+
+    def close(self):
+        """
+        Flush remaining actions and close client channel.
+        """
+        try:
+            self.flush()
+        finally:
+            self.client.close()
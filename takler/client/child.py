@@ -0,0 +1,138 @@
+"""
+Lean entry point for child commands used in task job scripts.
+
+Each task runs child commands several times (init, event, meter, complete...),
+so this module only imports ``argparse``, gRPC and protocol stubs.
+Options are the same as child commands in ``takler.client.cli``.
+
+Usage::
+
+    python -m takler.client.child init --host ${TAKLER_HOST} --port ${TAKLER_PORT} \
+        --node-path ${TAKLER_NAME} --task-id ${TAKLER_RID}
+"""
+import argparse
+import os
+from typing import Optional, Union, Tuple, List
+
+from takler.constant import DEFAULT_HOST, DEFAULT_PORT
+
+
+TAKLER_HOST = "TAKLER_HOST"
+TAKLER_PORT = "TAKLER_PORT"
+TAKLER_NAME = "TAKLER_NAME"
+TAKLER_CONNECT_FILE = "TAKLER_CONNECT_FILE"
+NO_TAKLER = "NO_TAKLER"
+
+HOST_HELP_STRING = f"takler service host, or use env var {TAKLER_HOST}"
+PORT_HELP_STRING = f"takler service port, or use env var {TAKLER_PORT}"
+
+
+def get_host_and_prot(
+        host: Optional[str] = None,
+        port: Optional[Union[str, int]] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    get host and port.
+
+    Priority:
+    * function options: host, port
+    * connect config file, TAKLER_CONNECT_FILE
+    * env variables for host and port, TAKLER_HOST and TAKLER_PORT
+
+    Parameters
+    ----------
+    host
+    port
+
+    Returns
+    -------
+    (Optional[str], Optional[str])
+    """
+    result_host = DEFAULT_HOST
+    result_port = DEFAULT_PORT
+
+    if TAKLER_HOST in os.environ:
+        result_host = os.environ[TAKLER_HOST]
+
+    if TAKLER_PORT in os.environ:
+        result_port = os.environ[TAKLER_PORT]
+
+    if TAKLER_CONNECT_FILE in os.environ:
+        # connect config needs yaml and pydantic, only import them when used.
+        from takler.server.connect_config import load_connect_config
+        connect_config = load_connect_config(os.environ[TAKLER_CONNECT_FILE])
+        result_host = connect_config.server.address.hostname
+        result_port = connect_config.server.address.port
+
+    if host is not None:
+        result_host = host
+    if port is not None:
+        result_port = port
+
+    return result_host, result_port
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="takler.client.child", description="takler child commands.")
+    sub_parsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_child_parser(name: str, help_string: str) -> argparse.ArgumentParser:
+        p = sub_parsers.add_parser(name, help=help_string)
+        p.add_argument(
+            "--node-path", default=os.environ.get(TAKLER_NAME, None),
+            required=TAKLER_NAME not in os.environ, help="node path.")
+        p.add_argument("--host", default=None, help=HOST_HELP_STRING)
+        p.add_argument("--port", default=None, help=PORT_HELP_STRING)
+        return p
+
+    p = add_child_parser("init", "[child] init the task.")
+    p.add_argument("--task-id", required=True, help="task id (TAKLER_RID).")
+
+    add_child_parser("complete", "[child] complete the task.")
+
+    p = add_child_parser("abort", "[child] abort the task.")
+    p.add_argument("--reason", default="", help="abort reason")
+
+    p = add_child_parser("event", "[child] change Event.")
+    p.add_argument("--event-name", required=True, help="event name")
+
+    p = add_child_parser("meter", "[child] change Meter.")
+    p.add_argument("--meter-name", required=True, help="meter name")
+    p.add_argument("--meter-value", required=True, help="meter value")
+
+    return parser
+
+
+def run_child_command(args: argparse.Namespace):
+    # service client imports grpc, so import it after arguments are checked.
+    from takler.client.service_client import TaklerServiceClient
+
+    host, port = get_host_and_prot(args.host, args.port)
+    client = TaklerServiceClient(host=host, port=port)
+
+    if args.command == "init":
+        client.init(node_path=args.node_path, task_id=args.task_id)
+    elif args.command == "complete":
+        client.complete(node_path=args.node_path)
+    elif args.command == "abort":
+        client.abort(node_path=args.node_path, reason=args.reason)
+    elif args.command == "event":
+        client.event(node_path=args.node_path, event_name=args.event_name)
+    elif args.command == "meter":
+        client.meter(node_path=args.node_path, meter_name=args.meter_name, meter_value=args.meter_value)
+    else:
+        raise ValueError(f"command is not supported: {args.command}")
+
+
+def main(argv: Optional[List[str]] = None):
+    if NO_TAKLER in os.environ:
+        print("ignore because NO_TAKLER is set.")
+        return
+
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    run_child_command(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,18 @@
 import os
 import warnings
-from typing import Optional, List, Union, Tuple
+from typing import Optional, List, Union
 
 import typer
 
 from takler.client.service_client import TaklerServiceClient
-from takler.server.connect_config import ConnectConfig, load_connect_config, TAKLER_CONNECT_FILE
+from takler.client.child import (
+    get_host_and_prot,
+    TAKLER_HOST, TAKLER_PORT, TAKLER_NAME, NO_TAKLER,
+    HOST_HELP_STRING, PORT_HELP_STRING,
+)
 from takler.constant import DEFAULT_HOST, DEFAULT_PORT
 
 
-TAKLER_HOST = "TAKLER_HOST"
-TAKLER_PORT = "TAKLER_PORT"
-TAKLER_NAME = "TAKLER_NAME"
-NO_TAKLER = "NO_TAKLER"
-
-HOST_HELP_STRING = f"takler service host, or use env var {TAKLER_HOST}"
-PORT_HELP_STRING = f"takler service port, or use env var {TAKLER_PORT}"
-
-
 app = typer.Typer()
 
 
@@ -219,7 +214,7 @@ def free_dep(
 def load(
         host: str = typer.Option(None, help=HOST_HELP_STRING),
         port: str = typer.Option(None, help=PORT_HELP_STRING),
-        flow_type: str = typer.Option("json", help="flow file type, [json]"),
+        flow_type: str = typer.Option("json", help="flow file type, [json, compact]"),
         flow_file_path: str = typer.Argument(..., help="flow file path"),
 ):
     """
@@ -227,7 +222,20 @@ def load(
     """
     host, port = get_host_and_prot(host, port)
     client = TaklerServiceClient(host=host, port=port)
-    client.load(flow_file_path=flow_file_path)
+    client.load(flow_file_path=flow_file_path, flow_type=flow_type)
+
+
+@app.command()
+def checkpoint(
+        host: str = typer.Option(None, help=HOST_HELP_STRING),
+        port: str = typer.Option(None, help=PORT_HELP_STRING),
+):
+    """
+    [control] save server's checkpoint file now.
+    """
+    host, port = get_host_and_prot(host, port)
+    client = TaklerServiceClient(host=host, port=port)
+    client.checkpoint()
 
 
 # Query command --------------------------------------------------------
@@ -266,6 +274,32 @@ def show(
     )
 
 
+@app.command()
+def query(
+        host: str = typer.Option(None, help=HOST_HELP_STRING),
+        port: str = typer.Option(None, help=PORT_HELP_STRING),
+        node_path: str = typer.Argument("", help="root node path, default is all flows."),
+        max_depth: int = typer.Option(0, help="number of levels, 0 for all levels."),
+        status: List[str] = typer.Option(None, help="only show nodes in these status."),
+        attribute: List[str] = typer.Option(None, help="attributes: event, meter, limit, repeat, parameter, trigger."),
+):
+    """
+    [query] print nodes in a subtree, filtered by status.
+    """
+    host, port = get_host_and_prot(host, port)
+    client = TaklerServiceClient(host=host, port=port)
+    for record in client.query_nodes(
+            node_path=node_path,
+            max_depth=max_depth,
+            status=status,
+            attributes=attribute,
+    ):
+        suspended = " [suspended]" if record.suspended else ""
+        print(f"{record.node_path} [{record.status}]{suspended}")
+        for item in record.attributes:
+            print(f"    {item.kind} {item.name} {item.value}")
+
+
 @app.command()
 def ping(
         host: str = typer.Option(None, help=HOST_HELP_STRING),
@@ -292,50 +326,20 @@ def coroutine(
     client.coroutine()
 
 
-# ----------------------------
-def get_host_and_prot(
-        host: Optional[str] = None,
-        port: Optional[Union[str, int]] = None
-) -> Tuple[Optional[str], Optional[str]]:
+@app.command()
+def metrics(
+        host: str = typer.Option(None, help=HOST_HELP_STRING),
+        port: str = typer.Option(None, help=PORT_HELP_STRING),
+):
     """
-    get host and port.
-
-    Priority:
-    * function options: host, port
-    * connect config file, TAKLER_CONNECT_FILE
-    * env variables for host and port, TAKLER_HOST and TAKLER_PORT
-
-    Parameters
-    ----------
-    host
-    port
-
-    Returns
-    -------
-    (Optional[str], Optional[str])
+    [show] print metrics of scheduler, such as command queue depth and drain time.
     """
-    result_host = DEFAULT_HOST
-    result_port = DEFAULT_PORT
-
-    if TAKLER_HOST in os.environ:
-        result_host = os.environ[TAKLER_HOST]
-
-    if TAKLER_PORT in os.environ:
-        result_port = os.environ[TAKLER_PORT]
-
-    if TAKLER_CONNECT_FILE in os.environ:
-        connect_config = load_connect_config(os.environ[TAKLER_CONNECT_FILE])
-        result_host = connect_config.server.address.hostname
-        result_port = connect_config.server.address.port
-
-    if host is not None:
-        result_host = host
-    if port is not None:
-        result_port = port
-
-    return result_host, result_port
+    host, port = get_host_and_prot(host, port)
+    client = TaklerServiceClient(host=host, port=port)
+    client.metrics()
 
 
+# ----------------------------
 def get_host(host: Optional[str] = None) -> Optional[str]:
     """
     Get takler server's host. If ``host`` is ``None``, check environment variable ``TAKLER_HOST``.
@@ -1,4 +1,5 @@
-from typing import Optional, Union, List
+from typing import Optional, Union, List, Tuple, Dict, Any, Iterator
+from dataclasses import dataclass
 from datetime import datetime
 
 import grpc
@@ -11,9 +12,97 @@ from takler.constant import DEFAULT_HOST, DEFAULT_PORT
 
 logger = get_logger("client")
 
+# Max bytes of each chunk uploaded by ``TaklerServiceClient.run_command_load``.
+# Default max message size of gRPC is 4 MiB.
+LOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class BatchRejectedError(RuntimeError):
+    """
+    Server rejects a batch of child actions, and no action in the batch is applied.
+    """
+    pass
+
+
+@dataclass
+class ChannelOptions:
+    """
+    Options for a long-lived gRPC channel, used in persistent mode of ``TaklerServiceClient``.
+
+    Attributes
+    ----------
+    keepalive_time_ms
+        send keepalive ping after the channel is idle for this time.
+    keepalive_timeout_ms
+        close the connection if keepalive ping is not acknowledged in this time.
+    keepalive_permit_without_calls
+        send keepalive ping even if there is no active call.
+    initial_reconnect_backoff_ms
+        first delay before reconnecting after a connection failure.
+    max_reconnect_backoff_ms
+        max delay between reconnect attempts, delays grow exponentially up to this value.
+    wait_for_ready
+        If set, calls wait for the channel to reconnect instead of failing immediately when server is unavailable.
+    timeout
+        timeout seconds for each call, None for no timeout.
+    """
+    keepalive_time_ms: int = 30000
+    keepalive_timeout_ms: int = 10000
+    keepalive_permit_without_calls: bool = True
+    initial_reconnect_backoff_ms: int = 1000
+    max_reconnect_backoff_ms: int = 30000
+    wait_for_ready: bool = True
+    timeout: Optional[float] = 60.0
+
+    def grpc_options(self) -> List[Tuple[str, Any]]:
+        return [
+            ("grpc.keepalive_time_ms", self.keepalive_time_ms),
+            ("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms),
+            ("grpc.keepalive_permit_without_calls", int(self.keepalive_permit_without_calls)),
+            ("grpc.http2.max_pings_without_data", 0),
+            ("grpc.initial_reconnect_backoff_ms", self.initial_reconnect_backoff_ms),
+            ("grpc.min_reconnect_backoff_ms", self.initial_reconnect_backoff_ms),
+            ("grpc.max_reconnect_backoff_ms", self.max_reconnect_backoff_ms),
+        ]
+
+    def call_options(self) -> Dict[str, Any]:
+        return dict(
+            wait_for_ready=self.wait_for_ready,
+            timeout=self.timeout,
+        )
+
+
+def iter_load_chunks(flow_file_path: str, flow_type: str, chunk_size: int = LOAD_CHUNK_SIZE) -> Iterator[takler_pb2.LoadChunk]:
+    """
+    Read flow file and yield ``LoadChunk`` messages for ``RunCommandLoadStream``. Only the first chunk has flow type.
+    """
+    with open(flow_file_path, "rb") as f:
+        data = f.read(chunk_size)
+        yield takler_pb2.LoadChunk(flow_type=flow_type, data=data)
+        while True:
+            data = f.read(chunk_size)
+            if len(data) == 0:
+                break
+            yield takler_pb2.LoadChunk(data=data)
+
 
 class TaklerServiceClient:
     """
+    Client for takler service.
+
+    By default, each command method (``init``, ``complete``, ``meter``, ...) opens a new channel
+    and closes it after the call. In persistent mode, one long-lived channel with keepalive and
+    reconnect backoff is shared by all commands until ``close`` is called,
+    which is suitable for Python drivers and long-running wrappers.
+
+    Examples
+    --------
+    Update meters with one channel.
+
+    >>> with TaklerServiceClient(host="login_a06", port=33083, persistent=True) as client:
+    ...     for step in range(0, 240, 3):
+    ...         client.meter(node_path="/flow1/task1", meter_name="forecast_hour", meter_value=str(step))
+
     Notes
     -----
     If HPC login node's name is used, should set an environment to use native DNS resolver.
@@ -22,12 +111,29 @@ class TaklerServiceClient:
 
     Or use GOLANG version client.
     """
-    def __init__(self, host: str = DEFAULT_HOST, port: Union[int, str] = DEFAULT_PORT):
+    def __init__(
+            self,
+            host: str = DEFAULT_HOST,
+            port: Union[int, str] = DEFAULT_PORT,
+            persistent: bool = False,
+            channel_options: Optional[ChannelOptions] = None,
+    ):
         self.host: str = host
         self.port: str = str(port)
+        self.persistent: bool = persistent
+        if channel_options is None and persistent:
+            channel_options = ChannelOptions()
+        self.channel_options: Optional[ChannelOptions] = channel_options
         self.channel: Optional[grpc.Channel] = None
         self.stub: Optional[TaklerServerStub] = None
 
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def set_host_port(self, host: str, port: Union[int, str]):
         self.host = host
         self.port = str(port)
@@ -40,22 +146,51 @@ class TaklerServiceClient:
         return f'{self.host}:{self.port}'
 
     def create_channel(self):
-        self.channel = grpc.insecure_channel(self.listen_address)
+        if self.channel_options is None:
+            self.channel = grpc.insecure_channel(self.listen_address)
+        else:
+            self.channel = grpc.insecure_channel(self.listen_address, options=self.channel_options.grpc_options())
 
     def close_channel(self):
         self.channel.close()
         self.channel = None
+        self.stub = None
 
     def create_stub(self):
         self.stub = TaklerServerStub(self.channel)
         return self.stub
 
     def start(self):
+        """
+        Create channel and stub if there is no opened channel.
+        """
+        if self.channel is not None:
+            return
         self.create_channel()
         self.create_stub()
 
     def shutdown(self):
-        self.close_channel()
+        """
+        Close channel after a command. Channel is kept open in persistent mode.
+        """
+        if self.persistent:
+            return
+        self.close()
+
+    def close(self):
+        """
+        Close channel, in both normal and persistent mode.
+        """
+        if self.channel is not None:
+            self.close_channel()
+
+    def call_options(self) -> Dict[str, Any]:
+        """
+        Keyword arguments for each stub call.
+        """
+        if self.channel_options is None:
+            return dict()
+        return self.channel_options.call_options()
 
     # Child command -------------------------------------------------
 
@@ -71,7 +206,8 @@ class TaklerServiceClient:
                     node_path=node_path,
                 ),
                 task_id=task_id
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
@@ -86,7 +222,8 @@ class TaklerServiceClient:
                 child_options=takler_pb2.ChildCommandOptions(
                     node_path=node_path,
                 )
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
@@ -102,7 +239,8 @@ class TaklerServiceClient:
                     node_path=node_path,
                 ),
                 reason=reason
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
@@ -118,7 +256,8 @@ class TaklerServiceClient:
                     node_path=node_path,
                 ),
                 event_name=event_name,
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
@@ -135,10 +274,37 @@ class TaklerServiceClient:
                 ),
                 meter_name=meter_name,
                 meter_value=meter_value,
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
+    def batch(self, actions: List[takler_pb2.ChildAction]):
+        self.start()
+        try:
+            self.run_command_batch(actions=actions)
+        finally:
+            self.shutdown()
+
+    def run_command_batch(self, actions: List[takler_pb2.ChildAction]) -> takler_pb2.ServiceResponse:
+        """
+        Send an ordered list of child actions in one request, see ``ChildCommandBuffer``.
+
+        Raises
+        ------
+        BatchRejectedError
+            If server rejects the batch.
+        """
+        response = self.stub.RunCommandBatch(
+            takler_pb2.BatchCommand(
+                actions=actions,
+            ),
+            **self.call_options()
+        )
+        if response.flag != 0:
+            raise BatchRejectedError(f"batch is rejected: {response.message}")
+        return response
+
     # Control command ----------------------------------------------------
 
     def requeue(self, node_path: List[str]):
@@ -150,7 +316,8 @@ class TaklerServiceClient:
         response = self.stub.RunCommandRequeue(
             takler_pb2.RequeueCommand(
                 node_path=node_path
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
@@ -163,7 +330,8 @@ class TaklerServiceClient:
         response = self.stub.RunCommandSuspend(
             takler_pb2.SuspendCommand(
                 node_path=node_path
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
@@ -176,7 +344,8 @@ class TaklerServiceClient:
         response = self.stub.RunCommandResume(
             takler_pb2.SuspendCommand(
                 node_path=node_path
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
@@ -190,7 +359,8 @@ class TaklerServiceClient:
             takler_pb2.RunCommand(
                 force=force,
                 node_path=node_path
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
@@ -205,7 +375,8 @@ class TaklerServiceClient:
                 state=takler_pb2.ForceCommand.ForceState.Value(state),
                 recursive=recursive,
                 path=variable_paths,
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
@@ -219,27 +390,55 @@ class TaklerServiceClient:
             takler_pb2.FreeDepCommand(
                 dep_type=takler_pb2.FreeDepCommand.DepType.Value(dep_type),
                 path=node_paths,
-            )
+            ),
+            **self.call_options()
         )
         print(f"received: {response.flag}")
 
-    def load(self, flow_file_path: str):
+    def load(self, flow_file_path: str, flow_type: str = "json"):
         self.start()
-        self.run_command_load(flow_file_path=flow_file_path)
+        self.run_command_load(flow_file_path=flow_file_path, flow_type=flow_type)
         self.shutdown()
 
-    def run_command_load(self, flow_file_path: str):
-        flow_type = "json"
-        with open(flow_file_path, "rb") as f:
-            flow_bytes = f.read()
-        response = self.stub.RunCommandLoad(
-            takler_pb2.LoadCommand(
-                flow_type=flow_type,
-                flow=flow_bytes
-            )
+    def run_command_load(self, flow_file_path: str, flow_type: str = "json", chunk_size: int = LOAD_CHUNK_SIZE):
+        """
+        Load flow file into server.
+
+        The file is uploaded in chunks with client-streaming RPC ``RunCommandLoadStream``,
+        so large flows are not limited by max message size of gRPC.
+
+        Parameters
+        ----------
+        flow_file_path
+            flow file path.
+        flow_type
+            json (``Flow.to_dict``) or compact (``takler.core.compact_flow.dumps_compact_flow``).
+        chunk_size
+            max bytes of each chunk.
+        """
+        response = self.stub.RunCommandLoadStream(
+            iter_load_chunks(flow_file_path=flow_file_path, flow_type=flow_type, chunk_size=chunk_size),
+            **self.call_options()
         )
+        if response.flag != 0:
+            logger.warning(f"load failed: {response.message}")
         print(f"received: {response.flag}")
 
+    def checkpoint(self):
+        self.start()
+        self.run_command_checkpoint()
+        self.shutdown()
+
+    def run_command_checkpoint(self):
+        response = self.stub.RunCommandCheckpoint(
+            takler_pb2.CheckpointCommand(),
+            **self.call_options()
+        )
+        if response.flag != 0:
+            print(f"checkpoint failed: {response.message}")
+        else:
+            print(f"received: {response.flag}")
+
     # Query command ----------------------------------------------------
 
     def show(
@@ -275,7 +474,8 @@ class TaklerServiceClient:
                 show_limit=show_limit,
                 show_event=show_event,
                 show_meter=show_meter,
-            )
+            ),
+            **self.call_options()
         )
         print(response.output)
 
@@ -289,7 +489,8 @@ class TaklerServiceClient:
 
     def run_request_ping(self):
         response = self.stub.RunRequestPing(
-            takler_pb2.PingResponse()
+            takler_pb2.PingResponse(),
+            **self.call_options()
         )
 
     def coroutine(self):
@@ -299,9 +500,137 @@ class TaklerServiceClient:
 
     def run_query_coroutine(self):
         response = self.stub.QueryCoroutine(
-            takler_pb2.CoroutineRequest()
+            takler_pb2.CoroutineRequest(),
+            **self.call_options()
         )
 
         for task in response.coroutines:
             print(f"{task.name}\t{task.description}")
 
+    def metrics(self):
+        self.start()
+        self.run_query_metrics()
+        self.shutdown()
+
+    def run_query_metrics(self) -> Dict[str, float]:
+        response = self.stub.QueryMetrics(
+            takler_pb2.MetricsRequest(),
+            **self.call_options()
+        )
+
+        for name, value in sorted(response.metrics.items()):
+            print(f"{name}\t{value:g}")
+        return dict(response.metrics)
+
+    def query_nodes(
+            self,
+            node_path: str = "",
+            max_depth: int = 0,
+            status: Optional[List[str]] = None,
+            attributes: Optional[List[str]] = None,
+            page_size: int = 0,
+    ) -> Iterator[takler_pb2.NodeRecord]:
+        """
+        Query nodes in a subtree, pages are fetched when iterating.
+
+        Parameters
+        ----------
+        node_path
+            root node path of the subtree, empty string for all flows.
+        max_depth
+            number of levels to return, 1 for root node only, 0 for all levels.
+        status
+            only return nodes in these status, such as ["aborted", "active"].
+        attributes
+            attributes to return: event, meter, limit, repeat, parameter, trigger.
+        page_size
+            max number of nodes in one request, 0 for server's default size.
+
+        Examples
+        --------
+        Print all aborted tasks.
+
+        >>> client = TaklerServiceClient(host="login_a06", port=33083)
+        >>> for record in client.query_nodes(status=["aborted"]):
+        ...     print(record.node_path)
+        """
+        self.start()
+        try:
+            page_token = ""
+            while True:
+                response = self.run_query_nodes(
+                    node_path=node_path,
+                    max_depth=max_depth,
+                    status=status,
+                    attributes=attributes,
+                    page_size=page_size,
+                    page_token=page_token,
+                )
+                for record in response.nodes:
+                    yield record
+                page_token = response.next_page_token
+                if not page_token:
+                    break
+        finally:
+            self.shutdown()
+
+    def run_query_nodes(
+            self,
+            node_path: str,
+            max_depth: int,
+            status: Optional[List[str]],
+            attributes: Optional[List[str]],
+            page_size: int,
+            page_token: str,
+    ) -> takler_pb2.QueryNodesResponse:
+        return self.stub.QueryNodes(
+            takler_pb2.QueryNodesRequest(
+                node_path=node_path,
+                max_depth=max_depth,
+                status=status,
+                attributes=attributes,
+                page_size=page_size,
+                page_token=page_token,
+            ),
+            **self.call_options()
+        )
+
+    # Subscription ----------------------------------------------------
+
+    def subscribe(self, sequence: Optional[int] = None) -> Iterator[takler_pb2.SubscribeResponse]:
+        """
+        Subscribe status changes of the server: a snapshot, and then deltas with sequence numbers.
+
+        Parameters
+        ----------
+        sequence
+            last sequence received before reconnecting, to resume without a new snapshot.
+            Server sends a snapshot if the sequence is too old.
+
+        Examples
+        --------
+        Print status changes and resume after reconnecting.
+
+        >>> client = TaklerServiceClient(host="login_a06", port=33083)
+        >>> sequence = None
+        >>> for response in client.subscribe(sequence):
+        ...     if response.HasField("snapshot"):
+        ...         sequence = response.snapshot.sequence
+        ...     else:
+        ...         for delta in response.deltas.deltas:
+        ...             print(delta.sequence, delta.node_path, delta.field, delta.name, delta.value)
+        ...         sequence = response.deltas.deltas[-1].sequence
+        """
+        self.start()
+        # stream is long-lived, timeout is not used.
+        options = self.call_options()
+        options.pop("timeout", None)
+        request = takler_pb2.SubscribeRequest(
+            resume=sequence is not None,
+            sequence=sequence if sequence is not None else 0,
+        )
+        try:
+            for response in self.stub.Subscribe(request, **options):
+                yield response
+        finally:
+            self.shutdown()
@@ -1,3 +1,4 @@
+import datetime
 from typing import Optional, Dict, Union, List
 
 from pydantic import BaseModel, field_validator
@@ -7,6 +8,12 @@ from takler import constant
 from .node_container import NodeContainer
 from .flow import Flow
 from .node import Node
+from .limit import Limit, AllocationPolicy, get_resource_limit_name
+from .resolver import IncrementalResolver
+from .dependency import DependencyIndex
+from .change_tracker import ChangeTracker
+from .propagation import StatusPropagation
+from .expression_compiler import StructureVersion
 from .state import NodeStatus
 from .event import Event
 from .meter import Meter
@@ -19,6 +26,16 @@ class Bunch(NodeContainer):
     def __init__(self, name: str = "", host: str = None, port: str = None):
         super(Bunch, self).__init__(name=name)
         self.flows: Dict[str, Flow] = dict()
+        self.node_index: Dict[str, Node] = dict()
+        # nodes with time attributes, keep insertion order.
+        self.time_nodes: Dict[Node, None] = dict()
+        self.dependency_index: DependencyIndex = DependencyIndex()
+        self.resolver: IncrementalResolver = IncrementalResolver(bunch=self)
+        self.change_tracker: ChangeTracker = ChangeTracker()
+        self.status_propagation: StatusPropagation = StatusPropagation()
+        # compile trigger expressions into flat callables when they are parsed.
+        self.compile_expressions: bool = False
+        self.structure_version: StructureVersion = StructureVersion()
         self.server_state: ServerState = ServerState(host=host, port=port)
         self.server_state.setup()
 
@@ -33,6 +50,9 @@ class Bunch(NodeContainer):
 
     # Attr ------------------------------------------------
 
+    def get_structure_version(self) -> StructureVersion:
+        return self.structure_version
+
     def get_node_status(self) -> NodeStatus:
         """
         Calculate node status from all flows in bunch.
@@ -55,6 +75,8 @@ class Bunch(NodeContainer):
             flow = Flow(name=flow)
         self.flows[flow.name] = flow
         flow.bunch = self
+        self.add_node_tree_index(flow, register_expressions=True)
+        self.resolver.mark_dirty(flow)
         return flow
 
     def find_flow(self, name: str) -> Optional[Flow]:
@@ -70,9 +92,134 @@ class Bunch(NodeContainer):
             raise ValueError(f"flow is not in Bunch: {flow_name}")
 
         flow = self.flows.pop(flow_name)
+        self.release_node_tree_limits(flow)
+        self.remove_node_tree_index(flow)
+        self.dependency_index.remove_tree(flow)
+        flow.bunch = None
 
         return flow
 
+    # Resource pool ----------------------------------------------
+
+    def add_resource_pool(
+            self,
+            name: str,
+            resources: Union[int, Dict[str, int]],
+            policy: Union[AllocationPolicy, str] = AllocationPolicy.order,
+    ) -> List[Limit]:
+        """
+        Add a named resource pool shared by all flows in the bunch.
+
+        A pool is a ``Limit`` of the bunch for each resource, so any node in any flow can consume from it
+        with ``Node.add_resource_usage``, and availability is checked by ``Limit.in_limit`` in constant time.
+
+        Parameters
+        ----------
+        name
+            name of the pool.
+        resources
+            number of tokens, or amount of each resource, such as ``dict(cpu=1024, memory=4096)``.
+        policy
+            allocation policy for all resources, see ``AllocationPolicy``.
+
+        Returns
+        -------
+        List[Limit]
+            limits of the pool.
+        """
+        if isinstance(resources, int):
+            resources = {None: resources}
+        names = [get_resource_limit_name(name, resource) for resource in resources]
+        for limit_name in names:
+            if self.find_limit(limit_name) is not None:
+                raise RuntimeError(f"add_resource_pool failed: duplicate limit {limit_name} in bunch")
+        return [
+            self.add_limit(limit_name, amount, policy=policy)
+            for limit_name, amount in zip(names, resources.values())
+        ]
+
+    def release_node_tree_limits(self, root: Node, node_path: Optional[str] = None):
+        """
+        Release tokens of limits occupied by nodes in a node tree and remove them from wait queues,
+        used before the tree is deleted from the bunch. Nodes waiting for released limits are woken in next pass.
+
+        Limits are found from ``InLimit`` of nodes in the tree and of its ancestors,
+        including limits of the bunch such as resource pools.
+
+        Parameters
+        ----------
+        root
+            root node of the tree.
+        node_path
+            node path of root in the bunch. Default is current node path of root.
+        """
+        if node_path is None:
+            node_path = root.node_path
+
+        limits: Dict[int, Limit] = dict()
+        for in_limit in root.in_limit_manager.find_in_limits_up():
+            limits[id(in_limit.limit)] = in_limit.limit
+        nodes = list(root.children)
+        while len(nodes) > 0:
+            node = nodes.pop()
+            manager = node.in_limit_manager
+            if len(manager.in_limit_list) > 0:
+                manager.resolve_in_limit_references()
+                for in_limit in manager.in_limit_list:
+                    if in_limit.limit is not None:
+                        limits[id(in_limit.limit)] = in_limit.limit
+            nodes.extend(node.children)
+
+        released_limits = [limit for limit in limits.values() if limit.remove_node_tree(node_path)]
+        self.resolver.mark_limit_released(released_limits)
+
+    # Calendar ---------------------------------------------------
+
+    def update_calendar(self, time: datetime.datetime):
+        """
+        Update calendars of all flows, and time attributes of nodes in ``time_nodes``.
+
+        Only nodes with time attributes are visited instead of all nodes in flows.
+        """
+        for flow in self.flows.values():
+            flow.update_calendar(time, update_time_attributes=False)
+        self.update_time_attributes()
+
+    def update_time_attributes(self):
+        for node in list(self.time_nodes):
+            node.update_time_attributes(node.get_root().calendar)
+
+    def find_next_time_due(self) -> Optional[datetime.datetime]:
+        """
+        Find the earliest real time when some time attribute in bunch will be satisfied.
+
+        Returns
+        -------
+        Optional[datetime.datetime]
+            None if there is no time attribute to wait for.
+        """
+        next_time = None
+        for node in self.time_nodes:
+            calendar = node.get_root().calendar
+            for time_attr in node.times:
+                due_time = time_attr.next_due_time(calendar)
+                if due_time is not None and (next_time is None or due_time < next_time):
+                    next_time = due_time
+        return next_time
+
+    # Resolve ---------------------------------------------------
+
+    def resolve_dirty_nodes(self) -> int:
+        """
+        Resolve dependencies only for nodes changed since last call. See ``IncrementalResolver``.
+
+        Returns
+        -------
+        int
+            number of resolved nodes.
+        """
+        return self.resolver.resolve()
+
     # Node access -----------------------------------------------
 
     def find_node(self, a_path: str) -> Optional[Node]:
@@ -89,13 +236,70 @@ class Bunch(NodeContainer):
         """
         if not Node.check_absolute_node_path(a_path):
             raise ValueError(f"absolute node path is illegal: {a_path}")
-        tokens = a_path.split("/")
-        assert len(tokens) > 1
-        flow_name = tokens[1]
-        a_flow = self.find_flow(flow_name)
-        if a_flow is None:
+        node = self.node_index.get(a_path, None)
+        if node is not None:
+            return node
+
+        a_path = Node.normalize_node_path(a_path)
+        if a_path is None:
             return None
-        return a_flow.find_node(a_path)
+        return self.node_index.get(a_path, None)
+
+    def add_node_tree_index(self, root: Node, register_expressions: bool = False):
+        """
+        Add all nodes in a node tree into node path index, used when the tree is attached to the bunch.
+
+        Parameters
+        ----------
+        root
+            root node of the tree.
+        register_expressions
+            If set, parsed expressions are also registered in dependency index in the same travel,
+            as ``DependencyIndex.add_tree`` does.
+        """
+        dependency_index = self.dependency_index
+        nodes = [(root, root.node_path)]
+        while len(nodes) > 0:
+            node, node_path = nodes.pop()
+            self.node_index[node_path] = node
+            if len(node.times) > 0:
+                self.time_nodes[node] = None
+            for expression in (node.trigger_expression, node.complete_trigger_expression):
+                if expression is None:
+                    continue
+                # expressions compiled outside the bunch (e.g. in a staging bunch) follow this bunch's version.
+                if expression.compiled is not None:
+                    expression.compiled.set_structure_version(self.structure_version)
+                if register_expressions and expression.ast is not None:
+                    dependency_index.add_expression(node, expression)
+            for child in node.children:
+                nodes.append((child, f"{node_path}/{child.name}"))
+        self.change_tracker.mark_structure_changed()
+        self.structure_version.increase()
+
+    def remove_node_tree_index(self, root: Node, node_path: Optional[str] = None):
+        """
+        Remove all nodes in a node tree from node path index, used when the tree is detached from the bunch.
+
+        Parameters
+        ----------
+        root
+            root node of the tree.
+        node_path
+            node path of root when it was in the bunch. Default is current node path of root.
+        """
+        if node_path is None:
+            node_path = root.node_path
+        nodes = [(root, node_path)]
+        while len(nodes) > 0:
+            node, node_path = nodes.pop()
+            if self.node_index.get(node_path, None) is node:
+                del self.node_index[node_path]
+            self.time_nodes.pop(node, None)
+            for child in node.children:
+                nodes.append((child, f"{node_path}/{child.name}"))
+        self.change_tracker.mark_structure_changed()
+        self.structure_version.increase()
 
     def find_path(self, a_path: str) -> Optional[Union[Node, Meter, Event]]:
         """
@@ -124,6 +328,50 @@ class Bunch(NodeContainer):
         else:
             return None
 
+    # Dependency -----------------------------------------------
+
+    def find_dependents(self, a_path: str, recursive: bool = False) -> List[Node]:
+        """
+        Find nodes whose triggers depend on a node or a node's variable.
+
+        Only parsed triggers are considered. Triggers of loaded flows are parsed when loaded by scheduler.
+
+        Parameters
+        ----------
+        a_path
+            node path (/flow1/task1) or variable path (/flow1/task1:event1)
+        recursive
+            If set, also find dependents of dependents' status, which is useful to check
+            what will run if the node is complete.
+
+        Returns
+        -------
+        List[Node]
+        """
+        tokens = a_path.split(":")
+        node = self.find_node(tokens[0])
+        if node is None:
+            raise ValueError(f"node is not found: {tokens[0]}")
+
+        if len(tokens) == 1:
+            dependents = self.dependency_index.find_status_dependents(node)
+        elif len(tokens) == 2:
+            dependents = self.dependency_index.find_variable_dependents(node, tokens[1])
+        else:
+            raise ValueError(f"path is illegal: {a_path}")
+
+        result = dict.fromkeys(dependents)
+        if recursive:
+            nodes = list(dependents)
+            while len(nodes) > 0:
+                current_node = nodes.pop()
+                for dependent in self.dependency_index.find_status_dependents(current_node):
+                    if dependent not in result:
+                        result[dependent] = None
+                        nodes.append(dependent)
+
+        return list(result)
+
     # Parameter ------------------------------------------------
 
     def find_generated_parameter(self, name: str) -> Optional[Parameter]:
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .node import Node
+
+
+class ChangeTracker:
+    """
+    Record nodes whose visible state may be changed, used by status subscriptions in server.
+
+    Visible state includes node status, suspended flag and values of events, meters, limits and repeat.
+    Nodes are only recorded when a ``listener`` is set, so there is no cost for bunches without subscriptions.
+    The listener is called once for the first change after last ``pop_changes``,
+    so many changes in one scheduler pass or one command are published together.
+
+    Attributes
+    ----------
+    changed_nodes
+        nodes changed since last ``pop_changes``, keep insertion order.
+    structure_changed
+        If set, nodes are added into or removed from the bunch since last ``pop_changes``.
+    listener
+        a callable without arguments, usually schedules a publish in the event loop.
+    pending
+        If set, listener has been called and changes are not popped.
+    """
+    def __init__(self):
+        self.changed_nodes: Dict["Node", None] = dict()
+        self.structure_changed: bool = False
+        self.listener: Optional[Callable[[], None]] = None
+        self.pending: bool = False
+
+    def mark_changed(self, node: "Node"):
+        """
+        Record a node whose visible state may be changed.
+        """
+        if self.listener is None:
+            return
+        self.changed_nodes[node] = None
+        self.notify()
+
+    def mark_structure_changed(self):
+        """
+        Record that nodes are added into or removed from the bunch.
+        """
+        if self.listener is None:
+            return
+        self.structure_changed = True
+        self.notify()
+
+    def notify(self):
+        if self.pending:
+            return
+        self.pending = True
+        self.listener()
+
+    def pop_changes(self) -> Tuple[List["Node"], bool]:
+        """
+        Return changed nodes and structure changed flag since last call, and clear them.
+        """
+        changed_nodes = list(self.changed_nodes)
+        structure_changed = self.structure_changed
+        self.changed_nodes = dict()
+        self.structure_changed = False
+        self.pending = False
+        return changed_nodes, structure_changed
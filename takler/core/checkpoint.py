@@ -0,0 +1,481 @@
+"""
+Binary checkpoint of the full ``Bunch`` state.
+
+A checkpoint saves node trees of all flows together with runtime state which is not in ``to_dict``
+or is dropped by ``fill_from_dict``: node status and suspended flag, values of events and meters,
+limits with their occupying node paths and tokens, repeat values, free flags of triggers and time attributes,
+calendar of flows, and task ids and try numbers of tasks.
+
+Each node is encoded as a tuple of builtin values, and each flow as a list of node records in pre-order.
+The whole bunch is written with ``pickle``, a header first and then records in chunks.
+Only builtin types and ``datetime`` types are allowed when loading, see ``CheckpointUnpickler``.
+A dict of metadata is saved with the flows, such as the last journal sequence number covered by the checkpoint.
+Limits of the bunch (resource pools, see ``Bunch.add_resource_pool``) are saved with their node paths too.
+
+File layout::
+
+    b"TAKLERCP" | version (1 byte) | pickle header | pickle records chunk | pickle records chunk | ...
+
+Examples
+--------
+Save and restore a bunch.
+
+>>> data = dumps_checkpoint(bunch)
+>>> write_checkpoint_file(data, "/path/to/takler.checkpoint")
+>>> new_bunch = Bunch()
+>>> loads_checkpoint(read_checkpoint_file("/path/to/takler.checkpoint"), new_bunch)
+"""
+from __future__ import annotations
+
+import datetime
+import io
+import os
+import pickle
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from .event import Event
+from .expression import Expression
+from .node import Node, node_class_registry
+from .flow import Flow
+from .limit import Limit
+from .meter import Meter
+from .parameter import Parameter
+from .repeat import Repeat
+from .state import NodeStatus
+from .time_attr import TimeAttribute
+from .util import SerializationType, gc_paused
+
+if TYPE_CHECKING:
+    from .bunch import Bunch
+
+
+CHECKPOINT_MAGIC = b"TAKLERCP"
+CHECKPOINT_VERSION = 6
+
+# Max number of node records in one pickle, see ``dumps_payload``.
+PICKLE_CHUNK_SIZE = 1000
+
+# NodeStatus by value, faster than calling ``NodeStatus`` for each node in ``decode_node``.
+NODE_STATUSES = {status.value: status for status in NodeStatus}
+
+# Fields of a node record.
+(
+    RECORD_CLASS,
+    RECORD_NAME,
+    RECORD_STATUS,
+    RECORD_SUSPENDED,
+    RECORD_PARAMETERS,
+    RECORD_TRIGGER,
+    RECORD_COMPLETE_TRIGGER,
+    RECORD_EVENTS,
+    RECORD_METERS,
+    RECORD_LIMITS,
+    RECORD_IN_LIMITS,
+    RECORD_REPEAT,
+    RECORD_TIMES,
+    RECORD_EXTRA,
+    RECORD_CHILDREN,  # number of children, whose records follow in pre-order
+) = range(15)
+
+
+class CheckpointError(Exception):
+    """
+    Checkpoint data is broken or not supported.
+    """
+    pass
+
+
+class CheckpointUnpickler(pickle.Unpickler):
+    """
+    Unpickler only allows ``datetime`` types. Other values in checkpoint are builtin types
+    which are loaded without ``find_class``.
+    """
+    ALLOWED_CLASSES = {
+        ("datetime", "datetime"): datetime.datetime,
+        ("datetime", "date"): datetime.date,
+        ("datetime", "time"): datetime.time,
+        ("datetime", "timedelta"): datetime.timedelta,
+        ("datetime", "timezone"): datetime.timezone,
+    }
+
+    def find_class(self, module: str, name: str) -> Any:
+        cls = self.ALLOWED_CLASSES.get((module, name), None)
+        if cls is None:
+            raise CheckpointError(f"class is not allowed in checkpoint: {module}.{name}")
+        return cls
+
+
+# Encode --------------------------------------------------------------
+
+
+def encode_expression(expression) -> Optional[Tuple[str, bool]]:
+    if expression is None:
+        return None
+    return expression.expression_str, expression.free
+
+
+def encode_limits(limits: List[Limit]) -> Tuple:
+    return tuple((m.name, m.limit, m.value, tuple(sorted(m.node_tokens.items())), m.policy.value) for m in limits)
+
+
+def encode_node(node: Node, class_index: Dict[Type[Node], int]) -> Tuple:
+    """
+    Encode a node (without children) into a tuple. Class of the node is saved as an index of ``class_index``.
+    """
+    cls = type(node)
+    class_id = class_index.get(cls, None)
+    if class_id is None:
+        class_id = len(class_index)
+        class_index[cls] = class_id
+
+    # most nodes have few attributes, empty ones are shared as ``()``.
+    user_parameters = node.user_parameters
+    events = node.events
+    meters = node.meters
+    in_limit_list = node.in_limit_manager.in_limit_list
+    times = node.times
+    return (
+        class_id,
+        node.name,
+        node.state.node_status.value,
+        node.state.suspended,
+        tuple((p.name, p.value) for p in user_parameters.values()) if user_parameters else (),
+        encode_expression(node.trigger_expression),
+        encode_expression(node.complete_trigger_expression),
+        tuple((e.name, e.initial_value, e.value) for e in events) if events else (),
+        tuple((m.name, m.min_value, m.max_value, m.value) for m in meters) if meters else (),
+        encode_limits(node.limits) if node.limits else (),
+        tuple((m.limit_name, m.node_path, m.tokens) for m in in_limit_list) if in_limit_list else (),
+        None if node.repeat is None else node.repeat.to_dict(),
+        tuple((t.time, t.free) for t in times) if times else (),
+        node.checkpoint_state(),
+        len(node.children),
+    )
+
+
+def iter_encode_tree(root: Node, class_index: Dict[Type[Node], int], records: List[Tuple]) -> Iterator[Node]:
+    """
+    Encode a node tree into records in pre-order, and yield each encoded node.
+    Number of children is in the last field of each record.
+    """
+    stack = [root]
+    while len(stack) > 0:
+        node = stack.pop()
+        records.append(encode_node(node, class_index))
+        yield node
+        stack.extend(reversed(node.children))
+
+
+def encode_tree(root: Node, class_index: Dict[Type[Node], int]) -> List[Tuple]:
+    """
+    Encode a node tree into records in pre-order. Number of children is in the last field of each record.
+    """
+    records = []
+    for _ in iter_encode_tree(root, class_index, records):
+        pass
+    return records
+
+
+class BunchEncoder:
+    """
+    Encode all flows in a bunch step by step, so a large bunch can be encoded in chunks
+    between other work in event loop, see ``Scheduler.checkpoint``.
+
+    The node tree should not be changed until ``iter_encode`` is done.
+
+    Examples
+    --------
+    >>> encoder = BunchEncoder(bunch, metadata=dict(journal_sequence=10))
+    >>> for node in encoder.iter_encode():
+    ...     pass
+    >>> payload = encoder.get_payload()
+    """
+    def __init__(self, bunch: "Bunch", metadata: Optional[Dict[str, Any]] = None):
+        self.bunch: "Bunch" = bunch
+        self.metadata: Dict[str, Any] = dict() if metadata is None else dict(metadata)
+        self.class_index: Dict[Type[Node], int] = dict()
+        self.flows: List[List[Tuple]] = list()
+
+    def iter_encode(self) -> Iterator[Node]:
+        """
+        Encode all flows, and yield each encoded node.
+        """
+        for flow in list(self.bunch.flows.values()):
+            records = []
+            self.flows.append(records)
+            yield from iter_encode_tree(flow, self.class_index, records)
+
+    def get_payload(self) -> Tuple:
+        """
+        Get payload of builtin values after ``iter_encode`` is done. Limits of the bunch are encoded here.
+        """
+        classes = [None] * len(self.class_index)
+        for cls, class_id in self.class_index.items():
+            classes[class_id] = (cls.__module__, cls.__qualname__)
+        return CHECKPOINT_VERSION, classes, self.flows, self.metadata, encode_limits(self.bunch.limits)
+
+
+def encode_bunch(bunch: "Bunch", metadata: Optional[Dict[str, Any]] = None) -> Tuple:
+    """
+    Encode all flows in a bunch into builtin values at once.
+
+    This is the only step which reads the node tree. Use ``BunchEncoder`` to encode a large bunch in chunks.
+    Result can be pickled in another thread with ``dumps_payload``.
+
+    Parameters
+    ----------
+    bunch
+        bunch to be saved.
+    metadata
+        extra values of builtin types saved with flows, see ``get_payload_metadata``.
+    """
+    encoder = BunchEncoder(bunch, metadata=metadata)
+    with gc_paused():
+        for _ in encoder.iter_encode():
+            pass
+    return encoder.get_payload()
+
+
+def dumps_payload(payload: Tuple) -> bytes:
+    """
+    Pickle payload into checkpoint bytes.
+
+    Records of flows are pickled in chunks of ``PICKLE_CHUNK_SIZE`` records after a header,
+    so a thread pickling a large bunch releases GIL between chunks and does not block event loop for long.
+    """
+    version, classes, flows, metadata, limits = payload
+    header = (version, classes, [len(records) for records in flows], metadata, limits)
+    parts = [CHECKPOINT_MAGIC, bytes([CHECKPOINT_VERSION]), pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)]
+    for records in flows:
+        for start in range(0, len(records), PICKLE_CHUNK_SIZE):
+            parts.append(pickle.dumps(records[start:start + PICKLE_CHUNK_SIZE], protocol=pickle.HIGHEST_PROTOCOL))
+    return b"".join(parts)
+
+
+def dumps_checkpoint(bunch: "Bunch") -> bytes:
+    """
+    Encode all flows in a bunch into checkpoint bytes.
+    """
+    return dumps_payload(encode_bunch(bunch))
+
+
+# Decode -------------------------------------------------------------
+
+
+def find_node_class(module_name: str, class_name: str) -> Type[Node]:
+    try:
+        cls = node_class_registry.find(module_name, class_name)
+    except (ImportError, AttributeError):
+        raise CheckpointError(f"node class is not found: {module_name}.{class_name}")
+    if not isinstance(cls, type) or not issubclass(cls, Node):
+        raise CheckpointError(f"node class is not found: {module_name}.{class_name}")
+    return cls
+
+
+def decode_node(record: Tuple, classes: List[Type[Node]]) -> Node:
+    """
+    Create a node (without children) from record.
+
+    The node is not in any bunch, so attributes are filled directly instead of ``add_*`` methods,
+    which look up the bunch to increase its structure version for every attribute.
+    Values in records come from a checkpoint of a valid tree and are not checked again.
+    """
+    (
+        class_id, name, status, suspended, parameters, trigger, complete_trigger,
+        events, meters, limits, in_limits, repeat, times, extra, _
+    ) = record
+
+    node = classes[class_id](name)
+
+    state = node.state
+    state.node_status = NODE_STATUSES[status]
+    state.suspended = suspended
+
+    if parameters:
+        user_parameters = node.user_parameters
+        for parameter_name, value in parameters:
+            user_parameters[parameter_name] = Parameter(parameter_name, value)
+
+    if trigger is not None:
+        node.trigger_expression = Expression(trigger[0])
+        node.trigger_expression.free = trigger[1]
+    if complete_trigger is not None:
+        node.complete_trigger_expression = Expression(complete_trigger[0])
+        node.complete_trigger_expression.free = complete_trigger[1]
+
+    if events:
+        node_events = node.events
+        for event_name, initial_value, value in events:
+            event = Event(event_name, initial_value=initial_value)
+            event._value = value
+            node_events.append(event)
+    if meters:
+        node_meters = node.meters
+        for meter_name, min_value, max_value, value in meters:
+            meter = Meter(meter_name, min_value, max_value)
+            meter._value = value
+            node_meters.append(meter)
+    for limit_name, limit_value, value, node_tokens, policy in limits:
+        limit = Limit(limit_name, limit_value, policy=policy)
+        limit.set_node(node)
+        limit.value = value
+        limit.set_node_tokens(dict(node_tokens))
+        node.limits.append(limit)
+    for limit_name, node_path, tokens in in_limits:
+        node.add_in_limit(limit_name, node_path=node_path, tokens=tokens)
+
+    if repeat is not None:
+        node.repeat = Repeat.from_dict(repeat, method=SerializationType.Status)
+
+    for time, free in times:
+        time_attr = TimeAttribute(time)
+        time_attr.free = free
+        node.times.append(time_attr)
+
+    if extra is not None:
+        node.restore_checkpoint_state(extra)
+
+    return node
+
+
+def decode_tree(records: List[Tuple], classes: List[Type[Node]]) -> Node:
+    """
+    Create a node tree from records in pre-order.
+
+    The tree is not in any bunch yet, so children are linked directly instead of ``append_child``,
+    which looks up the bunch for each child. Node index is built once when the flow is added into a bunch.
+    """
+    if len(records) == 0:
+        raise CheckpointError("node tree has no record")
+    root = decode_node(records[0], classes)
+    # parent nodes with number of children which are not decoded yet.
+    stack = [[root, records[0][RECORD_CHILDREN]]]
+    for index in range(1, len(records)):
+        while len(stack) > 0 and stack[-1][1] == 0:
+            stack.pop()
+        if len(stack) == 0:
+            raise CheckpointError("node tree has extra records")
+        item = stack[-1]
+        item[1] -= 1
+        node = item[0]
+
+        record = records[index]
+        child = decode_node(record, classes)
+        # new node has no cached node path, and a detached tree has no structure version.
+        child._parent = node
+        node.children.append(child)
+        if record[RECORD_CHILDREN] > 0:
+            stack.append([child, record[RECORD_CHILDREN]])
+    return root
+
+
+def loads_payload(data: bytes) -> Tuple:
+    header_size = len(CHECKPOINT_MAGIC) + 1
+    if data[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+        raise CheckpointError("data is not a takler checkpoint")
+    version = data[len(CHECKPOINT_MAGIC)]
+    if version != CHECKPOINT_VERSION:
+        raise CheckpointError(f"checkpoint version is not supported: {version}")
+    try:
+        with gc_paused():
+            # each pickle has its own memo, so a new unpickler is used for each one.
+            stream = io.BytesIO(data[header_size:])
+            payload_version, classes, flow_sizes, metadata, limits = CheckpointUnpickler(stream).load()
+            flows = []
+            for flow_size in flow_sizes:
+                records = []
+                while len(records) < flow_size:
+                    records.extend(CheckpointUnpickler(stream).load())
+                flows.append(records)
+    except (pickle.UnpicklingError, EOFError, ValueError, TypeError) as e:
+        raise CheckpointError(f"checkpoint is broken: {e}") from e
+    return payload_version, classes, flows, metadata, limits
+
+
+def decode_flows(payload: Tuple) -> List[Flow]:
+    """
+    Create flows from checkpoint payload. Flows are not added into any bunch.
+    """
+    _, class_names, flow_records, _, _ = payload
+    classes = [find_node_class(module_name, class_name) for module_name, class_name in class_names]
+    flows = []
+    with gc_paused():
+        for records in flow_records:
+            flow = decode_tree(records, classes)
+            if not isinstance(flow, Flow):
+                raise CheckpointError(f"root node is not a Flow: {flow.name}")
+            flows.append(flow)
+    return flows
+
+
+def get_payload_metadata(payload: Tuple) -> Dict[str, Any]:
+    """
+    Get metadata saved by ``encode_bunch`` from checkpoint payload.
+    """
+    return payload[3]
+
+
+def restore_bunch_limits(payload: Tuple, bunch: "Bunch"):
+    """
+    Restore limits of the bunch from checkpoint payload.
+
+    Values of limits already in the bunch (such as resource pools added when server starts) are replaced,
+    and other limits are added.
+    """
+    for limit_name, limit_value, value, node_tokens, policy in payload[4]:
+        limit = bunch.find_limit(limit_name)
+        if limit is None:
+            limit = bunch.add_limit(limit_name, limit_value, policy=policy)
+        limit.value = value
+        limit.set_node_tokens(dict(node_tokens))
+
+
+def restore_flows(flows: List[Flow], bunch: "Bunch"):
+    """
+    Add restored flows into a bunch. Flows with the same names in the bunch are replaced.
+
+    Triggers are not parsed here. Restored flows are marked dirty by ``Bunch.add_flow``,
+    so triggers of queued nodes are parsed and registered in the dependency index on the next resolve.
+    """
+    for flow in flows:
+        if bunch.find_flow(flow.name) is not None:
+            bunch.delete_flow(flow.name)
+        bunch.add_flow(flow)
+
+
+def loads_checkpoint(data: bytes, bunch: "Bunch") -> List[Flow]:
+    """
+    Restore flows from checkpoint bytes into a bunch, see ``restore_flows``.
+
+    Returns
+    -------
+    List[Flow]
+        restored flows.
+    """
+    payload = loads_payload(data)
+    flows = decode_flows(payload)
+    restore_bunch_limits(payload, bunch)
+    restore_flows(flows, bunch)
+    return flows
+
+
+# File -------------------------------------------------------------
+
+
+def write_checkpoint_file(data: bytes, file_path: Union[str, Path]):
+    """
+    Write checkpoint atomically: write into a temporary file in the same directory, then rename it.
+    """
+    file_path = Path(file_path)
+    temp_path = file_path.with_name(f".{file_path.name}.tmp")
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, file_path)
+
+
+def read_checkpoint_file(file_path: Union[str, Path]) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
@@ -0,0 +1,359 @@
+"""
+Compact binary format of flow definition, loaded by ``Scheduler.run_command_load`` with flow type ``compact``.
+
+JSON from ``Node.to_dict`` repeats class types, state dicts and attribute lists on every node.
+The compact format is a protobuf message (see ``protocol/compact_flow.proto``) with:
+
+* a string table for node names, class types and triggers,
+* shared attribute templates: nodes with the same attributes (parameters, events, meters, limits, repeat...)
+  refer to one JSON object,
+* node columns in pre-order, with the number of children of each node.
+
+The payload is tens of times smaller than JSON, and parsing the message takes a few milliseconds.
+Most time of decoding is spent on creating node objects, which is shared with ``Flow.from_dict``,
+so decoding into a flow is only a few times faster than ``json.loads`` and ``Flow.from_dict``.
+Nodes are created from templates by ``NodeTemplate``. See ``benchmarks/bench_flow_load.py``.
+
+Examples
+--------
+Save a flow into compact bytes, and load it.
+
+>>> data = dumps_compact_flow(flow)
+>>> new_flow = loads_compact_flow(data)
+"""
+import datetime
+import enum
+import json
+from pathlib import PurePath
+from typing import Dict, List, Tuple, Optional, Type
+
+from google.protobuf.message import DecodeError
+
+from .event import Event
+from .expression import Expression
+from .flow import Flow
+from .limit import Limit, InLimit
+from .meter import Meter
+from .node import Node, node_class_registry
+from .parameter import Parameter
+from .repeat import Repeat
+from .state import NodeStatus
+from .time_attr import TimeAttribute
+from .protocol import compact_flow_pb2
+from .util import SerializationType, gc_paused
+
+
+COMPACT_FLOW_VERSION = 1
+
+# keys in ``Node.to_dict`` which are saved in node columns, others are saved in templates.
+NODE_KEYS = ("name", "class_type", "state", "trigger", "complete_trigger", "children")
+
+# attributes of ``Node`` which are created by ``Node.__init__`` and filled by ``NodeTemplate``.
+NODE_ATTRIBUTES = frozenset((
+    "_node_path", "_name", "state", "_parent", "children", "child_status_counts", "user_parameters",
+    "trigger_expression", "complete_trigger_expression", "is_complete_triggered",
+    "events", "meters", "limits", "in_limit_manager", "repeat", "times",
+))
+
+# values of other attributes are shared by nodes of one template, so they must be immutable.
+IMMUTABLE_TYPES = (
+    type(None), bool, int, float, str, bytes, tuple, enum.Enum, PurePath,
+    datetime.date, datetime.time, datetime.timedelta,
+)
+
+
+class CompactFlowError(Exception):
+    """
+    Compact flow data is broken or not supported.
+    """
+    pass
+
+
+class StringTable:
+    """
+    Intern strings into indexes. Index 0 is an empty string.
+    """
+    def __init__(self):
+        self.strings: List[str] = [""]
+        self.indexes: Dict[str, int] = {"": 0}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        index = self.indexes.get(value, None)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(value)
+            self.indexes[value] = index
+        return index
+
+
+# Encode ----------------------------------------------------------
+
+
+def encode_flow_dict(flow_dict: Dict) -> compact_flow_pb2.CompactFlow:
+    """
+    Encode a flow dict from ``Flow.to_dict`` into ``CompactFlow`` message.
+    """
+    strings = StringTable()
+    class_types: Dict[Tuple[str, str], int] = dict()
+    templates: Dict[str, int] = dict()
+
+    node_class_type = []
+    node_name = []
+    node_status = []
+    node_suspended = []
+    node_trigger = []
+    node_complete_trigger = []
+    node_template = []
+    node_child_count = []
+
+    stack = [flow_dict]
+    while len(stack) > 0:
+        d = stack.pop()
+
+        class_type = (d["class_type"]["module"], d["class_type"]["name"])
+        class_index = class_types.get(class_type, None)
+        if class_index is None:
+            class_index = len(class_types)
+            class_types[class_type] = class_index
+
+        template = json.dumps(
+            {key: value for key, value in d.items() if key not in NODE_KEYS},
+            sort_keys=True, separators=(",", ":")
+        )
+        template_index = templates.get(template, None)
+        if template_index is None:
+            template_index = len(templates)
+            templates[template] = template_index
+
+        state = d.get("state", None)
+        children = d.get("children", ())
+
+        node_class_type.append(class_index)
+        node_name.append(strings.add(d["name"]))
+        node_status.append(NodeStatus.unknown.value if state is None else state["status"])
+        node_suspended.append(False if state is None else state["suspended"])
+        node_trigger.append(strings.add(d.get("trigger", None)))
+        node_complete_trigger.append(strings.add(d.get("complete_trigger", None)))
+        node_template.append(template_index)
+        node_child_count.append(len(children))
+
+        # pre-order: push children in reverse order.
+        stack.extend(reversed(children))
+
+    message = compact_flow_pb2.CompactFlow(
+        version=COMPACT_FLOW_VERSION,
+        class_types=[
+            compact_flow_pb2.ClassType(module=strings.add(module), name=strings.add(name))
+            for module, name in class_types
+        ],
+        templates=list(templates),
+        node_class_type=node_class_type,
+        node_name=node_name,
+        node_status=node_status,
+        node_suspended=node_suspended,
+        node_trigger=node_trigger,
+        node_complete_trigger=node_complete_trigger,
+        node_template=node_template,
+        node_child_count=node_child_count,
+    )
+    message.strings.extend(strings.strings)
+    return message
+
+
+def dumps_compact_flow(flow: Flow) -> bytes:
+    """
+    Encode a flow into compact bytes.
+    """
+    return encode_flow_dict(flow.to_dict()).SerializeToString()
+
+
+# Decode -----------------------------------------------------------
+
+
+class NodeTemplate:
+    """
+    Create nodes of one class from one attribute template.
+
+    A prototype node is filled from the template once with ``fill_from_dict``, and its attributes are kept as tuples.
+    Each node is created with ``__init__`` and gets its own attribute objects (events, meters, limits...)
+    from these tuples, without reading the template dict again. Other attributes set by ``fill_from_dict``
+    of subclasses, such as ``Task.try_no``, are copied from the prototype.
+
+    If such an attribute is mutable, it can not be shared between nodes, such as calendar of ``Flow``.
+    Nodes of this template are filled with ``fill_from_dict`` as usual, see ``is_cloneable``.
+    """
+    def __init__(self, node_class: Type[Node], template: Dict, method: SerializationType = SerializationType.Tree):
+        self.node_class: Type[Node] = node_class
+        self.template: Dict = template
+        self.method: SerializationType = method
+        self.with_status: bool = method == SerializationType.Status
+
+        prototype = self.fill_node(node_class(""), "", NodeStatus.unknown.value, False)
+        self.cloneable: bool = self.is_cloneable(prototype)
+
+        # only attributes different from a new node are copied.
+        self.extra_attributes: Dict = dict()
+        if self.cloneable:
+            new_attributes = vars(node_class(""))
+            self.extra_attributes = {
+                key: value for key, value in vars(prototype).items()
+                if key not in NODE_ATTRIBUTES and (key not in new_attributes or new_attributes[key] != value)
+            }
+        self.parameters: Tuple = tuple((p.name, p.value) for p in prototype.user_parameters.values())
+        self.events: Tuple = tuple((e.name, e.initial_value, e.value) for e in prototype.events)
+        self.meters: Tuple = tuple((m.name, m.min_value, m.max_value, m.value) for m in prototype.meters)
+        self.limits: Tuple = tuple((m.name, m.limit, m.policy) for m in prototype.limits)
+        self.in_limits: Tuple = tuple(
+            (m.limit_name, m.node_path, m.tokens) for m in prototype.in_limit_manager.in_limit_list)
+        self.has_repeat: bool = prototype.repeat is not None
+        self.times: Tuple = tuple(t.time for t in prototype.times)
+
+    @staticmethod
+    def is_cloneable(prototype: Node) -> bool:
+        return all(
+            key in NODE_ATTRIBUTES or isinstance(value, IMMUTABLE_TYPES)
+            for key, value in vars(prototype).items()
+        )
+
+    def fill_node(self, node: Node, name: str, status: int, suspended: bool) -> Node:
+        d = self.template
+        d["name"] = name
+        if self.with_status:
+            d["state"] = dict(status=status, suspended=suspended)
+        self.node_class.fill_from_dict(d, node, method=self.method)
+        return node
+
+    def create_node(self, name: str, status: int, suspended: bool) -> Node:
+        node = self.node_class(name)
+        if not self.cloneable:
+            return self.fill_node(node, name, status, suspended)
+
+        if self.extra_attributes:
+            for key, value in self.extra_attributes.items():
+                setattr(node, key, value)
+        if self.with_status:
+            state = node.state
+            state.node_status = NodeStatus(status)
+            state.suspended = suspended
+
+        # new node is not in any bunch, so attributes are added without ``add_*`` methods.
+        if self.parameters:
+            user_parameters = node.user_parameters
+            for parameter_name, value in self.parameters:
+                user_parameters[parameter_name] = Parameter(parameter_name, value)
+        if self.events:
+            events = node.events
+            for event_name, initial_value, value in self.events:
+                event = Event(event_name, initial_value=initial_value)
+                event._value = value
+                events.append(event)
+        if self.meters:
+            meters = node.meters
+            for meter_name, min_value, max_value, value in self.meters:
+                meter = Meter(meter_name, min_value, max_value)
+                meter._value = value
+                meters.append(meter)
+        for limit_name, limit_value, policy in self.limits:
+            limit = Limit(limit_name, limit_value, policy=policy)
+            limit.set_node(node)
+            node.limits.append(limit)
+        for limit_name, node_path, tokens in self.in_limits:
+            node.in_limit_manager.in_limit_list.append(InLimit(limit_name, node_path=node_path, tokens=tokens))
+        if self.has_repeat:
+            node.repeat = Repeat.from_dict(self.template["repeat"], method=self.method)
+        for time in self.times:
+            node.times.append(TimeAttribute(time))
+        return node
+
+
+def decode_flow(message: compact_flow_pb2.CompactFlow, method: SerializationType = SerializationType.Tree) -> Flow:
+    """
+    Create a flow from ``CompactFlow`` message.
+
+    Each template is parsed once. Nodes are created from their templates with ``NodeTemplate``,
+    and the tree is built with the number of children of each node in pre-order.
+    """
+    if message.version != COMPACT_FLOW_VERSION:
+        raise CompactFlowError(f"compact flow version is not supported: {message.version}")
+
+    strings = list(message.strings)
+    try:
+        classes = [
+            node_class_registry.find(strings[class_type.module], strings[class_type.name])
+            for class_type in message.class_types
+        ]
+    except (ImportError, AttributeError, IndexError) as e:
+        raise CompactFlowError(f"node class is not found: {e}") from e
+    templates = [json.loads(template) for template in message.templates]
+
+    node_count = len(message.node_name)
+    columns = (
+        message.node_class_type, message.node_status, message.node_suspended,
+        message.node_trigger, message.node_complete_trigger, message.node_template, message.node_child_count,
+    )
+    if any(len(column) != node_count for column in columns):
+        raise CompactFlowError("node columns have different lengths")
+
+    node_templates: Dict[Tuple[int, int], NodeTemplate] = dict()
+    root = None
+    # [node, number of children not created]
+    stack: List[List] = []
+    try:
+        for class_index, name_index, status, suspended, trigger, complete_trigger, template_index, child_count in zip(
+                message.node_class_type, message.node_name, message.node_status, message.node_suspended,
+                message.node_trigger, message.node_complete_trigger, message.node_template,
+                message.node_child_count):
+            node_template = node_templates.get((class_index, template_index), None)
+            if node_template is None:
+                node_template = NodeTemplate(classes[class_index], templates[template_index], method=method)
+                node_templates[(class_index, template_index)] = node_template
+            node = node_template.create_node(strings[name_index], status, suspended)
+
+            # new node has no trigger, so expressions are set without ``add_trigger``.
+            if trigger != 0:
+                node.trigger_expression = Expression(strings[trigger])
+            if complete_trigger != 0:
+                node.complete_trigger_expression = Expression(strings[complete_trigger])
+
+            while len(stack) > 0 and stack[-1][1] == 0:
+                stack.pop()
+            if len(stack) > 0:
+                parent = stack[-1]
+                parent[1] -= 1
+                # new tree is not in any bunch, so children are linked without ``append_child``,
+                # and new node has no cached node path to invalidate.
+                node._parent = parent[0]
+                parent[0].children.append(node)
+            elif root is None:
+                root = node
+            else:
+                raise CompactFlowError("compact flow has more than one root node")
+
+            if child_count > 0:
+                stack.append([node, child_count])
+    except IndexError as e:
+        raise CompactFlowError(f"compact flow is broken: {e}") from e
+
+    if not isinstance(root, Flow):
+        raise CompactFlowError("root node is not a Flow")
+    return root
+
+
+def loads_compact_flow(data: bytes, method: SerializationType = SerializationType.Tree) -> Flow:
+    """
+    Create a flow from compact bytes.
+
+    Raises
+    ------
+    CompactFlowError
+        If data is broken or not supported.
+    """
+    message = compact_flow_pb2.CompactFlow()
+    try:
+        message.ParseFromString(data)
+    except DecodeError as e:
+        raise CompactFlowError(f"compact flow is broken: {e}") from e
+    with gc_paused():
+        return decode_flow(message, method=method)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Set, List, Tuple, Optional
+
+if TYPE_CHECKING:
+    from .node import Node
+    from .expression import Expression
+
+
+# reference key: (node, None) for node status, (node, variable name) for node's variable.
+ReferenceKey = Tuple["Node", Optional[str]]
+
+
+class DependencyIndex:
+    """
+    Reverse index from referenced nodes and variables to nodes whose triggers depend on them.
+
+    Triggers only know nodes they reference (see ``AstNodePath`` and ``AstVariablePath``).
+    ``DependencyIndex`` answers the reverse question: who waits on ``/flow1/container1/task1``
+    or ``/flow1/container1/task1:event1``?
+
+    References are registered when an expression's AST is created (``Expression.create_ast``),
+    and are updated when a flow is added or deleted and when a child node is updated or deleted.
+
+    Attributes
+    ----------
+    status_dependents
+        referenced node => {expression => dependent node}, for node status references.
+    variable_dependents
+        referenced node => {variable name => {expression => dependent node}}, for variable references.
+    expression_references
+        expression => (dependent node, reference keys), used to unregister an expression.
+    """
+    def __init__(self):
+        self.status_dependents: Dict["Node", Dict["Expression", "Node"]] = dict()
+        self.variable_dependents: Dict["Node", Dict[str, Dict["Expression", "Node"]]] = dict()
+        self.expression_references: Dict["Expression", Tuple["Node", List[ReferenceKey]]] = dict()
+
+    # Register ---------------------------------------------
+
+    def add_expression(self, node: "Node", expression: "Expression"):
+        """
+        Register all references of an expression with created AST.
+
+        Parameters
+        ----------
+        node
+            node who has the expression.
+        expression
+            trigger or complete trigger expression.
+        """
+        self.remove_expression(expression)
+
+        references = expression.references()
+        for reference_node, variable_name in references:
+            if variable_name is None:
+                dependents = self.status_dependents.setdefault(reference_node, dict())
+            else:
+                dependents = self.variable_dependents.setdefault(
+                    reference_node, dict()).setdefault(variable_name, dict())
+            dependents[expression] = node
+
+        self.expression_references[expression] = (node, references)
+
+    def remove_expression(self, expression: "Expression"):
+        """
+        Unregister all references of an expression.
+        """
+        item = self.expression_references.pop(expression, None)
+        if item is None:
+            return
+
+        _, references = item
+        for reference_node, variable_name in references:
+            if variable_name is None:
+                dependents = self.status_dependents.get(reference_node, None)
+            else:
+                dependents = self.variable_dependents.get(reference_node, dict()).get(variable_name, None)
+            if dependents is not None:
+                dependents.pop(expression, None)
+
+    def add_tree(self, root: "Node", parse: bool = False):
+        """
+        Register expressions of all nodes in a node tree.
+
+        Parameters
+        ----------
+        root
+            root node of the tree, usually a ``Flow``.
+        parse
+            If set, create AST for expressions not parsed yet. Otherwise, only parsed expressions are registered.
+        """
+        for node in iter_tree(root):
+            for expression in (node.trigger_expression, node.complete_trigger_expression):
+                if expression is None:
+                    continue
+                if expression.ast is None:
+                    if parse:
+                        expression.create_ast(node)
+                    continue
+                self.add_expression(node, expression)
+
+    def remove_tree(self, root: "Node") -> List["Node"]:
+        """
+        Unregister a node tree which is removed from the bunch.
+
+        Expressions outside the tree referencing nodes in the tree are reset,
+        so they will be parsed again and find new reference nodes when evaluated.
+
+        Returns
+        -------
+        List[Node]
+            dependent nodes outside the tree whose expressions are reset.
+        """
+        nodes = set(iter_tree(root))
+
+        outside_expressions: Dict["Expression", "Node"] = dict()
+        for node in nodes:
+            for expression in (node.trigger_expression, node.complete_trigger_expression):
+                if expression is not None:
+                    self.remove_expression(expression)
+
+            dependents = dict(self.status_dependents.pop(node, dict()))
+            for variable_dependents in self.variable_dependents.pop(node, dict()).values():
+                dependents.update(variable_dependents)
+            for expression, dependent_node in dependents.items():
+                if dependent_node not in nodes:
+                    outside_expressions[expression] = dependent_node
+
+        for expression in outside_expressions:
+            self.remove_expression(expression)
+            expression.clear_ast()
+
+        return list(dict.fromkeys(outside_expressions.values()))
+
+    # Query --------------------------------------------------
+
+    def find_status_dependents(self, node: "Node") -> Set["Node"]:
+        """
+        Return nodes whose triggers depend on status of ``node``.
+        """
+        return set(self.status_dependents.get(node, dict()).values())
+
+    def find_variable_dependents(self, node: "Node", variable_name: str) -> Set["Node"]:
+        """
+        Return nodes whose triggers depend on some variable (event, meter, parameter) of ``node``.
+        """
+        return set(self.variable_dependents.get(node, dict()).get(variable_name, dict()).values())
+
+    def find_all_dependents(self, node: "Node") -> Set["Node"]:
+        """
+        Return nodes whose triggers depend on status or any variable of ``node``.
+        """
+        result = self.find_status_dependents(node)
+        for dependents in self.variable_dependents.get(node, dict()).values():
+            result.update(dependents.values())
+        return result
+
+
+def iter_tree(root: "Node"):
+    """
+    Iterate all nodes in a node tree in pre-order without recursion.
+    """
+    nodes = [root]
+    while len(nodes) > 0:
+        node = nodes.pop()
+        yield node
+        nodes.extend(reversed(node.children))
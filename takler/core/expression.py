@@ -1,6 +1,7 @@
-from typing import Optional, TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING, List, Tuple
 from .expression_parser import parse_trigger
 from .expression_ast import AstRoot
+from .expression_compiler import CompiledExpression, StructureVersion
 
 
 if TYPE_CHECKING:
@@ -17,12 +18,15 @@ class Expression:
         expression with free set is always True.
     ast
         expression AST parsed from expression string.
+    compiled
+        optional flat callable compiled from AST, used by ``evaluate`` if set.
     expression_str
         original expression string.
     """
     def __init__(self, expression_str: str):
         self.free: bool = False
         self.ast: Optional[AstRoot] = None
+        self.compiled: Optional[CompiledExpression] = None
         self.expression_str: str = expression_str
 
     def reset(self):
@@ -41,12 +45,49 @@ class Expression:
         self.parse_expression()
         self.ast.set_parent_node(parent_node)
 
+        bunch = parent_node.get_bunch()
+        if bunch is not None:
+            bunch.dependency_index.add_expression(parent_node, self)
+            if bunch.compile_expressions:
+                self.compile(bunch.structure_version)
+
+    def compile(self, structure_version: Optional[StructureVersion] = None):
+        """
+        Compile AST into a flat callable. AST should be created before.
+
+        Parameters
+        ----------
+        structure_version
+            structure version of the bunch which the expression is in, compiled callable re-binds
+            references when it is changed. None for node trees not in any bunch.
+        """
+        self.compiled = CompiledExpression(self.ast, structure_version)
+
+    def clear_ast(self):
+        """
+        Clear AST and compiled callable, expression will be parsed again when evaluated.
+        """
+        self.ast = None
+        self.compiled = None
+
+    def references(self) -> "List[Tuple[Node, Optional[str]]]":
+        """
+        Return references of the expression, each one is a tuple of referenced node
+        and variable name (None for node status). AST should be created before.
+        """
+        references = []
+        if self.ast is not None:
+            self.ast.collect_references(references)
+        return references
+
     def evaluate(self) -> bool:
         """
         Calculate the expression result. If free flag is set, always return True.
         """
         if self.free:
             return True
+        if self.compiled is not None:
+            return self.compiled.evaluate()
         return self.ast.evaluate()
 
     def parse_expression(self):
@@ -54,3 +95,4 @@ class Expression:
         Parse expression string and create an AST.
         """
         self.ast = parse_trigger(self.expression_str)
+        self.compiled = None
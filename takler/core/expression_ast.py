@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional, TYPE_CHECKING, TypeVar
+from typing import Optional, TYPE_CHECKING, TypeVar, List, Tuple
 
 from .state import NodeStatus
 from .event import Event
@@ -9,6 +9,7 @@ from takler.logging import get_logger
 
 if TYPE_CHECKING:
     from .node import Node
+    from .expression_compiler import CodeGenerator
 
 
 logger = get_logger(__name__)
@@ -20,12 +21,39 @@ class AstBase:
     def set_parent_node(self, node: "Node"):
         ...
 
+    def collect_references(self, references: "List[Tuple[Node, Optional[str]]]"):
+        """
+        Append references of this AST into ``references``.
+
+        Each reference is a tuple of referenced node and variable name (None for node status).
+        """
+        ...
+
     def value(self) -> T:
         raise NotImplementedError("AstBase.value is not implemented")
 
     def evaluate(self) -> bool:
         raise NotImplementedError("AstBase.evaluate is not implemented")
 
+    def clone(self) -> "AstBase":
+        """
+        Return a copy of an AST template without parent node and reference caches.
+        Leaves without such states are shared.
+        """
+        return self
+
+    def generate_value_code(self, generator: "CodeGenerator") -> str:
+        """
+        Generate Python source for ``value()``. Default is to call ``value()`` of this AST node.
+        """
+        return f"{generator.add_slot(self)}.value()"
+
+    def generate_evaluate_code(self, generator: "CodeGenerator") -> str:
+        """
+        Generate Python source for ``evaluate()``. Default is to call ``evaluate()`` of this AST node.
+        """
+        return f"{generator.add_slot(self)}.evaluate()"
+
 
 @dataclass
 class AstRoot(AstBase):
@@ -36,53 +64,97 @@ class AstRoot(AstBase):
         self.left.set_parent_node(node)
         self.right.set_parent_node(node)
 
+    def collect_references(self, references: "List[Tuple[Node, Optional[str]]]"):
+        self.left.collect_references(references)
+        self.right.collect_references(references)
+
+    def clone(self) -> "AstRoot":
+        return self.__class__(left=self.left.clone(), right=self.right.clone())
+
+    def generate_binary_code(self, generator: "CodeGenerator", operator: str) -> str:
+        left = self.left.generate_value_code(generator)
+        right = self.right.generate_value_code(generator)
+        return f"({left} {operator} {right})"
+
 
 @dataclass
 class AstOpEq(AstRoot):
     def evaluate(self) -> bool:
         return self.left.value() == self.right.value()
 
+    def generate_evaluate_code(self, generator: "CodeGenerator") -> str:
+        # NodeStatus members are singletons, identity check is much faster than Enum's equality.
+        status_types = (AstNodePath, AstNodeStatus)
+        if isinstance(self.left, status_types) and isinstance(self.right, status_types):
+            return self.generate_binary_code(generator, "is")
+        return self.generate_binary_code(generator, "==")
+
 
 @dataclass
 class AstOpGt(AstRoot):
     def evaluate(self) -> bool:
         return self.left.value() > self.right.value()
 
+    def generate_evaluate_code(self, generator: "CodeGenerator") -> str:
+        return self.generate_binary_code(generator, ">")
+
 
 @dataclass
 class AstOpGe(AstRoot):
     def evaluate(self) -> bool:
         return self.left.value() >= self.right.value()
 
+    def generate_evaluate_code(self, generator: "CodeGenerator") -> str:
+        return self.generate_binary_code(generator, ">=")
+
 
 @dataclass
 class AstOpLt(AstRoot):
     def evaluate(self) -> bool:
         return self.left.value() < self.right.value()
 
+    def generate_evaluate_code(self, generator: "CodeGenerator") -> str:
+        return self.generate_binary_code(generator, "<")
+
 
 @dataclass
 class AstOpLe(AstRoot):
     def evaluate(self) -> bool:
         return self.left.value() <= self.right.value()
 
+    def generate_evaluate_code(self, generator: "CodeGenerator") -> str:
+        return self.generate_binary_code(generator, "<=")
+
 
 @dataclass
 class AstOpAnd(AstRoot):
     def evaluate(self) -> bool:
         return self.left.evaluate() and self.right.evaluate()
 
+    def generate_evaluate_code(self, generator: "CodeGenerator") -> str:
+        left = self.left.generate_evaluate_code(generator)
+        right = self.right.generate_evaluate_code(generator)
+        return f"({left} and {right})"
+
 
 @dataclass
 class AstOpOr(AstRoot):
     def evaluate(self) -> bool:
         return self.left.evaluate() or self.right.evaluate()
 
+    def generate_evaluate_code(self, generator: "CodeGenerator") -> str:
+        left = self.left.generate_evaluate_code(generator)
+        right = self.right.generate_evaluate_code(generator)
+        return f"({left} or {right})"
+
 @dataclass
 class AstMathAdd(AstRoot):
     def value(self) -> bool:
         return self.left.value() + self.right.value()
 
+    def generate_value_code(self, generator: "CodeGenerator") -> str:
+        return self.generate_binary_code(generator, "+")
+
 @dataclass
 class AstNodePath(AstBase):
     node_path: str
@@ -95,6 +167,11 @@ class AstNodePath(AstBase):
         if ref_node is None:
             raise ValueError(f"node path '{self.node_path}' is not found from node '{self.parent_node.node_path}'")
 
+    def collect_references(self, references: "List[Tuple[Node, Optional[str]]]"):
+        ref_node = self.get_reference_node()
+        if ref_node is not None:
+            references.append((ref_node, None))
+
     def value(self) -> NodeStatus:
         ref_node = self.get_reference_node()
         if ref_node is not None:
@@ -102,6 +179,15 @@ class AstNodePath(AstBase):
         else:
             return NodeStatus.unknown
 
+    def clone(self) -> "AstNodePath":
+        return AstNodePath(self.node_path)
+
+    def generate_value_code(self, generator: "CodeGenerator") -> str:
+        ref_node = self.get_reference_node()
+        if ref_node is None:
+            return super(AstNodePath, self).generate_value_code(generator)
+        return f"{generator.add_slot(ref_node)}.state.node_status"
+
     def get_reference_node(self) -> "Optional[Node]":
         """
         Find node only once.
@@ -128,6 +214,11 @@ class AstVariablePath(AstBase):
         if node_variable is None:
             raise ValueError(f"variable path '{self.node.node_path}:{self.variable_name}' is not found")
 
+    def collect_references(self, references: "List[Tuple[Node, Optional[str]]]"):
+        ref_node = self.node.get_reference_node()
+        if ref_node is not None:
+            references.append((ref_node, self.variable_name))
+
     def value(self) -> Optional[int]:
         v = self.get_variable()
         if v is None:
@@ -145,6 +236,29 @@ class AstVariablePath(AstBase):
         else:
             raise NotImplementedError(f"{v} is not support")
 
+    def clone(self) -> "AstVariablePath":
+        return AstVariablePath(node=self.node.clone(), variable_name=self.variable_name)
+
+    def generate_value_code(self, generator: "CodeGenerator") -> str:
+        """
+        Bind variable into a slot. Generated parameters may be recreated (e.g. repeat's parameters),
+        so only events, meters and user parameters are bound, others are evaluated by ``value()``.
+        Events and meters are read from ``_value`` to skip the property call.
+        """
+        ref_node = self.node.get_reference_node()
+        if ref_node is None:
+            return super(AstVariablePath, self).generate_value_code(generator)
+
+        v = ref_node.find_variable(self.variable_name)
+        if isinstance(v, Event):
+            return f"(1 if {generator.add_slot(v)}._value else 0)"
+        elif isinstance(v, Meter):
+            return f"{generator.add_slot(v)}._value"
+        elif isinstance(v, Parameter) and v is ref_node.find_user_parameter(self.variable_name):
+            return f"{generator.add_slot(v)}.value"
+        else:
+            return super(AstVariablePath, self).generate_value_code(generator)
+
     def get_variable(self) -> Optional[Event]:
         # NOTE: delete following codes to retrieve variable when trigger is evaluated,
         # because variable's location and even itself may be changed during workflow running.
@@ -163,6 +277,9 @@ class AstInteger(AstBase):
     def value(self) -> int:
         return self.number
 
+    def generate_value_code(self, generator: "CodeGenerator") -> str:
+        return repr(self.number)
+
 
 @dataclass
 class AstNodeStatus(AstBase):
@@ -170,3 +287,6 @@ class AstNodeStatus(AstBase):
 
     def value(self) -> NodeStatus:
         return self.node_status
+
+    def generate_value_code(self, generator: "CodeGenerator") -> str:
+        return generator.add_slot(self.node_status)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import itertools
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from .expression_ast import AstBase
+
+
+# version values are unique across all bunches, so a cached value never matches another bunch's version.
+_version_counter = itertools.count()
+
+
+class StructureVersion:
+    """
+    Version of node tree structure in one ``Bunch``.
+
+    The version is increased when nodes are added, deleted, renamed or re-parented,
+    and when events, meters, parameters or repeats are added to a node in the bunch.
+    Changes in node trees not attached to any bunch don't increase any version.
+    Compiled expressions re-bind their reference slots when the version is changed.
+    """
+    def __init__(self):
+        self.value: int = next(_version_counter)
+
+    def increase(self):
+        self.value = next(_version_counter)
+
+
+class CodeGenerator:
+    """
+    Collect Python source and reference slots when lowering an expression AST.
+
+    Each object used by the generated source (reference node, variable, constant or an AST node
+    which is evaluated by the interpreter) is stored in a slot named ``s0``, ``s1``, ...
+    Slots are passed as default arguments of the generated lambda, so they are local variables
+    in the compiled function.
+    """
+    def __init__(self):
+        self.slots: Dict[str, Any] = dict()
+        self.slot_names: Dict[int, str] = dict()
+
+    def add_slot(self, obj: Any) -> str:
+        """
+        Add an object into slots and return slot name. The same object uses the same slot.
+        """
+        slot_name = self.slot_names.get(id(obj), None)
+        if slot_name is not None:
+            return slot_name
+        slot_name = f"s{len(self.slots)}"
+        self.slots[slot_name] = obj
+        self.slot_names[id(obj)] = slot_name
+        return slot_name
+
+    def generate_source(self, body: str) -> str:
+        arguments = ", ".join(f"{name}={name}" for name in self.slots)
+        return f"lambda {arguments}: {body}"
+
+
+@lru_cache(maxsize=1024)
+def compile_source(source: str):
+    """
+    Compile generated source into code object. Triggers from templates share the same source,
+    so code objects are cached.
+    """
+    return compile(source, "<takler-expression>", "eval")
+
+
+class CompiledExpression:
+    """
+    Flat callable lowered from an expression AST.
+
+    Reference nodes and variables are bound into slots when compiled,
+    and are re-bound when ``structure_version`` is changed.
+    The version check is generated into the function, so ``evaluate`` is the function itself.
+
+    Attributes
+    ----------
+    ast
+        expression AST, reference nodes should be set before.
+    structure_version
+        structure version of the bunch which the expression is in. None if the node tree is not
+        in any bunch, and slots are not re-bound until the tree is attached to a bunch.
+    source
+        generated Python source.
+    function
+        compiled function without arguments.
+    evaluate
+        function to calculate the expression, which is ``function`` after slots are bound.
+    """
+    def __init__(self, ast: "AstBase", structure_version: Optional[StructureVersion] = None):
+        self.ast: "AstBase" = ast
+        self.structure_version: Optional[StructureVersion] = structure_version
+        self.source: str = ""
+        self.function: Callable[[], bool] = lambda: False
+        self.evaluate: Callable[[], bool] = self.rebind
+        self.bind()
+
+    def bind(self):
+        """
+        Generate source from AST and bind reference slots.
+        """
+        generator = CodeGenerator()
+        body = self.ast.generate_evaluate_code(generator)
+        if self.structure_version is not None:
+            generator.slots["structure_version"] = self.structure_version
+            generator.slots["version"] = self.structure_version.value
+            generator.slots["rebind"] = self.rebind
+            body = f"{body} if structure_version.value == version else rebind()"
+        self.source = generator.generate_source(body)
+        self.function = eval(compile_source(self.source), dict(generator.slots))
+        self.evaluate = self.function
+
+    def rebind(self) -> bool:
+        """
+        Bind reference slots again and calculate the expression.
+        """
+        self.bind()
+        return self.function()
+
+    def set_structure_version(self, structure_version: Optional[StructureVersion]):
+        """
+        Use structure version of another bunch, used when the node tree is attached to the bunch.
+        Slots are re-bound when the expression is evaluated next time.
+        """
+        self.structure_version = structure_version
+        self.evaluate = self.rebind
+
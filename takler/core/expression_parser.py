@@ -1,3 +1,7 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple, Optional
+
 from lark import Lark, Transformer
 
 from .expression_ast import (
@@ -123,8 +127,76 @@ class ExpressionTransformer(Transformer):
             raise ValueError(f"value is not supported: {s}")
 
 
-# Lark version of expression trigger parser.
-trigger_parser: Lark = Lark(r"""
+class LalrExpressionTransformer(ExpressionTransformer):
+    """
+    Transform tokens from LALR grammar into takler expression AST.
+
+    Node path and variable path are single tokens in LALR grammar.
+    """
+    def node_path(self, items) -> AstNodePath:
+        return AstNodePath(str(items[0]))
+
+    def variable_path(self, items) -> AstVariablePath:
+        node_path, variable_name = str(items[0]).split(":", 1)
+        return AstVariablePath(node=AstNodePath(node_path), variable_name=variable_name)
+
+
+# LALR grammar of trigger expression.
+#
+# As in Earley grammar, ``and`` and ``or`` have the same precedence and are evaluated from left to right,
+# that is ``a or b and c`` means ``(a or b) and c``.
+# Node path and variable path are single terminals, so node names are never confused with keywords.
+LALR_TRIGGER_GRAMMAR = r"""
+    ?expression: compare_expression
+               | expression logical_operator compare_expression -> expression
+    ?compare_expression: "(" expression ")"
+                       | value
+                       | node_path operator status -> expression
+                       | value operator event_value -> expression
+                       | value operator meter_value -> expression
+                       | value operator value -> expression
+    ?value: variable_path
+          | variable_path math_operator variable_path -> expression
+
+    node_path: NODE_PATH
+    variable_path: VARIABLE_PATH
+
+    NODE_PATH: /(\.\.?)?(\/(\.\.?|[A-Za-z0-9][A-Za-z0-9_]*))+/
+    VARIABLE_PATH: NODE_PATH ":" CNAME
+
+    op_eq: "==" | "eq"i
+    op_gt: ">"
+    op_ge: ">="
+    op_lt: "<"
+    op_le: "<="
+    op_and: "and"i
+    op_or: "or"i
+    ?operator: op_eq | op_gt | op_ge | op_lt | op_le
+    ?logical_operator: op_and | op_or
+
+    math_add: "+"
+    ?math_operator: math_add
+
+    st_complete: "complete"i
+    st_aborted: "aborted"i
+    st_active: "active"i
+    ?status: st_complete | st_aborted | st_active
+
+    event_set: "set"i
+    event_unset: "unset"i
+    ?event_value: event_set | event_unset
+
+    meter_value: NUMBER
+
+    %import common.CNAME
+    %import common.WS
+    %import common.NUMBER
+    %ignore WS
+"""
+
+
+# Earley grammar of trigger expression, used before LALR grammar. Kept for comparison.
+EARLEY_TRIGGER_GRAMMAR = r"""
     !node_path: ("."|"..")?"/"node_name("/"node_name)*
     !variable_path: node_path":"variable_name
     path: node_path | variable_path
@@ -176,13 +248,120 @@ trigger_parser: Lark = Lark(r"""
     %import common.WS
     %import common.NUMBER
     %ignore WS
-""", start="expression")
+"""
+
+
+_trigger_parser: Optional[Lark] = None
+
+
+def get_trigger_parser() -> Lark:
+    """
+    Return the LALR trigger parser, which is created on first use.
+
+    Parse tables are cached on disk by Lark (``cache=True``, in system's temp directory),
+    so only the first run after grammar is changed needs to build them.
+    """
+    global _trigger_parser
+    if _trigger_parser is None:
+        _trigger_parser = Lark(
+            LALR_TRIGGER_GRAMMAR,
+            start="expression",
+            parser="lalr",
+            transformer=LalrExpressionTransformer(),
+            cache=True,
+        )
+    return _trigger_parser
+
+
+def create_earley_trigger_parser() -> Lark:
+    """
+    Create Earley trigger parser from ``EARLEY_TRIGGER_GRAMMAR``. Result tree should be transformed
+    by ``ExpressionTransformer``.
+    """
+    return Lark(EARLEY_TRIGGER_GRAMMAR, start="expression")
+
+
+class ParseCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ParseCache:
+    """
+    LRU cache of parsed trigger AST templates keyed by expression string.
+
+    Flows generated from templates have many nodes with the same trigger text,
+    such as ``../prepare == complete``. Each text is parsed only once,
+    and a clone of the template AST is returned for each node.
+
+    Attributes
+    ----------
+    maxsize
+        max count of cached expressions.
+    hits
+    misses
+    """
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._templates: "OrderedDict[str, AstRoot]" = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def get(self, trigger_text: str) -> AstRoot:
+        """
+        Return a fresh AST for ``trigger_text``, parse it if not cached.
+        """
+        with self._lock:
+            template = self._templates.get(trigger_text, None)
+            if template is not None:
+                self._templates.move_to_end(trigger_text)
+                self.hits += 1
+                return template.clone()
+
+        template = parse_trigger_text(trigger_text)
+
+        with self._lock:
+            self.misses += 1
+            self._templates[trigger_text] = template
+            if len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+        return template.clone()
+
+    def cache_info(self) -> ParseCacheInfo:
+        with self._lock:
+            return ParseCacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                maxsize=self.maxsize,
+                currsize=len(self._templates),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+trigger_parse_cache: ParseCache = ParseCache()
+
+
+def parse_trigger_text(trigger_text: str) -> AstRoot:
+    """
+    Parse trigger expression string with ``trigger_parser``, without cache.
+    """
+    return get_trigger_parser().parse(trigger_text)
 
 
 def parse_trigger(trigger_text: str) -> AstRoot:
     """
     Parse trigger expression string and return expression's AST.
 
+    Parsed ASTs are cached in ``trigger_parse_cache``, and each call returns a new AST.
+
     Parameters
     ----------
     trigger_text
@@ -192,6 +371,4 @@ def parse_trigger(trigger_text: str) -> AstRoot:
     -------
     AstRoot
     """
-    tree = trigger_parser.parse(trigger_text)
-    expression_ast = ExpressionTransformer().transform(tree)
-    return expression_ast
+    return trigger_parse_cache.get(trigger_text)
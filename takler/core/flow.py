@@ -1,7 +1,7 @@
 import datetime
-from typing import TYPE_CHECKING, Optional, Dict
+from typing import TYPE_CHECKING, Optional, Dict, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from .node_container import NodeContainer
 from .calendar import Calendar
@@ -25,6 +25,32 @@ class Flow(NodeContainer):
     def get_bunch(self) -> "Bunch":
         return self.bunch
 
+    # Serialization ------------------------------------
+
+    def checkpoint_state(self) -> Optional[Tuple]:
+        calendar = self.calendar
+        return (
+            calendar.initial_time,
+            calendar.flow_time,
+            calendar.duration,
+            calendar.increment,
+            calendar.initial_real_time,
+            calendar.last_real_time,
+        )
+
+    def restore_checkpoint_state(self, state: Tuple):
+        calendar = self.calendar
+        (
+            calendar.initial_time,
+            calendar.flow_time,
+            calendar.duration,
+            calendar.increment,
+            calendar.initial_real_time,
+            calendar.last_real_time,
+        ) = state
+        if calendar.flow_time is not None:
+            self.generated_parameters.update_parameters()
+
     # Parameter ----------------------------------------
 
     def find_parent_parameter(self, name: str) -> Optional[Parameter]:
@@ -46,7 +72,7 @@ class Flow(NodeContainer):
         suite_time = datetime.datetime.now()
         self.calendar.begin(suite_time)
 
-    def update_calendar(self, time: datetime.datetime):
+    def update_calendar(self, time: datetime.datetime, update_time_attributes: bool = True):
         """
         Update calendar using given time. Used in scheduler's main loop.
 
@@ -55,10 +81,14 @@ class Flow(NodeContainer):
         Parameters
         ----------
         time
+        update_time_attributes
+            If not set, time attributes are not updated, and caller should update them,
+            such as ``Bunch.update_time_attributes`` which only visits nodes with time attributes.
         """
         self.calendar.update(time)
         self.update_generated_parameters()
-        self.calendar_changed(self.calendar)
+        if update_time_attributes:
+            self.calendar_changed(self.calendar)
 
     # Parameter ---------------------------------------------------
 
@@ -98,8 +128,8 @@ class FlowGeneratedParameters(BaseModel):
         current time
     """
     flow: Flow
-    date: Parameter = Parameter(DATE, None)
-    time: Parameter = Parameter(TIME, None)
+    date: Parameter = Field(default_factory=lambda: Parameter(DATE, None))
+    time: Parameter = Field(default_factory=lambda: Parameter(TIME, None))
 
     class Config:
         arbitrary_types_allowed = True
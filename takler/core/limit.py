@@ -1,5 +1,8 @@
-from typing import TYPE_CHECKING, Optional, Set, List, Dict
+import time
+from enum import Enum
+from typing import TYPE_CHECKING, Optional, Set, List, Dict, Union
 
+from .parameter import TAKLER_PRIORITY, TAKLER_SHARE
 from .util import SerializationType
 
 
@@ -7,6 +10,87 @@ if TYPE_CHECKING:
     from .node import Node
 
 
+class AllocationPolicy(Enum):
+    """
+    How free tokens of a :py:class:`~takler.core.limit.Limit` are allocated to waiting tasks.
+
+    order
+        tokens are taken by tasks in resolving order, which is pre-order of the node tree. Default policy.
+    fifo
+        tasks take tokens in order of queue time.
+    priority
+        tasks with higher ``TAKLER_PRIORITY`` take tokens first, then in order of queue time.
+    fair_share
+        tasks whose family holds fewer tokens relative to its ``TAKLER_SHARE`` take tokens first,
+        then in order of queue time.
+
+    Except ``order``, a task must wait in the Limit's wait queue until it is granted tokens by the policy,
+    see ``Limit.pop_waiting_nodes``.
+    """
+    order = "order"
+    fifo = "fifo"
+    priority = "priority"
+    fair_share = "fair_share"
+
+
+def find_user_parameter_value_up(node: "Node", name: str, default: float) -> float:
+    """
+    Find value of a user parameter up along the node tree, and convert it to float.
+    """
+    while node is not None:
+        param = node.find_user_parameter(name)
+        if param is not None:
+            try:
+                return float(param.value)
+            except (TypeError, ValueError):
+                return default
+        node = node.parent
+    return default
+
+
+def get_resource_limit_name(pool: str, resource: Optional[str] = None) -> str:
+    """
+    Get name of the ``Limit`` for one resource of a resource pool in a ``Bunch``.
+
+    A pool of plain tokens has only one ``Limit`` named by the pool.
+    Each resource of a multi-dimensional pool has a ``Limit`` named ``{pool}.{resource}``.
+    """
+    if resource is None:
+        return pool
+    return f"{pool}.{resource}"
+
+
+class LimitWaiter:
+    """
+    A node waiting in wait queue of a :py:class:`~takler.core.limit.Limit`.
+
+    Attributes
+    ----------
+    node
+        the waiting node.
+    in_limit
+        the ``InLimit`` of node or its ancestors using the Limit.
+    queue_time
+        time when the node starts to wait.
+    priority
+        ``TAKLER_PRIORITY`` of node, used by ``AllocationPolicy.priority``.
+    family
+        node path of node's parent, used by ``AllocationPolicy.fair_share``.
+    share
+        ``TAKLER_SHARE`` of node's parent, used by ``AllocationPolicy.fair_share``.
+    """
+    def __init__(self, node: "Node", in_limit: "InLimit", queue_time: float):
+        self.node: "Node" = node
+        self.in_limit: "InLimit" = in_limit
+        self.queue_time: float = queue_time
+        self.priority: float = 0
+        self.family: str = ""
+        self.share: float = 1
+
+    def __repr__(self):
+        return f"LimitWaiter(node={self.node!r}, tokens={self.in_limit.tokens}, queue_time={self.queue_time})"
+
+
 class Limit:
     """
     Limit is used to control task running, and it is an attribution attached to some Node.
@@ -24,14 +108,26 @@ class Limit:
         node who holds the Limit.
     node_paths
         list of node path that is occupying the Limit.
-
+    node_tokens
+        number of tokens occupied by each node path in ``node_paths``.
+    policy
+        allocation policy of free tokens, see :py:class:`~takler.core.limit.AllocationPolicy`.
+    waiting_nodes
+        wait queue, queued nodes blocked by the Limit in order.
+        Nodes are woken by the resolver when tokens are released, see ``Limit.pop_waiting_nodes``.
+    granted_nodes
+        nodes woken in last ``Limit.pop_waiting_nodes``, which are allowed to take tokens.
     """
-    def __init__(self, name: str, limit: int):
+    def __init__(self, name: str, limit: int, policy: Union[AllocationPolicy, str] = AllocationPolicy.order):
         self.name: str = name
         self.limit: int = limit
         self.value: int = 0
         self.node: Optional["Node"] = None
         self.node_paths: Set[str] = set()
+        self.node_tokens: Dict[str, int] = dict()
+        self.policy: AllocationPolicy = AllocationPolicy(policy)
+        self.waiting_nodes: Dict["Node", LimitWaiter] = dict()
+        self.granted_nodes: Dict["Node", LimitWaiter] = dict()
 
     def __eq__(self, other):
         if not isinstance(other, Limit):
@@ -45,7 +141,10 @@ class Limit:
         return hash((self.name, self.limit))
 
     def __repr__(self):
-        return f"Limit(name='{self.name}', limit={self.limit}, value={self.value}, node_paths={sorted(self.node_paths)})"
+        return (
+            f"Limit(name='{self.name}', limit={self.limit}, value={self.value}, "
+            f"node_paths={sorted(self.node_paths)}, policy={self.policy.value})"
+        )
 
     def set_node(self, node: "Node"):
         """
@@ -59,6 +158,12 @@ class Limit:
         """
         return self.value + tokens <= self.limit
 
+    def is_granted(self, node: "Node") -> bool:
+        """
+        check if node is allowed to take tokens by allocation policy.
+        """
+        return self.policy is AllocationPolicy.order or node in self.granted_nodes
+
     def increment(self, tokens: int, node_path: str):
         """
         Occupy ``tokens`` for some node by increment Limit value.
@@ -74,7 +179,10 @@ class Limit:
         if node_path in self.node_paths:
             return
         self.node_paths.add(node_path)
+        self.node_tokens[node_path] = tokens
         self.value += tokens
+        if self.node is not None:
+            self.node.mark_changed()
 
     def decrement(self, tokens: int, node_path: str):
         """
@@ -91,18 +199,155 @@ class Limit:
         if node_path not in self.node_paths:
             return
         self.node_paths.remove(node_path)
+        self.node_tokens.pop(node_path, None)
         self.value -= tokens
         if self.value < 0:
             self.value = 0
             self.node_paths.clear()
+            self.node_tokens.clear()
+        if self.node is not None:
+            self.node.mark_changed()
 
     def reset(self):
         """
         reset the limit. Clear node path list and set current value to 0.
         """
         self.node_paths.clear()
+        self.node_tokens.clear()
         self.value = 0
 
+    def remove_node_tree(self, node_path: str) -> bool:
+        """
+        Release tokens occupied by nodes in a node tree, and remove them from wait queue.
+        Used when the tree is deleted.
+
+        Parameters
+        ----------
+        node_path
+            node path of the tree's root.
+
+        Returns
+        -------
+        bool
+            True if some tokens are released.
+        """
+        prefix = f"{node_path}/"
+
+        def in_tree(path: str) -> bool:
+            return path == node_path or path.startswith(prefix)
+
+        released_paths = [path for path in self.node_paths if in_tree(path)]
+        for path in released_paths:
+            self.decrement(self.node_tokens.get(path, 0), path)
+        for nodes in (self.waiting_nodes, self.granted_nodes):
+            for node in [node for node in nodes if in_tree(node.node_path)]:
+                del nodes[node]
+        return len(released_paths) > 0
+
+    def set_node_tokens(self, node_tokens: Dict[str, int]):
+        """
+        set occupying node paths with their tokens, used when the Limit is restored.
+        """
+        self.node_tokens = dict(node_tokens)
+        self.node_paths = set(node_tokens)
+
+    # Waiting nodes ----------------------------------------------------------
+
+    def add_waiting_node(self, node: "Node", in_limit: "InLimit"):
+        """
+        Record a node blocked by this Limit in the wait queue.
+
+        A node granted in last ``Limit.pop_waiting_nodes`` but blocked again keeps its queue time.
+
+        Parameters
+        ----------
+        node
+            a queued node which has no enough tokens or is not granted by allocation policy.
+        in_limit
+            the ``InLimit`` of node or its ancestors using this Limit.
+        """
+        waiter = self.waiting_nodes.get(node, None)
+        if waiter is None:
+            waiter = self.granted_nodes.get(node, None)
+        if waiter is None:
+            waiter = LimitWaiter(node, in_limit, time.time())
+            if self.policy is AllocationPolicy.priority:
+                waiter.priority = find_user_parameter_value_up(node, TAKLER_PRIORITY, 0)
+            elif self.policy is AllocationPolicy.fair_share and node.parent is not None:
+                waiter.family = node.parent.node_path
+                waiter.share = max(find_user_parameter_value_up(node.parent, TAKLER_SHARE, 1), 1e-6)
+        waiter.in_limit = in_limit
+        self.waiting_nodes[node] = waiter
+
+    def pop_waiting_nodes(self) -> List["Node"]:
+        """
+        Remove and return waiting nodes which fit in free tokens, in order of allocation policy.
+
+        Returned nodes are granted to take tokens until next call.
+
+        Returns
+        -------
+        List[Node]
+        """
+        free_tokens = self.limit - self.value
+        if self.policy is AllocationPolicy.fair_share:
+            waiters = self.select_fair_share_waiters(free_tokens)
+        else:
+            waiters = []
+            for waiter in self.sorted_waiters():
+                if free_tokens <= 0:
+                    break
+                if waiter.in_limit.tokens <= free_tokens:
+                    waiters.append(waiter)
+                    free_tokens -= waiter.in_limit.tokens
+
+        self.granted_nodes = dict()
+        for waiter in waiters:
+            del self.waiting_nodes[waiter.node]
+            self.granted_nodes[waiter.node] = waiter
+        return [waiter.node for waiter in waiters]
+
+    def sorted_waiters(self) -> List[LimitWaiter]:
+        """
+        Waiters in order of allocation policy, except ``AllocationPolicy.fair_share``.
+        """
+        waiters = list(self.waiting_nodes.values())
+        if self.policy is AllocationPolicy.fifo:
+            waiters.sort(key=lambda w: w.queue_time)
+        elif self.policy is AllocationPolicy.priority:
+            waiters.sort(key=lambda w: (-w.priority, w.queue_time))
+        return waiters
+
+    def select_fair_share_waiters(self, free_tokens: int) -> List[LimitWaiter]:
+        """
+        Select waiters one by one from the family with the least tokens per share, including selected ones.
+        """
+        family_tokens: Dict[str, int] = dict()
+        for node_path, tokens in self.node_tokens.items():
+            family = node_path.rsplit("/", 1)[0]
+            family_tokens[family] = family_tokens.get(family, 0) + tokens
+
+        family_waiters: Dict[str, List[LimitWaiter]] = dict()
+        for waiter in sorted(self.waiting_nodes.values(), key=lambda w: w.queue_time):
+            family_waiters.setdefault(waiter.family, []).append(waiter)
+
+        waiters = []
+        while free_tokens > 0 and len(family_waiters) > 0:
+            family = min(
+                family_waiters,
+                key=lambda f: (family_tokens.get(f, 0) / family_waiters[f][0].share, family_waiters[f][0].queue_time)
+            )
+            queue = family_waiters[family]
+            waiter = queue.pop(0)
+            if len(queue) == 0:
+                del family_waiters[family]
+            if waiter.in_limit.tokens > free_tokens:
+                continue
+            waiters.append(waiter)
+            free_tokens -= waiter.in_limit.tokens
+            family_tokens[family] = family_tokens.get(family, 0) + waiter.in_limit.tokens
+        return waiters
+
     # Serialization ----------------------------------------------------------
 
     def to_dict(self) -> Dict:
@@ -112,18 +357,25 @@ class Limit:
             node_paths=sorted(list(self.node_paths)),
             value=self.value
         )
+        if self.policy is not AllocationPolicy.order:
+            result["policy"] = self.policy.value
+        node_tokens = {node_path: tokens for node_path, tokens in self.node_tokens.items() if tokens != 1}
+        if len(node_tokens) > 0:
+            result["node_tokens"] = node_tokens
         return result
 
     @classmethod
     def from_dict(cls, d: Dict, method: SerializationType = SerializationType.Status) -> "Limit":
         name = d["name"]
         limit = d["limit"]
-        limit = Limit(name=name, limit=limit)
+        policy = d.get("policy", AllocationPolicy.order.value)
+        limit = Limit(name=name, limit=limit, policy=policy)
         if method == SerializationType.Status:
             value = d["value"]
             node_paths = d["node_paths"]
+            node_tokens = d.get("node_tokens", dict())
             limit.value = value
-            limit.node_paths = set(node_paths)
+            limit.set_node_tokens({node_path: node_tokens.get(node_path, 1) for node_path in node_paths})
         return limit
 
 
@@ -163,7 +415,7 @@ class InLimit:
     def __repr__(self):
         return f"InLimit(limit_name='{self.limit_name}', tokens={self.tokens}, node_path={self.node_path!r})"
 
-    def set_limit(self, limit: Limit):
+    def set_limit(self, limit: Optional[Limit]):
         self.limit = limit
 
     # Serialization -----------------------
@@ -190,18 +442,31 @@ class InLimitManager:
     Manager :py:class:`~takler.core.limit.InLimit`s in one :py:class:`~takler.core.node.Node`.
     Deal with Limit increment and decrement.
 
+    ``Limit`` references are resolved once and cached until structure version of the bunch is changed.
+    References are not cached if the node is not in any bunch.
+
     Attributes
     ----------
     node : Node
         reference node who has the :py:class:`~takler.core.limit.InLimitManager`
     in_limit_list : List[InLimit]
         list of :py:class:`~takler.core.limit.InLimit`
+    version : int
+        structure version when ``Limit`` references are resolved.
+    in_limits_up : List[InLimit]
+        cached InLimits with ``Limit`` of the node and its ancestors, see ``InLimitManager.find_in_limits_up``.
+    in_limits_up_version : int
+        structure version when ``in_limits_up`` is collected.
     """
     def __init__(self, node: "Node"):
         self.node: "Node" = node
 
         self.in_limit_list: List[InLimit] = list()
 
+        self.version: Optional[int] = -1
+        self.in_limits_up: List[InLimit] = list()
+        self.in_limits_up_version: Optional[int] = -1
+
     def __eq__(self, other):
         return all([a == b for a,b in zip(self.in_limit_list, other.in_limit_list)])
 
@@ -211,6 +476,7 @@ class InLimitManager:
         if self.has_in_limit(in_limit):
             raise RuntimeError(f"add_in_limit failed: duplicate InLimit in node: {self.node.node_path}")
         self.in_limit_list.append(in_limit)
+        self.node.increase_structure_version()
 
     def delete_in_limit(self, name: str) -> bool:
         raise NotImplementedError()
@@ -241,62 +507,82 @@ class InLimitManager:
 
     def in_limit(self) -> bool:
         """
-        Check if there are enough tokens in all ``Limit``s.
+        Check if there are enough tokens in all ``Limit``s of the node and its ancestors.
 
         Returns
         -------
         bool
         """
-        if len(self.in_limit_list) == 0:
-            return True
+        return self.find_blocking_in_limit() is None
+
+    def find_blocking_in_limit(self) -> Optional[InLimit]:
+        """
+        Find the first ``InLimit`` without enough tokens up along the tree,
+        or whose ``Limit`` doesn't grant tokens to the node by allocation policy.
 
-        self.resolve_in_limit_references()
+        Returns
+        -------
+        Optional[InLimit]
+            None if all ``InLimit`` have enough tokens.
+        """
+        for item in self.find_in_limits_up():
+            limit = item.limit
+            if not limit.in_limit(item.tokens) or not limit.is_granted(self.node):
+                return item
+        return None
 
-        valid_in_limit_count = 0
-        fitted_in_limit_count = 0
-        for item in self.in_limit_list:
-            if item.limit is None:
-                continue
+    def find_in_limits_up(self) -> List[InLimit]:
+        """
+        Find all ``InLimit`` with ``Limit`` of the node and its ancestors, from the node up.
 
-            valid_in_limit_count += 1
-            if item.limit.in_limit(item.tokens):
-                fitted_in_limit_count += 1
+        The list is cached until structure version of the bunch is changed.
 
-        return valid_in_limit_count == fitted_in_limit_count
+        Returns
+        -------
+        List[InLimit]
+        """
+        version = self.get_version()
+        if version is not None and self.in_limits_up_version == version:
+            return self.in_limits_up
+
+        in_limits = []
+        manager = self
+        while manager is not None:
+            if len(manager.in_limit_list) > 0:
+                manager.resolve_in_limit_references()
+                in_limits.extend(item for item in manager.in_limit_list if item.limit is not None)
+            parent = manager.node.parent
+            manager = None if parent is None else parent.in_limit_manager
+
+        self.in_limits_up = in_limits
+        self.in_limits_up_version = version
+        return in_limits
 
     # Change ------------------------------------------
 
     def increment_in_limit(self, limit_set: Set[Limit], node_path: str):
         """
-        Occupy all ``Limits`` with each ``InLimit``'s token for some node.
+        Occupy all ``Limits`` with each ``InLimit``'s token up the node tree for some node.
 
         One ``Limit`` should only be occupied once even if there are multiply ``InLimit`` using it.
 
         Parameters
         ----------
         limit_set
-            A Limit set shared with in ``Node.increment_in_limit`` method to make sure each ``Limit`` will be occupied once.
+            A set to save changed ``Limit``, to make sure each ``Limit`` will be occupied once.
         node_path
             full node path, see ``Node.node_path``
         """
-        if len(self.in_limit_list) == 0:
-            return
-
-        self.resolve_in_limit_references()
-
-        for item in self.in_limit_list:
+        for item in self.find_in_limits_up():
             current_limit = item.limit
-            if current_limit is None:
-                continue
             if current_limit in limit_set:
                 continue
-
             limit_set.add(current_limit)
             current_limit.increment(item.tokens, node_path)
 
     def decrement_in_limit(self, limit_set: Set[Limit], node_path: str):
         """
-        Release all ``Limits`` with each ``InLimit``'s token for some node.
+        Release all ``Limits`` with each ``InLimit``'s token up the node tree for some node.
 
         One ``Limit`` should only be released once even if there are multiply ``InLimit`` using it.
 
@@ -307,18 +593,10 @@ class InLimitManager:
         node_path
             see ``InLimitManager.increment_in_limit``
         """
-        if len(self.in_limit_list) == 0:
-            return
-
-        self.resolve_in_limit_references()
-
-        for item in self.in_limit_list:
+        for item in self.find_in_limits_up():
             current_limit = item.limit
-            if current_limit is None:
-                continue
             if current_limit in limit_set:
                 continue
-
             limit_set.add(current_limit)
             current_limit.decrement(item.tokens, node_path)
 
@@ -326,33 +604,43 @@ class InLimitManager:
 
     def resolve_in_limit_references(self):
         """
-        Find ``Limit`` for all ``InLimit`` in this manager.
+        Find ``Limit`` for all ``InLimit`` in this manager, only if node tree is changed since last call.
         """
+        version = self.get_version()
+        if version is not None and self.version == version:
+            return
         for item in self.in_limit_list:
             self.resolve_in_limit(item)
+        self.version = version
+
+    def get_version(self) -> Optional[int]:
+        """
+        Get structure version of the bunch which the node is in, None if node is not in any bunch.
+        """
+        structure_version = self.node.get_structure_version()
+        if structure_version is None:
+            return None
+        return structure_version.value
 
     def resolve_in_limit(self, in_limit: InLimit):
         """
         Find ``Limit`` for some ``InLimit``.
-        """
-        if in_limit.limit is not None:
-            return
 
+        If no ``Limit`` is found, a ``Limit`` set to ``InLimit`` by hand (not attached to any node) is kept.
+        """
+        limit = None
         # find limit
         if in_limit.node_path is None:
             limit = self.node.find_limit_up(in_limit.limit_name)
-            if limit is not None:
-                in_limit.set_limit(limit)
-            return
         else:
             reference_node = self.node.find_node(in_limit.node_path)
-            if reference_node is None:
-                return
+            if reference_node is not None:
+                limit = reference_node.find_limit(in_limit.limit_name)
 
-            limit = reference_node.find_limit(in_limit.limit_name)
-            if limit is not None:
-                in_limit.set_limit(limit)
-            return
+        if limit is not None:
+            in_limit.set_limit(limit)
+        elif in_limit.limit is not None and in_limit.limit.node is not None:
+            in_limit.set_limit(None)
 
     # Serialization ----------------------------------------
 
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import datetime
 import importlib
-from typing import Union, List, Optional, Dict, TYPE_CHECKING, Set, Literal
+from typing import Union, List, Optional, Dict, TYPE_CHECKING, Set, Literal, Tuple, Type
 from pathlib import PurePosixPath
 from collections import defaultdict
 from abc import ABC
@@ -11,17 +11,19 @@ from .state import State, NodeStatus
 from .parameter import Parameter
 from .event import Event
 from .meter import Meter
-from .limit import Limit, InLimit, InLimitManager
+from .limit import Limit, InLimit, InLimitManager, AllocationPolicy, get_resource_limit_name
 from .expression import Expression
+from .expression_compiler import StructureVersion
 from .repeat import Repeat, RepeatBase
 from .time_attr import TimeAttribute
 
-from .util import logger, SerializationType
+from .util import logger, SerializationType, gc_paused
 
 if TYPE_CHECKING:
     from .bunch import Bunch
     from .calendar import Calendar
     from .flow import Flow
+    from .resolver import IncrementalResolver
 
 
 # def compute_node_status(node: Node, immediate: bool) -> NodeStatus:
@@ -48,6 +50,16 @@ if TYPE_CHECKING:
 #     return state
 
 
+# Status order used to compute the most significant status of children, see ``compute_most_significant_status``.
+SIGNIFICANT_STATUS_ORDER = (
+    NodeStatus.aborted,
+    NodeStatus.active,
+    NodeStatus.submitted,
+    NodeStatus.queued,
+    NodeStatus.complete,
+)
+
+
 def compute_most_significant_status(nodes: List[Node], immediate: bool) -> NodeStatus:
     """
     Compute the most significant node status from node list. Won't change anything in ``node``.
@@ -72,13 +84,7 @@ def compute_most_significant_status(nodes: List[Node], immediate: bool) -> NodeS
             child_node_state = node.computed_status(immediate)
         count[child_node_state] += 1
 
-    for status in (
-        NodeStatus.aborted,
-        NodeStatus.active,
-        NodeStatus.submitted,
-        NodeStatus.queued,
-        NodeStatus.complete,
-    ):
+    for status in SIGNIFICANT_STATUS_ORDER:
         if count[status] > 0:
             return status
 
@@ -107,14 +113,19 @@ class Node(ABC):
     times
     """
     def __init__(self, name: str):
-        self.name: str = name
+        # 缓存的节点路径，节点或祖先节点改名、更换父节点时失效
+        self._node_path: Optional[str] = None
+
+        self._name: str = name
 
         # 状态
         self.state: State = State()
 
         # 树形结构
-        self.parent: Optional["Node"] = None
+        self._parent: Optional["Node"] = None
         self.children: List["Node"] = list()
+        # 子节点状态计数，按 NodeStatus 值索引，0 位置保存计数的子节点个数。首次使用时创建
+        self.child_status_counts: Optional[List[int]] = None
 
         # 参数
         self.user_parameters: Dict[str, Parameter] = dict()
@@ -152,6 +163,38 @@ class Node(ABC):
     def __str__(self):
         return f"{self.__class__.__name__} {self.name}"
 
+    # Property ----------------------------------------------------------
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, value: str):
+        if value == self._name:
+            return
+
+        bunch = self.get_bunch()
+        if bunch is not None:
+            bunch.remove_node_tree_index(self)
+
+        self._name = value
+        self.invalidate_node_path()
+        self.increase_structure_version()
+
+        if bunch is not None:
+            bunch.add_node_tree_index(self)
+
+    @property
+    def parent(self) -> Optional["Node"]:
+        return self._parent
+
+    @parent.setter
+    def parent(self, value: Optional["Node"]):
+        self._parent = value
+        self.invalidate_node_path()
+        self.increase_structure_version()
+
     # Serialization -----------------------------------------------------
 
     def to_dict(self) -> Dict:
@@ -191,6 +234,8 @@ class Node(ABC):
         """
         Create ``Node`` based object from dictionary. Use ``d["class_type"]`` to determine which class is to be created.
 
+        The node tree is created iteratively, so deep trees don't reach the recursion limit.
+
         Parameters
         ----------
         d
@@ -201,19 +246,35 @@ class Node(ABC):
         Node
             A ``Node`` based object created from dictionary.
         """
+        with gc_paused():
+            root = cls.create_from_dict(d, method=method)
+            stack = [(root, d)]
+            while len(stack) > 0:
+                node, node_dict = stack.pop()
+                children = node.children
+                for child_dict in node_dict.get("children", ()):
+                    child_node = cls.create_from_dict(child_dict, method=method)
+                    # new tree is not in any bunch, so children are linked without ``append_child``.
+                    child_node.parent = node
+                    children.append(child_node)
+                    stack.append((child_node, child_dict))
+        return root
+
+    @classmethod
+    def create_from_dict(cls, d: Dict, method: SerializationType = SerializationType.Status) -> "Node":
+        """
+        Create one ``Node`` based object from dictionary without its children.
+        Class is found in ``node_class_registry`` by ``d["class_type"]``.
+        """
         class_type = d["class_type"]
-        class_module = class_type["module"]
-        class_name = class_type["name"]
-        class_module = importlib.import_module(class_module)
-        class_object = getattr(class_module, class_name)
+        class_object = node_class_registry.find(class_type["module"], class_type["name"])
         node = class_object(name=d["name"])
-        node = class_object.fill_from_dict(d, node, method=method)
-        return node
+        return class_object.fill_from_dict(d, node, method=method)
 
     @classmethod
     def fill_from_dict(cls, d: Dict, node: "Node", method: SerializationType = SerializationType.Status) -> "Node":
         """
-        Fill a ``Node`` based object from dictionary.
+        Fill attributes of a ``Node`` based object from dictionary. Children are created in ``from_dict``.
 
         Subclasses of ``Node`` should override this method and call ``Node.file_from_dict`` in the override method.
 
@@ -233,53 +294,66 @@ class Node(ABC):
             state = d["state"]
             node.state = State.from_dict(state, method=method)
 
-        if "user_parameters" in d:
-            user_parameters = d["user_parameters"]
+        user_parameters = d.get("user_parameters", None)
+        if user_parameters is not None:
             for param in user_parameters:
                 node.add_parameter(param["name"], param["value"])
 
-        if "trigger" in d:
-            trigger = d["trigger"]
+        trigger = d.get("trigger", None)
+        if trigger is not None:
             node.add_trigger(trigger, parse=False)
 
-        if "complete_trigger" in d:
-            trigger = d["complete_trigger"]
+        trigger = d.get("complete_trigger", None)
+        if trigger is not None:
             node.add_complete_trigger(trigger, parse=False)
 
-        if "events" in d:
-            events = d["events"]
+        events = d.get("events", None)
+        if events is not None:
             for event in events:
                 node.events.append(Event.from_dict(event, method=method))
-        if "meters" in d:
-            meters = d["meters"]
+
+        meters = d.get("meters", None)
+        if meters is not None:
             for meter in meters:
                 node.meters.append(Meter.from_dict(meter, method=method))
 
-        if "limits" in d:
-            limits = d["limits"]
+        limits = d.get("limits", None)
+        if limits is not None:
             for limit in limits:
-                node.add_limit(limit["name"], limit=limit["limit"])
+                node.add_limit(limit["name"], limit=limit["limit"], policy=limit.get("policy", "order"))
 
-        if "in_limit_manager" in d:
-            in_limit_manager = d["in_limit_manager"]
+        in_limit_manager = d.get("in_limit_manager", None)
+        if in_limit_manager is not None:
             InLimitManager.fill_from_dict(in_limit_manager, node=node, method=method)
 
-        if "repeat" in d:
-            repeat = d["repeat"]
+        repeat = d.get("repeat", None)
+        if repeat is not None:
             node.repeat = Repeat.from_dict(repeat, method=method)
 
-        if "times" in d:
-            times = d["times"]
+        times = d.get("times", None)
+        if times is not None:
             for time_attr in times:
                 node.add_time(time_attr["time"])
 
-        if "children" in d:
-            for child in d["children"]:
-                child_node = cls.from_dict(child, method=method)
-                node.append_child(child_node)
-
         return node
 
+    def checkpoint_state(self) -> Optional[Tuple]:
+        """
+        Runtime state of subclasses saved in checkpoint besides common attributes. See ``takler.core.checkpoint``.
+
+        Returns
+        -------
+        Optional[Tuple]
+            a tuple of builtin values, or None if there is no additional state.
+        """
+        return None
+
+    def restore_checkpoint_state(self, state: Tuple):
+        """
+        Restore runtime state returned by ``checkpoint_state``.
+        """
+        pass
+
     # Children operation ------------------------------------------------
     #   These methods are for inner usage, and should not be used by Users.
 
@@ -293,6 +367,12 @@ class Node(ABC):
 
         child_node.parent = self
         self.children.append(child_node)
+        self.count_child_status(child_node, 1)
+
+        bunch = self.get_bunch()
+        if bunch is not None:
+            bunch.add_node_tree_index(child_node)
+
         return child_node
 
     def find_child_index(self, child: Union[str, Node]) -> int:
@@ -319,6 +399,18 @@ class Node(ABC):
         old_child = self.children[child_index]
         new_child_node.parent = self
         self.children[child_index] = new_child_node
+        self.count_child_status(old_child, -1)
+        self.count_child_status(new_child_node, 1)
+
+        bunch = self.get_bunch()
+        if bunch is not None:
+            bunch.remove_node_tree_index(old_child, node_path=f"{self.node_path}/{old_child.name}")
+            dependents = bunch.dependency_index.remove_tree(old_child)
+            bunch.add_node_tree_index(new_child_node, register_expressions=True)
+            for node in dependents:
+                node.mark_dirty()
+            new_child_node.mark_dirty()
+
         return old_child
 
     def delete_child(self, child: Union[str, Node]) -> Node:
@@ -326,6 +418,16 @@ class Node(ABC):
         if child_node_index == -1:
             raise ValueError(f"{child} does not exist")
         child_node = self.children.pop(child_node_index)
+        self.count_child_status(child_node, -1)
+        self.increase_structure_version()
+
+        bunch = self.get_bunch()
+        if bunch is not None:
+            child_node_path = f"{self.node_path}/{child_node.name}"
+            bunch.release_node_tree_limits(child_node, node_path=child_node_path)
+            bunch.remove_node_tree_index(child_node, node_path=child_node_path)
+            bunch.dependency_index.remove_tree(child_node)
+
         child_node.delete_children()
         return child_node
 
@@ -336,6 +438,7 @@ class Node(ABC):
             node.delete_children()
             del node
         self.children = list()
+        self.child_status_counts = None
 
     # Node access -----------------------------------------------------
 
@@ -343,13 +446,37 @@ class Node(ABC):
     def node_path(self) -> str:
         """
         str: full path from root node, starts with "/" and split each level with "/"
+
+        Node path is cached, and is invalidated when the node or any ancestor is renamed or re-parented.
         """
-        cur_node = self
-        node_list = []
-        while cur_node is not None:
-            node_list.insert(0, cur_node.name)
-            cur_node = cur_node.parent
-        return str(PurePosixPath("/", *node_list))
+        if self._node_path is not None:
+            return self._node_path
+
+        if self._parent is None:
+            node_path = f"/{self._name}"
+        else:
+            parent_path = self._parent.node_path
+            if parent_path == "/":
+                node_path = f"/{self._name}"
+            else:
+                node_path = f"{parent_path}/{self._name}"
+        self._node_path = node_path
+        return node_path
+
+    def invalidate_node_path(self):
+        """
+        Clear cached node path of the node and all its descendants.
+
+        A node path is only cached after its parent's, so descendants of a node without cache
+        have no cache either and are skipped.
+        """
+        nodes = [self]
+        while len(nodes) > 0:
+            node = nodes.pop()
+            if node._node_path is None:
+                continue
+            node._node_path = None
+            nodes.extend(node.children)
 
     def is_leaf_node(self) -> bool:
         if len(self.children) == 0:
@@ -366,8 +493,8 @@ class Node(ABC):
         Node
         """
         root = self
-        while root.parent is not None:
-            root = root.parent
+        while root._parent is not None:
+            root = root._parent
         return root
 
     def get_bunch(self) -> "Optional[Bunch]":
@@ -378,10 +505,33 @@ class Node(ABC):
         -------
         Bunch or None
         """
-        if self.parent is not None:
-            return self.parent.get_bunch()
-        else:
+        root = self.get_root()
+        if root is self:
+            return None
+        # root is usually a ``Flow`` which knows its bunch.
+        return root.get_bunch()
+
+    def get_structure_version(self) -> "Optional[StructureVersion]":
+        """
+        get structure version of the bunch which the node is in.
+
+        Returns
+        -------
+        StructureVersion or None
+            None if node is not in any bunch.
+        """
+        bunch = self.get_bunch()
+        if bunch is None:
             return None
+        return bunch.structure_version
+
+    def increase_structure_version(self):
+        """
+        Increase structure version of the bunch which the node is in. Do nothing if node is not in any bunch.
+        """
+        structure_version = self.get_structure_version()
+        if structure_version is not None:
+            structure_version.increase()
 
     def find_node(self, a_path: str) -> Optional[Node]:
         """
@@ -403,6 +553,10 @@ class Node(ABC):
         Node or None
             node with node_path or None if not found
         """
+        bunch = self.get_bunch()
+        if bunch is not None:
+            return self.find_node_in_bunch(bunch, a_path)
+
         full_node_path = PurePosixPath(self.node_path).parent.joinpath(a_path)
         cur_node = self.get_root()
         parts = full_node_path.parts[1:]
@@ -427,6 +581,51 @@ class Node(ABC):
             cur_node = t_node
         return cur_node
 
+    def find_node_in_bunch(self, bunch: "Bunch", a_path: str) -> Optional[Node]:
+        """
+        Find node using node path index of the bunch, see ``Node.find_node``.
+        """
+        if a_path.startswith("/"):
+            full_node_path = a_path
+        else:
+            full_node_path = self.node_path.rsplit("/", 1)[0] + "/" + a_path
+
+        node = bunch.node_index.get(full_node_path, None)
+        if node is None:
+            full_node_path = Node.normalize_node_path(full_node_path)
+            if full_node_path is None:
+                return None
+            node = bunch.node_index.get(full_node_path, None)
+            if node is None:
+                return None
+
+        # only find node in the same flow.
+        if node.get_root() is not self.get_root():
+            return None
+        return node
+
+    @classmethod
+    def normalize_node_path(cls, node_path: str) -> Optional[str]:
+        """
+        Normalize an absolute node path by removing empty tokens, ``.`` and ``..``.
+
+        Returns
+        -------
+        Optional[str]
+            normalized node path, or None if node path goes beyond the root.
+        """
+        tokens = []
+        for token in node_path.split("/"):
+            if token == "" or token == ".":
+                continue
+            if token == "..":
+                if len(tokens) == 0:
+                    return None
+                tokens.pop()
+                continue
+            tokens.append(token)
+        return "/" + "/".join(tokens)
+
     @classmethod
     def check_absolute_node_path(cls, node_path: str) -> bool:
         if not node_path.startswith("/"):
@@ -451,6 +650,75 @@ class Node(ABC):
                 return True
         return False
 
+    # Incremental resolve --------------------------------------------------
+
+    def get_resolver(self) -> "Optional[IncrementalResolver]":
+        """
+        get ``IncrementalResolver`` of the bunch if node's root is in some bunch.
+        """
+        bunch = self.get_bunch()
+        if bunch is None:
+            return None
+        return bunch.resolver
+
+    def mark_dirty(self):
+        """
+        Mark this node to be resolved in scheduler's next pass.
+        """
+        resolver = self.get_resolver()
+        if resolver is not None:
+            resolver.mark_dirty(self)
+
+    def is_resolvable_status(self, node_status: NodeStatus) -> bool:
+        """
+        Check whether ``check_dependencies`` may change anything for the node in ``node_status``.
+
+        Nodes entering such status are marked dirty. Complete trigger is checked for any
+        incomplete node.
+
+        Parameters
+        ----------
+        node_status
+            Node status, just an enum without any additional data.
+
+        Returns
+        -------
+        bool
+        """
+        return node_status != NodeStatus.complete
+
+    def mark_dependents_dirty(self):
+        """
+        Mark all nodes whose triggers depend on this node's status to be resolved in scheduler's next pass.
+        """
+        resolver = self.get_resolver()
+        if resolver is not None:
+            resolver.mark_dependents_dirty(self)
+
+    def mark_variable_dependents_dirty(self, name: str):
+        """
+        Mark all nodes whose triggers depend on this node's variable to be resolved in scheduler's next pass.
+        """
+        resolver = self.get_resolver()
+        if resolver is not None:
+            resolver.mark_variable_dependents_dirty(self, name)
+
+    def mark_all_dependents_dirty(self):
+        """
+        Mark all nodes whose triggers depend on this node's status or variables to be resolved in scheduler's next pass.
+        """
+        resolver = self.get_resolver()
+        if resolver is not None:
+            resolver.mark_all_dependents_dirty(self)
+
+    def mark_changed(self):
+        """
+        Record that visible state of this node is changed, for status subscriptions. See ``ChangeTracker``.
+        """
+        bunch = self.get_bunch()
+        if bunch is not None:
+            bunch.change_tracker.mark_changed(self)
+
     # State management -----------------------------------------------------
 
     def is_suspended(self) -> bool:
@@ -473,6 +741,49 @@ class Node(ABC):
         """
         raise Exception("Not implemented!")
 
+    def get_child_status_counts(self) -> List[int]:
+        """
+        Get counts of children in each status, indexed by ``NodeStatus`` value.
+
+        Counts are created when first used, and are updated by ``set_node_status_only`` of children
+        and children operations, so getting them is O(1). If children list is changed directly,
+        such as when a tree is decoded, number of counted children does not match, and counts are rebuilt.
+
+        Returns
+        -------
+        List[int]
+            ``counts[status.value]`` is number of children in ``status``, ``counts[0]`` is number of counted children.
+        """
+        counts = self.child_status_counts
+        if counts is None or counts[0] != len(self.children):
+            counts = [0] * (len(NodeStatus) + 1)
+            for child in self.children:
+                counts[child.state.node_status._value_] += 1
+            counts[0] = len(self.children)
+            self.child_status_counts = counts
+        return counts
+
+    def count_child_status(self, child: "Node", delta: int):
+        """
+        Add ``delta`` into counts for status of a child, when the child is added (1) or removed (-1).
+        """
+        counts = self.child_status_counts
+        if counts is None:
+            return
+        counts[0] += delta
+        counts[child.state.node_status._value_] += delta
+
+    def most_significant_child_status(self) -> NodeStatus:
+        """
+        Get the most significant status of children from ``get_child_status_counts`` in O(1),
+        same as ``compute_most_significant_status(self.children, immediate=True)``.
+        """
+        counts = self.get_child_status_counts()
+        for status in SIGNIFICANT_STATUS_ORDER:
+            if counts[status._value_] > 0:
+                return status
+        return NodeStatus.unknown
+
     def set_node_status_only(self, node_status: NodeStatus):
         """
         Set node status to some status without any side effect.
@@ -487,6 +798,18 @@ class Node(ABC):
             return
 
         self.state.node_status = node_status
+        parent = self._parent
+        if parent is not None:
+            counts = parent.child_status_counts
+            if counts is not None:
+                # ``_value_`` is a plain attribute, faster than ``value``.
+                counts[old_state._value_] -= 1
+                counts[node_status._value_] += 1
+
+        bunch = self.get_bunch()
+        if bunch is not None:
+            bunch.resolver.mark_status_changed(self, old_state)
+            bunch.change_tracker.mark_changed(self)
 
     def set_node_status(self, node_status: NodeStatus):
         """
@@ -501,6 +824,8 @@ class Node(ABC):
             return
 
         self.set_node_status_only(node_status)
+        if self.is_resolvable_status(node_status):
+            self.mark_dirty()
         self.handle_status_change()
 
     def sink_status_change_only(self, node_status: NodeStatus):
@@ -516,12 +841,35 @@ class Node(ABC):
         Apply the node_status change to all its descendants with side effects.
         """
         self.sink_status_change_only(node_status)
+        if self.is_resolvable_status(node_status):
+            self.mark_dirty()
+        self.handle_status_change()
 
     def swim_status_change(self):
         """
         Compute current node's node_status, and swim status change up the tree.
 
         Swim current status up. This method can only be called in handle_status_change and itself.
+
+        If a propagation transaction of the bunch is active, the node is only recorded,
+        and is recomputed with its ancestors when the transaction commits. See ``StatusPropagation``.
+        """
+        bunch = self.get_bunch()
+        if bunch is not None and bunch.status_propagation.is_active:
+            bunch.status_propagation.record(self)
+            return
+
+        node = self
+        while node is not None:
+            node.update_computed_status()
+            node = node.parent
+
+    def update_computed_status(self):
+        """
+        Compute current node's node_status from its children, without swimming up.
+
+        If the node becomes complete and has a repeat, the repeat is incremented and the node is requeued
+        if the repeat is not finished.
         """
         node_status = self.computed_status(immediate=True)
 
@@ -531,16 +879,11 @@ class Node(ABC):
             if self.repeat is not None:
                 if self.repeat.increment():
                     self.requeue(reset_repeat=False)
-                    self.swim_status_change_only()
-                    return
+                    node_status = self.computed_status(immediate=True)
 
         if node_status != self.state.node_status:
             self.set_node_status_only(node_status=node_status)
 
-        if self.parent is not None:
-            self.parent.swim_status_change()
-        return
-
     def swim_status_change_only(self):
         node_status = self.computed_status(immediate=True)
 
@@ -569,12 +912,15 @@ class Node(ABC):
             If not set, trigger is just store as a string in expression and is not parsed.
         """
         if isinstance(trigger, str):
-            self.trigger_expression = Expression(trigger)
+            expression = Expression(trigger)
         elif isinstance(trigger, Expression):
-            self.trigger_expression = trigger
+            expression = trigger
         else:
             raise TypeError("trigger only supports str or Expression.")
 
+        self.remove_expression_dependencies(self.trigger_expression)
+        self.trigger_expression = expression
+
         if parse:
             self.trigger_expression.create_ast(self)
 
@@ -605,12 +951,15 @@ class Node(ABC):
 
     def add_complete_trigger(self, trigger: Union[str, Expression], parse: bool = False):
         if isinstance(trigger, str):
-            self.complete_trigger_expression = Expression(trigger)
+            expression = Expression(trigger)
         elif isinstance(trigger, Expression):
-            self.complete_trigger_expression = trigger
+            expression = trigger
         else:
             raise TypeError("trigger only supports str or Expression.")
 
+        self.remove_expression_dependencies(self.complete_trigger_expression)
+        self.complete_trigger_expression = expression
+
         if parse:
             self.complete_trigger_expression.create_ast(self)
 
@@ -623,6 +972,16 @@ class Node(ABC):
 
         return self.complete_trigger_expression.evaluate()
 
+    def remove_expression_dependencies(self, expression: Optional[Expression]):
+        """
+        Remove references of an expression from bunch's ``DependencyIndex``, used when the expression is replaced.
+        """
+        if expression is None:
+            return
+        bunch = self.get_bunch()
+        if bunch is not None:
+            bunch.dependency_index.remove_expression(expression)
+
     # Resolve -----------------------------------------------------------
     def check_dependencies(self) -> bool:
         # check suspend
@@ -646,6 +1005,25 @@ class Node(ABC):
 
         return True
 
+    def evaluate_dependencies(self) -> bool:
+        """
+        Check dependencies as ``check_dependencies`` does, without any side effect.
+
+        A node whose complete trigger is satisfied is not set to complete here, and False is returned.
+
+        Returns
+        -------
+        bool
+            True if dependencies of this node are satisfied.
+        """
+        if self.is_suspended():
+            return False
+        if not self.resolve_time_dependencies():
+            return False
+        if self.evaluate_complete_trigger():
+            return False
+        return self.evaluate_trigger()
+
     def resolve_dependencies(self) -> bool:
         """
         Check all dependencies in the Node, and return True if all dependencies are satisfied.
@@ -701,6 +1079,7 @@ class Node(ABC):
 
         TODO: add_parameter([dict])
         """
+        self.increase_structure_version()
         if isinstance(param, dict):
             if value is not None:
                 raise TypeError("value must be None if param is dict.")
@@ -855,12 +1234,15 @@ class Node(ABC):
 
         event = Event(name, initial_value=initial_value)
         self.events.append(event)
+        self.increase_structure_version()
         return event
 
     def set_event(self, name: str, value: bool) -> bool:
         event = self.find_event(name)
         if event is not None:
             event.value = value
+            self.mark_variable_dependents_dirty(name)
+            self.mark_changed()
             return True
 
         return False
@@ -875,6 +1257,8 @@ class Node(ABC):
         event = self.find_event(name)
         if event is not None:
             event.reset()
+            self.mark_variable_dependents_dirty(name)
+            self.mark_changed()
             return True
 
         return False
@@ -884,12 +1268,15 @@ class Node(ABC):
     def add_meter(self, name: str, min_value: int, max_value: int) -> Meter:
         meter = Meter(name, min_value=min_value, max_value=max_value)
         self.meters.append(meter)
+        self.increase_structure_version()
         return meter
 
     def set_meter(self, name: str, value: int) -> bool:
         meter = self.find_meter(name)
         if meter is not None:
             meter.value = value
+            self.mark_variable_dependents_dirty(name)
+            self.mark_changed()
             return True
 
         return False
@@ -904,6 +1291,8 @@ class Node(ABC):
         meter = self.find_meter(name)
         if meter is not None:
             meter.reset()
+            self.mark_variable_dependents_dirty(name)
+            self.mark_changed()
             return True
 
         return False
@@ -931,7 +1320,35 @@ class Node(ABC):
         self.in_limit_manager.add_in_limit(in_limit)
         return in_limit
 
-    def add_limit(self, name: str, limit: int) -> Limit:
+    def add_resource_usage(self, pool: str, amounts: Union[int, Dict[str, int]] = 1) -> List[InLimit]:
+        """
+        Consume resources from a resource pool of the bunch, see ``Bunch.add_resource_pool``.
+
+        An ``InLimit`` is added for each resource, which is resolved to the pool's ``Limit`` in the bunch
+        by ``Node.find_limit_up``.
+
+        Parameters
+        ----------
+        pool
+            name of the resource pool.
+        amounts
+            tokens for a pool of plain tokens, or amount of each resource for a multi-dimensional pool,
+            such as ``dict(cpu=32, memory=64)``.
+
+        Returns
+        -------
+        List[InLimit]
+        """
+        if isinstance(amounts, int):
+            return [self.add_in_limit(get_resource_limit_name(pool), tokens=amounts)]
+        return [
+            self.add_in_limit(get_resource_limit_name(pool, resource), tokens=amount)
+            for resource, amount in amounts.items()
+        ]
+
+    def add_limit(
+            self, name: str, limit: int, policy: Union[AllocationPolicy, str] = AllocationPolicy.order
+    ) -> Limit:
         """
         Add a Limit to node. Limits in one Node should not have duplicate names.
 
@@ -941,15 +1358,18 @@ class Node(ABC):
             limit name.
         limit
             total tokens for Limit.
+        policy
+            allocation policy of free tokens, see ``AllocationPolicy``.
         Returns
         -------
         Limit
         """
         if self.find_limit(name) is not None:
             raise RuntimeError(f"add_limit failed: duplicate limit {name} for node {self.node_path}")
-        item = Limit(name, limit)
+        item = Limit(name, limit, policy=policy)
         item.set_node(self)
         self.limits.append(item)
+        self.increase_structure_version()
         return item
 
     def find_limit(self, name: str) -> Optional[Limit]:
@@ -972,7 +1392,7 @@ class Node(ABC):
 
     def find_limit_up(self, name: str) -> Optional[Limit]:
         """
-        Find Limit up along the node tree.
+        Find Limit up along the node tree, and then in the bunch (resource pools).
 
         Parameters
         ----------
@@ -994,7 +1414,11 @@ class Node(ABC):
                 return item
             the_parent = the_parent.parent
 
-        return None
+        bunch = self.get_bunch()
+        if bunch is None:
+            return None
+
+        return bunch.find_limit(name)
 
     def check_in_limit_up(self) -> bool:
         """
@@ -1005,16 +1429,20 @@ class Node(ABC):
         bool
             If all ``InLimit`` have enough tokens, return True.
         """
-        if not self.in_limit_manager.in_limit():
-            return False
+        return self.in_limit_manager.in_limit()
 
-        the_parent = self.parent
-        while the_parent is not None:
-            if not the_parent.in_limit_manager.in_limit():
-                return False
-            the_parent = the_parent.parent
+    def find_blocking_in_limit(self) -> Optional[InLimit]:
+        """
+        Find the first ``InLimit`` without enough tokens up along the tree,
+        or whose ``Limit`` doesn't grant tokens to this node by allocation policy.
+        See ``InLimitManager.find_blocking_in_limit``.
 
-        return True
+        Returns
+        -------
+        Optional[InLimit]
+            None if all ``InLimit`` have enough tokens.
+        """
+        return self.in_limit_manager.find_blocking_in_limit()
 
     def increment_in_limit(self, limit_set: Set[Limit]):
         """
@@ -1025,13 +1453,7 @@ class Node(ABC):
         limit_set
             A set to save changed ``Limit``, to make sure one Limit is incremented only once.
         """
-        node_path = self.node_path
-        self.in_limit_manager.increment_in_limit(limit_set, node_path)
-
-        the_parent = self.parent
-        while the_parent is not None:
-            the_parent.in_limit_manager.increment_in_limit(limit_set, node_path)
-            the_parent = the_parent.parent
+        self.in_limit_manager.increment_in_limit(limit_set, self.node_path)
 
     def decrement_in_limit(self, limit_set: Set[Limit]):
         """
@@ -1042,18 +1464,13 @@ class Node(ABC):
         limit_set
             A set to save changed ``Limit``, to make sure one Limit is decremented only once.
         """
-        node_path = self.node_path
-        self.in_limit_manager.decrement_in_limit(limit_set, node_path)
-
-        the_parent = self.parent
-        while the_parent is not None:
-            the_parent.in_limit_manager.decrement_in_limit(limit_set, node_path)
-            the_parent = the_parent.parent
+        self.in_limit_manager.decrement_in_limit(limit_set, self.node_path)
 
     # Repeat ---------------------------------------------------------
 
     def add_repeat(self, r: RepeatBase) -> RepeatBase:
         self.repeat = Repeat(r)
+        self.increase_structure_version()
         return r
 
     # Time Attribute -----------------------------------------------------------
@@ -1073,6 +1490,9 @@ class Node(ABC):
         """
         time_attr = TimeAttribute(time)
         self.times.append(time_attr)
+        bunch = self.get_bunch()
+        if bunch is not None:
+            bunch.time_nodes[self] = None
         return time_attr
 
     def resolve_time_dependencies(self) -> bool:
@@ -1101,13 +1521,28 @@ class Node(ABC):
         """
         When Flow's calendar is changed, call this method to update time attributes.
 
+        Parameters
+        ----------
+        calendar
+            The calendar of a Flow.
+        """
+        self.update_time_attributes(calendar)
+
+    def update_time_attributes(self, calendar: Calendar):
+        """
+        Update time attributes of this node only, mark the node dirty if some of them becomes free.
+
         Parameters
         ----------
         calendar
             The calendar of a Flow.
         """
         for time_attr in self.times:
+            if time_attr.free:
+                continue
             time_attr.calendar_changed(calendar)
+            if time_attr.free:
+                self.mark_dirty()
 
     # Node Operations ------------------------------------------------
 
@@ -1143,6 +1578,10 @@ class Node(ABC):
         if self.trigger_expression is not None:
             self.trigger_expression.reset()
 
+        self.mark_dirty()
+        self.mark_all_dependents_dirty()
+        self.mark_changed()
+
     def suspend(self):
         """
         Suspend the node.
@@ -1150,12 +1589,15 @@ class Node(ABC):
         Suspended nodes does not run automatically, see ``Node.resolve_dependencies`` method.
         """
         self.state.suspended = True
+        self.mark_changed()
 
     def resume(self):
         """
         Resume the node.
         """
         self.state.suspended = False
+        self.mark_dirty()
+        self.mark_changed()
 
     def free_dependencies(self, dep_type: Optional[Literal["all", "time", "trigger"]] = None):
         """
@@ -1194,4 +1636,45 @@ class Node(ABC):
         if free_trigger:
             self.trigger_expression.set_free()
 
+        self.mark_dirty()
         return
+
+
+class NodeClassRegistry:
+    """
+    Node classes used in deserialization, keyed by module and class name in ``class_type`` of ``Node.to_dict``.
+
+    Each class is imported once when first found, instead of importing it again for every node.
+
+    Attributes
+    ----------
+    classes
+        (module name, class name) => node class
+    """
+    def __init__(self):
+        self.classes: Dict[Tuple[str, str], Type[Node]] = dict()
+
+    def register(self, node_class: Type[Node]):
+        self.classes[(node_class.__module__, node_class.__name__)] = node_class
+
+    def find(self, module_name: str, class_name: str) -> Type[Node]:
+        """
+        Find node class by module name and class name.
+
+        Raises
+        ------
+        ImportError
+            If module is not found.
+        AttributeError
+            If class is not found in module.
+        """
+        key = (module_name, class_name)
+        node_class = self.classes.get(key, None)
+        if node_class is None:
+            module = importlib.import_module(module_name)
+            node_class = getattr(module, class_name)
+            self.classes[key] = node_class
+        return node_class
+
+
+node_class_registry = NodeClassRegistry()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
 from typing import Union
 
 from .node import Node, compute_most_significant_status
@@ -18,6 +19,9 @@ class NodeContainer(Node):
         if len(self.children) == 0:
             return self.state.node_status
 
+        if immediate:
+            return self.most_significant_child_status()
+
         c_state = compute_most_significant_status(self.children, immediate)
         return c_state
 
@@ -34,12 +38,44 @@ class NodeContainer(Node):
     def sink_status_change(self, node_status: NodeStatus):
         """
         Apply the node_status change to all its descendants with side effects.
+
+        Limits of descendant tasks are updated, and status change swims up from this node once
+        in a propagation transaction. Repeats of descendants are not incremented.
         """
         # if self.state.node_status == node_status:
         #     return
 
-        self.sink_status_change_only(node_status)
-        self.handle_status_change()
+        bunch = self.get_bunch()
+        with nullcontext() if bunch is None else bunch.status_propagation.batch():
+            self.sink_status_change_only(node_status)
+            self.update_descendant_limits()
+            if self.is_resolvable_status(node_status):
+                self.mark_dirty()
+            self.handle_status_change()
+
+    def update_descendant_limits(self):
+        """
+        Update limits of all descendant tasks according to their status.
+
+        Only tasks with ``InLimit`` in themselves or their ancestors are updated.
+        """
+        has_in_limit = False
+        node = self
+        while node is not None:
+            if len(node.in_limit_manager.in_limit_list) > 0:
+                has_in_limit = True
+                break
+            node = node.parent
+
+        nodes = [(child, has_in_limit) for child in self.children]
+        while len(nodes) > 0:
+            node, has_in_limit = nodes.pop()
+            has_in_limit = has_in_limit or len(node.in_limit_manager.in_limit_list) > 0
+            if isinstance(node, Task):
+                if has_in_limit:
+                    node.update_limits()
+            else:
+                nodes.extend((child, has_in_limit) for child in node.children)
 
     def handle_status_change(self):
         self.swim_status_change()
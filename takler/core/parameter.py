@@ -23,6 +23,10 @@ TAKLER_TRY_NO = "TAKLER_TRY_NO"
 
 TAKLER_TRIES = "TAKLER_TRIES"
 
+# Limit allocation, see ``AllocationPolicy``
+TAKLER_PRIORITY = "TAKLER_PRIORITY"
+TAKLER_SHARE = "TAKLER_SHARE"
+
 
 class Parameter(object):
     def __init__(self, name: str, value: Optional[Union[str, int, float, bool]] = None):
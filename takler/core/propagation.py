@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import heapq
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, List, Tuple, Iterator
+
+if TYPE_CHECKING:
+    from .node import Node
+
+
+class StatusPropagation:
+    """
+    Propagation transaction of status changes in a :py:class:`~takler.core.bunch.Bunch`.
+
+    Outside a transaction, a status change swims up the tree immediately, see ``Node.swim_status_change``.
+    Inside a transaction (``with bunch.status_propagation.batch():``), swimming is deferred:
+    nodes whose status should be recomputed are recorded, and when the outermost batch exits,
+    each recorded node and its ancestors are recomputed exactly once in bottom-up order.
+    So many status changes under the same family only recompute the family and its ancestors once.
+
+    Repeat increments happen when a node is recomputed, same as swimming immediately.
+    Limits are updated by tasks immediately, they do not depend on status of ancestors.
+
+    Attributes
+    ----------
+    depth
+        nesting depth of ``batch``.
+    pending_nodes
+        recorded nodes to be recomputed, and their depth in the tree.
+    """
+    def __init__(self):
+        self.depth: int = 0
+        self.pending_nodes: Dict["Node", int] = dict()
+        self.heap: List[Tuple[int, int, "Node"]] = list()
+        self.sequence: int = 0
+
+    @property
+    def is_active(self) -> bool:
+        """
+        bool: whether swimming should be recorded instead of running immediately.
+        """
+        return self.depth > 0
+
+    @contextmanager
+    def batch(self) -> Iterator["StatusPropagation"]:
+        """
+        Run a propagation transaction, commit when the outermost batch exits.
+        """
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            if self.depth == 1:
+                # keep depth while committing, so swims during commit are recorded too.
+                try:
+                    self.commit()
+                finally:
+                    self.depth -= 1
+            else:
+                self.depth -= 1
+
+    def record(self, node: "Node"):
+        """
+        Record a node whose status should be recomputed from its children.
+        """
+        if len(node.children) == 0 and node.repeat is None and node.parent is not None:
+            # status of a leaf node without repeat is not computed from anything, start from its parent.
+            node = node.parent
+        pending_nodes = self.pending_nodes
+        if node in pending_nodes:
+            return
+        parent = node.parent
+        if parent is None:
+            depth = 0
+        elif parent in pending_nodes:
+            depth = pending_nodes[parent] + 1
+        else:
+            depth = 1
+            parent = parent.parent
+            while parent is not None:
+                depth += 1
+                parent = parent.parent
+        pending_nodes[node] = depth
+        # deepest first, then in record order.
+        self.sequence += 1
+        heapq.heappush(self.heap, (-depth, self.sequence, node))
+
+    def commit(self) -> int:
+        """
+        Recompute recorded nodes and their ancestors, deepest first.
+
+        Returns
+        -------
+        int
+            number of recomputed nodes.
+        """
+        count = 0
+        while len(self.heap) > 0:
+            _, _, node = heapq.heappop(self.heap)
+            del self.pending_nodes[node]
+            node.update_computed_status()
+            count += 1
+            if node.parent is not None:
+                self.record(node.parent)
+        self.sequence = 0
+        return count
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: takler/core/protocol/compact_flow.proto
+# Protobuf Python Version: 5.27.2
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    27,
+    2,
+    '',
+    'takler/core/protocol/compact_flow.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\'takler/core/protocol/compact_flow.proto\x12\x0etakler_compact\")\n\tClassType\x12\x0e\n\x06module\x18\x01 \x01(\r\x12\x0c\n\x04name\x18\x02 \x01(\r\"\xb1\x02\n\x0b\x43ompactFlow\x12\x0f\n\x07version\x18\x01 \x01(\r\x12\x0f\n\x07strings\x18\x02 \x03(\t\x12.\n\x0b\x63lass_types\x18\x03 \x03(\x0b\x32\x19.takler_compact.ClassType\x12\x11\n\ttemplates\x18\x04 \x03(\t\x12\x17\n\x0fnode_class_type\x18\x05 \x03(\r\x12\x11\n\tnode_name\x18\x06 \x03(\r\x12\x13\n\x0bnode_status\x18\x07 \x03(\x05\x12\x16\n\x0enode_suspended\x18\x08 \x03(\x08\x12\x14\n\x0cnode_trigger\x18\t \x03(\r\x12\x1d\n\x15node_complete_trigger\x18\n \x03(\r\x12\x15\n\rnode_template\x18\x0b \x03(\r\x12\x18\n\x10node_child_count\x18\x0c \x03(\rb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'takler.core.protocol.compact_flow_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_CLASSTYPE']._serialized_start=59
+  _globals['_CLASSTYPE']._serialized_end=100
+  _globals['_COMPACTFLOW']._serialized_start=103
+  _globals['_COMPACTFLOW']._serialized_end=408
+# @@protoc_insertion_point(module_scope)
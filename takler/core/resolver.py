@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Iterator, Iterable, Generator, Tuple
+
+if TYPE_CHECKING:
+    from .node import Node
+    from .bunch import Bunch
+    from .limit import Limit
+    from .state import NodeStatus
+
+
+class IncrementalResolver:
+    """
+    Incremental dependency resolver for a :py:class:`~takler.core.bunch.Bunch`.
+
+    Instead of walking the whole bunch on every scheduler loop, nodes whose dependencies may have changed
+    are marked as dirty, and only dirty nodes (with their subtrees) are resolved.
+
+    A node becomes dirty when:
+
+    * an operation changes its own state (requeue, resume, free dependencies, force status...).
+    * a node or a variable referenced by its trigger or complete trigger is changed.
+    * one of its time attributes becomes free when calendar is updated.
+    * a ``Limit`` is released while the node is waiting for tokens.
+
+    During a pass, dependents of a node whose status is changed are marked when the pass ends,
+    and only if the status is different from the one before the pass. A status which is changed and set back
+    in one pass, such as a family completed by its complete trigger while its children are still active,
+    does not make its dependents dirty again and again. Dependents checked in the pass after the last change
+    have seen the new status, and are not marked either.
+
+    Nodes blocked by a ``Limit`` wait in ``Limit.waiting_nodes``. When tokens are released,
+    only waiting nodes fitting in free tokens are woken at the beginning of next pass.
+    If some woken node doesn't take tokens (for example, it is suspended), more nodes are woken in the pass after.
+
+    Attributes
+    ----------
+    bunch
+        the bunch to be resolved.
+    dirty_nodes
+        nodes to be resolved in next pass, keep insertion order.
+    released_limits
+        limits with released tokens and waiting nodes, keyed by id because equal limits may be different objects.
+    status_changes
+        nodes whose status is changed in current pass, with their status before the pass and the step of the last change.
+    checked_steps
+        nodes checked in current pass, with the step when they are checked.
+    step
+        number of node checks in current pass.
+    in_pass
+        whether a pass is running, see ``iter_resolve``.
+    """
+    def __init__(self, bunch: "Bunch"):
+        self.bunch: "Bunch" = bunch
+        self.dirty_nodes: Dict["Node", None] = dict()
+        self.released_limits: Dict[int, "Limit"] = dict()
+        self.status_changes: Dict["Node", Tuple["NodeStatus", int]] = dict()
+        self.checked_steps: Dict["Node", int] = dict()
+        self.step: int = 0
+        self.in_pass: bool = False
+
+    # Mark ----------------------------------------------------
+
+    def mark_dirty(self, node: "Node"):
+        """
+        Mark a node to be resolved in next pass.
+        """
+        self.dirty_nodes[node] = None
+
+    def mark_dependents_dirty(self, reference_node: "Node"):
+        """
+        Mark all nodes depending on status of ``reference_node`` as dirty.
+        """
+        dependents = self.bunch.dependency_index.status_dependents.get(reference_node, None)
+        if dependents is None:
+            return
+        for node in dependents.values():
+            self.dirty_nodes[node] = None
+
+    def mark_status_changed(self, node: "Node", old_status: "NodeStatus"):
+        """
+        Status of ``node`` is changed from ``old_status``, mark its dependents as dirty.
+
+        In a pass, dependents are marked when the pass ends, see ``commit_status_changes``.
+        """
+        if not self.in_pass:
+            self.mark_dependents_dirty(node)
+            return
+        change = self.status_changes.get(node, None)
+        if change is not None:
+            old_status = change[0]
+        self.status_changes[node] = (old_status, self.step)
+
+    def commit_status_changes(self):
+        """
+        Mark dependents of nodes whose status is different from the one before current pass,
+        except dependents checked after the last change.
+        """
+        status_changes = self.status_changes
+        checked_steps = self.checked_steps
+        self.status_changes = dict()
+        self.checked_steps = dict()
+        self.step = 0
+        status_dependents = self.bunch.dependency_index.status_dependents
+        for node, (old_status, step) in status_changes.items():
+            if node.state.node_status == old_status:
+                continue
+            dependents = status_dependents.get(node, None)
+            if dependents is None:
+                continue
+            for dependent in dependents.values():
+                if checked_steps.get(dependent, -1) < step:
+                    self.dirty_nodes[dependent] = None
+
+    def mark_variable_dependents_dirty(self, reference_node: "Node", variable_name: str):
+        """
+        Mark all nodes depending on some variable of ``reference_node`` as dirty.
+        """
+        for node in self.bunch.dependency_index.find_variable_dependents(reference_node, variable_name):
+            self.dirty_nodes[node] = None
+
+    def mark_all_dependents_dirty(self, reference_node: "Node"):
+        """
+        Mark all nodes depending on status or any variable of ``reference_node`` as dirty.
+        """
+        for node in self.bunch.dependency_index.find_all_dependents(reference_node):
+            self.dirty_nodes[node] = None
+
+    def mark_limit_released(self, limits: Iterable["Limit"]):
+        """
+        Some tokens of ``limits`` are released, nodes waiting for them will be woken in next pass.
+        """
+        for limit in limits:
+            if len(limit.waiting_nodes) > 0:
+                self.released_limits[id(limit)] = limit
+
+    def wake_limit_waiting_nodes(self):
+        """
+        Mark waiting nodes fitting in free tokens of released limits as dirty.
+
+        A limit is kept for the next pass if some nodes are woken and others are still waiting,
+        to check whether woken nodes have taken the tokens.
+        """
+        released_limits = self.released_limits
+        self.released_limits = dict()
+        for key, limit in released_limits.items():
+            nodes = limit.pop_waiting_nodes()
+            if len(nodes) == 0:
+                continue
+            self.dirty_nodes.update(dict.fromkeys(nodes))
+            if len(limit.waiting_nodes) > 0:
+                self.released_limits[key] = limit
+
+    def has_dirty_nodes(self) -> bool:
+        return len(self.dirty_nodes) > 0 or len(self.released_limits) > 0
+
+    def has_released_limits(self) -> bool:
+        return len(self.released_limits) > 0
+
+    # Resolve -------------------------------------------------
+
+    def resolve(self) -> int:
+        """
+        Resolve all dirty nodes once.
+
+        Nodes marked during this pass (for example, task submission changes node status)
+        are kept for the next pass.
+
+        Returns
+        -------
+        int
+            number of resolved nodes, not including descendants of resolved containers.
+        """
+        steps = self.iter_resolve()
+        try:
+            while True:
+                next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+    def iter_resolve(self) -> Generator["Node", None, int]:
+        """
+        Resolve all dirty nodes once as ``resolve`` does, step by step.
+
+        Yield each node after it is checked, including descendants of dirty containers,
+        so caller can pause the pass between nodes, such as yielding to event loop for a large tree.
+        Other operations may change the bunch while paused, and nodes of flows removed from the bunch are skipped.
+
+        Returns
+        -------
+        int
+            number of resolved nodes, not including descendants of resolved containers.
+        """
+        if len(self.released_limits) > 0:
+            self.wake_limit_waiting_nodes()
+
+        if len(self.dirty_nodes) == 0:
+            return 0
+
+        dirty_nodes = self.dirty_nodes
+        self.dirty_nodes = dict()
+
+        count = 0
+        self.in_pass = True
+        try:
+            for node in dirty_nodes:
+                ancestors = self.get_ancestors(node)
+
+                # ancestor will resolve the whole subtree.
+                if any(a in dirty_nodes for a in ancestors):
+                    continue
+
+                if not self.is_in_bunch(node, ancestors):
+                    continue
+
+                count += 1
+                if not self.check_ancestors(ancestors):
+                    continue
+                yield from self.iter_resolve_tree(node)
+        finally:
+            self.in_pass = False
+            self.commit_status_changes()
+
+        return count
+
+    @classmethod
+    def check_ancestors(cls, ancestors: List["Node"]) -> bool:
+        """
+        Check ancestors' dependencies from top to bottom, without side effects. See ``Node.evaluate_dependencies``.
+
+        An ancestor is not completed here even if its complete trigger is satisfied.
+        It depends on the nodes in its complete trigger, and is completed when it is resolved itself.
+        """
+        for ancestor in reversed(ancestors):
+            if not ancestor.evaluate_dependencies():
+                return False
+        return True
+
+    def iter_resolve_tree(self, root: "Node") -> Iterator["Node"]:
+        """
+        Resolve dependencies of a node tree as ``Node.resolve_dependencies`` does, and yield each checked node.
+
+        Nodes are checked in pre-order. Children of a container are checked only if the container's dependencies
+        are satisfied. If the flow of ``root`` is removed from the bunch while paused, the rest nodes are skipped.
+        """
+        flow = root.get_root()
+        flows = self.bunch.flows
+        in_pass = self.in_pass
+        checked_steps = self.checked_steps
+        stack = [root]
+        while len(stack) > 0:
+            node = stack.pop()
+            if len(node.children) > 0:
+                if node.check_dependencies():
+                    stack.extend(reversed(node.children))
+            else:
+                node.resolve_dependencies()
+            if in_pass:
+                checked_steps[node] = self.step
+                self.step += 1
+
+            yield node
+
+            if flows.get(flow.name, None) is not flow:
+                return
+
+    def is_in_bunch(self, node: "Node", ancestors: List["Node"]) -> bool:
+        if len(ancestors) == 0:
+            root = node
+        else:
+            root = ancestors[-1]
+        return self.bunch.flows.get(root.name, None) is root
+
+    @classmethod
+    def get_ancestors(cls, node: "Node") -> List["Node"]:
+        ancestors = []
+        parent: Optional["Node"] = node.parent
+        while parent is not None:
+            ancestors.append(parent)
+            parent = parent.parent
+        return ancestors
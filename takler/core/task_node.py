@@ -1,8 +1,8 @@
 import functools
 import asyncio
-from typing import Optional, Dict, Set
+from typing import Optional, Dict, Set, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from .node import Node
 from .state import NodeStatus
@@ -23,11 +23,18 @@ class Task(Node):
 
         self.try_no: int = 0
 
-        self.generated_parameters: TaskNodeGeneratedParameters = TaskNodeGeneratedParameters(node=self)
+        # 生成参数，首次使用时创建
+        self._generated_parameters: Optional[TaskNodeGeneratedParameters] = None
 
     def __repr__(self):
         return f"Task {self.name}"
 
+    @property
+    def generated_parameters(self) -> "TaskNodeGeneratedParameters":
+        if self._generated_parameters is None:
+            self._generated_parameters = TaskNodeGeneratedParameters(node=self)
+        return self._generated_parameters
+
     # Serialization ----------------------------------------------
 
     def to_dict(self) -> Dict:
@@ -53,6 +60,12 @@ class Task(Node):
 
         return node
 
+    def checkpoint_state(self) -> Optional[Tuple]:
+        return self.task_id, self.aborted_reason, self.try_no
+
+    def restore_checkpoint_state(self, state: Tuple):
+        self.task_id, self.aborted_reason, self.try_no = state
+
     # State management --------------------------------------------
 
     def computed_status(self, immediate: bool) -> NodeStatus:
@@ -93,13 +106,25 @@ class Task(Node):
             self.decrement_in_limit(limit_set)
         elif status == NodeStatus.submitted:
             self.increment_in_limit(limit_set)
+            return
         elif status == NodeStatus.active:
             # TODO: When submitted is absent, active should increment limit
-            pass
+            return
         else:
             self.decrement_in_limit(limit_set)
 
+        if len(limit_set) > 0:
+            resolver = self.get_resolver()
+            if resolver is not None:
+                resolver.mark_limit_released(limit_set)
+
     # Trigger -----------------------------------------------------
+    def is_resolvable_status(self, node_status: NodeStatus) -> bool:
+        """
+        Only queued and aborted tasks are checked in ``check_dependencies``.
+        """
+        return node_status in (NodeStatus.queued, NodeStatus.aborted)
+
     def check_dependencies(self) -> bool:
         # check node status
         node_status = self.state.node_status
@@ -119,7 +144,16 @@ class Task(Node):
         if node_status == NodeStatus.aborted:
             return False
 
-        if not self.check_in_limit_up():
+        in_limit = self.find_blocking_in_limit()
+        if in_limit is not None:
+            # wait for the first blocking limit only, other limits are checked again when woken.
+            limit = in_limit.limit
+            limit.add_waiting_node(self, in_limit)
+            if limit.in_limit(in_limit.tokens):
+                # not granted by allocation policy, tokens are allocated in next pass.
+                resolver = self.get_resolver()
+                if resolver is not None:
+                    resolver.mark_limit_released([limit])
             return False
 
         return True
@@ -181,7 +215,6 @@ class Task(Node):
         """
         self.set_node_status(node_status=NodeStatus.submitted)
         logger.info(f"run: {self.node_path} with try no {self.try_no}")
-        self.handle_status_change()
 
     def run(self):
         """
@@ -208,18 +241,15 @@ class Task(Node):
         self.task_id = task_id
         self.set_node_status(node_status=NodeStatus.active)
         logger.info(f"init: {self.node_path}")
-        self.handle_status_change()
 
     def complete(self):
         self.set_node_status(node_status=NodeStatus.complete)
         logger.info(f"complete: {self.node_path}")
-        self.handle_status_change()
 
     def abort(self, reason: str = ""):
         self.set_node_status(node_status=NodeStatus.aborted)
         self.aborted_reason = reason
         logger.info(f"abort: {self.node_path} {reason}")
-        self.handle_status_change()
 
     # Util ------------------------------------
     def increment_try_no(self):
@@ -231,10 +261,10 @@ class Task(Node):
 
 class TaskNodeGeneratedParameters(BaseModel):
     node: Task
-    task: Parameter = Parameter(TASK, None)
-    takler_name: Parameter = Parameter(TAKLER_NAME, None)
-    takler_rid: Parameter = Parameter(TAKLER_RID, None)
-    takler_try_no: Parameter = Parameter(TAKLER_TRY_NO, None)
+    task: Parameter = Field(default_factory=lambda: Parameter(TASK, None))
+    takler_name: Parameter = Field(default_factory=lambda: Parameter(TAKLER_NAME, None))
+    takler_rid: Parameter = Field(default_factory=lambda: Parameter(TAKLER_RID, None))
+    takler_try_no: Parameter = Field(default_factory=lambda: Parameter(TAKLER_TRY_NO, None))
 
     class Config:
         arbitrary_types_allowed = True
@@ -1,5 +1,5 @@
 import datetime
-from typing import Union, Dict
+from typing import Union, Dict, Optional
 
 from .calendar import Calendar
 from .util import SerializationType
@@ -73,6 +73,31 @@ class TimeAttribute:
         """
         self.free = False
 
+    def next_due_time(self, calendar: Calendar) -> Optional[datetime.datetime]:
+        """
+        Real time when the TimeAttribute will be satisfied by the next calendar update at or after it.
+
+        Flow time goes with real time, so the due time is computed from calendar's last update.
+        If flow time is already in the minute of the TimeAttribute, calendar's last update time is returned.
+
+        Parameters
+        ----------
+        calendar
+            The calendar of a Flow
+
+        Returns
+        -------
+        Optional[datetime.datetime]
+            None if the TimeAttribute is free or calendar is not begun.
+        """
+        if self.free or calendar.flow_time is None:
+            return None
+        flow_time = calendar.flow_time
+        due_time = flow_time.replace(hour=self.time.hour, minute=self.time.minute, second=0, microsecond=0)
+        if due_time + datetime.timedelta(minutes=1) <= flow_time:
+            due_time += datetime.timedelta(days=1)
+        return calendar.last_real_time + max(due_time - flow_time, datetime.timedelta())
+
     def calendar_changed(self, calendar: Calendar):
         """
         When calendar equals TimeAttribute's time, the TimeAttribute is satisfied.
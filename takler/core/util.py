@@ -1,4 +1,7 @@
-from typing import TYPE_CHECKING
+import gc
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
 from enum import Enum
 
 from takler.logging import get_logger
@@ -13,3 +16,37 @@ logger: "Logger" = get_logger("core")
 class SerializationType(Enum):
     Tree = "tree"
     Status = "status"
+
+
+# Number of active ``gc_paused`` contexts in all threads, and whether gc was enabled before the first one.
+_gc_pause_lock = threading.Lock()
+_gc_pause_count = 0
+_gc_enabled_before_pause = False
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Disable garbage collection while creating or reading many small objects.
+
+    Nodes and their parents reference each other, so a node tree is full of reference cycles.
+    But the tree is alive until the whole flow is removed, and the collector triggered again and again
+    by allocations only scans the whole growing tree without freeing anything.
+
+    gc is disabled for the whole process, and contexts may overlap in different threads, such as loading
+    flows in worker threads. gc is enabled again only when the last context exits, if it was enabled
+    before the first one.
+    """
+    global _gc_pause_count, _gc_enabled_before_pause
+    with _gc_pause_lock:
+        if _gc_pause_count == 0:
+            _gc_enabled_before_pause = gc.isenabled()
+            gc.disable()
+        _gc_pause_count += 1
+    try:
+        yield
+    finally:
+        with _gc_pause_lock:
+            _gc_pause_count -= 1
+            if _gc_pause_count == 0 and _gc_enabled_before_pause:
+                gc.enable()
@@ -0,0 +1,184 @@
+"""
+Ordered pipeline of commands which change the bunch.
+
+RPC handlers put commands into ``CommandQueue`` and wait for their results. The scheduler's main loop is
+the only consumer: it drains queued commands in batches between resolution steps and applies them
+in arrival order, then runs one resolution pass for the whole batch. So 500 ``complete`` commands
+arriving together are applied in one batch and followed by one pass, instead of one pass each.
+"""
+import asyncio
+import time
+from typing import Optional, Dict, Any, NamedTuple, List
+
+
+DEFAULT_COMMAND_BATCH_SIZE = 1000
+
+
+class QueuedCommand(NamedTuple):
+    """
+    A command waiting in ``CommandQueue``.
+
+    Attributes
+    ----------
+    command
+        command name, such as complete, which is applied by ``Scheduler.run_command_complete``.
+    arguments
+        keyword arguments of the command.
+    future
+        set to the result of the command, or the exception raised by it.
+    enqueue_time
+        ``time.perf_counter()`` when the command is queued.
+    """
+    command: str
+    arguments: Dict[str, Any]
+    future: asyncio.Future
+    enqueue_time: float
+
+
+class CommandQueueMetrics:
+    """
+    Counters of ``CommandQueue``.
+
+    Attributes
+    ----------
+    queued_count : int
+        number of commands put into the queue.
+    applied_count : int
+        number of commands taken from the queue and applied, including failed ones.
+    failed_count : int
+        number of commands which raised an exception.
+    drain_count : int
+        number of non-empty batches drained.
+    max_batch_size : int
+        max number of commands in one batch.
+    last_drain_seconds : float
+        time to apply the last batch.
+    max_drain_seconds : float
+        max time to apply one batch.
+    total_drain_seconds : float
+        time to apply all batches.
+    max_wait_seconds : float
+        max time a command waits in the queue before it is applied.
+    """
+    def __init__(self):
+        self.queued_count: int = 0
+        self.applied_count: int = 0
+        self.failed_count: int = 0
+        self.drain_count: int = 0
+        self.max_batch_size: int = 0
+        self.last_drain_seconds: float = 0.0
+        self.max_drain_seconds: float = 0.0
+        self.total_drain_seconds: float = 0.0
+        self.max_wait_seconds: float = 0.0
+
+    def record_drain(self, batch_size: int, drain_seconds: float, max_wait_seconds: float):
+        self.applied_count += batch_size
+        self.drain_count += 1
+        self.max_batch_size = max(self.max_batch_size, batch_size)
+        self.last_drain_seconds = drain_seconds
+        self.max_drain_seconds = max(self.max_drain_seconds, drain_seconds)
+        self.total_drain_seconds += drain_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, max_wait_seconds)
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(
+            queued_count=self.queued_count,
+            applied_count=self.applied_count,
+            failed_count=self.failed_count,
+            drain_count=self.drain_count,
+            max_batch_size=self.max_batch_size,
+            last_drain_seconds=self.last_drain_seconds,
+            max_drain_seconds=self.max_drain_seconds,
+            total_drain_seconds=self.total_drain_seconds,
+            max_wait_seconds=self.max_wait_seconds,
+        )
+
+
+class CommandQueue:
+    """
+    An ``asyncio.Queue`` of ``QueuedCommand`` with a wakeup event for the consumer.
+
+    Only non-blocking queue methods are used, so the queue is not bound to an event loop until ``start``.
+
+    Attributes
+    ----------
+    queue : asyncio.Queue
+        queued commands in arrival order.
+    metrics : CommandQueueMetrics
+        counters of queued and drained commands.
+    is_running : bool
+        set between ``start`` and ``stop``, when a consumer drains the queue.
+        Commands are applied directly by ``Scheduler.submit_command`` otherwise.
+    """
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.metrics: CommandQueueMetrics = CommandQueueMetrics()
+        self.is_running: bool = False
+        self.wakeup_event: Optional[asyncio.Event] = None
+
+    def start(self):
+        """
+        Called by the consumer in event loop before draining.
+        """
+        self.wakeup_event = asyncio.Event()
+        self.is_running = True
+
+    def stop(self):
+        self.is_running = False
+        self.wakeup_event = None
+
+    @property
+    def depth(self) -> int:
+        """
+        int: number of commands waiting in the queue.
+        """
+        return self.queue.qsize()
+
+    def put(self, command: str, arguments: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue a command, return a future set when the command is applied.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(QueuedCommand(command, arguments, future, time.perf_counter()))
+        self.metrics.queued_count += 1
+        self.wakeup()
+        return future
+
+    def take_batch(self, max_count: int = DEFAULT_COMMAND_BATCH_SIZE) -> List[QueuedCommand]:
+        """
+        Take at most ``max_count`` commands from the queue in arrival order.
+        """
+        batch = []
+        while len(batch) < max_count and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    def wakeup(self):
+        """
+        Wake up the consumer waiting in ``wait``.
+        """
+        if self.wakeup_event is not None:
+            self.wakeup_event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait until some command is queued, ``wakeup`` is called or ``timeout`` seconds elapsed.
+
+        Returns
+        -------
+        bool
+            True if woken up before timeout.
+        """
+        if not self.queue.empty():
+            return True
+        event = self.wakeup_event
+        if event is None:
+            await asyncio.sleep(timeout)
+            return False
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            event.clear()
@@ -0,0 +1,384 @@
+"""
+Write-ahead journal of commands which change the bunch.
+
+Commands run by ``Scheduler.run_command_*`` are appended to the journal as JSON lines::
+
+    {"sequence": 12, "command": "complete", "arguments": {"node_path": "/flow1/task1"}}
+
+Records are written into segment files ``<journal_path>.<first sequence>``. Writing is cheap,
+and records are flushed to disk in groups (group commit): only one ``fsync`` runs at a time, and all records
+appended while it is running, or within ``sync_delay`` seconds, are flushed by the next ``fsync``.
+Callers wait for ``Journal.sync`` before replying to clients, so a reply is delayed at most by ``sync_delay``
+and two ``fsync`` calls.
+
+Large arguments, such as definition of a loaded flow, are written into blob files ``<journal_path>.blob.<id>``
+in worker threads before the record is appended (``Journal.write_blob``), and the record only keeps the blob name.
+So the event loop never encodes or writes large payloads.
+
+When a checkpoint is saved, a new segment is started (``Journal.rotate``) and the last sequence number
+is saved in the checkpoint. Old segments and their blob files are deleted after the checkpoint is written
+(``Journal.compact``). When restarted, records after the sequence in the checkpoint are replayed.
+All ``fsync`` calls after the journal is opened run in ``Journal.sync_executor``, outside the event loop.
+"""
+import asyncio
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator, NamedTuple, BinaryIO, Tuple, Union
+
+from takler.logging import get_logger
+
+
+logger = get_logger("server.journal")
+
+
+DEFAULT_JOURNAL_SYNC_DELAY_SECONDS = 0.001
+
+
+class JournalRecord(NamedTuple):
+    """
+    A command in journal.
+
+    Attributes
+    ----------
+    sequence
+        increasing sequence number of the record, starting from 1.
+    command
+        command name, such as complete, which is applied by ``Scheduler.run_command_complete``.
+    arguments
+        keyword arguments of the command.
+    blob
+        name of blob file with large payload of the command, see ``Journal.write_blob``.
+    """
+    sequence: int
+    command: str
+    arguments: Dict[str, Any]
+    blob: Optional[str] = None
+
+
+def find_segments(journal_path: Union[str, Path]) -> List[Tuple[int, Path]]:
+    """
+    Find segment files of a journal, sorted by the first sequence number.
+
+    Returns
+    -------
+    List[Tuple[int, Path]]
+        (first sequence, segment path) list.
+    """
+    journal_path = Path(journal_path)
+    segments = []
+    if not journal_path.parent.exists():
+        return segments
+    prefix = journal_path.name + "."
+    for segment_path in journal_path.parent.iterdir():
+        suffix = segment_path.name[len(prefix):]
+        if segment_path.name.startswith(prefix) and suffix.isdigit():
+            segments.append((int(suffix), segment_path))
+    segments.sort()
+    return segments
+
+
+def read_segment(segment_path: Path) -> Iterator[JournalRecord]:
+    """
+    Read records in a segment file.
+
+    The last line may be broken if the server is killed while writing. Reading stops at the first broken line.
+    """
+    with open(segment_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                logger.warning(f"ignore incomplete journal record in {segment_path}")
+                return
+            try:
+                record = json.loads(line)
+                yield JournalRecord(record["sequence"], record["command"], record["arguments"], record.get("blob", None))
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"ignore broken journal record in {segment_path}")
+                return
+
+
+def get_blob_path(journal_path: Union[str, Path], blob: str) -> Path:
+    journal_path = Path(journal_path)
+    return journal_path.with_name(f"{journal_path.name}.blob.{blob}")
+
+
+def read_blob(journal_path: Union[str, Path], blob: str) -> bytes:
+    """
+    Read payload in a blob file of a journal record.
+    """
+    with open(get_blob_path(journal_path, blob), "rb") as f:
+        return f.read()
+
+
+def sync_directory(directory: Path):
+    """
+    Flush directory entries of new files.
+    """
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def delete_segments(segment_paths: List[Path], journal_path: Path):
+    """
+    Delete segment files and blob files referenced by their records.
+    """
+    for segment_path in segment_paths:
+        for record in read_segment(segment_path):
+            if record.blob is not None:
+                get_blob_path(journal_path, record.blob).unlink(missing_ok=True)
+        segment_path.unlink(missing_ok=True)
+
+
+def read_journal(journal_path: Union[str, Path], after_sequence: int = 0) -> Iterator[JournalRecord]:
+    """
+    Read records after ``after_sequence`` from all segments of a journal in order.
+    """
+    for _, segment_path in find_segments(journal_path):
+        for record in read_segment(segment_path):
+            if record.sequence > after_sequence:
+                yield record
+
+
+class Journal:
+    """
+    Append-only journal with group ``fsync``.
+
+    Attributes
+    ----------
+    journal_path
+        path prefix of segment files.
+    sync_delay
+        seconds to wait for more records before ``fsync`` is started, bounding the extra latency of commands.
+    sequence
+        sequence number of the last appended record.
+    synced_sequence
+        sequence number of the last record on disk.
+    sync_executor
+        a dedicated thread for ``fsync`` and deleting segments, so syncing is not queued behind jobs
+        in the scheduler's worker pool.
+    """
+    def __init__(self, journal_path: Union[str, Path], sync_delay: float = DEFAULT_JOURNAL_SYNC_DELAY_SECONDS):
+        self.journal_path: Path = Path(journal_path)
+        self.sync_delay: float = sync_delay
+        self.sequence: int = 0
+        self.synced_sequence: int = 0
+
+        self.segment_file: Optional[BinaryIO] = None
+        # (segment file, last sequence) of segments before the current one.
+        self.retired_segments: List[Tuple[BinaryIO, int]] = []
+        # whether directory entry of current segment file is flushed.
+        self.directory_synced: bool = True
+
+        self.sync_future: Optional[asyncio.Future] = None
+        self.sync_lock: asyncio.Lock = asyncio.Lock()
+        self.sync_executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.segment_file is not None
+
+    def open(self, sequence: int = 0):
+        """
+        Start a new segment after existing records.
+
+        Parameters
+        ----------
+        sequence
+            sequence number of the last record which is already applied, such as the last replayed record.
+        """
+        self.sequence = sequence
+        self.synced_sequence = sequence
+        if self.sync_executor is None:
+            self.sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="takler-journal")
+        self.open_segment()
+        sync_directory(self.journal_path.parent)
+        self.directory_synced = True
+
+    def close(self):
+        """
+        Flush all records to disk and close segment files.
+        """
+        if self.segment_file is None:
+            return
+        self.sync_segments(self.get_unsynced_segments())
+        self.synced_sequence = self.sequence
+        self.segment_file.close()
+        self.segment_file = None
+        for segment_file, _ in self.retired_segments:
+            segment_file.close()
+        self.retired_segments = []
+        if self.sync_executor is not None:
+            self.sync_executor.shutdown()
+            self.sync_executor = None
+
+    def open_segment(self):
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        segment_path = self.journal_path.with_name(f"{self.journal_path.name}.{self.sequence + 1:012d}")
+        # Unbuffered, so each record is written with one system call, and fsync in worker thread
+        # doesn't need to flush a buffer shared with the event loop.
+        self.segment_file = open(segment_path, "ab", buffering=0)
+        # directory entry is flushed with records by next sync.
+        self.directory_synced = False
+
+    def get_unsynced_segments(self) -> List[BinaryIO]:
+        """
+        Get segment files which may have records not on disk: retired segments not synced yet and current segment.
+        """
+        segment_files = [f for f, last_sequence in self.retired_segments if last_sequence > self.synced_sequence]
+        if self.segment_file is not None:
+            segment_files.append(self.segment_file)
+        return segment_files
+
+    def sync_segments(self, segment_files: List[BinaryIO]):
+        """
+        Flush segment files and directory entry of new segment file. Runs in ``sync_executor`` except open and close.
+        """
+        if not self.directory_synced:
+            sync_directory(self.journal_path.parent)
+            self.directory_synced = True
+        for segment_file in segment_files:
+            os.fsync(segment_file.fileno())
+
+    # Write ------------------------------------------------------
+
+    def write_blob(self, data: bytes) -> str:
+        """
+        Write large payload of a command into a new blob file and flush it to disk.
+        Runs in a worker thread before the record is appended by ``append``.
+
+        Returns
+        -------
+        str
+            blob name, which is saved in the journal record.
+        """
+        blob = uuid.uuid4().hex
+        blob_path = get_blob_path(self.journal_path, blob)
+        with open(blob_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        sync_directory(blob_path.parent)
+        return blob
+
+    def delete_blob(self, blob: str):
+        """
+        Delete a blob file whose record is not appended, such as when the command fails.
+        """
+        get_blob_path(self.journal_path, blob).unlink(missing_ok=True)
+
+    def append(self, command: str, arguments: Dict[str, Any], blob: Optional[str] = None) -> int:
+        """
+        Append a record into current segment. The record is not on disk until ``sync`` is done.
+
+        Parameters
+        ----------
+        command
+            command name.
+        arguments
+            keyword arguments of the command, should be small.
+        blob
+            name of blob file written by ``write_blob``.
+
+        Returns
+        -------
+        int
+            sequence number of the record.
+        """
+        if self.segment_file is None:
+            raise RuntimeError("journal is not opened.")
+        self.sequence += 1
+        record = dict(sequence=self.sequence, command=command, arguments=arguments)
+        if blob is not None:
+            record["blob"] = blob
+        line = json.dumps(record, separators=(",", ":"))
+        self.segment_file.write(line.encode("utf-8") + b"\n")
+        return self.sequence
+
+    async def sync(self):
+        """
+        Wait until all appended records are on disk.
+
+        Records appended by concurrent commands are flushed by one ``fsync``, see module docs.
+        """
+        if self.synced_sequence >= self.sequence or self.segment_file is None:
+            return
+        if self.sync_future is None:
+            loop = asyncio.get_running_loop()
+            self.sync_future = loop.create_future()
+            loop.create_task(self.run_sync(self.sync_future), name="takler.server.journal.sync")
+        await asyncio.shield(self.sync_future)
+
+    async def run_sync(self, future: asyncio.Future):
+        await asyncio.sleep(self.sync_delay)
+        try:
+            # wait for the running fsync. Records appended meanwhile are flushed together.
+            async with self.sync_lock:
+                self.sync_future = None
+                sequence = self.sequence
+                if self.segment_file is not None:
+                    # including retired segments with records appended before ``rotate``.
+                    segment_files = self.get_unsynced_segments()
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(self.sync_executor, self.sync_segments, segment_files)
+        except Exception as e:
+            logger.error(f"journal sync failed: {e}")
+            future.set_exception(e)
+            return
+        self.synced_sequence = max(self.synced_sequence, sequence)
+        future.set_result(sequence)
+
+    # Compaction ------------------------------------------------------
+
+    def rotate(self) -> int:
+        """
+        Start a new segment. Called together with encoding a checkpoint, without awaiting between them.
+
+        The old segment is not flushed here. Next ``sync`` flushes it together with the new segment.
+
+        Returns
+        -------
+        int
+            sequence number of the last record before the new segment, which is covered by the checkpoint.
+        """
+        if self.segment_file is None:
+            return self.sequence
+        self.retired_segments.append((self.segment_file, self.sequence))
+        self.open_segment()
+        return self.sequence
+
+    async def compact(self, sequence: int):
+        """
+        Delete segments whose records are all covered by a checkpoint saved on disk, and their blob files.
+
+        Parameters
+        ----------
+        sequence
+            sequence number returned by ``rotate`` when the checkpoint is encoded.
+        """
+        # wait for fsync of retired segments.
+        async with self.sync_lock:
+            retired_segments = []
+            for segment_file, last_sequence in self.retired_segments:
+                if last_sequence > sequence:
+                    retired_segments.append((segment_file, last_sequence))
+                else:
+                    segment_file.close()
+            self.retired_segments = retired_segments
+
+        # A segment is covered if the next segment starts before or just after sequence,
+        # including segments left by previous runs of server.
+        segments = find_segments(self.journal_path)
+        covered_paths = [
+            segment_path for index, (_, segment_path) in enumerate(segments[:-1])
+            if segments[index + 1][0] <= sequence + 1
+        ]
+        if len(covered_paths) > 0:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.sync_executor, delete_segments, covered_paths, self.journal_path)
@@ -1,15 +1,59 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set
 import asyncio
 
 import grpc
 
+from takler.core import NodeStatus
+from takler.core.node import Node
 from takler.server.protocol import takler_pb2, takler_pb2_grpc
 from takler.logging import get_logger
-from takler.server.scheduler import Scheduler
+from takler.server.scheduler import Scheduler, ChildAction
+from takler.server.subscription import SubscriptionHub
 
 
 logger = get_logger("server.service")
 
+DEFAULT_QUERY_PAGE_SIZE = 1000
+MAX_QUERY_PAGE_SIZE = 10000
+QUERY_ATTRIBUTES = ("event", "meter", "limit", "repeat", "parameter", "trigger")
+
+
+def create_node_record(node: Node, attributes: Set[str]) -> takler_pb2.NodeRecord:
+    """
+    Create ``NodeRecord`` message for a node with selected attributes. See ``QUERY_ATTRIBUTES``.
+    """
+    values = []
+    if "event" in attributes:
+        for event in node.events:
+            values.append(takler_pb2.AttributeValue(
+                kind="event", name=event.name, value="set" if event.value else "unset"))
+    if "meter" in attributes:
+        for meter in node.meters:
+            values.append(takler_pb2.AttributeValue(kind="meter", name=meter.name, value=str(meter.value)))
+    if "limit" in attributes:
+        for limit in node.limits:
+            values.append(takler_pb2.AttributeValue(kind="limit", name=limit.name, value=str(limit.value)))
+    if "repeat" in attributes and node.repeat is not None:
+        values.append(takler_pb2.AttributeValue(
+            kind="repeat", name=node.repeat.r.name, value=str(node.repeat.value())))
+    if "parameter" in attributes:
+        for name, param in node.user_parameters.items():
+            values.append(takler_pb2.AttributeValue(kind="parameter", name=name, value=str(param.value)))
+    if "trigger" in attributes:
+        if node.trigger_expression is not None:
+            values.append(takler_pb2.AttributeValue(
+                kind="trigger", name="trigger", value=node.trigger_expression.expression_str))
+        if node.complete_trigger_expression is not None:
+            values.append(takler_pb2.AttributeValue(
+                kind="trigger", name="complete", value=node.complete_trigger_expression.expression_str))
+
+    return takler_pb2.NodeRecord(
+        node_path=node.node_path,
+        status=node.state.node_status.name,
+        suspended=node.state.suspended,
+        attributes=values,
+    )
+
 
 class TaklerService(takler_pb2_grpc.TaklerServerServicer):
     """
@@ -23,6 +67,8 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         Service host
     port : int
         Service port
+    subscription_hub : SubscriptionHub
+        Publish status changes to ``Subscribe`` clients.
     """
     def __init__(self, scheduler: Scheduler, host: str = None, port: int = None):
         self.scheduler: Scheduler = scheduler
@@ -33,6 +79,7 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         self.host: str = host
         self.port: int = port
         self.grpc_server: Optional[grpc.aio.Server] = None
+        self.subscription_hub: SubscriptionHub = SubscriptionHub(scheduler.bunch)
 
     @property
     def listen_address(self) -> str:
@@ -45,6 +92,7 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         """
         Start gRPC server.
         """
+        self.subscription_hub.start()
         self.grpc_server = grpc.aio.server()
         takler_pb2_grpc.add_TaklerServerServicer_to_server(self, self.grpc_server)
         self.grpc_server.add_insecure_port(self.listen_address)
@@ -63,6 +111,7 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         """
         logger.info("service shutting down..")
         await self.grpc_server.stop(5)
+        self.subscription_hub.stop()
         logger.info("service shutting down..done")
 
     # Child command -----------------------------------------------------
@@ -72,7 +121,8 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         task_id = request.task_id
 
         logger.info(f"Init: {node_path} with {task_id}")
-        await self.scheduler.run_command_init(node_path, task_id)
+        await self.scheduler.submit_command("init", node_path=node_path, task_id=task_id)
+        await self.scheduler.sync_journal()
         return takler_pb2.ServiceResponse(
             flag=0,
             message="",
@@ -81,7 +131,8 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
     async def RunCommandComplete(self, request, context):
         node_path = request.child_options.node_path
         logger.info(f"Complete: {node_path}")
-        self.scheduler.run_command_complete(node_path)
+        await self.scheduler.submit_command("complete", node_path=node_path)
+        await self.scheduler.sync_journal()
 
         return takler_pb2.ServiceResponse(
             flag=0,
@@ -92,7 +143,8 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         node_path = request.child_options.node_path
         reason = request.reason
         logger.info(f"Abort: {node_path}")
-        self.scheduler.run_command_abort(node_path, reason=reason)
+        await self.scheduler.submit_command("abort", node_path=node_path, reason=reason)
+        await self.scheduler.sync_journal()
 
         return takler_pb2.ServiceResponse(
             flag=0,
@@ -103,7 +155,8 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         node_path = request.child_options.node_path
         event_name = request.event_name
         logger.info(f"Event set: {node_path}:{event_name}")
-        self.scheduler.run_command_event(node_path, event_name)
+        await self.scheduler.submit_command("event", node_path=node_path, event_name=event_name)
+        await self.scheduler.sync_journal()
 
         return takler_pb2.ServiceResponse(
             flag=0,
@@ -115,8 +168,45 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         meter = request.meter_name
         value = request.meter_value
         logger.info(f"Meter set: {node_path}:{meter} {value}")
-        self.scheduler.run_command_meter(node_path, meter, value)
+        await self.scheduler.submit_command("meter", node_path=node_path, meter_name=meter, meter_value=value)
+        await self.scheduler.sync_journal()
+
+        return takler_pb2.ServiceResponse(
+            flag=0,
+            message="",
+        )
 
+    async def RunCommandBatch(self, request: takler_pb2.BatchCommand, context):
+        actions = []
+        for item in request.actions:
+            action_type = item.WhichOneof("action")
+            if action_type is None:
+                continue
+            command = getattr(item, action_type)
+            node_path = command.child_options.node_path
+            if action_type == "init":
+                arguments = dict(task_id=command.task_id)
+            elif action_type == "abort":
+                arguments = dict(reason=command.reason)
+            elif action_type == "event":
+                arguments = dict(event_name=command.event_name)
+            elif action_type == "meter":
+                arguments = dict(meter_name=command.meter_name, meter_value=command.meter_value)
+            else:
+                arguments = dict()
+            actions.append(ChildAction(command=action_type, node_path=node_path, arguments=arguments))
+
+        logger.info(f"Batch: {len(actions)} actions")
+        try:
+            await self.scheduler.submit_command("batch", actions=actions)
+        except ValueError as e:
+            logger.warning(f"Batch is rejected: {e}")
+            return takler_pb2.ServiceResponse(
+                flag=1,
+                message=str(e),
+            )
+
+        await self.scheduler.sync_journal()
         return takler_pb2.ServiceResponse(
             flag=0,
             message="",
@@ -128,7 +218,8 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         node_path_list = request.node_path
         for node_path in node_path_list:
             logger.info(f"Requeue: {node_path}")
-            self.scheduler.run_command_requeue(node_path)
+            await self.scheduler.submit_command("requeue", node_path=node_path)
+        await self.scheduler.sync_journal()
 
         return takler_pb2.ServiceResponse(
             flag=0,
@@ -139,7 +230,8 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         node_paths = request.node_path
         for node_path in node_paths:
             logger.info(f"Suspend: {node_path}")
-            self.scheduler.run_command_suspend(node_path)
+            await self.scheduler.submit_command("suspend", node_path=node_path)
+        await self.scheduler.sync_journal()
 
         return takler_pb2.ServiceResponse(
             flag=0,
@@ -150,7 +242,8 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         node_paths = request.node_path
         for node_path in node_paths:
             logger.info(f"Resume: {node_path}")
-            self.scheduler.run_command_resume(node_path)
+            await self.scheduler.submit_command("resume", node_path=node_path)
+        await self.scheduler.sync_journal()
 
         return takler_pb2.ServiceResponse(
             flag=0,
@@ -161,7 +254,7 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         node_paths = request.node_path
         force = request.force
         for node_path in node_paths:
-            result = self.scheduler.run_command_run(node_path, force=force)
+            result = await self.scheduler.submit_command("run", node_path=node_path, force=force)
             if result:
                 logger.info(f"Run: {node_path}")
             else:
@@ -178,12 +271,14 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         recursive = request.recursive
 
         for variable_path in paths:
-            result = self.scheduler.run_command_force(variable_path, state=state, recursive=recursive)
+            result = await self.scheduler.submit_command(
+                "force", variable_path=variable_path, state=state, recursive=recursive)
             if result:
                 logger.info(f"Force: {variable_path} {state}")
             else:
                 logger.info(f"Force has error: {variable_path} {state}")
 
+        await self.scheduler.sync_journal()
         return takler_pb2.ServiceResponse(
             flag=0,
             message="",
@@ -193,8 +288,9 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         paths = request.path
         dep_type = takler_pb2.FreeDepCommand.DepType.Name(request.dep_type)
         for path in paths:
-            result = self.scheduler.run_command_free_dep(path, dep_type)
+            result = await self.scheduler.submit_command("free_dep", node_path=path, dep_type=dep_type)
             logger.info(f"Free Dep: {dep_type} {path}")
+        await self.scheduler.sync_journal()
         return takler_pb2.ServiceResponse(
             flag=0,
             message="",
@@ -204,7 +300,57 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
         flow_type = request.flow_type
         flow_bytes = request.flow
         logger.info(f"Load flow from bytes...")
-        self.scheduler.run_command_load(flow_type=flow_type, flow_bytes=flow_bytes)
+        await self.scheduler.run_command_load_async(flow_type=flow_type, flow_bytes=flow_bytes)
+        await self.scheduler.sync_journal()
+        return takler_pb2.ServiceResponse(
+            flag=0,
+            message="",
+        )
+
+    async def RunCommandLoadStream(self, request_iterator, context):
+        """
+        Load a flow uploaded in chunks. The flow is built in a worker thread, so other RPCs are served meanwhile.
+        """
+        requests = aiter(request_iterator)
+        first_request = await anext(requests, None)
+        if first_request is None:
+            return takler_pb2.ServiceResponse(
+                flag=1,
+                message="load stream is empty",
+            )
+
+        async def iter_chunks():
+            yield first_request.data
+            async for request in requests:
+                yield request.data
+
+        logger.info(f"Load flow from stream...")
+        try:
+            flow = await self.scheduler.run_command_load_stream(
+                flow_type=first_request.flow_type, chunks=iter_chunks())
+        except Exception as e:
+            logger.warning(f"Load flow failed: {e}")
+            return takler_pb2.ServiceResponse(
+                flag=1,
+                message=str(e),
+            )
+        logger.info(f"Load flow from stream...done [flow name: {flow.name}]")
+        await self.scheduler.sync_journal()
+        return takler_pb2.ServiceResponse(
+            flag=0,
+            message="",
+        )
+
+    async def RunCommandCheckpoint(self, request: takler_pb2.CheckpointCommand, context):
+        logger.info(f"Checkpoint: {self.scheduler.checkpoint_path}")
+        try:
+            await self.scheduler.checkpoint()
+        except Exception as e:
+            logger.warning(f"Checkpoint failed: {e}")
+            return takler_pb2.ServiceResponse(
+                flag=1,
+                message=str(e),
+            )
         return takler_pb2.ServiceResponse(
             flag=0,
             message="",
@@ -213,7 +359,7 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
     # Query command -----------------------------------------------------
 
     async def RunRequestShow(self, request: takler_pb2.ShowRequest, context):
-        output = self.scheduler.handle_request_show(
+        output = await self.scheduler.handle_request_show(
             show_parameter=request.show_parameter,
             show_trigger=request.show_trigger,
             show_limit=request.show_limit,
@@ -240,3 +386,51 @@ class TaklerService(takler_pb2_grpc.TaklerServerServicer):
             coroutines=tasks
         )
 
+    async def QueryMetrics(self, request: takler_pb2.MetricsRequest, context):
+        return takler_pb2.MetricsResponse(
+            metrics=self.scheduler.get_metrics()
+        )
+
+    async def QueryNodes(self, request: takler_pb2.QueryNodesRequest, context):
+        try:
+            status = None
+            if len(request.status) > 0:
+                status = set()
+                for name in request.status:
+                    if name not in NodeStatus.__members__:
+                        raise ValueError(f"node status is not supported: {name}")
+                    status.add(NodeStatus[name])
+
+            attributes = set(request.attributes)
+            for name in attributes:
+                if name not in QUERY_ATTRIBUTES:
+                    raise ValueError(f"attribute is not supported: {name}")
+
+            page_size = request.page_size
+            if page_size <= 0:
+                page_size = DEFAULT_QUERY_PAGE_SIZE
+            page_size = min(page_size, MAX_QUERY_PAGE_SIZE)
+
+            # page token is node path of the last node in previous page.
+            nodes, next_page_token = self.scheduler.query_nodes(
+                node_path=request.node_path,
+                max_depth=request.max_depth,
+                status=status,
+                after=request.page_token,
+                limit=page_size,
+            )
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        return takler_pb2.QueryNodesResponse(
+            nodes=[create_node_record(node, attributes) for node in nodes],
+            next_page_token="" if next_page_token is None else next_page_token,
+        )
+
+    # Subscription ---------------------------------------------------------
+
+    async def Subscribe(self, request: takler_pb2.SubscribeRequest, context):
+        sequence = request.sequence if request.resume else None
+        logger.info(f"Subscribe: resume from {sequence}")
+        async for response in self.subscription_hub.subscribe(sequence):
+            yield response
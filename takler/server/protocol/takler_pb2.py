@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n#takler/server/protocol/takler.proto\x12\x0ftakler_protocol\"0\n\x0fServiceResponse\x12\x0c\n\x04\x66lag\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"(\n\x13\x43hildCommandOptions\x12\x11\n\tnode_path\x18\x01 \x01(\t\"[\n\x0bInitCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\x12\x0f\n\x07task_id\x18\x02 \x01(\t\"N\n\x0f\x43ompleteCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\"[\n\x0c\x41\x62ortCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\x12\x0e\n\x06reason\x18\x02 \x01(\t\"_\n\x0c\x45ventCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\x12\x12\n\nevent_name\x18\x02 \x01(\t\"t\n\x0cMeterCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\x12\x12\n\nmeter_name\x18\x02 \x01(\t\x12\x13\n\x0bmeter_value\x18\x03 \x01(\t\"#\n\x0eRequeueCommand\x12\x11\n\tnode_path\x18\x01 \x03(\t\"#\n\x0eSuspendCommand\x12\x11\n\tnode_path\x18\x01 \x03(\t\".\n\nRunCommand\x12\r\n\x05\x66orce\x18\x01 \x01(\x08\x12\x11\n\tnode_path\x18\x02 \x03(\t\"\xd9\x01\n\x0c\x46orceCommand\x12\x37\n\x05state\x18\x01 \x01(\x0e\x32(.takler_protocol.ForceCommand.ForceState\x12\x11\n\trecursive\x18\x02 \x01(\x08\x12\x0c\n\x04path\x18\x03 \x03(\t\"o\n\nForceState\x12\x0b\n\x07unknown\x10\x00\x12\x0c\n\x08\x63omplete\x10\x01\x12\n\n\x06queued\x10\x02\x12\r\n\tsubmitted\x10\x03\x12\n\n\x06\x61\x63tive\x10\x04\x12\x0b\n\x07\x61\x62orted\x10\x05\x12\t\n\x05\x63lear\x10\x06\x12\x07\n\x03set\x10\x07\"\x84\x01\n\x0e\x46reeDepCommand\x12\x39\n\x08\x64\x65p_type\x18\x01 \x01(\x0e\x32\'.takler_protocol.FreeDepCommand.DepType\x12\x0c\n\x04path\x18\x02 \x03(\t\")\n\x07\x44\x65pType\x12\x07\n\x03\x61ll\x10\x00\x12\x0b\n\x07trigger\x10\x01\x12\x08\n\x04time\x10\x02\".\n\x0bLoadCommand\x12\x11\n\tflow_type\x18\x01 \x01(\t\x12\x0c\n\x04\x66low\x18\x02 \x01(\x0c\"w\n\x0bShowRequest\x12\x14\n\x0cshow_trigger\x18\x01 \x01(\x08\x12\x16\n\x0eshow_parameter\x18\x02 \x01(\x08\x12\x12\n\nshow_limit\x18\x03 \x01(\x08\x12\x12\n\nshow_event\x18\x04 \x01(\x08\x12\x12\n\nshow_meter\x18\x05 \x01(\x08\"\x1e\n\x0cShowResponse\x12\x0e\n\x06output\x18\x01 \x01(\t\"\r\n\x0bPingRequest\"\x0e\n\x0cPingResponse\".\n\tCoroutine\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\"\x12\n\x10\x43oroutineRequest\"C\n\x11\x43oroutineResponse\x12.\n\ncoroutines\x18\x01 \x03(\x0b\x32\x1a.takler_protocol.Coroutine2\xa0\n\n\x0cTaklerServer\x12R\n\x0eRunCommandInit\x12\x1c.takler_protocol.InitCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12Z\n\x12RunCommandComplete\x12 .takler_protocol.CompleteCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12T\n\x0fRunCommandAbort\x12\x1d.takler_protocol.AbortCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12T\n\x0fRunCommandEvent\x12\x1d.takler_protocol.EventCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12T\n\x0fRunCommandMeter\x12\x1d.takler_protocol.MeterCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12X\n\x11RunCommandRequeue\x12\x1f.takler_protocol.RequeueCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12X\n\x11RunCommandSuspend\x12\x1f.takler_protocol.SuspendCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12W\n\x10RunCommandResume\x12\x1f.takler_protocol.SuspendCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12P\n\rRunCommandRun\x12\x1b.takler_protocol.RunCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12T\n\x0fRunCommandForce\x12\x1d.takler_protocol.ForceCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12X\n\x11RunCommandFreeDep\x12\x1f.takler_protocol.FreeDepCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12R\n\x0eRunCommandLoad\x12\x1c.takler_protocol.LoadCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12O\n\x0eRunRequestShow\x12\x1c.takler_protocol.ShowRequest\x1a\x1d.takler_protocol.ShowResponse\"\x00\x12O\n\x0eRunRequestPing\x12\x1c.takler_protocol.PingRequest\x1a\x1d.takler_protocol.PingResponse\"\x00\x12Y\n\x0eQueryCoroutine\x12!.takler_protocol.CoroutineRequest\x1a\".takler_protocol.CoroutineResponse\"\x00\x42\x35Z3github.com/perillaroc/takler-client/takler_protocolb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n#takler/server/protocol/takler.proto\x12\x0ftakler_protocol\"0\n\x0fServiceResponse\x12\x0c\n\x04\x66lag\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"(\n\x13\x43hildCommandOptions\x12\x11\n\tnode_path\x18\x01 \x01(\t\"[\n\x0bInitCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\x12\x0f\n\x07task_id\x18\x02 \x01(\t\"N\n\x0f\x43ompleteCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\"[\n\x0c\x41\x62ortCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\x12\x0e\n\x06reason\x18\x02 \x01(\t\"_\n\x0c\x45ventCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\x12\x12\n\nevent_name\x18\x02 \x01(\t\"t\n\x0cMeterCommand\x12;\n\rchild_options\x18\x01 \x01(\x0b\x32$.takler_protocol.ChildCommandOptions\x12\x12\n\nmeter_name\x18\x02 \x01(\t\x12\x13\n\x0bmeter_value\x18\x03 \x01(\t\"\x8b\x02\n\x0b\x43hildAction\x12,\n\x04init\x18\x01 \x01(\x0b\x32\x1c.takler_protocol.InitCommandH\x00\x12\x34\n\x08\x63omplete\x18\x02 \x01(\x0b\x32 .takler_protocol.CompleteCommandH\x00\x12.\n\x05\x61\x62ort\x18\x03 \x01(\x0b\x32\x1d.takler_protocol.AbortCommandH\x00\x12.\n\x05\x65vent\x18\x04 \x01(\x0b\x32\x1d.takler_protocol.EventCommandH\x00\x12.\n\x05meter\x18\x05 \x01(\x0b\x32\x1d.takler_protocol.MeterCommandH\x00\x42\x08\n\x06\x61\x63tion\"=\n\x0c\x42\x61tchCommand\x12-\n\x07\x61\x63tions\x18\x01 \x03(\x0b\x32\x1c.takler_protocol.ChildAction\"#\n\x0eRequeueCommand\x12\x11\n\tnode_path\x18\x01 \x03(\t\"#\n\x0eSuspendCommand\x12\x11\n\tnode_path\x18\x01 \x03(\t\".\n\nRunCommand\x12\r\n\x05\x66orce\x18\x01 \x01(\x08\x12\x11\n\tnode_path\x18\x02 \x03(\t\"\xd9\x01\n\x0c\x46orceCommand\x12\x37\n\x05state\x18\x01 \x01(\x0e\x32(.takler_protocol.ForceCommand.ForceState\x12\x11\n\trecursive\x18\x02 \x01(\x08\x12\x0c\n\x04path\x18\x03 \x03(\t\"o\n\nForceState\x12\x0b\n\x07unknown\x10\x00\x12\x0c\n\x08\x63omplete\x10\x01\x12\n\n\x06queued\x10\x02\x12\r\n\tsubmitted\x10\x03\x12\n\n\x06\x61\x63tive\x10\x04\x12\x0b\n\x07\x61\x62orted\x10\x05\x12\t\n\x05\x63lear\x10\x06\x12\x07\n\x03set\x10\x07\"\x84\x01\n\x0e\x46reeDepCommand\x12\x39\n\x08\x64\x65p_type\x18\x01 \x01(\x0e\x32\'.takler_protocol.FreeDepCommand.DepType\x12\x0c\n\x04path\x18\x02 \x03(\t\")\n\x07\x44\x65pType\x12\x07\n\x03\x61ll\x10\x00\x12\x0b\n\x07trigger\x10\x01\x12\x08\n\x04time\x10\x02\".\n\x0bLoadCommand\x12\x11\n\tflow_type\x18\x01 \x01(\t\x12\x0c\n\x04\x66low\x18\x02 \x01(\x0c\",\n\tLoadChunk\x12\x11\n\tflow_type\x18\x01 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\"\x13\n\x11\x43heckpointCommand\"w\n\x0bShowRequest\x12\x14\n\x0cshow_trigger\x18\x01 \x01(\x08\x12\x16\n\x0eshow_parameter\x18\x02 \x01(\x08\x12\x12\n\nshow_limit\x18\x03 \x01(\x08\x12\x12\n\nshow_event\x18\x04 \x01(\x08\x12\x12\n\nshow_meter\x18\x05 \x01(\x08\"\x1e\n\x0cShowResponse\x12\x0e\n\x06output\x18\x01 \x01(\t\"\r\n\x0bPingRequest\"\x0e\n\x0cPingResponse\".\n\tCoroutine\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\"\x12\n\x10\x43oroutineRequest\"C\n\x11\x43oroutineResponse\x12.\n\ncoroutines\x18\x01 \x03(\x0b\x32\x1a.takler_protocol.Coroutine\"\x10\n\x0eMetricsRequest\"\x81\x01\n\x0fMetricsResponse\x12>\n\x07metrics\x18\x01 \x03(\x0b\x32-.takler_protocol.MetricsResponse.MetricsEntry\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\"\x84\x01\n\x11QueryNodesRequest\x12\x11\n\tnode_path\x18\x01 \x01(\t\x12\x11\n\tmax_depth\x18\x02 \x01(\x05\x12\x0e\n\x06status\x18\x03 \x03(\t\x12\x12\n\nattributes\x18\x04 \x03(\t\x12\x11\n\tpage_size\x18\x05 \x01(\x05\x12\x12\n\npage_token\x18\x06 \x01(\t\"Y\n\x12QueryNodesResponse\x12*\n\x05nodes\x18\x01 \x03(\x0b\x32\x1b.takler_protocol.NodeRecord\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\"4\n\x10SubscribeRequest\x12\x0e\n\x06resume\x18\x01 \x01(\x08\x12\x10\n\x08sequence\x18\x02 \x01(\x03\";\n\x0e\x41ttributeValue\x12\x0c\n\x04kind\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\r\n\x05value\x18\x03 \x01(\t\"w\n\nNodeRecord\x12\x11\n\tnode_path\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x11\n\tsuspended\x18\x03 \x01(\x08\x12\x33\n\nattributes\x18\x04 \x03(\x0b\x32\x1f.takler_protocol.AttributeValue\"H\n\x08Snapshot\x12\x10\n\x08sequence\x18\x01 \x01(\x03\x12*\n\x05nodes\x18\x02 \x03(\x0b\x32\x1b.takler_protocol.NodeRecord\"\\\n\tNodeDelta\x12\x10\n\x08sequence\x18\x01 \x01(\x03\x12\x11\n\tnode_path\x18\x02 \x01(\t\x12\r\n\x05\x66ield\x18\x03 \x01(\t\x12\x0c\n\x04name\x18\x04 \x01(\t\x12\r\n\x05value\x18\x05 \x01(\t\"8\n\nDeltaBatch\x12*\n\x06\x64\x65ltas\x18\x01 \x03(\x0b\x32\x1a.takler_protocol.NodeDelta\"{\n\x11SubscribeResponse\x12-\n\x08snapshot\x18\x01 \x01(\x0b\x32\x19.takler_protocol.SnapshotH\x00\x12-\n\x06\x64\x65ltas\x18\x02 \x01(\x0b\x32\x1b.takler_protocol.DeltaBatchH\x00\x42\x08\n\x06update2\xb6\x0e\n\x0cTaklerServer\x12R\n\x0eRunCommandInit\x12\x1c.takler_protocol.InitCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12Z\n\x12RunCommandComplete\x12 .takler_protocol.CompleteCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12T\n\x0fRunCommandAbort\x12\x1d.takler_protocol.AbortCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12T\n\x0fRunCommandEvent\x12\x1d.takler_protocol.EventCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12T\n\x0fRunCommandMeter\x12\x1d.takler_protocol.MeterCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12T\n\x0fRunCommandBatch\x12\x1d.takler_protocol.BatchCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12X\n\x11RunCommandRequeue\x12\x1f.takler_protocol.RequeueCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12X\n\x11RunCommandSuspend\x12\x1f.takler_protocol.SuspendCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12W\n\x10RunCommandResume\x12\x1f.takler_protocol.SuspendCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12P\n\rRunCommandRun\x12\x1b.takler_protocol.RunCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12T\n\x0fRunCommandForce\x12\x1d.takler_protocol.ForceCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12X\n\x11RunCommandFreeDep\x12\x1f.takler_protocol.FreeDepCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12R\n\x0eRunCommandLoad\x12\x1c.takler_protocol.LoadCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12X\n\x14RunCommandLoadStream\x12\x1a.takler_protocol.LoadChunk\x1a .takler_protocol.ServiceResponse\"\x00(\x01\x12^\n\x14RunCommandCheckpoint\x12\".takler_protocol.CheckpointCommand\x1a .takler_protocol.ServiceResponse\"\x00\x12O\n\x0eRunRequestShow\x12\x1c.takler_protocol.ShowRequest\x1a\x1d.takler_protocol.ShowResponse\"\x00\x12O\n\x0eRunRequestPing\x12\x1c.takler_protocol.PingRequest\x1a\x1d.takler_protocol.PingResponse\"\x00\x12Y\n\x0eQueryCoroutine\x12!.takler_protocol.CoroutineRequest\x1a\".takler_protocol.CoroutineResponse\"\x00\x12W\n\nQueryNodes\x12\".takler_protocol.QueryNodesRequest\x1a#.takler_protocol.QueryNodesResponse\"\x00\x12S\n\x0cQueryMetrics\x12\x1f.takler_protocol.MetricsRequest\x1a .takler_protocol.MetricsResponse\"\x00\x12V\n\tSubscribe\x12!.takler_protocol.SubscribeRequest\x1a\".takler_protocol.SubscribeResponse\"\x00\x30\x01\x42\x35Z3github.com/perillaroc/takler-client/takler_protocolb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,6 +32,8 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'takler.server.protocol.takl
 if not _descriptor._USE_C_DESCRIPTORS:
   _globals['DESCRIPTOR']._loaded_options = None
   _globals['DESCRIPTOR']._serialized_options = b'Z3github.com/perillaroc/takler-client/takler_protocol'
+  _globals['_METRICSRESPONSE_METRICSENTRY']._loaded_options = None
+  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_options = b'8\001'
   _globals['_SERVICERESPONSE']._serialized_start=56
   _globals['_SERVICERESPONSE']._serialized_end=104
   _globals['_CHILDCOMMANDOPTIONS']._serialized_start=106
@@ -46,36 +48,68 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_EVENTCOMMAND']._serialized_end=509
   _globals['_METERCOMMAND']._serialized_start=511
   _globals['_METERCOMMAND']._serialized_end=627
-  _globals['_REQUEUECOMMAND']._serialized_start=629
-  _globals['_REQUEUECOMMAND']._serialized_end=664
-  _globals['_SUSPENDCOMMAND']._serialized_start=666
-  _globals['_SUSPENDCOMMAND']._serialized_end=701
-  _globals['_RUNCOMMAND']._serialized_start=703
-  _globals['_RUNCOMMAND']._serialized_end=749
-  _globals['_FORCECOMMAND']._serialized_start=752
-  _globals['_FORCECOMMAND']._serialized_end=969
-  _globals['_FORCECOMMAND_FORCESTATE']._serialized_start=858
-  _globals['_FORCECOMMAND_FORCESTATE']._serialized_end=969
-  _globals['_FREEDEPCOMMAND']._serialized_start=972
-  _globals['_FREEDEPCOMMAND']._serialized_end=1104
-  _globals['_FREEDEPCOMMAND_DEPTYPE']._serialized_start=1063
-  _globals['_FREEDEPCOMMAND_DEPTYPE']._serialized_end=1104
-  _globals['_LOADCOMMAND']._serialized_start=1106
-  _globals['_LOADCOMMAND']._serialized_end=1152
-  _globals['_SHOWREQUEST']._serialized_start=1154
-  _globals['_SHOWREQUEST']._serialized_end=1273
-  _globals['_SHOWRESPONSE']._serialized_start=1275
-  _globals['_SHOWRESPONSE']._serialized_end=1305
-  _globals['_PINGREQUEST']._serialized_start=1307
-  _globals['_PINGREQUEST']._serialized_end=1320
-  _globals['_PINGRESPONSE']._serialized_start=1322
-  _globals['_PINGRESPONSE']._serialized_end=1336
-  _globals['_COROUTINE']._serialized_start=1338
-  _globals['_COROUTINE']._serialized_end=1384
-  _globals['_COROUTINEREQUEST']._serialized_start=1386
-  _globals['_COROUTINEREQUEST']._serialized_end=1404
-  _globals['_COROUTINERESPONSE']._serialized_start=1406
-  _globals['_COROUTINERESPONSE']._serialized_end=1473
-  _globals['_TAKLERSERVER']._serialized_start=1476
-  _globals['_TAKLERSERVER']._serialized_end=2788
+  _globals['_CHILDACTION']._serialized_start=630
+  _globals['_CHILDACTION']._serialized_end=897
+  _globals['_BATCHCOMMAND']._serialized_start=899
+  _globals['_BATCHCOMMAND']._serialized_end=960
+  _globals['_REQUEUECOMMAND']._serialized_start=962
+  _globals['_REQUEUECOMMAND']._serialized_end=997
+  _globals['_SUSPENDCOMMAND']._serialized_start=999
+  _globals['_SUSPENDCOMMAND']._serialized_end=1034
+  _globals['_RUNCOMMAND']._serialized_start=1036
+  _globals['_RUNCOMMAND']._serialized_end=1082
+  _globals['_FORCECOMMAND']._serialized_start=1085
+  _globals['_FORCECOMMAND']._serialized_end=1302
+  _globals['_FORCECOMMAND_FORCESTATE']._serialized_start=1191
+  _globals['_FORCECOMMAND_FORCESTATE']._serialized_end=1302
+  _globals['_FREEDEPCOMMAND']._serialized_start=1305
+  _globals['_FREEDEPCOMMAND']._serialized_end=1437
+  _globals['_FREEDEPCOMMAND_DEPTYPE']._serialized_start=1396
+  _globals['_FREEDEPCOMMAND_DEPTYPE']._serialized_end=1437
+  _globals['_LOADCOMMAND']._serialized_start=1439
+  _globals['_LOADCOMMAND']._serialized_end=1485
+  _globals['_LOADCHUNK']._serialized_start=1487
+  _globals['_LOADCHUNK']._serialized_end=1531
+  _globals['_CHECKPOINTCOMMAND']._serialized_start=1533
+  _globals['_CHECKPOINTCOMMAND']._serialized_end=1552
+  _globals['_SHOWREQUEST']._serialized_start=1554
+  _globals['_SHOWREQUEST']._serialized_end=1673
+  _globals['_SHOWRESPONSE']._serialized_start=1675
+  _globals['_SHOWRESPONSE']._serialized_end=1705
+  _globals['_PINGREQUEST']._serialized_start=1707
+  _globals['_PINGREQUEST']._serialized_end=1720
+  _globals['_PINGRESPONSE']._serialized_start=1722
+  _globals['_PINGRESPONSE']._serialized_end=1736
+  _globals['_COROUTINE']._serialized_start=1738
+  _globals['_COROUTINE']._serialized_end=1784
+  _globals['_COROUTINEREQUEST']._serialized_start=1786
+  _globals['_COROUTINEREQUEST']._serialized_end=1804
+  _globals['_COROUTINERESPONSE']._serialized_start=1806
+  _globals['_COROUTINERESPONSE']._serialized_end=1873
+  _globals['_METRICSREQUEST']._serialized_start=1875
+  _globals['_METRICSREQUEST']._serialized_end=1891
+  _globals['_METRICSRESPONSE']._serialized_start=1894
+  _globals['_METRICSRESPONSE']._serialized_end=2023
+  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_start=1977
+  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_end=2023
+  _globals['_QUERYNODESREQUEST']._serialized_start=2026
+  _globals['_QUERYNODESREQUEST']._serialized_end=2158
+  _globals['_QUERYNODESRESPONSE']._serialized_start=2160
+  _globals['_QUERYNODESRESPONSE']._serialized_end=2249
+  _globals['_SUBSCRIBEREQUEST']._serialized_start=2251
+  _globals['_SUBSCRIBEREQUEST']._serialized_end=2303
+  _globals['_ATTRIBUTEVALUE']._serialized_start=2305
+  _globals['_ATTRIBUTEVALUE']._serialized_end=2364
+  _globals['_NODERECORD']._serialized_start=2366
+  _globals['_NODERECORD']._serialized_end=2485
+  _globals['_SNAPSHOT']._serialized_start=2487
+  _globals['_SNAPSHOT']._serialized_end=2559
+  _globals['_NODEDELTA']._serialized_start=2561
+  _globals['_NODEDELTA']._serialized_end=2653
+  _globals['_DELTABATCH']._serialized_start=2655
+  _globals['_DELTABATCH']._serialized_end=2711
+  _globals['_SUBSCRIBERESPONSE']._serialized_start=2713
+  _globals['_SUBSCRIBERESPONSE']._serialized_end=2836
+  _globals['_TAKLERSERVER']._serialized_start=2839
+  _globals['_TAKLERSERVER']._serialized_end=4685
 # @@protoc_insertion_point(module_scope)
@@ -61,6 +61,11 @@ class TaklerServerStub(object):
                 request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.MeterCommand.SerializeToString,
                 response_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.FromString,
                 _registered_method=True)
+        self.RunCommandBatch = channel.unary_unary(
+                '/takler_protocol.TaklerServer/RunCommandBatch',
+                request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.BatchCommand.SerializeToString,
+                response_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.FromString,
+                _registered_method=True)
         self.RunCommandRequeue = channel.unary_unary(
                 '/takler_protocol.TaklerServer/RunCommandRequeue',
                 request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.RequeueCommand.SerializeToString,
@@ -96,6 +101,16 @@ class TaklerServerStub(object):
                 request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.LoadCommand.SerializeToString,
                 response_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.FromString,
                 _registered_method=True)
+        self.RunCommandLoadStream = channel.stream_unary(
+                '/takler_protocol.TaklerServer/RunCommandLoadStream',
+                request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.LoadChunk.SerializeToString,
+                response_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.FromString,
+                _registered_method=True)
+        self.RunCommandCheckpoint = channel.unary_unary(
+                '/takler_protocol.TaklerServer/RunCommandCheckpoint',
+                request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.CheckpointCommand.SerializeToString,
+                response_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.FromString,
+                _registered_method=True)
         self.RunRequestShow = channel.unary_unary(
                 '/takler_protocol.TaklerServer/RunRequestShow',
                 request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.ShowRequest.SerializeToString,
@@ -111,6 +126,21 @@ class TaklerServerStub(object):
                 request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.CoroutineRequest.SerializeToString,
                 response_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.CoroutineResponse.FromString,
                 _registered_method=True)
+        self.QueryNodes = channel.unary_unary(
+                '/takler_protocol.TaklerServer/QueryNodes',
+                request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.QueryNodesRequest.SerializeToString,
+                response_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.QueryNodesResponse.FromString,
+                _registered_method=True)
+        self.QueryMetrics = channel.unary_unary(
+                '/takler_protocol.TaklerServer/QueryMetrics',
+                request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.MetricsRequest.SerializeToString,
+                response_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.MetricsResponse.FromString,
+                _registered_method=True)
+        self.Subscribe = channel.unary_stream(
+                '/takler_protocol.TaklerServer/Subscribe',
+                request_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.SubscribeRequest.SerializeToString,
+                response_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.SubscribeResponse.FromString,
+                _registered_method=True)
 
 
 class TaklerServerServicer(object):
@@ -149,6 +179,12 @@ class TaklerServerServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def RunCommandBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def RunCommandRequeue(self, request, context):
         """control command
 
@@ -193,6 +229,18 @@ class TaklerServerServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def RunCommandLoadStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RunCommandCheckpoint(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def RunRequestShow(self, request, context):
         """query command
 
@@ -213,6 +261,26 @@ class TaklerServerServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def QueryNodes(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def QueryMetrics(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Subscribe(self, request, context):
+        """subscription
+
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TaklerServerServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -241,6 +309,11 @@ def add_TaklerServerServicer_to_server(servicer, server):
                     request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.MeterCommand.FromString,
                     response_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.SerializeToString,
             ),
+            'RunCommandBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.RunCommandBatch,
+                    request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.BatchCommand.FromString,
+                    response_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.SerializeToString,
+            ),
             'RunCommandRequeue': grpc.unary_unary_rpc_method_handler(
                     servicer.RunCommandRequeue,
                     request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.RequeueCommand.FromString,
@@ -276,6 +349,16 @@ def add_TaklerServerServicer_to_server(servicer, server):
                     request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.LoadCommand.FromString,
                     response_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.SerializeToString,
             ),
+            'RunCommandLoadStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.RunCommandLoadStream,
+                    request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.LoadChunk.FromString,
+                    response_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.SerializeToString,
+            ),
+            'RunCommandCheckpoint': grpc.unary_unary_rpc_method_handler(
+                    servicer.RunCommandCheckpoint,
+                    request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.CheckpointCommand.FromString,
+                    response_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.SerializeToString,
+            ),
             'RunRequestShow': grpc.unary_unary_rpc_method_handler(
                     servicer.RunRequestShow,
                     request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.ShowRequest.FromString,
@@ -291,6 +374,21 @@ def add_TaklerServerServicer_to_server(servicer, server):
                     request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.CoroutineRequest.FromString,
                     response_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.CoroutineResponse.SerializeToString,
             ),
+            'QueryNodes': grpc.unary_unary_rpc_method_handler(
+                    servicer.QueryNodes,
+                    request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.QueryNodesRequest.FromString,
+                    response_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.QueryNodesResponse.SerializeToString,
+            ),
+            'QueryMetrics': grpc.unary_unary_rpc_method_handler(
+                    servicer.QueryMetrics,
+                    request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.MetricsRequest.FromString,
+                    response_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.MetricsResponse.SerializeToString,
+            ),
+            'Subscribe': grpc.unary_stream_rpc_method_handler(
+                    servicer.Subscribe,
+                    request_deserializer=takler_dot_server_dot_protocol_dot_takler__pb2.SubscribeRequest.FromString,
+                    response_serializer=takler_dot_server_dot_protocol_dot_takler__pb2.SubscribeResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'takler_protocol.TaklerServer', rpc_method_handlers)
@@ -439,6 +537,33 @@ class TaklerServer(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def RunCommandBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/takler_protocol.TaklerServer/RunCommandBatch',
+            takler_dot_server_dot_protocol_dot_takler__pb2.BatchCommand.SerializeToString,
+            takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def RunCommandRequeue(request,
             target,
@@ -628,6 +753,60 @@ class TaklerServer(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def RunCommandLoadStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/takler_protocol.TaklerServer/RunCommandLoadStream',
+            takler_dot_server_dot_protocol_dot_takler__pb2.LoadChunk.SerializeToString,
+            takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RunCommandCheckpoint(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/takler_protocol.TaklerServer/RunCommandCheckpoint',
+            takler_dot_server_dot_protocol_dot_takler__pb2.CheckpointCommand.SerializeToString,
+            takler_dot_server_dot_protocol_dot_takler__pb2.ServiceResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def RunRequestShow(request,
             target,
@@ -708,3 +887,84 @@ class TaklerServer(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def QueryNodes(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/takler_protocol.TaklerServer/QueryNodes',
+            takler_dot_server_dot_protocol_dot_takler__pb2.QueryNodesRequest.SerializeToString,
+            takler_dot_server_dot_protocol_dot_takler__pb2.QueryNodesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def QueryMetrics(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/takler_protocol.TaklerServer/QueryMetrics',
+            takler_dot_server_dot_protocol_dot_takler__pb2.MetricsRequest.SerializeToString,
+            takler_dot_server_dot_protocol_dot_takler__pb2.MetricsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Subscribe(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/takler_protocol.TaklerServer/Subscribe',
+            takler_dot_server_dot_protocol_dot_takler__pb2.SubscribeRequest.SerializeToString,
+            takler_dot_server_dot_protocol_dot_takler__pb2.SubscribeResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,42 +1,196 @@
 import asyncio
+import base64
 import time
 import datetime
 import json
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
-from queue import Queue
-from typing import Optional
+from pathlib import Path
+from typing import Optional, List, Dict, NamedTuple, Set, Tuple, AsyncIterator, Iterator, Any
 
 from takler.core import Bunch, Task, NodeStatus, Event, Flow, SerializationType
+from takler.core.checkpoint import (
+    BunchEncoder, dumps_payload, loads_payload, decode_flows, get_payload_metadata, restore_flows,
+    restore_bunch_limits, write_checkpoint_file, read_checkpoint_file
+)
+from takler.core.compact_flow import loads_compact_flow
 from takler.core.node import Node
+from takler.core.util import gc_paused
 from takler.logging import get_logger
-from takler.visitor import pre_order_travel, PrintVisitor
+from takler.server.command_queue import CommandQueue, DEFAULT_COMMAND_BATCH_SIZE
+from takler.server.journal import (
+    Journal, JournalRecord, read_journal, read_blob, DEFAULT_JOURNAL_SYNC_DELAY_SECONDS,
+)
+from takler.visitor import pre_order_travel_cooperative, PrintVisitor
 
 
 logger = get_logger("server.scheduler")
 
 
 DEFAULT_INTERVAL_LOOP_SECONDS = 10.0
+DEFAULT_CHECKPOINT_INTERVAL_SECONDS = 300.0
+# Wait for more commands after main loop is woken up by a command, see ``Scheduler.main_loop``.
+DEFAULT_WAKEUP_DEBOUNCE_SECONDS = 0.002
+# Nodes checked or visited between yielding to event loop, see ``Scheduler.resolve_bunch``.
+DEFAULT_RESOLVE_BATCH_SIZE = 100
+# Loops run at once one after another when nodes are left to resolve, see ``Scheduler.main_loop``.
+DEFAULT_MAX_IMMEDIATE_LOOPS = 10
+DEFAULT_WORKER_COUNT = 4
+
+# Commands written into journal, applied by ``Scheduler.run_command_<command>`` when replayed.
+# ``run`` is not in journal because replaying it would submit the task again.
+JOURNAL_COMMANDS = (
+    "init", "complete", "abort", "event", "meter", "batch",
+    "requeue", "suspend", "resume", "force", "free_dep", "load",
+)
+
+
+# Flow types supported by ``Scheduler.run_command_load``.
+LOAD_FLOW_TYPES = ("json", "compact")
+
+
+def check_load_flow_type(flow_type: str):
+    """
+    Raise RuntimeError if flow type is not supported by command load.
+    """
+    if flow_type not in LOAD_FLOW_TYPES:
+        logger.warning(f"flow type {flow_type} is not supported for command load.")
+        raise RuntimeError(f"flow type {flow_type} is not supported for command load.")
+
+
+class ChildAction(NamedTuple):
+    """
+    A child command in a batch, see ``Scheduler.run_command_batch``.
+
+    Attributes
+    ----------
+    command
+        child command name: init, complete, abort, event, meter.
+    node_path
+        node path string of a task, starting with "/".
+    arguments
+        command arguments, such as task_id for init, reason for abort, event_name for event,
+        meter_name and meter_value for meter.
+    """
+    command: str
+    node_path: str
+    arguments: Dict[str, str]
 
 
 class Scheduler:
     """
     定时调度器，定时遍历所有 Flow，运行满足依赖条件的任务，同时还负责执行 Flow 操作。
 
+    The node tree has a single owner, the event loop thread. Main loop, RPC handlers and
+    commands all change the tree in the event loop, so no thread lock is needed. Long work is kept off the loop:
+
+    * resolving and traveling large trees yield to event loop every ``resolve_batch_size`` nodes,
+      so child commands are served between batches.
+    * RPC handlers do not change the tree themselves. They submit commands into ``command_queue``
+      (see ``submit_command``), and main loop drains them in arrival order between resolution steps,
+      then resolves changes of a whole batch in one pass.
+    * CPU-heavy or blocking work without the tree, such as rendering job scripts, writing files and
+      decoding loaded flows, runs in ``worker_pool``. Workers only get data copied from the tree,
+      and results are applied in the event loop.
+    * checkpoint encodes the tree in chunks of ``resolve_batch_size`` nodes. Each loop of main loop holds
+      ``tree_lock``, and so does checkpoint until the tree is encoded, so commands are not applied
+      in the middle of a checkpoint. They wait in ``command_queue`` instead.
+
     Attributes
     ----------
     bunch : Bunch
         Scheduler has only one bunch.
     interval_main_loop : float
-        time interval to check flow dependencies, unit is seconds.
+        max time interval between two main loops when nothing happens, unit is seconds.
+    wakeup_debounce : float
+        time to wait for more commands after main loop is woken up by a command, unit is seconds.
+    max_immediate_loops : int
+        max number of loops run at once one after another when nodes are left to resolve after a pass.
+    incremental : bool
+        If set, only resolve nodes changed since last loop (see ``Bunch.resolve_dirty_nodes``),
+        otherwise travel all nodes in bunch.
+    compile_expression : bool
+        If set, trigger expressions are compiled into flat callables when parsed (see ``Expression.compile``).
+        Off by default, expressions are evaluated by walking their parsed trees.
+    checkpoint_path : Optional[str]
+        checkpoint file path. If set, bunch is restored from the file when started, and is saved into the file
+        periodically, on demand and when stopped. See ``takler.core.checkpoint``.
+    checkpoint_interval : float
+        time interval to save checkpoint, unit is seconds.
+    journal : Optional[Journal]
+        write-ahead journal of commands, created if ``journal_path`` is set. Commands after the last checkpoint
+        are replayed from the journal when started. See ``takler.server.journal``.
+    command_queue : CommandQueue
+        ordered queue of state-changing commands, drained by main loop.
+    command_batch_size : int
+        max number of commands applied in one drain.
+    resolve_count : int
+        number of finished resolution passes.
+    resolve_batch_size : int
+        number of nodes resolved or visited between yielding to event loop.
+    worker_count : int
+        number of threads in ``worker_pool``.
+    worker_pool : Optional[ThreadPoolExecutor]
+        thread pool created in ``start``, and set as the default executor of event loop.
+        So ``asyncio.to_thread`` and ``loop.run_in_executor(None, ...)`` use it.
     """
-    def __init__(self, bunch: Bunch, interval_main_loop: float = DEFAULT_INTERVAL_LOOP_SECONDS):
+    def __init__(
+            self,
+            bunch: Bunch,
+            interval_main_loop: float = DEFAULT_INTERVAL_LOOP_SECONDS,
+            incremental: bool = True,
+            compile_expression: bool = False,
+            checkpoint_path: Optional[str] = None,
+            checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL_SECONDS,
+            journal_path: Optional[str] = None,
+            journal_sync_delay: float = DEFAULT_JOURNAL_SYNC_DELAY_SECONDS,
+            resolve_batch_size: int = DEFAULT_RESOLVE_BATCH_SIZE,
+            worker_count: int = DEFAULT_WORKER_COUNT,
+            command_batch_size: int = DEFAULT_COMMAND_BATCH_SIZE,
+            wakeup_debounce: float = DEFAULT_WAKEUP_DEBOUNCE_SECONDS,
+            max_immediate_loops: int = DEFAULT_MAX_IMMEDIATE_LOOPS,
+    ):
         self.bunch: Bunch = bunch
+        self.bunch.compile_expressions = compile_expression
         self.interval_main_loop: float = interval_main_loop
-        self.command_queue: Queue = Queue()
+        self.incremental: bool = incremental
         self.should_stop: bool = False
 
+        self.command_queue: CommandQueue = CommandQueue()
+        self.command_batch_size: int = command_batch_size
+        self.wakeup_debounce: float = wakeup_debounce
+        self.max_immediate_loops: int = max_immediate_loops
+        self.resolve_count: int = 0
+
+        self.checkpoint_path: Optional[str] = checkpoint_path
+        self.checkpoint_interval: float = checkpoint_interval
+        self.last_checkpoint_time: float = time.time()
+        self.checkpoint_lock: Optional[asyncio.Lock] = None
+        self.tree_lock: Optional[asyncio.Lock] = None
+        self.checkpoint_task: Optional[asyncio.Task] = None
+
+        self.journal: Optional[Journal] = None
+        if journal_path is not None:
+            self.journal = Journal(journal_path, sync_delay=journal_sync_delay)
+
+        self.resolve_batch_size: int = resolve_batch_size
+        self.worker_count: int = worker_count
+        self.worker_pool: Optional[ThreadPoolExecutor] = None
+
     async def start(self):
-        pass
+        """
+        Create worker pool, restore bunch from checkpoint file if exists,
+        replay commands in journal after the checkpoint, and open journal for new commands.
+        """
+        self.worker_pool = ThreadPoolExecutor(max_workers=self.worker_count, thread_name_prefix="takler-worker")
+        asyncio.get_running_loop().set_default_executor(self.worker_pool)
+
+        journal_sequence = 0
+        if self.checkpoint_path is not None and Path(self.checkpoint_path).exists():
+            journal_sequence = self.restore_checkpoint()
+        if self.journal is not None:
+            journal_sequence = await self.replay_journal(journal_sequence)
+            self.journal.open(journal_sequence)
 
     async def run(self):
         """
@@ -47,36 +201,114 @@ class Scheduler:
 
     async def shutdown(self):
         """
-        Called after main loop is done, unset ``should_stop`` flag.
+        Called after main loop is done, save checkpoint and unset ``should_stop`` flag.
         """
+        if self.checkpoint_path is not None:
+            await self.checkpoint()
+        if self.journal is not None:
+            self.journal.close()
         self.should_stop = False
 
     async def main_loop(self):
         """
         Main loop of scheduler.
 
-        Travel bunch until ``should_stop`` flag is set.
+        Each loop applies queued commands, updates calendars and resolves the bunch, until ``should_stop`` flag is set.
+        Between two loops, main loop sleeps until the earliest of:
+
+        * some command is queued, then waits ``wakeup_debounce`` seconds so a burst of commands is applied together.
+        * some time attribute is due, see ``Bunch.find_next_time_due``.
+        * next checkpoint is due.
+        * ``interval_main_loop`` seconds after the last loop.
+
+        In incremental mode, resolution is skipped if no node is changed, so an idle bunch costs little.
+        If nodes are left to resolve after a pass, such as waiting nodes granted tokens by a Limit's allocation policy,
+        main loop runs next loop at once. At most ``max_immediate_loops`` loops are run at once one after another,
+        then main loop waits as usual, so nodes which are always left to resolve do not keep event loop busy.
+        """
+        self.command_queue.start()
+        tree_lock = self.get_tree_lock()
+        immediate_loops = 0
+        try:
+            while not self.should_stop:
+                # logger.debug("main loop...")
+                async with tree_lock:
+                    await self.drain_commands()
+                    start_time = time.time()
+
+                    # update calendar for all flows.
+                    self.bunch.update_calendar(datetime.datetime.now())
+
+                    # resolve the bunch.
+                    if not self.incremental or self.bunch.resolver.has_dirty_nodes():
+                        await self.resolve_bunch()
+
+                self.schedule_checkpoint()
+
+                elapsed = time.time() - start_time
+                if elapsed > self.interval_main_loop:
+                    logger.warning(f"elapse time ({elapsed:.2f}) seconds is larger than main loop interval ({self.interval_main_loop} seconds)")
+
+                if self.has_pending_nodes() and immediate_loops < self.max_immediate_loops:
+                    immediate_loops += 1
+                    await asyncio.sleep(0)
+                    continue
+                immediate_loops = 0
+
+                duration = max(self.find_next_loop_time(start_time) - time.time(), 0)
+                woken = await self.command_queue.wait(duration)
+                if woken and self.wakeup_debounce > 0:
+                    await asyncio.sleep(self.wakeup_debounce)
+            # apply commands which are already accepted.
+            async with tree_lock:
+                while await self.drain_commands() > 0:
+                    pass
+        finally:
+            self.command_queue.stop()
+
+    def get_tree_lock(self) -> asyncio.Lock:
+        """
+        Get the lock held by each loop of main loop and by checkpoint while encoding the tree.
         """
-        while not self.should_stop:
-            # logger.debug("main loop...")
-            start_time = time.time()
+        if self.tree_lock is None:
+            self.tree_lock = asyncio.Lock()
+        return self.tree_lock
 
-            # update calendar for all flows.
-            time_now = datetime.datetime.now()
-            for name, flow in self.bunch.flows.items():
-                flow.update_calendar(time_now)
+    def has_pending_nodes(self) -> bool:
+        """
+        Check whether some nodes should be resolved at once after a pass.
 
-            # travel the bunch.
-            self.travel_bunch()
+        In incremental mode, these are dirty nodes and waiting nodes of released limits.
+        Full travel checks all nodes in each pass, so only waiting nodes of released limits are pending.
+        """
+        resolver = self.bunch.resolver
+        if self.incremental:
+            return resolver.has_dirty_nodes()
+        return resolver.has_released_limits()
 
-            elapsed = time.time() - start_time
-            if elapsed > self.interval_main_loop:
-                logger.warning(f"elapse time ({elapsed:.2f}) seconds is larger than main loop interval ({self.interval_main_loop} seconds)")
-                duration = 0
-            else:
-                duration = self.interval_main_loop - elapsed
+    def find_next_loop_time(self, last_loop_time: float) -> float:
+        """
+        Find when main loop should wake up if no command arrives.
 
-            await asyncio.sleep(duration)
+        Returns
+        -------
+        float
+            the earliest of next due time attribute, next checkpoint time,
+            and ``interval_main_loop`` seconds after ``last_loop_time``, in seconds since the epoch.
+        """
+        next_time = last_loop_time + self.interval_main_loop
+        due_time = self.bunch.find_next_time_due()
+        if due_time is not None:
+            next_time = min(next_time, due_time.timestamp())
+        if self.checkpoint_path is not None and (self.checkpoint_task is None or self.checkpoint_task.done()):
+            next_time = min(next_time, self.last_checkpoint_time + self.checkpoint_interval)
+        return next_time
+
+    def wakeup(self):
+        """
+        Wake up main loop to resolve the bunch, used when the bunch is changed outside ``command_queue``.
+        """
+        self.command_queue.wakeup()
 
     async def stop(self):
         """
@@ -86,23 +318,298 @@ class Scheduler:
         """
         logger.info("scheduler shutting down...")
         self.should_stop = True
+        self.wakeup()
 
         while self.should_stop:
             await asyncio.sleep(0.1)
         logger.info("scheduler shutting down...done")
 
+    async def resolve_bunch(self):
+        """
+        Resolve dependencies in bunch, use incremental resolution if ``incremental`` is set.
+
+        Yield to event loop every ``resolve_batch_size`` checked nodes, and apply queued commands,
+        so commands are served during a long pass. Nodes changed by these commands are resolved in the next pass.
+        """
+        if self.incremental:
+            steps = self.bunch.resolver.iter_resolve()
+        else:
+            steps = self.iter_travel_bunch()
+
+        count = 0
+        for _ in steps:
+            count += 1
+            if count % self.resolve_batch_size == 0:
+                await asyncio.sleep(0)
+                await self.drain_commands()
+        self.resolve_count += 1
+
     def travel_bunch(self):
         """
-        Travel all flows in bunch to resolve dependencies.
+        Travel all flows in bunch to resolve dependencies at once, without yielding to event loop.
+
+        Kept for callers outside main loop. Main loop uses ``resolve_bunch`` instead, see ``iter_travel_bunch``.
+        """
+        for _ in self.iter_travel_bunch():
+            pass
+
+    def iter_travel_bunch(self) -> Iterator[Node]:
+        """
+        Travel all flows in bunch to resolve dependencies, and yield each checked node.
 
         This function will submit tasks which fit its dependencies.
+        Waiting nodes of released limits are granted tokens before the travel, as ``IncrementalResolver.iter_resolve`` does.
+        """
+        resolver = self.bunch.resolver
+        if resolver.has_released_limits():
+            resolver.wake_limit_waiting_nodes()
 
-        Notes
-        -----
-        是否使用异步函数遍历工作流？
+        for flow in list(self.bunch.flows.values()):
+            # flow may be removed while traveling previous flows.
+            if self.bunch.find_flow(flow.name) is not flow:
+                continue
+            yield from resolver.iter_resolve_tree(flow)
+
+    # Command queue -------------------------------------------------
+
+    async def submit_command(self, command: str, **arguments) -> Any:
+        """
+        Run a state-changing command through ``command_queue``, and wait until it is applied by main loop.
+        The command is applied directly if main loop is not running.
+
+        Parameters
+        ----------
+        command
+            command name, applied by ``Scheduler.run_command_<command>``.
+        arguments
+            keyword arguments of the command.
+
+        Returns
+        -------
+        Any
+            return value of the command.
+
+        Raises
+        ------
+        Exception
+            The exception raised by the command.
+        """
+        if not self.command_queue.is_running:
+            return await self.apply_command(command, arguments)
+        return await self.command_queue.put(command, arguments)
+
+    async def drain_commands(self) -> int:
+        """
+        Apply at most ``command_batch_size`` queued commands in arrival order, and set their results.
+
+        Commands do not await anything in event loop, so a batch is applied without other coroutines between them.
+        The batch is applied in a propagation transaction (see ``StatusPropagation``),
+        so status of each changed family is recomputed once after all commands.
+
+        Returns
+        -------
+        int
+            number of applied commands.
+        """
+        batch = self.command_queue.take_batch(self.command_batch_size)
+        if len(batch) == 0:
+            return 0
+
+        metrics = self.command_queue.metrics
+        start_time = time.perf_counter()
+        max_wait = start_time - batch[0].enqueue_time
+        # status changes of the whole batch swim up once when committed.
+        with self.bunch.status_propagation.batch():
+            for item in batch:
+                try:
+                    result = await self.apply_command(item.command, item.arguments)
+                except Exception as e:
+                    metrics.failed_count += 1
+                    if not item.future.done():
+                        item.future.set_exception(e)
+                    else:
+                        logger.warning(f"command {item.command} failed: {e}")
+                else:
+                    if not item.future.done():
+                        item.future.set_result(result)
+        metrics.record_drain(len(batch), time.perf_counter() - start_time, max_wait)
+        return len(batch)
+
+    async def apply_command(self, command: str, arguments: Dict[str, Any]) -> Any:
+        """
+        Apply a command by ``Scheduler.run_command_<command>``.
+        """
+        method = getattr(self, f"run_command_{command}", None)
+        if method is None:
+            raise ValueError(f"command is not supported: {command}")
+        result = method(**arguments)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Get metrics of scheduler: command queue depth and counters in ``CommandQueueMetrics``
+        with prefix ``command_queue.``, number of resolution passes, and usage of resource pools
+        (limits of the bunch) with prefix ``resource_pool.``.
+        """
+        metrics = {"command_queue.depth": self.command_queue.depth}
+        for name, value in self.command_queue.metrics.to_dict().items():
+            metrics[f"command_queue.{name}"] = value
+        metrics["resolve_count"] = self.resolve_count
+        for limit in self.bunch.limits:
+            metrics[f"resource_pool.{limit.name}.value"] = limit.value
+            metrics[f"resource_pool.{limit.name}.limit"] = limit.limit
+            metrics[f"resource_pool.{limit.name}.waiting"] = len(limit.waiting_nodes)
+        return metrics
+
+    # Checkpoint -------------------------------------------------
+
+    def restore_checkpoint(self) -> int:
+        """
+        Restore flows in bunch from checkpoint file.
+
+        Returns
+        -------
+        int
+            sequence number of the last journal record covered by the checkpoint.
+        """
+        logger.info(f"restore checkpoint from {self.checkpoint_path}...")
+        start_time = time.time()
+        payload = loads_payload(read_checkpoint_file(self.checkpoint_path))
+        flows = decode_flows(payload)
+        restore_bunch_limits(payload, self.bunch)
+        restore_flows(flows, self.bunch)
+        logger.info(f"restore checkpoint...done [{len(flows)} flows, {time.time() - start_time:.2f} seconds]")
+        return get_payload_metadata(payload).get("journal_sequence", 0)
+
+    async def checkpoint(self):
+        """
+        Save bunch into checkpoint file.
+
+        Bunch is encoded in event loop with ``BunchEncoder``, and yields to event loop every ``resolve_batch_size`` nodes.
+        ``tree_lock`` is held until the tree is encoded, so main loop applies no command in the middle of encoding.
+        Pickling and atomic file writing run in another thread.
+        """
+        if self.checkpoint_path is None:
+            raise ValueError("checkpoint path is not set.")
+        if self.checkpoint_lock is None:
+            self.checkpoint_lock = asyncio.Lock()
+
+        async with self.checkpoint_lock:
+            async with self.get_tree_lock():
+                self.last_checkpoint_time = time.time()
+                # journal records before the new segment are included in this checkpoint.
+                journal_sequence = 0 if self.journal is None else self.journal.rotate()
+                payload = await self.encode_bunch(metadata=dict(journal_sequence=journal_sequence))
+            await asyncio.to_thread(self.write_checkpoint, payload, self.checkpoint_path)
+            if self.journal is not None:
+                await self.journal.compact(journal_sequence)
+
+    async def encode_bunch(self, metadata: Dict[str, Any]) -> Tuple:
+        """
+        Encode bunch for checkpoint, and yield to event loop every ``resolve_batch_size`` nodes.
+        """
+        encoder = BunchEncoder(self.bunch, metadata=metadata)
+        count = 0
+        for _ in encoder.iter_encode():
+            count += 1
+            if count % self.resolve_batch_size == 0:
+                await asyncio.sleep(0)
+        return encoder.get_payload()
+
+    @staticmethod
+    def write_checkpoint(payload, checkpoint_path: str):
+        write_checkpoint_file(dumps_payload(payload), checkpoint_path)
+
+    def schedule_checkpoint(self):
+        """
+        Start a background checkpoint if ``checkpoint_interval`` has elapsed since the last one.
+        """
+        if self.checkpoint_path is None:
+            return
+        if self.checkpoint_task is not None and not self.checkpoint_task.done():
+            return
+        if time.time() - self.last_checkpoint_time < self.checkpoint_interval:
+            return
+        loop = asyncio.get_running_loop()
+        self.checkpoint_task = loop.create_task(
+            self.periodic_checkpoint(), name="takler.server.scheduler.checkpoint")
+
+    async def periodic_checkpoint(self):
+        try:
+            await self.checkpoint()
+        except Exception as e:
+            logger.error(f"checkpoint failed: {e}")
+
+    # Journal -------------------------------------------------
+
+    def record_command(self, command: str, blob: Optional[str] = None, **arguments):
+        """
+        Append an applied command into journal. Nothing is recorded when journal is not opened,
+        such as when commands are replayed.
+
+        ``blob`` is name of a blob file with large payload of the command, see ``write_journal_blob``.
+        """
+        if self.journal is None or not self.journal.is_open:
+            return
+        self.journal.append(command, arguments, blob=blob)
+
+    def write_journal_blob(self, data: bytes) -> Optional[str]:
+        """
+        Write large payload of a command into a journal blob file, should run in worker pool.
+
+        Returns
+        -------
+        Optional[str]
+            blob name, None if journal is not opened.
+        """
+        if self.journal is None or not self.journal.is_open:
+            return None
+        return self.journal.write_blob(data)
+
+    async def sync_journal(self):
+        """
+        Wait until recorded commands are on disk. Service should call it before replying to clients.
         """
-        for name, flow in self.bunch.flows.items():
-            flow.resolve_dependencies()
+        if self.journal is not None:
+            await self.journal.sync()
+
+    async def replay_journal(self, after_sequence: int) -> int:
+        """
+        Apply commands in journal after ``after_sequence``.
+
+        Returns
+        -------
+        int
+            sequence number of the last record in journal.
+        """
+        logger.info(f"replay journal after {after_sequence}...")
+        sequence = after_sequence
+        count = 0
+        for record in read_journal(self.journal.journal_path, after_sequence):
+            try:
+                await self.apply_journal_record(record)
+            except Exception as e:
+                logger.warning(f"journal record {record.sequence} ({record.command}) is not applied: {e}")
+            sequence = record.sequence
+            count += 1
+        logger.info(f"replay journal...done [{count} records]")
+        return sequence
+
+    async def apply_journal_record(self, record: JournalRecord):
+        if record.command not in JOURNAL_COMMANDS:
+            raise ValueError(f"journal command is not supported: {record.command}")
+        arguments = record.arguments
+        if record.command == "batch":
+            arguments = dict(actions=[ChildAction(*action) for action in arguments["actions"]])
+        elif record.command == "load":
+            if record.blob is not None:
+                flow_bytes = read_blob(self.journal.journal_path, record.blob)
+            else:
+                flow_bytes = base64.b64decode(arguments["flow_bytes"])
+            arguments = dict(flow_type=arguments["flow_type"], flow_bytes=flow_bytes)
+        await self.apply_command(record.command, arguments)
 
     # Child command -------------------------------------------------
 
@@ -134,6 +641,7 @@ class Scheduler:
             node.init(task_id)
         else:
             raise ValueError(f"node must be Task: {node_path}")
+        self.record_command("init", node_path=node_path, task_id=task_id)
 
     def run_command_complete(self, node_path: str):
         """
@@ -161,6 +669,7 @@ class Scheduler:
             node.complete()
         else:
             raise ValueError(f"node must be Task: {node_path}")
+        self.record_command("complete", node_path=node_path)
 
     def run_command_abort(self, node_path: str, reason: Optional[str] = None):
         """
@@ -190,6 +699,7 @@ class Scheduler:
             node.abort(reason)
         else:
             raise ValueError(f"node must be Task: {node_path}")
+        self.record_command("abort", node_path=node_path, reason=reason)
 
     def run_command_event(self, node_path: str, event_name: str):
         """
@@ -211,6 +721,7 @@ class Scheduler:
             raise ValueError(f"node is not found: {node_path}")
 
         node.set_event(event_name, True)
+        self.record_command("event", node_path=node_path, event_name=event_name)
 
     def run_command_meter(self, node_path: str, meter_name: str, meter_value: str):
         """
@@ -234,6 +745,79 @@ class Scheduler:
             raise ValueError(f"node is not found: {node_path}")
 
         node.set_meter(meter_name, int(meter_value))
+        self.record_command("meter", node_path=node_path, meter_name=meter_name, meter_value=meter_value)
+
+    def run_command_batch(self, actions: List[ChildAction]):
+        """
+        Run an ordered list of child commands atomically.
+
+        All actions are checked before any of them is applied, so either all actions are applied or none.
+        Actions are applied without awaiting, so no other command or main loop runs between them.
+
+        Parameters
+        ----------
+        actions
+            child actions in order.
+
+        Raises
+        ------
+        ValueError
+            If some action is invalid, and no action is applied.
+        """
+        nodes = [self.check_child_action(action) for action in actions]
+        with self.bunch.status_propagation.batch():
+            for node, action in zip(nodes, actions):
+                self.apply_child_action(node, action)
+        self.record_command("batch", actions=[list(action) for action in actions])
+
+    def check_child_action(self, action: ChildAction) -> Node:
+        """
+        Check a child action can be applied, return the node of the action.
+
+        Raises
+        ------
+        ValueError
+            If node, event or meter is not found, node is not a ``Task`` for status commands,
+            or meter value is invalid.
+        """
+        node = self.bunch.find_node(action.node_path)
+        if node is None:
+            raise ValueError(f"node is not found: {action.node_path}")
+
+        if action.command in ("init", "complete", "abort"):
+            if not isinstance(node, Task):
+                raise ValueError(f"node must be Task: {action.node_path}")
+        elif action.command == "event":
+            event_name = action.arguments["event_name"]
+            if node.find_event(event_name) is None:
+                raise ValueError(f"event is not found: {action.node_path}:{event_name}")
+        elif action.command == "meter":
+            meter_name = action.arguments["meter_name"]
+            meter = node.find_meter(meter_name)
+            if meter is None:
+                raise ValueError(f"meter is not found: {action.node_path}:{meter_name}")
+            try:
+                meter_value = int(action.arguments["meter_value"])
+            except ValueError:
+                raise ValueError(f"meter value must be an integer: {action.node_path}:{meter_name}")
+            if meter.is_invalid(meter_value):
+                raise ValueError(f"meter value is out of range: {action.node_path}:{meter_name} {meter_value}")
+        else:
+            raise ValueError(f"child command is not supported: {action.command}")
+
+        return node
+
+    def apply_child_action(self, node: Node, action: ChildAction):
+        if action.command == "init":
+            node.init(action.arguments.get("task_id", ""))
+        elif action.command == "complete":
+            node.complete()
+        elif action.command == "abort":
+            node.abort(action.arguments.get("reason", ""))
+        elif action.command == "event":
+            node.set_event(action.arguments["event_name"], True)
+        elif action.command == "meter":
+            node.set_meter(action.arguments["meter_name"], int(action.arguments["meter_value"]))
 
     # Control -------------------------------------------------
 
@@ -260,6 +844,7 @@ class Scheduler:
             raise ValueError(f"node is not found: {node_path}")
 
         node.requeue()
+        self.record_command("requeue", node_path=node_path)
 
     def run_command_suspend(self, node_path: str):
         """
@@ -284,6 +869,7 @@ class Scheduler:
             raise ValueError(f"node is not found: {node_path}")
 
         node.suspend()
+        self.record_command("suspend", node_path=node_path)
 
     def run_command_resume(self, node_path: str):
         """
@@ -308,6 +894,7 @@ class Scheduler:
             raise ValueError(f"node is not found: {node_path}")
 
         node.resume()
+        self.record_command("resume", node_path=node_path)
 
     def run_command_run(self, node_path: str, force: bool = False) -> bool:
         """
@@ -387,14 +974,17 @@ class Scheduler:
                 variable.sink_status_change(node_status)
             else:
                 variable.set_node_status(node_status)
+            self.record_command("force", variable_path=variable_path, state=state, recursive=recursive)
             return True
         elif isinstance(variable, Event):
+            node = self.bunch.find_node(variable_path.split(":")[0])
             if state == "set":
-                variable.value = True
+                node.set_event(variable.name, True)
             elif state == "clear":
-                variable.value = False
+                node.set_event(variable.name, False)
             else:
                 raise ValueError(f"state {state} is not supported for Event")
+            self.record_command("force", variable_path=variable_path, state=state, recursive=recursive)
             return True
         return True
 
@@ -416,6 +1006,7 @@ class Scheduler:
         if node is None:
             raise ValueError(f"node is not found: {node_path}")
         node.free_dependencies(dep_type)
+        self.record_command("free_dep", node_path=node_path, dep_type=dep_type)
 
     def run_command_load(self, flow_type: str, flow_bytes: bytes):
         """
@@ -427,6 +1018,7 @@ class Scheduler:
             type of flow, support:
 
                 * json: json string
+                * compact: compact binary format, see ``takler.core.compact_flow``
 
         flow_bytes
             string bytes of flow's definition.
@@ -435,21 +1027,123 @@ class Scheduler:
         -------
         None
         """
-        if flow_type == "json":
-            logger.info("load json flow...")
-            flow_dict = json.loads(flow_bytes)
-            flow: Flow = Flow.from_dict(d=flow_dict, method=SerializationType.Tree)
-            self.bunch.add_flow(flow)
+        flow, blob = self.create_journal_load_flow(flow_type, flow_bytes)
+        self.run_command_attach_load(flow, flow_type=flow_type, blob=blob)
+
+    async def run_command_load_stream(self, flow_type: str, chunks: AsyncIterator[bytes]) -> Flow:
+        """
+        Load a new flow into bunch from chunks of string bytes, used by client-streaming load RPC.
+
+        Chunks are buffered as they arrive. The flow is created and requeued in worker pool
+        without blocking the event loop, and is attached to the bunch in one step only after it is fully built.
+        So the scheduler loop and other commands never see a partly loaded flow.
+
+        Parameters
+        ----------
+        flow_type
+            type of flow, see ``run_command_load``.
+        chunks
+            chunks of string bytes of flow's definition.
+
+        Returns
+        -------
+        Flow
+            the loaded flow.
+        """
+        check_load_flow_type(flow_type)
+        buffer = bytearray()
+        async for chunk in chunks:
+            buffer.extend(chunk)
+        return await self.run_command_load_async(flow_type=flow_type, flow_bytes=bytes(buffer))
+
+    async def run_command_load_async(self, flow_type: str, flow_bytes: bytes) -> Flow:
+        """
+        Load a new flow into bunch as ``run_command_load`` does, but create the flow in worker pool.
+
+        The created flow is attached by command ``attach_load`` through ``command_queue``,
+        so it is applied by main loop in order with other commands.
+
+        Returns
+        -------
+        Flow
+            the loaded flow.
+        """
+        flow, blob = await asyncio.to_thread(self.create_journal_load_flow, flow_type, flow_bytes)
+        try:
+            return await self.submit_command("attach_load", flow=flow, flow_type=flow_type, blob=blob)
+        except Exception:
+            if blob is not None:
+                await asyncio.to_thread(self.journal.delete_blob, blob)
+            raise
+
+    def create_journal_load_flow(self, flow_type: str, flow_bytes: bytes) -> Tuple[Flow, Optional[str]]:
+        """
+        Create a flow by ``create_load_flow``, and write flow bytes into a journal blob file for command load.
+        Can run in a worker thread.
+
+        Returns
+        -------
+        Tuple[Flow, Optional[str]]
+            the created flow, and blob name (None if journal is not opened).
+        """
+        flow = self.create_load_flow(flow_type, flow_bytes, self.bunch.compile_expressions)
+        blob = self.write_journal_blob(flow_bytes)
+        return flow, blob
+
+    @staticmethod
+    def create_load_flow(flow_type: str, flow_bytes: bytes, compile_expressions: bool = False) -> Flow:
+        """
+        Create a requeued flow with parsed triggers from string bytes for command load.
+
+        The flow is built in a private staging bunch, whose node path index is used to find trigger references,
+        and is detached from it before returned. So this method doesn't touch the scheduler's bunch and
+        can run in a worker thread. Parsed ASTs are registered in ``DependencyIndex`` by ``Bunch.add_flow``
+        when the flow is attached.
+
+        Raises
+        ------
+        ValueError
+            If some trigger references a node not found.
+        """
+        check_load_flow_type(flow_type)
+        logger.info(f"load {flow_type} flow...")
+        # parsing and requeue create many objects, see ``gc_paused``.
+        with gc_paused():
+            if flow_type == "json":
+                flow_dict = json.loads(flow_bytes)
+                flow: Flow = Flow.from_dict(d=flow_dict, method=SerializationType.Tree)
+            else:
+                flow: Flow = loads_compact_flow(flow_bytes, method=SerializationType.Tree)
+
+            staging_bunch = Bunch()
+            staging_bunch.compile_expressions = compile_expressions
+            staging_bunch.add_flow(flow)
+            staging_bunch.dependency_index.add_tree(flow, parse=True)
             # TODO: should use begin to start flow running.
             flow.requeue()
-            logger.info(f"load json flow...done [flow name: {flow.name}]")
-        else:
-            logger.warning(f"flow type {flow_type} is not supported for command load.")
-            raise RuntimeError(f"flow type {flow_type} is not supported for command load.")
+            # staging bunch is dropped, so its indexes are not cleaned.
+            flow.bunch = None
+        return flow
+
+    def run_command_attach_load(self, flow: Flow, flow_type: str, blob: Optional[str] = None) -> Flow:
+        """
+        Add a flow created by ``create_load_flow`` into bunch, and record the load command in journal.
+        The command is not written into journal itself, and is replayed by command ``load``
+        with flow bytes in journal blob file ``blob``.
+
+        ``Bunch.add_flow`` marks the whole flow dirty, so all nodes are resolved in next pass,
+        and main loop is woken up for it.
+        """
+        with gc_paused():
+            self.bunch.add_flow(flow)
+        self.wakeup()
+        self.record_command("load", blob=blob, flow_type=flow_type)
+        logger.info(f"load {flow_type} flow...done [flow name: {flow.name}]")
+        return flow
 
     # Query -------------------------------------------------
 
-    def handle_request_show(
+    async def handle_request_show(
             self,
             show_parameter: bool,
             show_trigger: bool,
@@ -457,16 +1151,116 @@ class Scheduler:
             show_event: bool,
             show_meter: bool,
     ) -> str:
+        """
+        Print all flows in bunch.
+
+        Yield to event loop every ``resolve_batch_size`` nodes, see ``pre_order_travel_cooperative``.
+        """
         stream = StringIO()
 
-        for name, flow in self.bunch.flows.items():
-            pre_order_travel(flow, PrintVisitor(
+        for flow in list(self.bunch.flows.values()):
+            await pre_order_travel_cooperative(flow, PrintVisitor(
                 stream=stream,
                 show_parameter=show_parameter,
                 show_trigger=show_trigger,
                 show_limit=show_limit,
                 show_event=show_event,
                 show_meter=show_meter,
-            ))
+            ), batch_size=self.resolve_batch_size)
 
         return stream.getvalue()
+
+    def query_nodes(
+            self,
+            node_path: Optional[str] = None,
+            max_depth: int = 0,
+            status: Optional[Set[NodeStatus]] = None,
+            after: Optional[str] = None,
+            limit: Optional[int] = None,
+    ) -> Tuple[List[Node], Optional[str]]:
+        """
+        Find nodes in a subtree in pre-order, filtered by node status.
+
+        Traversal stops when a page is full, and next page resumes from the last returned node,
+        so each page is cheap and listing a large bunch page by page is linear.
+
+        Parameters
+        ----------
+        node_path
+            root node path of the subtree, None or empty string for all flows.
+        max_depth
+            number of levels to return, 1 for root node only, 0 for all levels.
+        status
+            only return nodes in these status, None for all status.
+        after
+            node path of the last node in previous page, None for the first page.
+        limit
+            max number of returned nodes, None for all.
+
+        Returns
+        -------
+        Tuple[List[Node], Optional[str]]
+            matched nodes, and node path of the last node if there are more nodes (None for the last page).
+
+        Raises
+        ------
+        ValueError
+            If node is not found, or ``after`` is not a node in the subtree.
+        """
+        if node_path:
+            root = self.bunch.find_node(node_path)
+            if root is None:
+                raise ValueError(f"node is not found: {node_path}")
+            roots = [root]
+        else:
+            roots = list(self.bunch.flows.values())
+
+        if after:
+            stack = self.create_query_resume_stack(roots, after, max_depth)
+        else:
+            stack = [(node, 1) for node in reversed(roots)]
+
+        nodes = []
+        while len(stack) > 0:
+            node, depth = stack.pop()
+            if status is None or node.state.node_status in status:
+                if limit is not None and len(nodes) == limit:
+                    return nodes, nodes[-1].node_path
+                nodes.append(node)
+            if max_depth <= 0 or depth < max_depth:
+                for child in reversed(node.children):
+                    stack.append((child, depth + 1))
+
+        return nodes, None
+
+    def create_query_resume_stack(self, roots: List[Node], after: str, max_depth: int) -> List[Tuple[Node, int]]:
+        """
+        Create traversal stack of ``query_nodes`` to continue pre-order traversal after some node.
+
+        The stack holds children of the node, and next siblings of the node and its ancestors up to ``roots``.
+        """
+        last_node = self.bunch.find_node(after)
+        if last_node is None:
+            raise ValueError(f"page token is invalid: {after}")
+
+        # path from query root down to last node.
+        chain = [last_node]
+        while not any(chain[-1] is root for root in roots):
+            parent = chain[-1].parent
+            if parent is None:
+                raise ValueError(f"page token is invalid: {after}")
+            chain.append(parent)
+        chain.reverse()
+
+        root_index = next(i for i, root in enumerate(roots) if root is chain[0])
+        stack = [(node, 1) for node in reversed(roots[root_index + 1:])]
+        for depth in range(2, len(chain) + 1):
+            node = chain[depth - 1]
+            siblings = node.parent.children
+            for sibling in reversed(siblings[node.parent.find_child_index(node) + 1:]):
+                stack.append((sibling, depth))
+        depth = len(chain)
+        if max_depth <= 0 or depth < max_depth:
+            for child in reversed(last_node.children):
+                stack.append((child, depth + 1))
+        return stack
@@ -0,0 +1,250 @@
+import asyncio
+from collections import deque
+from itertools import islice
+from typing import Optional, List, Dict, Tuple, Deque, AsyncIterator
+
+from takler.core import Bunch
+from takler.core.node import Node
+from takler.server.protocol import takler_pb2
+from takler.visitor import pre_order_travel, NodeVisitor
+
+
+DEFAULT_MAX_DELTAS = 10000
+
+# (kind, name, value) of event, meter, limit and repeat.
+AttributeRecord = Tuple[str, str, str]
+
+
+class NodeState:
+    """
+    Visible state of a node which is sent to subscribers.
+    """
+    __slots__ = ("status", "suspended", "attributes")
+
+    def __init__(self, node: Node):
+        self.status: str = node.state.node_status.name
+        self.suspended: bool = node.state.suspended
+        attributes: List[AttributeRecord] = []
+        for event in node.events:
+            attributes.append(("event", event.name, "set" if event.value else "unset"))
+        for meter in node.meters:
+            attributes.append(("meter", meter.name, str(meter.value)))
+        for limit in node.limits:
+            attributes.append(("limit", limit.name, str(limit.value)))
+        if node.repeat is not None:
+            attributes.append(("repeat", node.repeat.r.name, str(node.repeat.value())))
+        self.attributes: Tuple[AttributeRecord, ...] = tuple(attributes)
+
+    def to_record(self, node_path: str) -> takler_pb2.NodeRecord:
+        return takler_pb2.NodeRecord(
+            node_path=node_path,
+            status=self.status,
+            suspended=self.suspended,
+            attributes=[
+                takler_pb2.AttributeValue(kind=kind, name=name, value=value)
+                for kind, name, value in self.attributes
+            ]
+        )
+
+
+class CollectVisitor(NodeVisitor):
+    def __init__(self):
+        super(CollectVisitor, self).__init__()
+        self.states: Dict[str, NodeState] = dict()
+
+    def visit(self, node: Node):
+        self.states[node.node_path] = NodeState(node)
+
+
+class SubscriptionHub:
+    """
+    Publish status changes of a bunch to subscribers: one full snapshot, then incremental deltas.
+
+    Changed nodes are recorded by ``ChangeTracker`` of the bunch. All changes in one event loop iteration
+    are published once: visible states of changed nodes are compared with the last published states,
+    and each difference becomes a ``NodeDelta`` with an increasing sequence number.
+    Deltas are converted to protobuf messages once and shared by all subscribers,
+    so the cost of a subscriber is only sending messages.
+
+    Recent deltas are kept to let subscribers resume from a sequence number after reconnecting.
+    If the sequence is too old, or nodes are added or deleted after it, a new snapshot is sent.
+
+    Attributes
+    ----------
+    bunch
+        bunch to be watched.
+    sequence
+        sequence number of the last published change.
+    snapshot_sequence
+        sequence number when node tree is changed. Subscribers before this sequence must receive a snapshot.
+    states
+        last published state for each node path.
+    deltas
+        recent deltas, sequence numbers are continuous.
+    """
+    def __init__(self, bunch: Bunch, max_deltas: int = DEFAULT_MAX_DELTAS):
+        self.bunch: Bunch = bunch
+        self.sequence: int = 0
+        self.snapshot_sequence: int = 0
+        self.states: Dict[str, NodeState] = dict()
+        self.structure_version: int = -1
+        self.deltas: Deque[takler_pb2.NodeDelta] = deque(maxlen=max_deltas)
+        self.last_response: Optional[Tuple[int, takler_pb2.SubscribeResponse]] = None
+        self.update_event: Optional[asyncio.Event] = None
+        self.subscriber_count: int = 0
+
+    def start(self):
+        """
+        Start recording changes of the bunch.
+        """
+        self.collect_states()
+        self.bunch.change_tracker.listener = self.schedule_publish
+
+    def stop(self):
+        self.bunch.change_tracker.listener = None
+        self.bunch.change_tracker.pop_changes()
+
+    # Publish ------------------------------------------------------
+
+    def schedule_publish(self):
+        """
+        Publish changes in next event loop iteration. Publish at once if there is no running loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.publish()
+            return
+        loop.call_soon(self.publish)
+
+    def publish(self):
+        """
+        Compare changed nodes with published states, create deltas and wake up subscribers.
+        """
+        nodes, structure_changed = self.bunch.change_tracker.pop_changes()
+        if structure_changed or self.structure_version != self.bunch.structure_version.value:
+            self.collect_states()
+            self.sequence += 1
+            self.snapshot_sequence = self.sequence
+            self.deltas.clear()
+            self.last_response = None
+        else:
+            start_sequence = self.sequence
+            new_deltas = []
+            for node in nodes:
+                node_path = node.node_path
+                old_state = self.states.get(node_path, None)
+                if old_state is None:
+                    continue
+                new_state = NodeState(node)
+                self.states[node_path] = new_state
+                self.compare_state(node_path, old_state, new_state, new_deltas)
+
+            if len(new_deltas) == 0:
+                return
+
+            self.deltas.extend(new_deltas)
+            self.last_response = (
+                start_sequence,
+                takler_pb2.SubscribeResponse(deltas=takler_pb2.DeltaBatch(deltas=new_deltas))
+            )
+
+        if self.update_event is not None:
+            self.update_event.set()
+            self.update_event = None
+
+    def compare_state(self, node_path: str, old_state: NodeState, new_state: NodeState, deltas: List):
+        if old_state.status != new_state.status:
+            self.add_delta(deltas, node_path, "status", "", new_state.status)
+        if old_state.suspended != new_state.suspended:
+            self.add_delta(deltas, node_path, "suspended", "", "true" if new_state.suspended else "false")
+        if old_state.attributes != new_state.attributes:
+            for old_attribute, new_attribute in zip(old_state.attributes, new_state.attributes):
+                if old_attribute != new_attribute:
+                    kind, name, value = new_attribute
+                    self.add_delta(deltas, node_path, kind, name, value)
+
+    def add_delta(self, deltas: List, node_path: str, field: str, name: str, value: str):
+        self.sequence += 1
+        deltas.append(takler_pb2.NodeDelta(
+            sequence=self.sequence,
+            node_path=node_path,
+            field=field,
+            name=name,
+            value=value,
+        ))
+
+    def collect_states(self):
+        visitor = CollectVisitor()
+        for flow in self.bunch.flows.values():
+            pre_order_travel(flow, visitor)
+        self.states = visitor.states
+        self.structure_version = self.bunch.structure_version.value
+
+    # Subscribe ------------------------------------------------------
+
+    def create_snapshot(self) -> takler_pb2.SubscribeResponse:
+        return takler_pb2.SubscribeResponse(
+            snapshot=takler_pb2.Snapshot(
+                sequence=self.sequence,
+                nodes=[state.to_record(node_path) for node_path, state in self.states.items()]
+            )
+        )
+
+    def get_deltas(self, sequence: int) -> Optional[List[takler_pb2.NodeDelta]]:
+        """
+        Get deltas after ``sequence``. Return None if a snapshot is required.
+        """
+        if sequence > self.sequence or sequence < self.snapshot_sequence:
+            return None
+        if sequence == self.sequence:
+            return []
+        if len(self.deltas) == 0 or self.deltas[0].sequence > sequence + 1:
+            return None
+        return list(islice(self.deltas, sequence + 1 - self.deltas[0].sequence, None))
+
+    def get_update(self, sequence: Optional[int]) -> Optional[takler_pb2.SubscribeResponse]:
+        """
+        Get the response for a subscriber which has received changes until ``sequence``.
+
+        Returns
+        -------
+        Optional[takler_pb2.SubscribeResponse]
+            None if there is no new change.
+        """
+        if sequence is None:
+            return self.create_snapshot()
+        if self.last_response is not None and self.last_response[0] == sequence:
+            return self.last_response[1]
+        deltas = self.get_deltas(sequence)
+        if deltas is None:
+            return self.create_snapshot()
+        if len(deltas) == 0:
+            return None
+        return takler_pb2.SubscribeResponse(deltas=takler_pb2.DeltaBatch(deltas=deltas))
+
+    async def subscribe(self, sequence: Optional[int] = None) -> AsyncIterator[takler_pb2.SubscribeResponse]:
+        """
+        Yield a snapshot (or deltas after ``sequence``) and then deltas until cancelled.
+
+        Parameters
+        ----------
+        sequence
+            last sequence received by the subscriber, None to start with a snapshot.
+        """
+        self.subscriber_count += 1
+        try:
+            while True:
+                if self.update_event is None:
+                    self.update_event = asyncio.Event()
+                update_event = self.update_event
+
+                response = self.get_update(sequence)
+                if response is not None:
+                    sequence = self.sequence
+                    yield response
+                    continue
+
+                await update_event.wait()
+        finally:
+            self.subscriber_count -= 1
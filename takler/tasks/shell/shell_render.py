@@ -32,51 +32,48 @@ class ShellRender(object):
         * ``TAKLER_INCLUDE``: template search directory list, split by ``:``
         * ``TAKLER_JOB``: generated job script path
         """
-        script_path = Path(script_path)
-        loader_paths = [script_path.parent]
-        loader_paths.extend(self.get_include_paths())
-
-        template_params = self.template_params()
-
-        file_loader = FileSystemLoader(loader_paths)
-        env = Environment(loader=file_loader)
-
-        # TODO: may raise exception
-        template = env.get_template(script_path.name)
-        job_script_content = template.render(**template_params)
-
-        job_script_path = Path(self.node.find_parameter(TAKLER_JOB).value)
-        job_script_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(job_script_path, "w") as f:
-            f.write(job_script_content)
-
-        return job_script_path
+        return render_job_script(
+            script_path=script_path,
+            include_paths=self.get_include_paths(),
+            template_params=self.template_params(),
+            job_script_path=self.node.find_parameter(TAKLER_JOB).value,
+        )
 
     def render_job_command(self) -> str:
         """
         render job command from ``TAKLER_SHELL_JOB_CMD`` or use ``DEFAULT_TAKLER_SHELL_JOB_CMD`` if not set.
         """
-        # get job command, default is ``DEFAULT_TAKLER_SHELL_JOB_CMD``
-        job_command_param = self.node.find_parent_parameter(TAKLER_SHELL_JOB_CMD)
-        if job_command_param is not None:
-            job_command = job_command_param.value
-        else:
-            job_command = DEFAULT_TAKLER_SHELL_JOB_CMD
-
-        command = self.render_command(job_command)
-        return command
+        return self.render_command(self.get_job_command())
 
     def render_command(self, command: str) -> str:
         """
         render command string using node's parameters.
         """
-        template_params = self.template_params()
+        return render_command(command, self.template_params())
 
-        env = Environment()
-        template = env.from_string(command)
+    def get_job_command(self) -> str:
+        """
+        Get job command template from ``TAKLER_SHELL_JOB_CMD``, default is ``DEFAULT_TAKLER_SHELL_JOB_CMD``.
+        """
+        job_command_param = self.node.find_parent_parameter(TAKLER_SHELL_JOB_CMD)
+        if job_command_param is not None:
+            return job_command_param.value
+        else:
+            return DEFAULT_TAKLER_SHELL_JOB_CMD
 
-        rendered_command = template.render(**template_params)
-        return rendered_command
+    def create_job(self, script_path: Union[str, Path]) -> "ShellJob":
+        """
+        Copy everything needed to create the job from node into a ``ShellJob``.
+        """
+        return ShellJob(
+            node_path=self.node.node_path,
+            try_no=self.node.try_no,
+            script_path=script_path,
+            include_paths=self.get_include_paths(),
+            template_params=dict(self.template_params()),
+            job_script_path=self.node.find_parameter(TAKLER_JOB).value,
+            job_command=self.get_job_command(),
+        )
 
     def get_include_paths(self) -> List[str]:
         """
@@ -107,3 +104,100 @@ class ShellRender(object):
         template_params = {key: p.value for key, p in params.items()}
         self._template_params = template_params
         return self._template_params
+
+
+class ShellJob(object):
+    """
+    Job of a ``ShellScriptTask`` with all data copied from the node tree.
+
+    ``create`` renders and writes job script without touching the node, so it can run in a worker thread.
+
+    Attributes
+    ----------
+    node_path
+        node path of the task.
+    try_no
+        try no of the task when the job is created.
+    script_path
+        shell script template path.
+    include_paths
+        template search directories, see ``ShellRender.get_include_paths``.
+    template_params
+        parameters of the task used to render script and job command.
+    job_script_path
+        generated job script path, value of ``TAKLER_JOB``.
+    job_command
+        job command template, see ``ShellRender.get_job_command``.
+    """
+    def __init__(
+            self,
+            node_path: str,
+            try_no: int,
+            script_path: Union[str, Path],
+            include_paths: List[str],
+            template_params: Dict[str, Any],
+            job_script_path: Union[str, Path],
+            job_command: str,
+    ):
+        self.node_path: str = node_path
+        self.try_no: int = try_no
+        self.script_path: Union[str, Path] = script_path
+        self.include_paths: List[str] = include_paths
+        self.template_params: Dict[str, Any] = template_params
+        self.job_script_path: Union[str, Path] = job_script_path
+        self.job_command: str = job_command
+
+    def create(self) -> str:
+        """
+        Render and write job script, and return rendered run command.
+        """
+        job_script_path = render_job_script(
+            script_path=self.script_path,
+            include_paths=self.include_paths,
+            template_params=self.template_params,
+            job_script_path=self.job_script_path,
+        )
+        job_script_path.chmod(0o755)
+        return render_command(self.job_command, self.template_params)
+
+
+def render_job_script(
+        script_path: Union[str, Path],
+        include_paths: List[str],
+        template_params: Dict[str, Any],
+        job_script_path: Union[str, Path],
+) -> Path:
+    """
+    Render shell script template with Jinja2 and write job script to file system.
+
+    Returns
+    -------
+    Path
+        job script path.
+    """
+    script_path = Path(script_path)
+    loader_paths = [script_path.parent]
+    loader_paths.extend(include_paths)
+
+    file_loader = FileSystemLoader(loader_paths)
+    env = Environment(loader=file_loader)
+
+    # TODO: may raise exception
+    template = env.get_template(script_path.name)
+    job_script_content = template.render(**template_params)
+
+    job_script_path = Path(job_script_path)
+    job_script_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(job_script_path, "w") as f:
+        f.write(job_script_content)
+
+    return job_script_path
+
+
+def render_command(command: str, template_params: Dict[str, Any]) -> str:
+    """
+    Render command string with Jinja2.
+    """
+    env = Environment()
+    template = env.from_string(command)
+    return template.render(**template_params)
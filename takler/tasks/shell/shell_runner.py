@@ -16,10 +16,19 @@ class ShellRunner:
 
             /bin/sh -c command_string
         """
-        async def run_shell_command():
-            await run_process(["/bin/sh", "-c", command])
         loop = asyncio.get_running_loop()
-        t = loop.create_task(run_shell_command())
+        t = loop.create_task(self.run(command))
+
+    async def run(self, command: str):
+        """
+        Run command in sub progress using ``anyio.run_process`` and wait until it exits.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            If command exits with non-zero code.
+        """
+        await run_process(["/bin/sh", "-c", command])
 
     def spwan_v2(self, command: str):
         """
@@ -1,9 +1,10 @@
-from typing import Union, Optional, Dict
+import asyncio
+from typing import Union, Optional, Dict, Tuple, Set
 from pathlib import Path
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from takler.core import Task, Parameter, Flow
+from takler.core import Task, Parameter, Flow, NodeStatus
 from takler.core.node import Node
 from takler.core.parameter import TAKLER_HOME
 from takler.logging import get_logger
@@ -17,12 +18,15 @@ from .constant import (
     JOB_SCRIPT_EXTENSION,
     JOB_OUTPUT_EXTENSION
 )
-from .shell_render import ShellRender
+from .shell_render import ShellRender, ShellJob
 from .shell_runner import ShellRunner
 
 
 logger = get_logger("tasks.shell")
 
+# job tasks created by ``ShellScriptTask.submit``, keep references until they are done.
+running_job_tasks: Set[asyncio.Task] = set()
+
 
 class ShellScriptTask(Task):
     """
@@ -39,7 +43,24 @@ class ShellScriptTask(Task):
 
         self.script_path = script_path
 
-        self.shell_generated_parameters = ShellScriptTaskGeneratedParameters(node=self)
+        # 生成参数，首次使用时创建
+        self._shell_generated_parameters: Optional[ShellScriptTaskGeneratedParameters] = None
+
+    @property
+    def shell_generated_parameters(self) -> "ShellScriptTaskGeneratedParameters":
+        if self._shell_generated_parameters is None:
+            self._shell_generated_parameters = ShellScriptTaskGeneratedParameters(node=self)
+        return self._shell_generated_parameters
+
+    # Serialization ---------------------------------------------
+
+    def checkpoint_state(self) -> Optional[Tuple]:
+        script_path = None if self.script_path is None else str(self.script_path)
+        return super(ShellScriptTask, self).checkpoint_state(), script_path
+
+    def restore_checkpoint_state(self, state: Tuple):
+        task_state, self.script_path = state
+        super(ShellScriptTask, self).restore_checkpoint_state(task_state)
 
     # Parameter -------------------------------------------------
 
@@ -78,25 +99,23 @@ class ShellScriptTask(Task):
 
     def submit(self) -> bool:
         """
-        Generate job script and run job command.
-        """
-        run_command = self.create_job_script()
+        Create job in event loop's default executor (worker pool of scheduler) and run job command.
 
-        # run command
-        shell_runner = ShellRunner()
-        shell_runner.spwan(command=run_command)
+        Only data for the job is collected from the node tree in event loop (see ``create_job``).
+        Rendering and writing job script run in a worker thread. If job creation fails,
+        the task is aborted in event loop.
+        """
+        job = self.create_job()
+        loop = asyncio.get_running_loop()
+        job_task = loop.create_task(self.run_job(job), name=f"takler.tasks.shell.job:{job.node_path}")
+        running_job_tasks.add(job_task)
+        job_task.add_done_callback(running_job_tasks.discard)
         return True
 
-    def create_job_script(self) -> str:
+    def create_job(self) -> ShellJob:
         """
-        Create job script and return run command.
-
-        Returns
-        -------
-        str
-            run command string.
+        Update generated parameters and copy data for job creation from the node tree.
         """
-
         self.update_generated_parameters()
 
         # get script path from TAKLER_SCRIPT
@@ -105,15 +124,42 @@ class ShellScriptTask(Task):
             raise ValueError("script param is empty")
         script_path = script_param.value
 
-        # render job script
-        shell_script = ShellRender(self)
+        return ShellRender(self).create_job(script_path)
+
+    async def run_job(self, job: ShellJob):
+        """
+        Create job script in worker pool, run the job command and wait until it exits.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            run_command = await loop.run_in_executor(None, job.create)
+        except Exception as e:
+            logger.error(f"Job generation failed: {job.node_path} {e}")
+            # task may be requeued or run again when job is created.
+            if self.try_no == job.try_no and self.state.node_status == NodeStatus.submitted:
+                self.abort(f"job generation failed: {e}")
+            return
+        logger.info(f"Job generation success: {job.job_script_path}")
+        logger.info(f"Render run command success: {run_command}")
+
+        shell_runner = ShellRunner()
+        try:
+            await shell_runner.run(command=run_command)
+        except Exception as e:
+            logger.warning(f"Job command failed: {job.node_path} {e}")
 
-        job_script_path = shell_script.render_script(script_path)
-        job_script_path.chmod(0o755)
-        logger.info(f"Job generation success: {job_script_path}")
+    def create_job_script(self) -> str:
+        """
+        Create job script and return run command.
 
-        # get run command
-        run_command = shell_script.render_job_command()
+        Returns
+        -------
+        str
+            run command string.
+        """
+        job = self.create_job()
+        run_command = job.create()
+        logger.info(f"Job generation success: {job.job_script_path}")
         logger.info(f"Render run command success: {run_command}")
         return run_command
 
@@ -124,9 +170,9 @@ class ShellScriptTask(Task):
 
 class ShellScriptTaskGeneratedParameters(BaseModel):
     node: ShellScriptTask
-    takler_script: Parameter = Parameter(TAKLER_SCRIPT, None)
-    takler_job: Parameter = Parameter(TAKLER_JOB, None)
-    takler_jobout: Parameter = Parameter(TAKLER_JOBOUT, None)
+    takler_script: Parameter = Field(default_factory=lambda: Parameter(TAKLER_SCRIPT, None))
+    takler_job: Parameter = Field(default_factory=lambda: Parameter(TAKLER_JOB, None))
+    takler_jobout: Parameter = Field(default_factory=lambda: Parameter(TAKLER_JOBOUT, None))
 
     class Config:
         arbitrary_types_allowed = True
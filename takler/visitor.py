@@ -1,3 +1,4 @@
+import asyncio
 from typing import IO, Optional
 from abc import ABC, abstractmethod
 
@@ -144,3 +145,32 @@ def pre_order_travel(root_node: Node, visitor: NodeVisitor):
         visitor.before_visit_child()
         pre_order_travel(child_node, visitor)
         visitor.after_visit_child()
+
+
+async def pre_order_travel_cooperative(root_node: Node, visitor: NodeVisitor, batch_size: int = 1000):
+    """
+    Same as ``pre_order_travel``, but yield to event loop after each ``batch_size`` visited nodes,
+    so other coroutines are not blocked by traveling a large tree.
+
+    Other coroutines may change the tree between batches. Each node is visited as it is when reached,
+    and children are visited from a copy of the children list taken when the parent is visited.
+    """
+    count = 0
+    visitor.visit(root_node)
+    # iterators of children lists, one for each level below root.
+    stack = [iter(list(root_node.children))]
+    while len(stack) > 0:
+        child_node = next(stack[-1], None)
+        if child_node is None:
+            stack.pop()
+            if len(stack) > 0:
+                visitor.after_visit_child()
+            continue
+
+        visitor.before_visit_child()
+        visitor.visit(child_node)
+        stack.append(iter(list(child_node.children)))
+
+        count += 1
+        if count % batch_size == 0:
+            await asyncio.sleep(0)
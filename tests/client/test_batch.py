@@ -0,0 +1,108 @@
+import time
+from concurrent import futures
+from typing import List
+
+import grpc
+import pytest
+
+from takler.client.batch import ChildCommandBuffer
+from takler.client.service_client import TaklerServiceClient, BatchRejectedError
+from takler.server.protocol import takler_pb2, takler_pb2_grpc
+
+
+class BatchServicer(takler_pb2_grpc.TaklerServerServicer):
+    """
+    Record applied batches. A batch with meter value "bad" is rejected, and a call fails if ``fail_count`` > 0.
+    """
+    def __init__(self):
+        self.batches: List[List[str]] = []
+        self.fail_count: int = 0
+
+    def RunCommandBatch(self, request, context):
+        if self.fail_count > 0:
+            self.fail_count -= 1
+            context.abort(grpc.StatusCode.INTERNAL, "server error")
+        for item in request.actions:
+            if item.WhichOneof("action") == "meter" and item.meter.meter_value == "bad":
+                return takler_pb2.ServiceResponse(flag=1, message="bad meter value")
+        self.batches.append([item.WhichOneof("action") for item in request.actions])
+        return takler_pb2.ServiceResponse(flag=0)
+
+
+@pytest.fixture
+def batch_server():
+    servicer = BatchServicer()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    takler_pb2_grpc.add_TaklerServerServicer_to_server(servicer, server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    yield servicer, port
+    server.stop(None)
+
+
+def test_buffer_flush(batch_server):
+    servicer, port = batch_server
+    client = TaklerServiceClient(host="localhost", port=port, persistent=True)
+    with ChildCommandBuffer(client, flush_size=3, flush_interval=None) as buffer:
+        buffer.init(node_path="/flow1/task1", task_id="1234")
+        for i in range(4):
+            buffer.meter(node_path="/flow1/task1", meter_name="meter1", meter_value=str(i))
+        buffer.event(node_path="/flow1/task1", event_name="event1")
+        assert len(buffer.actions) == 2
+        buffer.complete(node_path="/flow1/task1")
+
+    assert client.channel is None
+    assert servicer.batches == [
+        ["init"],
+        ["meter", "meter", "meter"],
+        ["meter", "event", "complete"],
+    ]
+
+
+def test_buffer_flush_interval(batch_server):
+    servicer, port = batch_server
+    client = TaklerServiceClient(host="localhost", port=port, persistent=True)
+    with ChildCommandBuffer(client, flush_size=100, flush_interval=0.1) as buffer:
+        buffer.meter(node_path="/flow1/task1", meter_name="meter1", meter_value="1")
+        buffer.event(node_path="/flow1/task1", event_name="event1")
+        for _ in range(50):
+            if len(servicer.batches) > 0:
+                break
+            time.sleep(0.1)
+        assert servicer.batches == [["meter", "event"]]
+        assert buffer.timer is None
+
+
+def test_buffer_flush_failed(batch_server):
+    servicer, port = batch_server
+    client = TaklerServiceClient(host="localhost", port=port, persistent=True)
+    buffer = ChildCommandBuffer(client, flush_size=100, flush_interval=None)
+    buffer.meter(node_path="/flow1/task1", meter_name="meter1", meter_value="1")
+    buffer.event(node_path="/flow1/task1", event_name="event1")
+
+    # actions are kept if request fails.
+    servicer.fail_count = 1
+    with pytest.raises(grpc.RpcError):
+        buffer.flush()
+    assert len(buffer.actions) == 2
+
+    buffer.flush()
+    assert len(buffer.actions) == 0
+    assert servicer.batches == [["meter", "event"]]
+    buffer.close()
+
+
+def test_buffer_flush_rejected(batch_server):
+    servicer, port = batch_server
+    client = TaklerServiceClient(host="localhost", port=port, persistent=True)
+    buffer = ChildCommandBuffer(client, flush_size=100, flush_interval=None)
+    buffer.meter(node_path="/flow1/task1", meter_name="meter1", meter_value="1")
+    buffer.meter(node_path="/flow1/task1", meter_name="meter1", meter_value="bad")
+    buffer.event(node_path="/flow1/task1", event_name="event1")
+
+    # valid actions are sent one by one after the batch is rejected.
+    with pytest.raises(BatchRejectedError):
+        buffer.flush()
+    assert len(buffer.actions) == 0
+    assert servicer.batches == [["meter"], ["event"]]
+    buffer.close()
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+
+# modules which should not be loaded by child commands.
+HEAVY_MODULES = [
+    "typer",
+    "pydantic",
+    "yaml",
+    "jinja2",
+    "lark",
+    "importlib.metadata",
+    "takler.core",
+    "takler.server.scheduler",
+    "takler.server.network_service",
+]
+
+
+def get_import_times(code: str) -> Dict[str, int]:
+    """
+    Run code in a new interpreter with ``-X importtime`` and return cumulative import time (us) of each module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    import_times = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        tokens = line[len("import time:"):].split("|")
+        if len(tokens) != 3 or not tokens[1].strip().isdigit():
+            continue
+        import_times[tokens[2].strip()] = int(tokens[1])
+    return import_times
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import takler.client.child",
+        "import takler.client.child; from takler.client.service_client import TaklerServiceClient",
+    ]
+)
+def test_child_import(code):
+    import_times = get_import_times(code)
+    assert "takler.client.child" in import_times
+    for module in HEAVY_MODULES:
+        assert module not in import_times, f"{module} is imported by child command"
+
+
+def test_child_parser():
+    from takler.client.child import create_parser
+    parser = create_parser()
+    args = parser.parse_args([
+        "meter", "--node-path", "/flow1/task1", "--meter-name", "meter1", "--meter-value", "10"
+    ])
+    assert args.command == "meter"
+    assert args.node_path == "/flow1/task1"
+    assert args.meter_name == "meter1"
+    assert args.meter_value == "10"
@@ -0,0 +1,84 @@
+from concurrent import futures
+from typing import List, Tuple
+
+import grpc
+import pytest
+
+from takler.client.service_client import TaklerServiceClient, ChannelOptions
+from takler.server.protocol import takler_pb2, takler_pb2_grpc
+
+
+class MeterServicer(takler_pb2_grpc.TaklerServerServicer):
+    def __init__(self):
+        self.meters: List[Tuple[str, str, str]] = []
+
+    def RunCommandMeter(self, request, context):
+        self.meters.append((request.child_options.node_path, request.meter_name, request.meter_value))
+        return takler_pb2.ServiceResponse(flag=0)
+
+
+@pytest.fixture
+def meter_server():
+    servicer = MeterServicer()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    takler_pb2_grpc.add_TaklerServerServicer_to_server(servicer, server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    yield servicer, port
+    server.stop(None)
+
+
+def test_channel_options():
+    options = ChannelOptions(keepalive_time_ms=1000, max_reconnect_backoff_ms=5000)
+    grpc_options = dict(options.grpc_options())
+    assert grpc_options["grpc.keepalive_time_ms"] == 1000
+    assert grpc_options["grpc.max_reconnect_backoff_ms"] == 5000
+    assert options.call_options() == dict(wait_for_ready=True, timeout=60.0)
+
+
+def test_normal_client(meter_server):
+    servicer, port = meter_server
+    client = TaklerServiceClient(host="localhost", port=port)
+    assert client.channel_options is None
+    client.meter(node_path="/flow1/task1", meter_name="meter1", meter_value="1")
+    assert client.channel is None
+    assert servicer.meters == [("/flow1/task1", "meter1", "1")]
+
+
+def test_persistent_client(meter_server):
+    servicer, port = meter_server
+    with TaklerServiceClient(host="localhost", port=port, persistent=True) as client:
+        channel = client.channel
+        assert channel is not None
+        for i in range(5):
+            client.meter(node_path="/flow1/task1", meter_name="meter1", meter_value=str(i))
+            assert client.channel is channel
+
+    assert client.channel is None
+    assert [m[2] for m in servicer.meters] == ["0", "1", "2", "3", "4"]
+
+
+class LoadServicer(takler_pb2_grpc.TaklerServerServicer):
+    def __init__(self):
+        self.chunks: List[takler_pb2.LoadChunk] = []
+
+    def RunCommandLoadStream(self, request_iterator, context):
+        self.chunks.extend(request_iterator)
+        return takler_pb2.ServiceResponse(flag=0)
+
+
+def test_run_command_load(tmp_path):
+    servicer = LoadServicer()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    takler_pb2_grpc.add_TaklerServerServicer_to_server(servicer, server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+
+    flow_file_path = tmp_path / "flow1.json"
+    flow_file_path.write_bytes(b"x" * 2500)
+    with TaklerServiceClient(host="localhost", port=port, persistent=True) as client:
+        client.run_command_load(flow_file_path=str(flow_file_path), flow_type="json", chunk_size=1000)
+    server.stop(None)
+
+    assert [len(chunk.data) for chunk in servicer.chunks] == [1000, 1000, 500]
+    assert [chunk.flow_type for chunk in servicer.chunks] == ["json", "", ""]
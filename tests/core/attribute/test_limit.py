@@ -1,7 +1,7 @@
 from pydantic import ConfigDict
 import pytest
 
-from takler.core import Limit, InLimit, Flow, Task
+from takler.core import Limit, InLimit, Flow, Task, Bunch, NodeStatus, AllocationPolicy
 from takler.core.limit import InLimitManager
 
 from ..conftest import SimpleFlow
@@ -73,6 +73,99 @@ def test_limit_reset():
     assert limit.value == 0
 
 
+def test_limit_pop_waiting_nodes():
+    limit = Limit("post_limit", 3)
+    limit.increment(1, "/flow1/task1")
+    task2 = Task("task2")
+    task3 = Task("task3")
+    task4 = Task("task4")
+    limit.add_waiting_node(task2, InLimit("post_limit", tokens=1))
+    limit.add_waiting_node(task3, InLimit("post_limit", tokens=3))
+    limit.add_waiting_node(task4, InLimit("post_limit", tokens=1))
+
+    # task3 doesn't fit in 2 free tokens.
+    assert limit.pop_waiting_nodes() == [task2, task4]
+    assert list(limit.waiting_nodes) == [task3]
+
+
+def test_limit_pop_waiting_nodes_fifo():
+    limit = Limit("post_limit", 2, policy=AllocationPolicy.fifo)
+    task1 = Task("task1")
+    task2 = Task("task2")
+    task3 = Task("task3")
+    limit.add_waiting_node(task1, InLimit("post_limit"))
+    limit.add_waiting_node(task2, InLimit("post_limit"))
+    limit.add_waiting_node(task3, InLimit("post_limit"))
+    limit.waiting_nodes[task1].queue_time = limit.waiting_nodes[task3].queue_time + 1
+
+    assert limit.pop_waiting_nodes() == [task2, task3]
+    assert limit.is_granted(task2)
+    assert not limit.is_granted(task1)
+
+    # granted task blocked again keeps its queue time.
+    queue_time = limit.granted_nodes[task2].queue_time
+    limit.add_waiting_node(task2, InLimit("post_limit"))
+    assert limit.waiting_nodes[task2].queue_time == queue_time
+
+
+def test_limit_pop_waiting_nodes_priority():
+    with Flow("flow1") as flow1:
+        limit = flow1.add_limit("post_limit", 2, policy="priority")
+        with flow1.add_container("bulk") as bulk:
+            for i in range(3):
+                bulk.add_task(f"task{i}")
+        with flow1.add_container("urgent") as urgent:
+            urgent.add_parameter("TAKLER_PRIORITY", 10)
+            urgent.add_task("task0")
+            with urgent.add_task("task1") as task:
+                task.add_parameter("TAKLER_PRIORITY", 20)
+
+    for node in bulk.children + urgent.children:
+        limit.add_waiting_node(node, InLimit("post_limit"))
+    assert limit.pop_waiting_nodes() == [urgent.children[1], urgent.children[0]]
+    assert limit.pop_waiting_nodes() == bulk.children[:2]
+
+
+def test_limit_pop_waiting_nodes_fair_share():
+    with Flow("flow1") as flow1:
+        limit = flow1.add_limit("post_limit", 4, policy="fair_share")
+        with flow1.add_container("family1") as family1:
+            for i in range(4):
+                family1.add_task(f"task{i}")
+        with flow1.add_container("family2") as family2:
+            family2.add_parameter("TAKLER_SHARE", 2)
+            for i in range(4):
+                family2.add_task(f"task{i}")
+
+    limit.increment(1, "/flow1/family1/task9")
+    for node in family1.children + family2.children:
+        limit.add_waiting_node(node, InLimit("post_limit"))
+    # tokens per share: family1 1/1, family2 0/2 -> 1/2 -> 2/2, then family1 queued earlier.
+    nodes = limit.pop_waiting_nodes()
+    assert [node.parent for node in nodes] == [family2, family2, family1]
+
+
+def test_limit_pop_waiting_nodes_fair_share_tokens():
+    with Flow("flow1") as flow1:
+        limit = flow1.add_limit("post_limit", 6, policy="fair_share")
+        with flow1.add_container("family1") as family1:
+            family1.add_task("task0")
+        with flow1.add_container("family2") as family2:
+            family2.add_task("task0")
+
+    # family1 holds 3 tokens with one task, family2 holds 2 tokens with two tasks.
+    limit.increment(3, "/flow1/family1/task9")
+    limit.increment(1, "/flow1/family2/task8")
+    limit.increment(1, "/flow1/family2/task9")
+    assert limit.node_tokens == {"/flow1/family1/task9": 3, "/flow1/family2/task8": 1, "/flow1/family2/task9": 1}
+    for node in family1.children + family2.children:
+        limit.add_waiting_node(node, InLimit("post_limit"))
+    assert limit.pop_waiting_nodes() == family2.children
+
+    limit.decrement(3, "/flow1/family1/task9")
+    assert limit.node_tokens == {"/flow1/family2/task8": 1, "/flow1/family2/task9": 1}
+
+
 #---------------------
 # InLimit
 #---------------------
@@ -496,3 +589,59 @@ def test_flow_limit(flow_with_limit):
     task5.complete()
     assert total_limit.value == 0
     assert section_limit.value == 0
+
+
+def test_in_limit_reference_cache(flow_with_limit):
+    flow1 = flow_with_limit.flow1
+    task1 = flow_with_limit.task1
+    task4 = flow_with_limit.task4
+    # references are cached only in a bunch.
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+
+    in_limits = task1.in_limit_manager.find_in_limits_up()
+    assert [item.limit for item in in_limits] == [flow_with_limit.section_limit, flow_with_limit.total_limit]
+    assert task1.in_limit_manager.find_in_limits_up() is in_limits
+
+    # new Limit and InLimit invalidate the cache.
+    container_limit = flow_with_limit.container1.add_limit("container_limit", 1)
+    in_limit = task4.add_in_limit("container_limit", node_path="/flow1/container1")
+    assert task4.find_blocking_in_limit() is None
+    container_limit.increment(1, "/flow1/container1/task1")
+    assert task4.find_blocking_in_limit() is in_limit
+
+    # reference node is deleted.
+    flow1.delete_child("container1")
+    assert task4.in_limit_manager.find_in_limits_up() == [flow_with_limit.total_limit_in_limit]
+    assert in_limit.limit is None
+
+
+def test_limit_policy_resolve():
+    """
+    Tasks of a family early in the tree don't take all tokens when the limit uses priority policy.
+    """
+    with Flow("flow1") as flow1:
+        limit = flow1.add_limit("limit1", 1, policy=AllocationPolicy.priority)
+        flow1.add_in_limit("limit1")
+        with flow1.add_container("bulk") as bulk:
+            for i in range(3):
+                bulk.add_task(f"task{i}")
+        with flow1.add_task("urgent") as urgent:
+            urgent.add_parameter("TAKLER_PRIORITY", 10)
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+
+    # all tasks wait in the queue, and the token is allocated in next pass.
+    bunch.resolve_dirty_nodes()
+    assert list(limit.waiting_nodes) == bulk.children + [urgent]
+    assert limit.value == 0
+
+    bunch.resolve_dirty_nodes()
+    assert urgent.state.node_status == NodeStatus.submitted
+    assert bulk.children[0].state.node_status == NodeStatus.queued
+
+    urgent.complete()
+    bunch.resolve_dirty_nodes()
+    assert bulk.children[0].state.node_status == NodeStatus.submitted
+    assert list(limit.waiting_nodes) == bulk.children[1:]
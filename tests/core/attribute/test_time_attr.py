@@ -3,7 +3,7 @@ import datetime
 import pytest
 from pydantic import BaseModel, ConfigDict
 
-from takler.core import Flow, Task
+from takler.core import Flow, Task, Bunch
 
 
 #-------------------
@@ -144,6 +144,50 @@ def test_time_attr_free_dependencies(one_task_time_flow, patch_datetime_now):
     assert task1.resolve_time_dependencies()
 
 
+def test_time_attr_next_due_time(one_task_time_flow, patch_datetime_now):
+    flow1: Flow = one_task_time_flow.flow1
+    time_attr = one_task_time_flow.task1.times[0]
+    assert time_attr.next_due_time(flow1.calendar) is None
+
+    flow1.calendar.begin(datetime.datetime(2022, 9, 12, 10, 0, 0))
+    flow1.update_calendar(datetime.datetime(2022, 9, 12, 11, 30, 20))
+    assert time_attr.next_due_time(flow1.calendar) == datetime.datetime(2022, 9, 12, 12, 0, 0)
+
+    # in the minute of time attribute, but calendar is not updated.
+    flow1.calendar.update(datetime.datetime(2022, 9, 12, 12, 0, 30))
+    assert time_attr.next_due_time(flow1.calendar) == datetime.datetime(2022, 9, 12, 12, 0, 30)
+
+    # missed, wait for next day.
+    flow1.calendar.update(datetime.datetime(2022, 9, 12, 12, 1, 0))
+    assert time_attr.next_due_time(flow1.calendar) == datetime.datetime(2022, 9, 13, 12, 0, 0)
+
+    time_attr.set_free()
+    assert time_attr.next_due_time(flow1.calendar) is None
+
+
+def test_bunch_time_attributes(one_task_time_flow, patch_datetime_now):
+    flow1: Flow = one_task_time_flow.flow1
+    task1: Task = one_task_time_flow.task1
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.calendar.begin(datetime.datetime(2022, 9, 12, 10, 0, 0))
+    assert list(bunch.time_nodes) == [task1]
+
+    task2 = flow1.add_task("task2")
+    task2.add_time("11:00")
+    assert list(bunch.time_nodes) == [task1, task2]
+    assert bunch.find_next_time_due() == datetime.datetime(2022, 9, 12, 11, 0, 0)
+
+    bunch.update_calendar(datetime.datetime(2022, 9, 12, 11, 0, 5))
+    assert task2.times[0].free
+    assert not task1.times[0].free
+    assert task2 in bunch.resolver.dirty_nodes
+    assert bunch.find_next_time_due() == datetime.datetime(2022, 9, 12, 12, 0, 0)
+
+    flow1.delete_child(task2)
+    assert list(bunch.time_nodes) == [task1]
+
+
 def test_task_resolve_time_dependencies_single_task():
     task = Task('task1')
     task.add_time('12:00')
@@ -0,0 +1,163 @@
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus
+from takler.core.expression import Expression
+from takler.core.repeat import RepeatDate
+
+
+@pytest.fixture
+def compile_flow() -> Flow:
+    """
+    A simple flow with event, meter and parameter:
+
+        |- flow1 [unknown]
+          |- container1 [unknown]
+            |- task1 [unknown]
+                 event event1 unset
+                 meter meter1 0 10 0
+                 param param1 1
+            |- task2 [unknown]
+                 meter meter2 0 10 0
+          |- task3 [unknown]
+
+    """
+    with Flow("flow1") as flow1:
+        with flow1.add_container("container1") as container1:
+            with container1.add_task("task1") as task1:
+                task1.add_event("event1")
+                task1.add_meter("meter1", 0, 10)
+                task1.add_parameter("param1", 1)
+            with container1.add_task("task2") as task2:
+                task2.add_meter("meter2", 0, 10)
+        flow1.add_task("task3")
+    flow1.requeue()
+    return flow1
+
+
+@pytest.mark.parametrize(
+    "expr_string",
+    [
+        "./task1 == complete",
+        "./container1/task1 eq complete",
+        "/flow1/container1/task1 == aborted",
+        "./task1:event1 == set",
+        "./task1:event1 == unset",
+        "./task1:meter1 > 5",
+        "./task1:meter1 >= 5",
+        "./task1:meter1 < 5",
+        "./task1:meter1 <= 5",
+        "./task1:param1 == 1",
+        "./task1:meter1 + ./task2:meter2 >= ./task1:meter1",
+        "./task1:meter1 >= ./task2:meter2",
+        "./task1:meter1 >= 5 or ./task1 == complete",
+        "./task1:meter1 >= 5 and (./task1 == complete or ./task1:event1 == set)",
+    ]
+)
+def test_compiled_expression(compile_flow, expr_string):
+    task1 = compile_flow.find_node("/flow1/container1/task1")
+    task2 = compile_flow.find_node("/flow1/container1/task2")
+    node = task2
+    if expr_string.startswith("./container1"):
+        node = compile_flow.find_node("/flow1/task3")
+
+    expr = Expression(expr_string)
+    expr.create_ast(node)
+    expr.compile()
+
+    def check():
+        assert expr.compiled.evaluate() == expr.ast.evaluate()
+
+    check()
+    task1.set_meter("meter1", 6)
+    check()
+    task2.set_meter("meter2", 7)
+    check()
+    task1.set_event("event1", True)
+    check()
+    task1.complete()
+    check()
+    task1.abort()
+    check()
+
+
+def test_compiled_expression_rebind(compile_flow):
+    bunch = Bunch()
+    bunch.add_flow(compile_flow)
+    task1 = compile_flow.find_node("/flow1/container1/task1")
+    task2 = compile_flow.find_node("/flow1/container1/task2")
+
+    expr = Expression("./task1:param1 == 2")
+    expr.create_ast(task2)
+    expr.compile(bunch.structure_version)
+    assert not expr.evaluate()
+
+    # parameter is replaced.
+    task1.add_parameter("param1", 2)
+    assert expr.evaluate()
+
+    # event with the same name is found before parameter.
+    task1.add_event("param1")
+    assert not expr.evaluate()
+    assert expr.evaluate() == expr.ast.evaluate()
+
+
+def test_compiled_expression_generated_parameter(compile_flow):
+    task1 = compile_flow.find_node("/flow1/container1/task1")
+    task2 = compile_flow.find_node("/flow1/container1/task2")
+    task1.add_repeat(RepeatDate("YMD", 20240101, 20240103))
+
+    expr = Expression("./task1:YMD == 20240101")
+    expr.create_ast(task2)
+    expr.compile()
+    assert expr.evaluate()
+    assert ".value()" in expr.compiled.source
+
+
+def test_compile_in_bunch(compile_flow):
+    bunch = Bunch()
+    bunch.compile_expressions = True
+    bunch.add_flow(compile_flow)
+    task1 = compile_flow.find_node("/flow1/container1/task1")
+    task2 = compile_flow.find_node("/flow1/container1/task2")
+
+    task2.add_trigger("./task1 == complete", parse=True)
+    assert task2.trigger_expression.compiled is not None
+    assert not task2.evaluate_trigger()
+
+    task1.complete()
+    assert task2.evaluate_trigger()
+
+    task2.trigger_expression.clear_ast()
+    assert task2.trigger_expression.compiled is None
+    assert task2.trigger_expression.ast is None
+    assert task2.evaluate_trigger()
+    assert task2.trigger_expression.compiled is not None
+    assert task1.state.node_status == NodeStatus.complete
+
+
+def test_structure_version_per_bunch(compile_flow):
+    bunch = Bunch()
+    bunch.compile_expressions = True
+    staging_bunch = Bunch()
+    staging_bunch.compile_expressions = True
+
+    # changes in a detached tree or in another bunch don't change the version.
+    version = bunch.structure_version.value
+    compile_flow.find_node("/flow1/container1/task1").add_event("event2")
+    with Flow("flow2") as flow2:
+        flow2.add_task("task1").add_event("event1")
+        flow2.add_task("task2")
+    staging_bunch.add_flow(flow2)
+    task2 = flow2.find_node("/flow2/task2")
+    task2.add_trigger("./task1:event1 == set", parse=True)
+    assert bunch.structure_version.value == version
+
+    # compiled expression follows version of the bunch which the tree is attached to.
+    staging_bunch.delete_flow(flow2)
+    bunch.add_flow(flow2)
+    assert bunch.structure_version.value != version
+    assert task2.trigger_expression.compiled.structure_version is bunch.structure_version
+    assert not task2.evaluate_trigger()
+
+    flow2.find_node("/flow2/task1").set_event("event1", True)
+    assert task2.evaluate_trigger()
@@ -0,0 +1,81 @@
+import pytest
+from lark import UnexpectedCharacters
+
+from takler.core.expression_parser import (
+    ExpressionTransformer,
+    create_earley_trigger_parser,
+    parse_trigger_text,
+)
+
+
+@pytest.fixture(scope="module")
+def earley_parser():
+    return create_earley_trigger_parser()
+
+
+# trigger expressions used in expression and trigger tests.
+EXPRESSION_CASES = [
+    "/flow1/task1 == complete",
+    "/flow1/task9 eq complete",
+    "/flow1/task1 EQ complete",
+    "./task1 == aborted",
+    "./task1 == Aborted",
+    "./task1 == active",
+    "./task1 == COMPLETE",
+    "../task1 == complete",
+    "../container1/task1 == complete",
+    "../../container1/task_001 == complete",
+    "/flow1/00/container1/000_task == complete",
+    "/flow1/00/001/002_task03 == complete",
+    "./container1/container2 == complete",
+    "./task1:event1 == set",
+    "./task1:event2==set",
+    "../task1:event_b == set",
+    "/flow1/task1:event1 == SET",
+    "/flow1/task1:event1 == unset",
+    "/flow1/task1:event1 == UNSET",
+    "../task1:meter_a == 4",
+    "./task1:meter_a >= 4",
+    "/flow1/task1:meter1 > 10",
+    "./task1:meter1 < 5",
+    "./task1:meter1 <= 5",
+    "./task1:param1 == 2",
+    "./task1:YMD == 20240101",
+    "./task1:meter1 >= ./task2:meter2",
+    "/flow1/container1:YMD + /flow1/container2:LAG_DATE",
+    "./task1:meter1 + ./task2:meter2 >= ./task1:meter1",
+    "./task2 == complete and ./container1 == complete",
+    "/flow1/task1 == complete AND /flow1/task2 == complete",
+    "/flow1/task1 == complete or /flow1/task2 == complete",
+    "/flow1/task1 == complete OR /flow1/task2:meter1 >= 10",
+    "./task1:meter1 >= 5 or ./task1 == complete",
+    "(/flow1/task1 == complete and /flow1/task2:meter1 >= 20) or /flow1/task3 == complete",
+    "/flow1/task1 == complete and (/flow1/task2:event1 == set or /flow1/task3 == complete)",
+    "./task1:meter1 >= 5 and (./task1 == complete or ./task1:event1 == set)",
+    # and, or are evaluated from left to right.
+    "./task1 == complete or ./task2 == complete and ./task3 == complete",
+    "./task1 == complete and ./task2 == complete or ./task3 == complete and ./task4 == complete",
+]
+
+
+INVALID_EXPRESSION_CASES = [
+    "task1 == complete",
+    "./task1 == unknown",
+    "./task1 == queued",
+    "./task1 == submitted",
+]
+
+
+@pytest.mark.parametrize("expr_string", EXPRESSION_CASES)
+def test_lalr_equal_to_earley(earley_parser, expr_string):
+    earley_ast = ExpressionTransformer().transform(earley_parser.parse(expr_string))
+    lalr_ast = parse_trigger_text(expr_string)
+    assert lalr_ast == earley_ast
+
+
+@pytest.mark.parametrize("expr_string", INVALID_EXPRESSION_CASES)
+def test_lalr_invalid_expression(earley_parser, expr_string):
+    with pytest.raises(UnexpectedCharacters):
+        earley_parser.parse(expr_string)
+    with pytest.raises(UnexpectedCharacters):
+        parse_trigger_text(expr_string)
@@ -0,0 +1,75 @@
+import pytest
+from lark.exceptions import UnexpectedInput
+
+from takler.core import Flow
+from takler.core.expression_ast import AstOpAnd
+from takler.core.expression_parser import ParseCache, parse_trigger_text
+
+
+def test_parse_cache():
+    cache = ParseCache(maxsize=2)
+    expr_string = "./task1 == complete and ./task2:event1 == set"
+
+    ast1 = cache.get(expr_string)
+    ast2 = cache.get(expr_string)
+    assert isinstance(ast1, AstOpAnd)
+    assert ast1 == ast2
+    assert ast1 == parse_trigger_text(expr_string)
+    assert ast1 is not ast2
+    assert ast1.left is not ast2.left
+    assert ast1.right.left.node is not ast2.right.left.node
+
+    info = cache.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+
+
+def test_parse_cache_lru():
+    cache = ParseCache(maxsize=2)
+    cache.get("./task1 == complete")
+    cache.get("./task2 == complete")
+    cache.get("./task1 == complete")
+    cache.get("./task3 == complete")
+    assert cache.cache_info().currsize == 2
+
+    cache.get("./task1 == complete")
+    assert cache.cache_info().hits == 2
+
+    cache.get("./task2 == complete")
+    assert cache.cache_info().misses == 4
+
+    cache.clear()
+    assert cache.cache_info() == (0, 0, 2, 0)
+
+
+def test_parse_cache_error():
+    cache = ParseCache()
+    with pytest.raises(UnexpectedInput):
+        cache.get("./task1 == ")
+    assert cache.cache_info().currsize == 0
+
+
+def test_parse_cache_bind_nodes():
+    """
+    ASTs from the same template are bound to different nodes.
+    """
+    with Flow("flow1") as flow1:
+        with flow1.add_container("container1") as container1:
+            task1 = container1.add_task("task1")
+            task2 = container1.add_task("task2")
+            task2.add_trigger("./task1 == complete")
+        with flow1.add_container("container2") as container2:
+            task3 = container2.add_task("task1")
+            task4 = container2.add_task("task2")
+            task4.add_trigger("./task1 == complete")
+    flow1.requeue()
+
+    assert not task2.evaluate_trigger()
+    assert not task4.evaluate_trigger()
+    assert task2.trigger_expression.ast.left.get_reference_node() is task1
+    assert task4.trigger_expression.ast.left.get_reference_node() is task3
+
+    task3.complete()
+    assert not task2.evaluate_trigger()
+    assert task4.evaluate_trigger()
@@ -1,7 +1,7 @@
 import pytest
 
-from takler.core import Flow
-from takler.core.node import Node
+from takler.core import Flow, Task
+from takler.core.node import Node, NodeClassRegistry
 
 from .util import get_node_tree_print_string
 
@@ -112,3 +112,41 @@ def test_from_dict(child_case):
     expected_node_text = get_node_tree_print_string(container1)
     assert node_text == expected_node_text
     return
+
+
+def test_from_dict_deep_tree():
+    depth = 5000
+    d = dict(
+        name="task",
+        class_type=dict(module="takler.core.task_node", name="Task"),
+        state=dict(status=3, suspended=False),
+        task_id=None,
+        aborted_reason=None,
+        try_no=0,
+    )
+    for i in range(depth):
+        d = dict(
+            name=f"container_{i}",
+            class_type=dict(module="takler.core.node_container", name="NodeContainer"),
+            state=dict(status=3, suspended=False),
+            children=[d],
+        )
+
+    node = Node.from_dict(d)
+    assert node.name == f"container_{depth - 1}"
+    for _ in range(depth):
+        node = node.children[0]
+    assert node.name == "task"
+    assert node.parent.name == "container_0"
+
+
+def test_node_class_registry():
+    registry = NodeClassRegistry()
+    assert registry.find("takler.core.task_node", "Task") is Task
+    assert registry.classes[("takler.core.task_node", "Task")] is Task
+
+    registry.register(ObjectContainer)
+    assert registry.find(__name__, "ObjectContainer") is ObjectContainer
+
+    with pytest.raises(AttributeError):
+        registry.find("takler.core.task_node", "NoSuchTask")
@@ -0,0 +1,189 @@
+import datetime
+import pickle
+
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus
+from takler.core.checkpoint import (
+    dumps_checkpoint, loads_checkpoint, write_checkpoint_file, read_checkpoint_file,
+    CheckpointError, CHECKPOINT_MAGIC, CHECKPOINT_VERSION, PICKLE_CHUNK_SIZE,
+)
+from takler.core.repeat import RepeatDate
+from takler.tasks.shell import ShellScriptTask
+
+
+@pytest.fixture
+def bunch() -> Bunch:
+    """
+    A bunch with runtime state:
+
+        |- flow1
+             limit limit1 2
+          |- container1
+               repeat date YMD 20240101 20240105
+            |- task1 [complete]
+                 param param1 1
+                 event event1 set
+                 meter meter1 0 10 5
+                 inlimit limit1
+            |- task2 [active] suspended
+                 trigger ./task1 == complete (free)
+                 time 12:00 (free)
+          |- task3 [aborted]
+
+    """
+    with Flow("flow1") as flow1:
+        flow1.add_limit("limit1", 2)
+        with flow1.add_container("container1") as container1:
+            container1.add_repeat(RepeatDate("YMD", 20240101, 20240105))
+            with container1.add_task("task1") as task1:
+                task1.add_parameter("param1", 1)
+                task1.add_event("event1")
+                task1.add_meter("meter1", 0, 10)
+                task1.add_in_limit("limit1")
+            with container1.add_task("task2") as task2:
+                task2.add_trigger("./task1 == complete")
+                task2.add_time("12:00")
+        flow1.append_child(ShellScriptTask("task3", script_path="/path/to/task3.sh"))
+
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    flow1.update_calendar(datetime.datetime(2024, 1, 1, 12, 30))
+
+    container1.repeat.change(20240103)
+    task1.init("1001")
+    task1.set_event("event1", True)
+    task1.set_meter("meter1", 5)
+    task1.complete()
+    task2.init("1002")
+    flow1.find_limit("limit1").increment(1, task2.node_path)
+    task2.suspend()
+    task2.free_dependencies("all")
+    task3 = bunch.find_node("/flow1/task3")
+    task3.init("1003")
+    task3.abort("failed")
+    task3.increment_try_no()
+    return bunch
+
+
+def test_checkpoint(bunch):
+    data = dumps_checkpoint(bunch)
+    assert data.startswith(CHECKPOINT_MAGIC)
+
+    new_bunch = Bunch()
+    flows = loads_checkpoint(data, new_bunch)
+    assert [flow.name for flow in flows] == ["flow1"]
+    flow1 = new_bunch.find_node("/flow1")
+    assert flow1.to_dict() == bunch.find_node("/flow1").to_dict()
+
+    task1 = new_bunch.find_node("/flow1/container1/task1")
+    assert task1.state.node_status == NodeStatus.complete
+    assert task1.find_event("event1").value
+    assert task1.find_meter("meter1").value == 5
+    assert task1.task_id == "1001"
+    assert task1.find_parameter("param1").value == 1
+
+    limit = flow1.find_limit("limit1")
+    assert limit.value == 1
+    assert limit.node_paths == {"/flow1/container1/task2"}
+
+    container1 = new_bunch.find_node("/flow1/container1")
+    assert container1.repeat.value() == 20240103
+
+    task2 = new_bunch.find_node("/flow1/container1/task2")
+    assert task2.state.node_status == NodeStatus.active
+    assert task2.state.suspended
+    assert task2.trigger_expression.free
+    assert task2.times[0].free
+    assert task2.times[0].time == datetime.time(12, 0)
+    # triggers are parsed when evaluated, and registered in dependency index.
+    assert task2.trigger_expression.ast is None
+    assert new_bunch.resolver.has_dirty_nodes()
+    assert task2.evaluate_trigger()
+    assert task2 in new_bunch.dependency_index.find_status_dependents(task1)
+
+    task3 = new_bunch.find_node("/flow1/task3")
+    assert isinstance(task3, ShellScriptTask)
+    assert task3.script_path == "/path/to/task3.sh"
+    assert task3.try_no == 1
+
+    old_calendar = bunch.find_node("/flow1").calendar
+    assert old_calendar.flow_time is not None
+    assert flow1.calendar.flow_time == old_calendar.flow_time
+    assert flow1.calendar.initial_real_time == old_calendar.initial_real_time
+    assert flow1.find_generated_parameter("DATE").value == old_calendar.flow_time.strftime("%Y-%m-%d")
+
+
+def test_checkpoint_resource_pool(bunch):
+    cpu_limit, = bunch.add_resource_pool("hpc", dict(cpu=64), policy="fifo")
+    cpu_limit.increment(16, "/flow1/task3")
+
+    new_bunch = Bunch()
+    new_bunch.add_resource_pool("hpc", dict(cpu=128))
+    loads_checkpoint(dumps_checkpoint(bunch), new_bunch)
+    limit = new_bunch.find_limit("hpc.cpu")
+    assert limit.limit == 128
+    assert limit.value == 16
+    assert limit.node_paths == {"/flow1/task3"}
+    assert limit.node_tokens == {"/flow1/task3": 16}
+
+    new_bunch = Bunch()
+    loads_checkpoint(dumps_checkpoint(bunch), new_bunch)
+    limit = new_bunch.find_limit("hpc.cpu")
+    assert limit.limit == 64
+    assert limit.policy.value == "fifo"
+    assert limit.value == 16
+
+
+def test_checkpoint_replace_flow(bunch):
+    new_bunch = Bunch()
+    new_bunch.add_flow(Flow("flow1"))
+    loads_checkpoint(dumps_checkpoint(bunch), new_bunch)
+    assert new_bunch.find_node("/flow1/container1/task1") is not None
+    assert len(new_bunch.flows) == 1
+
+
+def test_checkpoint_records_in_chunks():
+    # records of the flow are pickled in several chunks.
+    with Flow("flow1") as flow1:
+        for i in range(PICKLE_CHUNK_SIZE // 10 + 1):
+            with flow1.add_container(f"container{i}") as container:
+                for j in range(10):
+                    container.add_task(f"task{j}")
+        flow1.add_task("task_last")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+
+    new_bunch = Bunch()
+    loads_checkpoint(dumps_checkpoint(bunch), new_bunch)
+    new_flow1 = new_bunch.find_node("/flow1")
+    assert [child.name for child in new_flow1.children] == [child.name for child in flow1.children]
+    assert len(new_bunch.node_index) == len(bunch.node_index)
+    assert new_bunch.find_node(f"/flow1/container{PICKLE_CHUNK_SIZE // 10}/task9").parent.name == \
+        f"container{PICKLE_CHUNK_SIZE // 10}"
+
+
+def test_checkpoint_file(bunch, tmp_path):
+    file_path = tmp_path / "takler.checkpoint"
+    write_checkpoint_file(dumps_checkpoint(bunch), file_path)
+    assert list(tmp_path.iterdir()) == [file_path]
+
+    new_bunch = Bunch()
+    loads_checkpoint(read_checkpoint_file(file_path), new_bunch)
+    assert new_bunch.find_node("/flow1/task3").state.node_status == NodeStatus.aborted
+
+
+def test_checkpoint_invalid_data():
+    with pytest.raises(CheckpointError):
+        loads_checkpoint(b"some data", Bunch())
+
+    with pytest.raises(CheckpointError):
+        loads_checkpoint(CHECKPOINT_MAGIC + bytes([CHECKPOINT_VERSION]) + b"\x80", Bunch())
+
+    # classes other than datetime types are not allowed.
+    payload = (CHECKPOINT_VERSION, [], [Bunch])
+    data = CHECKPOINT_MAGIC + bytes([CHECKPOINT_VERSION]) + pickle.dumps(payload)
+    with pytest.raises(CheckpointError):
+        loads_checkpoint(data, Bunch())
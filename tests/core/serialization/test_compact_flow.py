@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+from takler.core import Flow, NodeStatus, SerializationType
+from takler.core.compact_flow import (
+    CompactFlowError, dumps_compact_flow, loads_compact_flow, encode_flow_dict
+)
+from takler.core.repeat import RepeatDate
+from takler.tasks.shell import ShellScriptTask
+
+
+@pytest.fixture
+def flow() -> Flow:
+    """
+    A flow with different attributes, and containers sharing the same tasks:
+
+        |- flow1 [queued]
+          param ECF_HOME "/home/user"
+          limit limit1 2
+          |- container1 [queued]
+            repeat YMD 20240101 20240103
+            |- task1 [queued]
+                 event event1
+                 meter meter1 0 10
+            |- task2 [queued]
+                 trigger ./task1 == complete
+                 inlimit /flow1:limit1 1
+                 time 12:00
+          |- container2 [queued]
+            |- task1 [queued]
+                 event event1
+                 meter meter1 0 10
+            |- task2 [queued]
+                 trigger ./task1 == complete
+                 complete ./task1:event1 == set
+          |- task3 [queued]
+
+    """
+    with Flow("flow1") as flow1:
+        flow1.add_parameter("ECF_HOME", "/home/user")
+        flow1.add_limit("limit1", 2)
+        for container_name in ("container1", "container2"):
+            with flow1.add_container(container_name) as container:
+                with container.add_task("task1") as task1:
+                    task1.add_event("event1")
+                    task1.add_meter("meter1", 0, 10)
+                with container.add_task("task2") as task2:
+                    task2.add_trigger("./task1 == complete")
+        container1 = flow1.find_node("/flow1/container1")
+        container1.add_repeat(RepeatDate("YMD", 20240101, 20240103))
+        task2 = flow1.find_node("/flow1/container1/task2")
+        task2.add_in_limit("limit1", node_path="/flow1")
+        task2.add_time("12:00")
+        flow1.find_node("/flow1/container2/task2").add_complete_trigger("./task1:event1 == set")
+        flow1.append_child(ShellScriptTask("task3"))
+    flow1.requeue()
+    return flow1
+
+
+def test_compact_flow(flow):
+    data = dumps_compact_flow(flow)
+    new_flow = loads_compact_flow(data, method=SerializationType.Status)
+    assert new_flow.to_dict() == flow.to_dict()
+    assert isinstance(new_flow.find_node("/flow1/task3"), ShellScriptTask)
+    assert new_flow.find_node("/flow1/container2/task1").parent.name == "container2"
+
+    new_flow = loads_compact_flow(data)
+    assert new_flow.to_dict() == Flow.from_dict(flow.to_dict(), method=SerializationType.Tree).to_dict()
+    assert new_flow.find_node("/flow1/container1/task1").state.node_status == NodeStatus.unknown
+
+
+def test_compact_flow_shared(flow):
+    message = encode_flow_dict(flow.to_dict())
+    assert len(message.node_name) == 8
+    # task1 in two containers share one template, so do task2 in container2 and task3 which have no attributes.
+    assert len(message.templates) == 6
+    assert list(message.strings).count("task1") == 1
+    assert list(message.strings).count("./task1 == complete") == 1
+    assert len(dumps_compact_flow(flow)) * 2 < len(json.dumps(flow.to_dict()))
+
+
+def test_compact_flow_template(flow):
+    flow.find_node("/flow1/container1/task1").init("1001")
+    new_flow = loads_compact_flow(dumps_compact_flow(flow), method=SerializationType.Status)
+
+    # nodes created from one template have their own attributes.
+    task1 = new_flow.find_node("/flow1/container1/task1")
+    task2 = new_flow.find_node("/flow1/container2/task1")
+    assert task1.events[0] is not task2.events[0]
+    assert task1.meters[0] is not task2.meters[0]
+    task1.set_event("event1", True)
+    assert not task2.find_event("event1").value
+
+    # attributes of subclasses are copied from the template.
+    assert task1.task_id == "1001"
+    assert task1.state.node_status == NodeStatus.active
+    assert task2.task_id is None
+    assert new_flow.find_node("/flow1/container1/task2").in_limit_manager.node is \
+        new_flow.find_node("/flow1/container1/task2")
+
+
+def test_compact_flow_broken(flow):
+    with pytest.raises(CompactFlowError):
+        loads_compact_flow(b"\x00\x01broken")
+
+    message = encode_flow_dict(flow.to_dict())
+    message.node_name.append(1)
+    with pytest.raises(CompactFlowError):
+        loads_compact_flow(message.SerializeToString())
+
+    message = encode_flow_dict(flow.to_dict())
+    message.version = 100
+    with pytest.raises(CompactFlowError):
+        loads_compact_flow(message.SerializeToString())
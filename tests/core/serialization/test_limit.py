@@ -1,6 +1,6 @@
 import pytest
 
-from takler.core import Limit, Task, SerializationType
+from takler.core import Limit, Task, SerializationType, AllocationPolicy
 from takler.core.limit import InLimit, InLimitManager
 
 
@@ -43,6 +43,35 @@ def test_limit_to_dict():
     )
 
 
+def test_limit_policy_to_dict():
+    limit = Limit("upload_limit", 10, policy="fifo")
+    d = limit.to_dict()
+    assert d == dict(
+        name="upload_limit",
+        limit=10,
+        value=0,
+        node_paths=list(),
+        policy="fifo",
+    )
+    assert Limit.from_dict(d).policy == AllocationPolicy.fifo
+    assert Limit.from_dict(d, method=SerializationType.Tree).policy == AllocationPolicy.fifo
+
+
+def test_limit_node_tokens_to_dict():
+    limit = Limit("upload_limit", 10)
+    limit.increment(1, "/flow1/task1")
+    limit.increment(3, "/flow1/task2")
+    d = limit.to_dict()
+    assert d == dict(
+        name="upload_limit",
+        limit=10,
+        value=4,
+        node_paths=["/flow1/task1", "/flow1/task2"],
+        node_tokens={"/flow1/task2": 3},
+    )
+    assert Limit.from_dict(d).node_tokens == {"/flow1/task1": 1, "/flow1/task2": 3}
+
+
 def test_limit_from_dict():
     d = dict(
         name="upload_limit",
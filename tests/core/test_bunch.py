@@ -1,6 +1,6 @@
 import pytest
 
-from takler.core import Bunch, NodeStatus
+from takler.core import Bunch, Flow, NodeStatus
 
 
 @pytest.fixture
@@ -101,3 +101,109 @@ def test_bunch_get_node_status(simple_flow):
     task2 = simple_flow.task2
     task2.abort()
     assert bunch.get_node_status() == NodeStatus.aborted
+
+
+def test_bunch_node_index(simple_bunch, simple_flow, simple_flow_2):
+    bunch = simple_bunch
+    flow1 = simple_flow.flow1
+    container1 = simple_flow.container1
+    task3 = simple_flow.task3
+
+    assert bunch.node_index["/flow1"] is flow1
+    assert bunch.node_index["/flow1/container1/container2/task3"] is task3
+
+    assert bunch.find_node("/flow1/container1/./container2//task3") is task3
+    assert bunch.find_node("/flow1/container1/../container1/container2/task3") is task3
+    assert bunch.find_node("/flow1/../../flow1") is None
+
+    # append child
+    task10 = container1.add_task("task10")
+    assert bunch.find_node("/flow1/container1/task10") is task10
+    assert task3.find_node("../task10") is task10
+
+    # delete child
+    container1.delete_child("container2")
+    assert bunch.find_node("/flow1/container1/container2/task3") is None
+
+    # delete flow
+    bunch.delete_flow("flow2")
+    assert not any(p.startswith("/flow2") for p in bunch.node_index)
+
+
+def test_node_find_node_in_bunch(simple_bunch, simple_flow):
+    task1 = simple_flow.task1
+    task3 = simple_flow.task3
+    # node in another flow is not found from relative path.
+    assert task1.find_node("/flow2") is None
+    assert task1.find_node("./container2/task3") is task3
+    assert task3.find_node("../task1") is task1
+
+
+def test_bunch_resource_pool():
+    bunch = Bunch()
+    license_limit, = bunch.add_resource_pool("license", 1)
+    cpu_limit, memory_limit = bunch.add_resource_pool("hpc", dict(cpu=64, memory=100))
+    assert cpu_limit.name == "hpc.cpu"
+    with pytest.raises(RuntimeError):
+        bunch.add_resource_pool("hpc", dict(cpu=32))
+
+    for name in ("flow1", "flow2"):
+        with Flow(name) as flow:
+            with flow.add_task("task1") as task1:
+                task1.add_resource_usage("license")
+            with flow.add_task("task2") as task2:
+                task2.add_resource_usage("hpc", dict(cpu=32, memory=60))
+        bunch.add_flow(flow)
+        flow.requeue()
+
+    assert bunch.find_node("/flow2/task1").find_limit_up("license") is license_limit
+
+    # tasks in different flows share the same limits.
+    bunch.resolve_dirty_nodes()
+    assert bunch.find_node("/flow1/task1").state.node_status == NodeStatus.submitted
+    assert bunch.find_node("/flow2/task1").state.node_status == NodeStatus.queued
+    assert bunch.find_node("/flow1/task2").state.node_status == NodeStatus.submitted
+    # cpu is enough, but memory is not.
+    assert bunch.find_node("/flow2/task2").state.node_status == NodeStatus.queued
+    assert cpu_limit.value == 32
+    assert memory_limit.value == 60
+
+    bunch.find_node("/flow1/task2").complete()
+    bunch.resolve_dirty_nodes()
+    assert bunch.find_node("/flow2/task2").state.node_status == NodeStatus.submitted
+    assert memory_limit.node_paths == {"/flow2/task2"}
+
+
+@pytest.mark.parametrize("policy", ["order", "fifo"])
+def test_bunch_resource_pool_delete(policy):
+    bunch = Bunch()
+    license_limit, = bunch.add_resource_pool("license", 1, policy=policy)
+    for name in ("flow1", "flow2", "flow3"):
+        with Flow(name) as flow:
+            with flow.add_container("container1") as container1:
+                with container1.add_task("task1") as task1:
+                    task1.add_resource_usage("license")
+        bunch.add_flow(flow)
+        flow.requeue()
+
+    for _ in range(2):
+        bunch.resolve_dirty_nodes()
+    assert license_limit.node_paths == {"/flow1/container1/task1"}
+    flow2_task1 = bunch.find_node("/flow2/container1/task1")
+    flow3_task1 = bunch.find_node("/flow3/container1/task1")
+    assert set(license_limit.waiting_nodes) == {flow2_task1, flow3_task1}
+
+    # tokens of the deleted flow are released, and waiting nodes are woken.
+    bunch.delete_flow("flow1")
+    assert license_limit.value == 0
+    for _ in range(2):
+        bunch.resolve_dirty_nodes()
+    assert flow2_task1.state.node_status == NodeStatus.submitted
+    assert license_limit.node_paths == {"/flow2/container1/task1"}
+
+    # deleted nodes are removed from wait queue.
+    bunch.find_node("/flow3").delete_child("container1")
+    assert len(license_limit.waiting_nodes) == 0
+    bunch.find_node("/flow2/container1").delete_child("task1")
+    assert license_limit.value == 0
+    assert len(license_limit.node_paths) == 0
@@ -0,0 +1,237 @@
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus
+
+
+@pytest.fixture
+def resolver_bunch():
+    """
+
+    |- flow1
+        |- task1
+        |- task2
+        |- container1
+            |- task3
+            |- task4
+        |- task5
+
+    """
+    bunch = Bunch()
+    flow1 = Flow("flow1")
+    task1 = flow1.add_task("task1")
+    task1.add_event("event1")
+    task2 = flow1.add_task("task2")
+    task2.add_trigger("./task1 == complete")
+    container1 = flow1.add_container("container1")
+    container1.add_trigger("./task1:event1 == set")
+    container1.add_task("task3")
+    container1.add_task("task4")
+    task5 = flow1.add_task("task5")
+    task5.add_trigger("./container1 == complete")
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+def test_resolve_dirty_nodes(resolver_bunch):
+    bunch = resolver_bunch
+    task1 = bunch.find_node("/flow1/task1")
+    task2 = bunch.find_node("/flow1/task2")
+    task3 = bunch.find_node("/flow1/container1/task3")
+    task4 = bunch.find_node("/flow1/container1/task4")
+    task5 = bunch.find_node("/flow1/task5")
+
+    assert bunch.resolve_dirty_nodes() > 0
+    assert task1.state.node_status == NodeStatus.submitted
+    assert task2.state.node_status == NodeStatus.queued
+    assert task3.state.node_status == NodeStatus.queued
+
+    # nothing changed
+    assert bunch.resolve_dirty_nodes() == 0
+
+    task1.init("1001")
+    task1.set_event("event1", True)
+    bunch.resolve_dirty_nodes()
+    assert task2.state.node_status == NodeStatus.queued
+    assert task3.state.node_status == NodeStatus.submitted
+    assert task4.state.node_status == NodeStatus.submitted
+
+    task1.complete()
+    bunch.resolve_dirty_nodes()
+    assert task2.state.node_status == NodeStatus.submitted
+    assert task5.state.node_status == NodeStatus.queued
+
+    task3.complete()
+    task4.complete()
+    bunch.resolve_dirty_nodes()
+    assert task5.state.node_status == NodeStatus.submitted
+
+
+def test_resolve_only_dependents(resolver_bunch):
+    bunch = resolver_bunch
+    task1 = bunch.find_node("/flow1/task1")
+    task2 = bunch.find_node("/flow1/task2")
+    task5 = bunch.find_node("/flow1/task5")
+    bunch.resolve_dirty_nodes()
+
+    task1.init("1001")
+    bunch.resolve_dirty_nodes()
+
+    task1.complete()
+    assert task2 in bunch.resolver.dirty_nodes
+    assert task5 not in bunch.resolver.dirty_nodes
+
+
+def test_resolve_limit_released():
+    bunch = Bunch()
+    flow1 = Flow("flow1")
+    flow1.add_limit("limit1", 1)
+    flow1.add_in_limit("limit1")
+    task1 = flow1.add_task("task1")
+    task2 = flow1.add_task("task2")
+    bunch.add_flow(flow1)
+    flow1.requeue()
+
+    bunch.resolve_dirty_nodes()
+    assert task1.state.node_status == NodeStatus.submitted
+    assert task2.state.node_status == NodeStatus.queued
+    assert task2 in flow1.find_limit("limit1").waiting_nodes
+
+    task1.init("1001")
+    assert bunch.resolve_dirty_nodes() == 0
+    assert task2.state.node_status == NodeStatus.queued
+
+    task1.complete()
+    assert bunch.resolver.has_dirty_nodes()
+    bunch.resolve_dirty_nodes()
+    assert task2.state.node_status == NodeStatus.submitted
+    assert len(flow1.find_limit("limit1").waiting_nodes) == 0
+
+
+def test_resolve_limit_released_partially():
+    bunch = Bunch()
+    flow1 = Flow("flow1")
+    limit1 = flow1.add_limit("limit1", 1)
+    flow1.add_in_limit("limit1")
+    task1 = flow1.add_task("task1")
+    task2 = flow1.add_task("task2")
+    task3 = flow1.add_task("task3")
+    bunch.add_flow(flow1)
+    flow1.requeue()
+
+    bunch.resolve_dirty_nodes()
+    assert list(limit1.waiting_nodes) == [task2, task3]
+
+    task2.suspend()
+    task1.complete()
+    # only task2 is woken for one free token.
+    assert bunch.resolve_dirty_nodes() == 1
+    assert task2.state.node_status == NodeStatus.queued
+    assert list(limit1.waiting_nodes) == [task3]
+
+    # task2 doesn't take the token, so task3 is woken in next pass.
+    assert bunch.resolver.has_dirty_nodes()
+    bunch.resolve_dirty_nodes()
+    assert task3.state.node_status == NodeStatus.submitted
+    assert not bunch.resolver.has_dirty_nodes()
+
+
+def test_resolve_deleted_flow(resolver_bunch):
+    bunch = resolver_bunch
+    flow1 = bunch.find_flow("flow1")
+    task1 = bunch.find_node("/flow1/task1")
+    bunch.delete_flow(flow1)
+
+    assert bunch.resolve_dirty_nodes() == 0
+    assert task1.state.node_status == NodeStatus.queued
+
+
+def test_iter_resolve(resolver_bunch):
+    bunch = resolver_bunch
+    task1 = bunch.find_node("/flow1/task1")
+    task5 = bunch.find_node("/flow1/task5")
+
+    steps = bunch.resolver.iter_resolve()
+    # flow1 is checked first, and then its children in order.
+    assert [next(steps).name for _ in range(3)] == ["flow1", "task1", "task2"]
+    assert task1.state.node_status == NodeStatus.submitted
+    assert task5.state.node_status == NodeStatus.queued
+    # container1 is not free, so its children are skipped.
+    assert [node.name for node in steps] == ["container1", "task5"]
+
+
+def test_iter_resolve_deleted_flow(resolver_bunch):
+    bunch = resolver_bunch
+    flow1 = bunch.find_flow("flow1")
+    task1 = bunch.find_node("/flow1/task1")
+
+    steps = bunch.resolver.iter_resolve()
+    assert next(steps).name == "flow1"
+    bunch.delete_flow(flow1)
+    assert list(steps) == []
+    assert task1.state.node_status == NodeStatus.queued
+
+
+def test_resolve_complete_trigger_of_active_family():
+    """
+    A family whose complete trigger is satisfied while its children are still active is set back by its children.
+    The status is unchanged in the pass, so its dependents are not marked again and the resolver settles.
+
+    |- flow1
+      |- task1
+      |- container1
+           complete /flow1/task1 == complete
+        |- task2
+        |- task3
+             trigger /flow1/container1 == aborted
+    """
+    bunch = Bunch()
+    with Flow("flow1") as flow1:
+        task1 = flow1.add_task("task1")
+        with flow1.add_container("container1") as container1:
+            container1.add_complete_trigger("/flow1/task1 == complete")
+            task2 = container1.add_task("task2")
+            task3 = container1.add_task("task3")
+            task3.add_trigger("/flow1/container1 == aborted")
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    bunch.resolve_dirty_nodes()
+    assert task2.state.node_status == NodeStatus.submitted
+
+    task1.init("1001")
+    task1.complete()
+    bunch.resolve_dirty_nodes()
+    assert container1.state.node_status == NodeStatus.submitted
+    assert not bunch.resolver.has_dirty_nodes()
+    assert bunch.resolve_dirty_nodes() == 0
+    assert task3.state.node_status == NodeStatus.queued
+
+
+def test_resolve_complete_trigger_of_aborted_task():
+    """
+    A task aborted after its complete trigger is satisfied is checked again, and is set to complete.
+
+    |- flow1
+      |- task1
+      |- task2
+           complete /flow1/task1 == complete
+    """
+    bunch = Bunch()
+    with Flow("flow1") as flow1:
+        task1 = flow1.add_task("task1")
+        task2 = flow1.add_task("task2")
+        task2.add_complete_trigger("/flow1/task1 == complete")
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    bunch.resolve_dirty_nodes()
+
+    task2.init("1002")
+    task1.init("1001")
+    task1.complete()
+    bunch.resolve_dirty_nodes()
+    assert task2.state.node_status == NodeStatus.active
+
+    task2.abort()
+    bunch.resolve_dirty_nodes()
+    assert task2.state.node_status == NodeStatus.complete
+    assert flow1.state.node_status == NodeStatus.complete
@@ -0,0 +1,125 @@
+import pytest
+
+from takler.core import Bunch, Flow, Task
+
+
+@pytest.fixture
+def dependency_bunch():
+    """
+
+    |- flow1
+        |- task1
+            event event1
+        |- task2
+            trigger ./task1 == complete
+        |- container1
+            trigger ./task1:event1 == set
+            |- task3
+        |- task4
+            trigger ./task2 == complete and ./container1 == complete
+        |- task5
+
+    """
+    bunch = Bunch()
+    flow1 = Flow("flow1")
+    task1 = flow1.add_task("task1")
+    task1.add_event("event1")
+    task2 = flow1.add_task("task2")
+    task2.add_trigger("./task1 == complete")
+    container1 = flow1.add_container("container1")
+    container1.add_trigger("./task1:event1 == set")
+    container1.add_task("task3")
+    task4 = flow1.add_task("task4")
+    task4.add_trigger("./task2 == complete and ./container1 == complete")
+    flow1.add_task("task5")
+    bunch.add_flow(flow1)
+    bunch.dependency_index.add_tree(flow1, parse=True)
+    flow1.requeue()
+    return bunch
+
+
+def test_find_dependents(dependency_bunch):
+    bunch = dependency_bunch
+    task2 = bunch.find_node("/flow1/task2")
+    container1 = bunch.find_node("/flow1/container1")
+    task4 = bunch.find_node("/flow1/task4")
+
+    assert bunch.find_dependents("/flow1/task1") == [task2]
+    assert bunch.find_dependents("/flow1/task1:event1") == [container1]
+    assert bunch.find_dependents("/flow1/task2") == [task4]
+    assert bunch.find_dependents("/flow1/task5") == []
+
+    assert set(bunch.find_dependents("/flow1/task1", recursive=True)) == {task2, task4}
+
+    with pytest.raises(ValueError):
+        bunch.find_dependents("/flow1/not_exist_task")
+
+
+def test_add_expression_when_create_ast():
+    bunch = Bunch()
+    flow1 = bunch.add_flow("flow1")
+    task1 = flow1.add_task("task1")
+    task2 = flow1.add_task("task2")
+    task2.add_trigger("./task1 == complete")
+    assert bunch.find_dependents("/flow1/task1") == []
+
+    task2.evaluate_trigger()
+    assert bunch.find_dependents("/flow1/task1") == [task2]
+
+    task2.add_trigger("./task1 == aborted", parse=True)
+    assert bunch.find_dependents("/flow1/task1") == [task2]
+    assert len(bunch.dependency_index.status_dependents[task1]) == 1
+
+    task3 = flow1.add_task("task3")
+    task2.add_trigger("./task3 == complete", parse=True)
+    assert bunch.find_dependents("/flow1/task1") == []
+    assert bunch.find_dependents("/flow1/task3") == [task2]
+
+
+def test_variable_dependents_dirty(dependency_bunch):
+    bunch = dependency_bunch
+    task1 = bunch.find_node("/flow1/task1")
+    task2 = bunch.find_node("/flow1/task2")
+    container1 = bunch.find_node("/flow1/container1")
+    bunch.resolve_dirty_nodes()
+    bunch.resolve_dirty_nodes()
+    assert not bunch.resolver.has_dirty_nodes()
+
+    task1.set_event("event1", True)
+    assert container1 in bunch.resolver.dirty_nodes
+    assert task2 not in bunch.resolver.dirty_nodes
+
+
+def test_update_child(dependency_bunch):
+    bunch = dependency_bunch
+    flow1 = bunch.find_flow("flow1")
+    task1 = bunch.find_node("/flow1/task1")
+    task2 = bunch.find_node("/flow1/task2")
+
+    new_task1 = Task("task1")
+    flow1.update_child("task1", new_task1)
+    assert bunch.find_dependents("/flow1/task1") == []
+    assert task1 not in bunch.dependency_index.status_dependents
+    assert task2.trigger_expression.ast is None
+
+    new_task1.requeue()
+    new_task1.complete()
+    assert task2.evaluate_trigger()
+    assert bunch.find_dependents("/flow1/task1") == [task2]
+
+
+def test_delete_flow(dependency_bunch):
+    bunch = dependency_bunch
+    bunch.delete_flow("flow1")
+    assert bunch.dependency_index.status_dependents == {}
+    assert bunch.dependency_index.variable_dependents == {}
+    assert bunch.dependency_index.expression_references == {}
+
+
+def test_delete_child(dependency_bunch):
+    bunch = dependency_bunch
+    flow1 = bunch.find_flow("flow1")
+    task4 = bunch.find_node("/flow1/task4")
+    flow1.delete_child("task4")
+    assert bunch.find_dependents("/flow1/task2") == []
+    assert task4.trigger_expression not in bunch.dependency_index.expression_references
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional
 import pytest
 
-from takler.core import Bunch
+from takler.core import Bunch, Flow, NodeContainer
 
 
 def test_node_node_path(simple_flow):
@@ -18,6 +18,42 @@ def test_node_node_path(simple_flow):
     assert simple_flow.task6.node_path == "/flow1/task6"
 
 
+def test_node_node_path_cache(simple_flow):
+    flow1 = simple_flow.flow1
+    container1 = simple_flow.container1
+    container2 = simple_flow.container2
+    task3 = simple_flow.task3
+    assert task3.node_path == "/flow1/container1/container2/task3"
+
+    # rename ancestor
+    container1.name = "new_container1"
+    assert container2.node_path == "/flow1/new_container1/container2"
+    assert task3.node_path == "/flow1/new_container1/container2/task3"
+
+    # re-parent
+    flow2 = Flow("flow2")
+    flow2.append_child(container1)
+    assert task3.node_path == "/flow2/new_container1/container2/task3"
+
+    # replace
+    new_container3 = NodeContainer("container3")
+    new_task5 = new_container3.add_task("task5")
+    assert new_task5.node_path == "/container3/task5"
+    flow1.update_child("container3", new_container3)
+    assert new_task5.node_path == "/flow1/container3/task5"
+
+
+def test_node_node_path_cache_in_bunch(simple_flow):
+    bunch = Bunch()
+    bunch.add_flow(simple_flow.flow1)
+    container1 = simple_flow.container1
+    task3 = simple_flow.task3
+
+    container1.name = "new_container1"
+    assert bunch.find_node("/flow1/new_container1/container2/task3") is task3
+    assert bunch.find_node("/flow1/container1/container2/task3") is None
+
+
 def test_node_is_leaf_node(simple_flow):
     assert not simple_flow.flow1.is_leaf_node()
     assert not simple_flow.container1.is_leaf_node()
@@ -216,3 +216,61 @@ def test_node_container_compute_status_empty_children():
     assert container1.state.node_status == NodeStatus.queued
     assert container1.computed_status(True) == NodeStatus.queued
     assert container1.computed_status(False) == NodeStatus.queued
+
+
+def test_child_status_counts(status_flow_queued):
+    flow1 = status_flow_queued.flow1
+    container1 = status_flow_queued.container1
+    container2 = status_flow_queued.container2
+
+    counts = container2.get_child_status_counts()
+    assert counts[0] == 4
+    assert counts[NodeStatus.queued.value] == 4
+
+    status_flow_queued.task2.set_node_status_only(NodeStatus.active)
+    assert counts[NodeStatus.queued.value] == 3
+    assert counts[NodeStatus.active.value] == 1
+    assert container2.computed_status(True) == NodeStatus.active
+
+    status_flow_queued.task3.set_node_status(NodeStatus.aborted)
+    assert container2.state.node_status == NodeStatus.aborted
+    assert container1.state.node_status == NodeStatus.aborted
+    assert flow1.state.node_status == NodeStatus.aborted
+
+    for task in (status_flow_queued.task2, status_flow_queued.task3,
+                 status_flow_queued.task4, status_flow_queued.task5):
+        task.set_node_status(NodeStatus.complete)
+    assert counts[NodeStatus.complete.value] == 4
+    assert container2.state.node_status == NodeStatus.complete
+    assert container1.state.node_status == NodeStatus.queued
+
+    for task in container1.children:
+        task.set_node_status(NodeStatus.complete)
+    assert flow1.state.node_status == NodeStatus.complete
+
+
+def test_child_status_counts_children_changed(status_flow_queued):
+    container2 = status_flow_queued.container2
+    assert container2.computed_status(True) == NodeStatus.queued
+
+    task7 = container2.add_task("task7")
+    task7.set_node_status_only(NodeStatus.submitted)
+    assert container2.get_child_status_counts()[0] == 5
+    assert container2.computed_status(True) == NodeStatus.submitted
+
+    container2.delete_child("task7")
+    assert container2.get_child_status_counts()[0] == 4
+    assert container2.computed_status(True) == NodeStatus.queued
+
+    task8 = Task("task8")
+    task8.state.node_status = NodeStatus.active
+    container2.update_child("task2", task8)
+    assert container2.computed_status(True) == NodeStatus.active
+
+    # children linked directly, counts are rebuilt.
+    task9 = Task("task9")
+    task9.state.node_status = NodeStatus.aborted
+    task9.parent = container2
+    container2.children.append(task9)
+    assert container2.computed_status(True) == NodeStatus.aborted
+    assert container2.get_child_status_counts()[0] == 5
@@ -0,0 +1,91 @@
+"""
+Compare incremental resolution with full travel on random flows.
+
+Random operations are applied to a flow, which is resolved with ``Bunch.resolve_dirty_nodes``
+until no node is dirty. Full travel with ``Node.resolve_dependencies`` of the whole flow should change
+nothing after that, otherwise some node is not marked dirty when it should be.
+
+Nodes are checked in different orders by the two ways, so statuses may differ when both are applied
+from the same state. Only the settled state is compared.
+"""
+import random
+from typing import Dict, List
+
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus, Task
+from takler.core.node import Node
+
+
+def create_random_bunch(seed: int) -> Bunch:
+    rng = random.Random(seed)
+    with Flow("flow1") as flow1:
+        nodes: List[Node] = []
+        for i in range(rng.randint(2, 3)):
+            with flow1.add_container(f"container{i}") as container:
+                nodes.append(container)
+                for j in range(rng.randint(2, 4)):
+                    nodes.append(container.add_task(f"task{j}"))
+
+        for index, node in enumerate(nodes):
+            if index > 0 and rng.random() < 0.5:
+                reference = rng.choice(nodes[:index])
+                if reference is not node.parent:
+                    status = rng.choice(["complete", "aborted"])
+                    node.add_trigger(f"{reference.node_path} == {status}")
+            if rng.random() < 0.3:
+                reference = rng.choice([n for n in nodes if n is not node and n.parent is not node])
+                node.add_complete_trigger(f"{reference.node_path} == complete")
+
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+def get_statuses(bunch: Bunch) -> Dict[str, NodeStatus]:
+    return {node_path: node.state.node_status for node_path, node in bunch.node_index.items()}
+
+
+def resolve_incremental(bunch: Bunch):
+    for _ in range(100):
+        if not bunch.resolver.has_dirty_nodes():
+            return
+        bunch.resolve_dirty_nodes()
+    raise RuntimeError("incremental resolution does not settle")
+
+
+def apply_operation(bunch: Bunch, rng: random.Random):
+    tasks = sorted(
+        (node for node in bunch.node_index.values() if isinstance(node, Task)),
+        key=lambda node: node.node_path,
+    )
+    task = rng.choice(tasks)
+    status = task.state.node_status
+    if status == NodeStatus.submitted:
+        task.init("1001")
+    elif status == NodeStatus.active:
+        if rng.random() < 0.5:
+            task.complete()
+        else:
+            task.abort()
+    elif status == NodeStatus.aborted or rng.random() < 0.2:
+        # requeue doesn't swim status up, ancestors are updated here as setting status does.
+        task.requeue()
+        task.parent.swim_status_change()
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_incremental_resolution_matches_full_travel(seed):
+    bunch = create_random_bunch(seed)
+    rng = random.Random(seed)
+
+    resolve_incremental(bunch)
+    for _ in range(30):
+        apply_operation(bunch, rng)
+        resolve_incremental(bunch)
+
+        statuses = get_statuses(bunch)
+        for flow in list(bunch.flows.values()):
+            flow.resolve_dependencies()
+        assert get_statuses(bunch) == statuses
@@ -0,0 +1,95 @@
+from takler.core import Bunch, Flow, NodeStatus, RepeatDate
+
+
+def create_bunch() -> Bunch:
+    """
+    |- flow1
+      limit limit1 2
+      |- container1
+        |- family1
+          repeat date YMD 20240101 20240102
+          |- task0
+            inlimit limit1
+          ...
+          |- task9
+            inlimit limit1
+        |- task10
+    """
+    with Flow("flow1") as flow1:
+        flow1.add_limit("limit1", 2)
+        with flow1.add_container("container1") as container1:
+            with container1.add_container("family1") as family1:
+                family1.add_repeat(RepeatDate("YMD", 20240101, 20240102))
+                for i in range(10):
+                    with family1.add_task(f"task{i}") as task:
+                        task.add_in_limit("limit1")
+            container1.add_task("task10")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+def test_status_propagation_batch():
+    bunch = create_bunch()
+    family1 = bunch.find_node("/flow1/container1/family1")
+    container1 = bunch.find_node("/flow1/container1")
+    propagation = bunch.status_propagation
+
+    with propagation.batch():
+        with propagation.batch():
+            for task in family1.children[:5]:
+                task.init("1")
+        # family is recorded once, and nothing swims until the outermost batch exits.
+        assert list(propagation.pending_nodes) == [family1]
+        assert family1.state.node_status == NodeStatus.queued
+
+    assert len(propagation.pending_nodes) == 0
+    assert family1.state.node_status == NodeStatus.active
+    assert container1.state.node_status == NodeStatus.active
+    assert bunch.find_node("/flow1").state.node_status == NodeStatus.active
+
+
+def test_status_propagation_repeat():
+    bunch = create_bunch()
+    family1 = bunch.find_node("/flow1/container1/family1")
+
+    with bunch.status_propagation.batch():
+        for task in family1.children:
+            task.complete()
+
+    # repeat is incremented once, and family is requeued for next date.
+    assert family1.repeat.value() == 20240102
+    assert family1.state.node_status == NodeStatus.queued
+    assert family1.children[0].state.node_status == NodeStatus.queued
+
+    with bunch.status_propagation.batch():
+        for task in family1.children:
+            task.complete()
+    assert family1.repeat.value() == 20240102
+    assert family1.state.node_status == NodeStatus.complete
+
+
+def test_sink_status_change_updates_limits():
+    bunch = create_bunch()
+    flow1 = bunch.find_flow("flow1")
+    limit1 = flow1.find_limit("limit1")
+    family1 = bunch.find_node("/flow1/container1/family1")
+    family1.children[0].run()
+    family1.children[1].run()
+    assert limit1.value == 2
+
+    container1 = bunch.find_node("/flow1/container1")
+    container1.sink_status_change(NodeStatus.aborted)
+    assert limit1.value == 0
+    assert flow1.state.node_status == NodeStatus.aborted
+    # repeats of descendants are not incremented.
+    assert family1.repeat.value() == 20240101
+
+
+def test_task_sink_status_change():
+    bunch = create_bunch()
+    task10 = bunch.find_node("/flow1/container1/task10")
+    task10.sink_status_change(NodeStatus.aborted)
+    assert bunch.find_node("/flow1/container1").state.node_status == NodeStatus.aborted
+    assert bunch.find_flow("flow1").state.node_status == NodeStatus.aborted
@@ -0,0 +1,36 @@
+import gc
+import threading
+
+from takler.core.util import gc_paused
+
+
+def test_gc_paused_overlap_in_threads():
+    assert gc.isenabled()
+    entered = threading.Event()
+    leave = threading.Event()
+
+    def load():
+        with gc_paused():
+            entered.set()
+            leave.wait(5)
+
+    thread = threading.Thread(target=load)
+    with gc_paused():
+        thread.start()
+        entered.wait(5)
+    # the other thread is still in the context.
+    assert not gc.isenabled()
+
+    leave.set()
+    thread.join()
+    assert gc.isenabled()
+
+
+def test_gc_paused_keep_disabled():
+    gc.disable()
+    try:
+        with gc_paused():
+            assert not gc.isenabled()
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
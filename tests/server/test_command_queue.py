@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus
+from takler.server.scheduler import Scheduler
+from takler.server.network_service import TaklerService
+from takler.server.protocol import takler_pb2
+
+
+TASK_COUNT = 500
+
+
+def create_bunch() -> Bunch:
+    """
+    A flow with many tasks, and a final task waiting for all of them:
+
+        |- flow1
+          |- container1
+            |- task0
+            ...
+            |- task499
+          |- final
+               trigger ./container1 == complete
+
+    """
+    with Flow("flow1") as flow1:
+        with flow1.add_container("container1") as container1:
+            for i in range(TASK_COUNT):
+                container1.add_task(f"task{i}")
+        with flow1.add_task("final") as final:
+            final.add_trigger("./container1 == complete")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+async def wait_until(condition, timeout: float = 5.0):
+    loop = asyncio.get_running_loop()
+    end_time = loop.time() + timeout
+    while not condition():
+        if loop.time() > end_time:
+            raise TimeoutError("condition is not met")
+        await asyncio.sleep(0.01)
+
+
+def test_command_queue_batch():
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, interval_main_loop=100)
+
+    async def run():
+        main_loop = asyncio.create_task(scheduler.run())
+        await wait_until(lambda: scheduler.resolve_count == 1)
+        assert bunch.find_node("/flow1/container1/task0").state.node_status == NodeStatus.submitted
+
+        await asyncio.gather(*[
+            scheduler.submit_command("complete", node_path=f"/flow1/container1/task{i}")
+            for i in range(TASK_COUNT)
+        ])
+        # final task is submitted before next main loop interval.
+        await wait_until(lambda: bunch.find_node("/flow1/final").state.node_status == NodeStatus.submitted)
+
+        await scheduler.stop()
+        await main_loop
+
+    asyncio.run(run())
+    metrics = scheduler.get_metrics()
+    assert metrics["command_queue.depth"] == 0
+    assert metrics["command_queue.applied_count"] == TASK_COUNT
+    assert metrics["command_queue.drain_count"] == 1
+    assert metrics["command_queue.max_batch_size"] == TASK_COUNT
+    assert metrics["command_queue.total_drain_seconds"] > 0
+    # one pass in the first loop, and one pass for all completes.
+    assert scheduler.resolve_count == 2
+
+
+def test_command_queue_order_and_error():
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, interval_main_loop=100, command_batch_size=2)
+
+    async def run():
+        main_loop = asyncio.create_task(scheduler.run())
+        await wait_until(lambda: scheduler.resolve_count == 1)
+
+        results = await asyncio.gather(
+            scheduler.submit_command("suspend", node_path="/flow1/container1/task0"),
+            scheduler.submit_command("complete", node_path="/flow1/container1/no_such_task"),
+            scheduler.submit_command("resume", node_path="/flow1/container1/task0"),
+            scheduler.submit_command("run", node_path="/flow1/final"),
+            return_exceptions=True,
+        )
+        await scheduler.stop()
+        await main_loop
+        return results
+
+    results = asyncio.run(run())
+    assert results[0] is None
+    assert isinstance(results[1], ValueError)
+    assert results[3] is True
+    assert not bunch.find_node("/flow1/container1/task0").state.suspended
+
+    metrics = scheduler.command_queue.metrics
+    assert metrics.applied_count == 4
+    assert metrics.failed_count == 1
+    assert metrics.max_batch_size == 2
+
+
+def test_submit_command_without_main_loop():
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch)
+
+    asyncio.run(scheduler.submit_command("init", node_path="/flow1/final", task_id="1001"))
+    assert bunch.find_node("/flow1/final").state.node_status == NodeStatus.active
+    assert scheduler.command_queue.depth == 0
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.submit_command("no_such_command", node_path="/flow1/final"))
+
+
+def test_service_query_metrics():
+    scheduler = Scheduler(create_bunch())
+    service = TaklerService(scheduler)
+
+    request = takler_pb2.CompleteCommand(child_options=takler_pb2.ChildCommandOptions(node_path="/flow1/final"))
+    asyncio.run(service.RunCommandComplete(request, None))
+    assert scheduler.bunch.find_node("/flow1/final").state.node_status == NodeStatus.complete
+
+    scheduler.bunch.add_resource_pool("license", 2)
+    response = asyncio.run(service.QueryMetrics(takler_pb2.MetricsRequest(), None))
+    assert response.metrics["command_queue.depth"] == 0
+    assert "command_queue.last_drain_seconds" in response.metrics
+    assert response.metrics["resource_pool.license.limit"] == 2
+    assert response.metrics["resource_pool.license.value"] == 0
@@ -0,0 +1,210 @@
+import asyncio
+import threading
+
+from takler.core import Bunch, Flow, NodeStatus
+from takler.core.compact_flow import dumps_compact_flow
+from takler.server import journal as journal_module
+from takler.server.journal import Journal, read_journal, find_segments, get_blob_path
+from takler.server.scheduler import Scheduler, ChildAction
+
+
+def create_bunch() -> Bunch:
+    with Flow("flow1") as flow1:
+        with flow1.add_task("task1") as task1:
+            task1.add_event("event1")
+            task1.add_meter("meter1", 0, 10)
+        flow1.add_task("task2")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+def test_journal_group_sync(tmp_path):
+    journal = Journal(tmp_path / "takler.journal", sync_delay=0.01)
+    journal.open()
+
+    async def command(node_path: str):
+        journal.append("complete", dict(node_path=node_path))
+        await journal.sync()
+
+    async def run():
+        await asyncio.gather(*[command(f"/flow1/task{i}") for i in range(10)])
+
+    asyncio.run(run())
+    assert journal.synced_sequence == 10
+    journal.close()
+
+    records = list(read_journal(tmp_path / "takler.journal"))
+    assert [r.sequence for r in records] == list(range(1, 11))
+    assert records[0].command == "complete"
+    assert records[0].arguments == dict(node_path="/flow1/task0")
+    assert [r.sequence for r in read_journal(tmp_path / "takler.journal", after_sequence=8)] == [9, 10]
+
+
+def test_journal_broken_record(tmp_path):
+    journal = Journal(tmp_path / "takler.journal")
+    journal.open()
+    journal.append("complete", dict(node_path="/flow1/task1"))
+    journal.append("complete", dict(node_path="/flow1/task2"))
+    journal.segment_file.write(b'{"sequence":3,"comm')
+    journal.close()
+
+    assert [r.sequence for r in read_journal(tmp_path / "takler.journal")] == [1, 2]
+
+
+def test_journal_compact(tmp_path):
+    journal_path = tmp_path / "takler.journal"
+    journal = Journal(journal_path)
+    journal.open()
+    journal.append("complete", dict(node_path="/flow1/task1"))
+
+    async def run():
+        sequence = journal.rotate()
+        journal.append("complete", dict(node_path="/flow1/task2"))
+        await journal.compact(sequence)
+
+    asyncio.run(run())
+    journal.close()
+    assert [first for first, _ in find_segments(journal_path)] == [2]
+    assert [r.sequence for r in read_journal(journal_path)] == [2]
+
+
+def test_journal_rotate_sync(tmp_path, monkeypatch):
+    journal = Journal(tmp_path / "takler.journal")
+    journal.open()
+    journal.append("complete", dict(node_path="/flow1/task1"))
+
+    fsync_calls = []
+    fsync = journal_module.os.fsync
+
+    def record_fsync(fd):
+        fsync_calls.append((fd, threading.current_thread().name))
+        fsync(fd)
+
+    monkeypatch.setattr(journal_module.os, "fsync", record_fsync)
+
+    async def run():
+        old_segment_file = journal.segment_file
+        journal.rotate()
+        # old segment is flushed by next sync, in journal thread.
+        assert fsync_calls == []
+        journal.append("complete", dict(node_path="/flow1/task2"))
+        await journal.sync()
+        return old_segment_file.fileno()
+
+    old_fd = asyncio.run(run())
+    assert journal.synced_sequence == 2
+    assert old_fd in [fd for fd, _ in fsync_calls]
+    assert all(name.startswith("takler-journal") for _, name in fsync_calls)
+    journal.close()
+
+
+def test_scheduler_replay_journal(tmp_path):
+    checkpoint_path = str(tmp_path / "takler.checkpoint")
+    journal_path = str(tmp_path / "takler.journal")
+
+    async def run_commands():
+        scheduler = Scheduler(create_bunch(), checkpoint_path=checkpoint_path, journal_path=journal_path)
+        await scheduler.start()
+        await scheduler.run_command_init("/flow1/task1", "1001")
+        scheduler.run_command_meter("/flow1/task1", "meter1", "3")
+        await scheduler.checkpoint()
+
+        # commands after checkpoint are only in journal.
+        scheduler.run_command_batch([
+            ChildAction("event", "/flow1/task1", dict(event_name="event1")),
+            ChildAction("complete", "/flow1/task1", dict()),
+        ])
+        scheduler.run_command_suspend("/flow1/task2")
+        await scheduler.sync_journal()
+        # server is killed without shutdown.
+
+    asyncio.run(run_commands())
+
+    bunch = Bunch()
+    scheduler = Scheduler(bunch, checkpoint_path=checkpoint_path, journal_path=journal_path)
+    asyncio.run(scheduler.start())
+    task1 = bunch.find_node("/flow1/task1")
+    assert task1.state.node_status == NodeStatus.complete
+    assert task1.task_id == "1001"
+    assert task1.find_meter("meter1").value == 3
+    assert task1.find_event("event1").value
+    assert bunch.find_node("/flow1/task2").state.suspended
+    assert scheduler.journal.sequence == 4
+    scheduler.journal.close()
+
+
+def test_scheduler_journal_without_checkpoint(tmp_path):
+    journal_path = str(tmp_path / "takler.journal")
+
+    async def run_commands():
+        scheduler = Scheduler(create_bunch(), journal_path=journal_path)
+        await scheduler.start()
+        scheduler.run_command_force("/flow1/task2", "aborted")
+        scheduler.run_command_force("/flow1/task1:event1", "set")
+        await scheduler.sync_journal()
+
+    asyncio.run(run_commands())
+
+    bunch = create_bunch()
+    asyncio.run(Scheduler(bunch, journal_path=journal_path).start())
+    assert bunch.find_node("/flow1/task2").state.node_status == NodeStatus.aborted
+    assert bunch.find_node("/flow1/task1").find_event("event1").value
+
+
+def test_scheduler_replay_load(tmp_path):
+    journal_path = str(tmp_path / "takler.journal")
+    with Flow("flow2") as flow2:
+        flow2.add_task("task1")
+    flow_bytes = dumps_compact_flow(flow2)
+
+    async def run_commands():
+        scheduler = Scheduler(Bunch(), journal_path=journal_path)
+        await scheduler.start()
+        scheduler.run_command_load("compact", flow_bytes)
+        scheduler.run_command_complete("/flow2/task1")
+        await scheduler.sync_journal()
+
+    asyncio.run(run_commands())
+
+    bunch = Bunch()
+    asyncio.run(Scheduler(bunch, journal_path=journal_path).start())
+    assert bunch.find_node("/flow2/task1").state.node_status == NodeStatus.complete
+
+
+def test_scheduler_load_blob(tmp_path):
+    checkpoint_path = str(tmp_path / "takler.checkpoint")
+    journal_path = str(tmp_path / "takler.journal")
+    with Flow("flow2") as flow2:
+        flow2.add_task("task1")
+    flow_bytes = dumps_compact_flow(flow2)
+
+    async def run_commands():
+        scheduler = Scheduler(Bunch(), checkpoint_path=checkpoint_path, journal_path=journal_path)
+        await scheduler.start()
+        await scheduler.run_command_load_async("compact", flow_bytes)
+        await scheduler.sync_journal()
+        return scheduler
+
+    scheduler = asyncio.run(run_commands())
+    # flow bytes are in blob file instead of journal record.
+    record, = read_journal(journal_path)
+    assert record.command == "load"
+    assert record.arguments == dict(flow_type="compact")
+    blob_path = get_blob_path(journal_path, record.blob)
+    assert blob_path.read_bytes() == flow_bytes
+
+    bunch = Bunch()
+    replay_scheduler = Scheduler(bunch, journal_path=journal_path)
+    asyncio.run(replay_scheduler.start())
+    replay_scheduler.journal.close()
+    assert bunch.find_node("/flow2/task1") is not None
+
+    # blob file is deleted with its segment after checkpoint.
+    async def checkpoint():
+        await scheduler.checkpoint()
+        scheduler.journal.close()
+
+    asyncio.run(checkpoint())
+    assert not blob_path.exists()
@@ -0,0 +1,144 @@
+import asyncio
+
+import grpc
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus
+from takler.core.repeat import RepeatDate
+from takler.server.scheduler import Scheduler
+from takler.server.network_service import TaklerService
+from takler.server.protocol import takler_pb2
+
+
+@pytest.fixture
+def scheduler() -> Scheduler:
+    """
+    Scheduler with a flow:
+
+        |- flow1
+          |- container1
+            |- task1 [aborted]
+                 event event1
+                 meter meter1 0 10
+            |- task2 [complete]
+          |- container2
+               repeat date YMD 20240101 20240103
+            |- task3 [aborted]
+          |- task4
+
+    """
+    with Flow("flow1") as flow1:
+        with flow1.add_container("container1") as container1:
+            with container1.add_task("task1") as task1:
+                task1.add_event("event1")
+                task1.add_meter("meter1", 0, 10)
+                task1.add_parameter("param1", 1)
+            with container1.add_task("task2") as task2:
+                task2.add_trigger("./task1 == complete")
+        with flow1.add_container("container2") as container2:
+            container2.add_repeat(RepeatDate("YMD", 20240101, 20240103))
+            task3 = container2.add_task("task3")
+        flow1.add_task("task4")
+
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    task1.abort("test")
+    task2.complete()
+    task3.abort("test")
+    return Scheduler(bunch)
+
+
+class AbortContext:
+    async def abort(self, code, details):
+        raise RuntimeError(code, details)
+
+
+def get_paths(nodes):
+    return [node.node_path for node in nodes]
+
+
+def test_query_nodes(scheduler):
+    nodes, next_page = scheduler.query_nodes()
+    assert len(nodes) == 7
+    assert next_page is None
+
+    nodes, _ = scheduler.query_nodes(node_path="/flow1", max_depth=2)
+    assert get_paths(nodes) == ["/flow1", "/flow1/container1", "/flow1/container2", "/flow1/task4"]
+
+    nodes, _ = scheduler.query_nodes(node_path="/flow1/container1", max_depth=1)
+    assert get_paths(nodes) == ["/flow1/container1"]
+
+    nodes, _ = scheduler.query_nodes(status={NodeStatus.aborted})
+    assert get_paths(nodes) == [
+        "/flow1", "/flow1/container1", "/flow1/container1/task1", "/flow1/container2", "/flow1/container2/task3"]
+
+    nodes, next_page = scheduler.query_nodes(status={NodeStatus.aborted}, after="/flow1", limit=2)
+    assert get_paths(nodes) == ["/flow1/container1", "/flow1/container1/task1"]
+    assert next_page == "/flow1/container1/task1"
+    nodes, next_page = scheduler.query_nodes(status={NodeStatus.aborted}, after=next_page, limit=2)
+    assert get_paths(nodes) == ["/flow1/container2", "/flow1/container2/task3"]
+    assert next_page is None
+
+    with pytest.raises(ValueError):
+        scheduler.query_nodes(node_path="/flow1/container3")
+    with pytest.raises(ValueError):
+        scheduler.query_nodes(node_path="/flow1/container2", after="/flow1/container1/task1")
+
+
+@pytest.mark.parametrize("node_path", [None, "/flow1", "/flow1/container1"])
+@pytest.mark.parametrize("max_depth", [0, 2])
+@pytest.mark.parametrize("status", [None, {NodeStatus.aborted}])
+def test_query_nodes_pages(scheduler, node_path, max_depth, status):
+    with Flow("flow2") as flow2:
+        flow2.add_task("task1")
+    scheduler.bunch.add_flow(flow2)
+    all_nodes, _ = scheduler.query_nodes(node_path=node_path, max_depth=max_depth, status=status)
+
+    for page_size in range(1, len(all_nodes) + 2):
+        nodes = []
+        after = None
+        while True:
+            page, after = scheduler.query_nodes(
+                node_path=node_path, max_depth=max_depth, status=status, after=after, limit=page_size)
+            nodes.extend(page)
+            if after is None:
+                break
+        assert nodes == all_nodes
+
+
+def test_service_query_nodes(scheduler):
+    service = TaklerService(scheduler)
+
+    def query(**kwargs):
+        request = takler_pb2.QueryNodesRequest(**kwargs)
+        return asyncio.run(service.QueryNodes(request, AbortContext()))
+
+    response = query(node_path="/flow1/container1", status=["aborted"], attributes=["event", "meter", "parameter"])
+    assert [n.node_path for n in response.nodes] == ["/flow1/container1", "/flow1/container1/task1"]
+    assert response.next_page_token == ""
+    assert [(a.kind, a.name, a.value) for a in response.nodes[1].attributes] == [
+        ("event", "event1", "unset"), ("meter", "meter1", "0"), ("parameter", "param1", "1"),
+    ]
+
+    response = query(node_path="/flow1/container1/task2", attributes=["trigger"])
+    assert response.nodes[0].status == "complete"
+    assert response.nodes[0].attributes[0].value == "./task1 == complete"
+
+    response = query(node_path="/flow1/container2", max_depth=1, attributes=["repeat"])
+    assert [(a.kind, a.name, a.value) for a in response.nodes[0].attributes] == [("repeat", "YMD", "20240101")]
+
+    paths = []
+    page_token = ""
+    while True:
+        response = query(page_size=3, page_token=page_token)
+        paths.extend(n.node_path for n in response.nodes)
+        page_token = response.next_page_token
+        if not page_token:
+            break
+    assert len(paths) == 7
+
+    for kwargs in [dict(status=["finished"]), dict(attributes=["variable"]), dict(node_path="/flow2")]:
+        with pytest.raises(RuntimeError) as exc_info:
+            query(**kwargs)
+        assert exc_info.value.args[0] == grpc.StatusCode.INVALID_ARGUMENT
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus
+from takler.server.scheduler import Scheduler, ChildAction
+from takler.server.network_service import TaklerService
+from takler.server.protocol import takler_pb2
+
+
+@pytest.fixture
+def scheduler() -> Scheduler:
+    """
+    Scheduler with a simple flow:
+
+        |- flow1
+          |- task1
+               event event1
+               meter meter1 0 10
+          |- task2
+
+    """
+    with Flow("flow1") as flow1:
+        with flow1.add_task("task1") as task1:
+            task1.add_event("event1")
+            task1.add_meter("meter1", 0, 10)
+        flow1.add_task("task2")
+    flow1.requeue()
+
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    return Scheduler(bunch)
+
+
+def test_run_command_batch(scheduler):
+    task1 = scheduler.bunch.find_node("/flow1/task1")
+    scheduler.run_command_batch([
+        ChildAction("init", "/flow1/task1", dict(task_id="1234")),
+        ChildAction("meter", "/flow1/task1", dict(meter_name="meter1", meter_value="3")),
+        ChildAction("event", "/flow1/task1", dict(event_name="event1")),
+        ChildAction("meter", "/flow1/task1", dict(meter_name="meter1", meter_value="5")),
+        ChildAction("complete", "/flow1/task1", dict()),
+    ])
+    assert task1.state.node_status == NodeStatus.complete
+    assert task1.find_event("event1").value
+    assert task1.find_meter("meter1").value == 5
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        ChildAction("meter", "/flow1/task3", dict(meter_name="meter1", meter_value="3")),
+        ChildAction("init", "/flow1", dict(task_id="1234")),
+        ChildAction("event", "/flow1/task1", dict(event_name="event2")),
+        ChildAction("meter", "/flow1/task1", dict(meter_name="meter1", meter_value="a")),
+        ChildAction("meter", "/flow1/task1", dict(meter_name="meter1", meter_value="11")),
+        ChildAction("requeue", "/flow1/task1", dict()),
+    ]
+)
+def test_run_command_batch_reject(scheduler, action):
+    task1 = scheduler.bunch.find_node("/flow1/task1")
+    with pytest.raises(ValueError):
+        scheduler.run_command_batch([
+            ChildAction("init", "/flow1/task1", dict(task_id="1234")),
+            ChildAction("event", "/flow1/task1", dict(event_name="event1")),
+            action,
+        ])
+    assert task1.state.node_status == NodeStatus.queued
+    assert not task1.find_event("event1").value
+
+
+def test_service_run_command_batch(scheduler):
+    service = TaklerService(scheduler)
+    task1 = scheduler.bunch.find_node("/flow1/task1")
+    child_options = takler_pb2.ChildCommandOptions(node_path="/flow1/task1")
+
+    request = takler_pb2.BatchCommand(actions=[
+        takler_pb2.ChildAction(init=takler_pb2.InitCommand(child_options=child_options, task_id="1234")),
+        takler_pb2.ChildAction(meter=takler_pb2.MeterCommand(
+            child_options=child_options, meter_name="meter1", meter_value="20")),
+    ])
+    response = asyncio.run(service.RunCommandBatch(request, None))
+    assert response.flag == 1
+    assert task1.state.node_status == NodeStatus.queued
+
+    request = takler_pb2.BatchCommand(actions=[
+        takler_pb2.ChildAction(init=takler_pb2.InitCommand(child_options=child_options, task_id="1234")),
+        takler_pb2.ChildAction(meter=takler_pb2.MeterCommand(
+            child_options=child_options, meter_name="meter1", meter_value="2")),
+        takler_pb2.ChildAction(abort=takler_pb2.AbortCommand(child_options=child_options, reason="test")),
+    ])
+    response = asyncio.run(service.RunCommandBatch(request, None))
+    assert response.flag == 0
+    assert task1.state.node_status == NodeStatus.aborted
+    assert task1.find_meter("meter1").value == 2
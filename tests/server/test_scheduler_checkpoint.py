@@ -0,0 +1,92 @@
+import asyncio
+
+from takler.core import Bunch, Flow, NodeStatus
+from takler.core.checkpoint import loads_checkpoint, read_checkpoint_file
+from takler.server.scheduler import Scheduler
+
+
+def create_bunch() -> Bunch:
+    with Flow("flow1") as flow1:
+        with flow1.add_task("task1") as task1:
+            task1.add_meter("meter1", 0, 10)
+        flow1.add_task("task2")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+def test_scheduler_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / "takler.checkpoint")
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, checkpoint_path=checkpoint_path)
+    task1 = bunch.find_node("/flow1/task1")
+    task1.init("1001")
+    task1.set_meter("meter1", 3)
+
+    asyncio.run(scheduler.checkpoint())
+
+    new_bunch = Bunch()
+    new_scheduler = Scheduler(new_bunch, checkpoint_path=checkpoint_path)
+    asyncio.run(new_scheduler.start())
+    new_task1 = new_bunch.find_node("/flow1/task1")
+    assert new_task1.state.node_status == NodeStatus.active
+    assert new_task1.find_meter("meter1").value == 3
+    assert new_task1.task_id == "1001"
+
+
+def test_scheduler_periodic_checkpoint(tmp_path):
+    checkpoint_path = tmp_path / "takler.checkpoint"
+    scheduler = Scheduler(
+        create_bunch(), interval_main_loop=0.01, checkpoint_path=str(checkpoint_path), checkpoint_interval=0.0)
+
+    async def run():
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.1)
+        assert checkpoint_path.exists()
+        scheduler.bunch.find_node("/flow1/task2").suspend()
+        await scheduler.stop()
+        await task
+
+    asyncio.run(run())
+
+    new_bunch = Bunch()
+    asyncio.run(Scheduler(new_bunch, checkpoint_path=str(checkpoint_path)).start())
+    assert new_bunch.find_node("/flow1/task2").state.suspended
+
+
+def test_scheduler_without_checkpoint_file(tmp_path):
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, checkpoint_path=str(tmp_path / "takler.checkpoint"))
+    asyncio.run(scheduler.start())
+    assert len(bunch.flows) == 1
+
+
+def test_scheduler_checkpoint_in_chunks(tmp_path):
+    checkpoint_path = str(tmp_path / "takler.checkpoint")
+    scheduler = Scheduler(
+        create_bunch(), interval_main_loop=0.01, checkpoint_path=checkpoint_path, resolve_batch_size=1)
+
+    async def run():
+        main_task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.05)
+
+        checkpoint_task = asyncio.create_task(scheduler.checkpoint())
+        await asyncio.sleep(0)
+        assert scheduler.get_tree_lock().locked()
+        # command is queued while the tree is encoded, and is applied after encoding.
+        suspend_task = asyncio.create_task(scheduler.submit_command("suspend", node_path="/flow1/task2"))
+        await asyncio.sleep(0)
+        assert not checkpoint_task.done()
+        assert not scheduler.bunch.find_node("/flow1/task2").state.suspended
+
+        await checkpoint_task
+        await suspend_task
+        assert scheduler.bunch.find_node("/flow1/task2").state.suspended
+        saved_bunch = Bunch()
+        loads_checkpoint(read_checkpoint_file(checkpoint_path), saved_bunch)
+        assert not saved_bunch.find_node("/flow1/task2").state.suspended
+        await scheduler.stop()
+        await main_task
+
+    asyncio.run(run())
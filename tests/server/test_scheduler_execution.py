@@ -0,0 +1,118 @@
+import asyncio
+import threading
+from io import StringIO
+
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus, AllocationPolicy
+from takler.server.scheduler import Scheduler
+from takler.visitor import pre_order_travel, PrintVisitor
+
+
+def create_bunch() -> Bunch:
+    """
+    A flow with 10 containers, each has 10 tasks.
+    """
+    with Flow("flow1") as flow1:
+        for i in range(10):
+            with flow1.add_container(f"container{i}") as container:
+                for j in range(10):
+                    container.add_task(f"task{j}")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+async def run_with_ticker(coroutine) -> int:
+    """
+    Run a coroutine, and count how many times another coroutine runs meanwhile.
+    """
+    task = asyncio.create_task(coroutine)
+    ticks = 0
+    while not task.done():
+        ticks += 1
+        await asyncio.sleep(0)
+    await task
+    return ticks
+
+
+@pytest.mark.parametrize("incremental", [True, False])
+def test_resolve_bunch_cooperative(incremental):
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, incremental=incremental, resolve_batch_size=10)
+
+    ticks = asyncio.run(run_with_ticker(scheduler.resolve_bunch()))
+    # 111 nodes are checked in 12 batches.
+    assert ticks >= 11
+    assert bunch.find_node("/flow1/container9/task9").state.node_status == NodeStatus.submitted
+
+
+def test_travel_bunch():
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, incremental=False)
+    scheduler.travel_bunch()
+    assert bunch.find_node("/flow1/container9/task9").state.node_status == NodeStatus.submitted
+
+
+def create_limit_bunch(policy: AllocationPolicy) -> Bunch:
+    """
+    A flow with a limit of 1 token and 3 tasks in the limit.
+    """
+    with Flow("flow1") as flow1:
+        flow1.add_limit("limit1", 1, policy=policy)
+        flow1.add_in_limit("limit1")
+        for i in range(3):
+            flow1.add_task(f"task{i}")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+@pytest.mark.parametrize("policy", list(AllocationPolicy))
+def test_travel_bunch_limit_policy(policy):
+    bunch = create_limit_bunch(policy)
+    flow1 = bunch.find_flow("flow1")
+    limit = flow1.find_limit("limit1")
+    scheduler = Scheduler(bunch, incremental=False)
+
+    def submitted_tasks():
+        return [task for task in flow1.children if task.state.node_status == NodeStatus.submitted]
+
+    # tokens are granted by allocation policy in the next travel.
+    for _ in range(2):
+        scheduler.travel_bunch()
+    assert submitted_tasks() == [flow1.children[0]]
+    assert limit.value == 1
+
+    flow1.children[0].complete()
+    for _ in range(2):
+        scheduler.travel_bunch()
+    assert submitted_tasks() == [flow1.children[1]]
+    assert limit.value == 1
+
+
+def test_handle_request_show_cooperative():
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, resolve_batch_size=10)
+
+    async def show():
+        return await scheduler.handle_request_show(
+            show_parameter=False, show_trigger=False, show_limit=True, show_event=True, show_meter=True)
+
+    stream = StringIO()
+    pre_order_travel(bunch.find_flow("flow1"), PrintVisitor(stream=stream))
+    ticks = asyncio.run(run_with_ticker(show()))
+    assert ticks >= 11
+    assert asyncio.run(show()) == stream.getvalue()
+
+
+def test_worker_pool():
+    scheduler = Scheduler(Bunch(), worker_count=2)
+
+    async def run():
+        await scheduler.start()
+        return await asyncio.to_thread(lambda: threading.current_thread().name)
+
+    assert asyncio.run(run()).startswith("takler-worker")
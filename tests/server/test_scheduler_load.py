@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus
+from takler.core.compact_flow import dumps_compact_flow
+from takler.server.scheduler import Scheduler
+from takler.server.network_service import TaklerService
+from takler.server.protocol import takler_pb2
+
+
+@pytest.fixture
+def flow2() -> Flow:
+    """
+    A flow to be loaded:
+
+        |- flow2
+          |- container1
+            |- task1
+            |- task2
+                 trigger ./task1 == complete
+            ...
+
+    """
+    with Flow("flow2") as flow2:
+        for i in range(50):
+            with flow2.add_container(f"container{i}") as container:
+                container.add_task("task1")
+                with container.add_task("task2") as task2:
+                    task2.add_trigger("./task1 == complete")
+    return flow2
+
+
+async def iter_chunks(data: bytes, chunk_size: int):
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+@pytest.mark.parametrize("flow_type", ["json", "compact"])
+def test_run_command_load_stream(flow2, flow_type):
+    if flow_type == "json":
+        flow_bytes = json.dumps(flow2.to_dict()).encode("utf-8")
+    else:
+        flow_bytes = dumps_compact_flow(flow2)
+    scheduler = Scheduler(Bunch())
+    # flow is not visible in bunch until it is fully built.
+    seen_before_attached = []
+
+    async def run():
+        task = asyncio.create_task(
+            scheduler.run_command_load_stream(flow_type, iter_chunks(flow_bytes, chunk_size=100)))
+        while not task.done():
+            seen_before_attached.append("flow2" in scheduler.bunch.flows)
+            await asyncio.sleep(0)
+        return task.result()
+
+    flow = asyncio.run(run())
+    assert len(seen_before_attached) > 0
+    assert not any(seen_before_attached)
+    assert scheduler.bunch.find_flow("flow2") is flow
+    assert scheduler.bunch.find_node("/flow2/container1/task1").state.node_status == NodeStatus.queued
+
+    task1 = scheduler.bunch.find_node("/flow2/container3/task1")
+    task2 = scheduler.bunch.find_node("/flow2/container3/task2")
+    assert task2.trigger_expression.ast is not None
+    assert task2 in scheduler.bunch.dependency_index.find_all_dependents(task1)
+    assert scheduler.bunch.resolver.has_dirty_nodes()
+
+
+def test_run_command_load_stream_queued(flow2):
+    scheduler = Scheduler(Bunch(), interval_main_loop=100)
+
+    async def run():
+        main_loop = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0)
+        flow = await scheduler.run_command_load_stream(
+            "compact", iter_chunks(dumps_compact_flow(flow2), chunk_size=100))
+        await scheduler.stop()
+        await main_loop
+        return flow
+
+    flow = asyncio.run(run())
+    assert scheduler.bunch.find_flow("flow2") is flow
+    # flow is attached by main loop through command queue.
+    assert scheduler.command_queue.metrics.applied_count == 1
+
+
+def test_run_command_load_stream_unsupported(flow2):
+    scheduler = Scheduler(Bunch())
+    with pytest.raises(RuntimeError):
+        asyncio.run(scheduler.run_command_load_stream("yaml", iter_chunks(b"flow2", chunk_size=100)))
+    assert len(scheduler.bunch.flows) == 0
+
+
+def test_run_command_load_stream_broken_trigger(flow2):
+    flow2.find_node("/flow2/container3/task2").add_trigger("./task3 == complete")
+    scheduler = Scheduler(Bunch())
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run_command_load_stream(
+            "compact", iter_chunks(dumps_compact_flow(flow2), chunk_size=100)))
+    assert len(scheduler.bunch.flows) == 0
+    assert len(scheduler.bunch.node_index) == 0
+
+
+def test_service_run_command_load_stream(flow2):
+    scheduler = Scheduler(Bunch())
+    service = TaklerService(scheduler)
+    flow_bytes = dumps_compact_flow(flow2)
+
+    async def iter_requests(flow_type: str):
+        yield takler_pb2.LoadChunk(flow_type=flow_type, data=flow_bytes[:100])
+        yield takler_pb2.LoadChunk(data=flow_bytes[100:])
+
+    response = asyncio.run(service.RunCommandLoadStream(iter_requests("compact"), None))
+    assert response.flag == 0
+    assert scheduler.bunch.find_node("/flow2/container49/task2") is not None
+
+    response = asyncio.run(service.RunCommandLoadStream(iter_requests("json"), None))
+    assert response.flag == 1
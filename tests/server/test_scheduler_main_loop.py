@@ -0,0 +1,174 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus, AllocationPolicy
+from takler.server.scheduler import Scheduler
+
+
+def create_bunch() -> Bunch:
+    """
+    |- flow1
+      |- task1
+      |- task2
+           trigger ./task1 == complete
+    """
+    with Flow("flow1") as flow1:
+        flow1.add_task("task1")
+        with flow1.add_task("task2") as task2:
+            task2.add_trigger("./task1 == complete")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+async def wait_until(condition, timeout: float = 5.0):
+    loop = asyncio.get_running_loop()
+    end_time = loop.time() + timeout
+    while not condition():
+        if loop.time() > end_time:
+            raise TimeoutError("condition is not met")
+        await asyncio.sleep(0.001)
+
+
+def test_main_loop_wakeup_on_command():
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, interval_main_loop=100)
+    task2 = bunch.find_node("/flow1/task2")
+
+    async def run():
+        main_loop = asyncio.create_task(scheduler.run())
+        await wait_until(lambda: scheduler.resolve_count == 1)
+        assert task2.state.node_status == NodeStatus.queued
+
+        start_time = time.perf_counter()
+        await scheduler.submit_command("complete", node_path="/flow1/task1")
+        await wait_until(lambda: task2.state.node_status == NodeStatus.submitted)
+        latency = time.perf_counter() - start_time
+
+        await scheduler.stop()
+        await main_loop
+        return latency
+
+    latency = asyncio.run(run())
+    assert latency < 1.0
+    assert scheduler.resolve_count == 2
+
+
+def test_main_loop_idle():
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, interval_main_loop=0.01)
+
+    async def run():
+        main_loop = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.2)
+        await scheduler.stop()
+        await main_loop
+
+    asyncio.run(run())
+    # nothing is changed after the first pass.
+    assert scheduler.resolve_count == 1
+
+
+@pytest.mark.parametrize("incremental", [True, False])
+@pytest.mark.parametrize("policy", list(AllocationPolicy))
+def test_main_loop_limit_policy_grant(policy, incremental):
+    """
+    Tokens granted by allocation policy are taken at once, without waiting for next main loop interval.
+    """
+    with Flow("flow1") as flow1:
+        flow1.add_limit("limit1", 1, policy=policy)
+        flow1.add_in_limit("limit1")
+        for i in range(3):
+            flow1.add_task(f"task{i}")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    scheduler = Scheduler(bunch, interval_main_loop=100, incremental=incremental)
+    task0 = flow1.children[0]
+    task1 = flow1.children[1]
+
+    async def run():
+        main_loop = asyncio.create_task(scheduler.run())
+        await wait_until(lambda: task0.state.node_status == NodeStatus.submitted, timeout=1.0)
+
+        await scheduler.submit_command("complete", node_path="/flow1/task0")
+        await wait_until(lambda: task1.state.node_status == NodeStatus.submitted, timeout=1.0)
+
+        await scheduler.stop()
+        await main_loop
+
+    asyncio.run(run())
+    assert flow1.find_limit("limit1").value == 1
+
+
+def test_find_next_loop_time():
+    bunch = create_bunch()
+    task1 = bunch.find_node("/flow1/task1")
+    scheduler = Scheduler(bunch, interval_main_loop=600)
+    now = time.time()
+    assert scheduler.find_next_loop_time(now) == now + 600
+
+    due_time = datetime.datetime.now() + datetime.timedelta(minutes=2)
+    task1.add_time(due_time.time())
+    next_time = scheduler.find_next_loop_time(now)
+    expected_time = due_time.replace(second=0, microsecond=0).timestamp()
+    assert abs(next_time - expected_time) < 1
+
+    scheduler.checkpoint_path = "takler.checkpoint"
+    scheduler.checkpoint_interval = 30
+    scheduler.last_checkpoint_time = now
+    assert scheduler.find_next_loop_time(now) == now + 30
+
+
+def test_main_loop_complete_trigger_of_active_family():
+    """
+    Main loop becomes idle when a family's complete trigger is satisfied while its children are still active.
+    """
+    with Flow("flow1") as flow1:
+        flow1.add_task("task1")
+        with flow1.add_container("container1") as container1:
+            container1.add_complete_trigger("/flow1/task1 == complete")
+            container1.add_task("task2")
+            with container1.add_task("task3") as task3:
+                task3.add_trigger("/flow1/container1 == aborted")
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    scheduler = Scheduler(bunch, interval_main_loop=100)
+
+    async def run():
+        main_loop = asyncio.create_task(scheduler.run())
+        await wait_until(lambda: scheduler.resolve_count == 1)
+        await scheduler.submit_command("init", node_path="/flow1/task1", task_id="1001")
+        await scheduler.submit_command("complete", node_path="/flow1/task1")
+        await asyncio.sleep(0.2)
+        resolve_count = scheduler.resolve_count
+        await asyncio.sleep(0.2)
+        assert scheduler.resolve_count == resolve_count
+        await scheduler.stop()
+        await main_loop
+
+    asyncio.run(run())
+
+
+def test_main_loop_max_immediate_loops():
+    """
+    Nodes always left to resolve do not keep main loop running, it waits after ``max_immediate_loops`` loops.
+    """
+    bunch = create_bunch()
+    scheduler = Scheduler(bunch, interval_main_loop=100, incremental=False, max_immediate_loops=3)
+    scheduler.has_pending_nodes = lambda: True
+
+    async def run():
+        main_loop = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.2)
+        await scheduler.stop()
+        await main_loop
+
+    asyncio.run(run())
+    # the first loop and 3 immediate loops.
+    assert scheduler.resolve_count == 4
@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+
+from takler.core import Bunch, Flow, NodeStatus
+from takler.core.repeat import RepeatDate
+from takler.server.subscription import SubscriptionHub
+
+
+@pytest.fixture
+def bunch() -> Bunch:
+    """
+    A bunch with a simple flow:
+
+        |- flow1
+             limit limit1 2
+          |- task1
+               event event1
+               meter meter1 0 10
+               inlimit limit1
+          |- task2
+
+    """
+    with Flow("flow1") as flow1:
+        flow1.add_limit("limit1", 2)
+        with flow1.add_task("task1") as task1:
+            task1.add_event("event1")
+            task1.add_meter("meter1", 0, 10)
+            task1.add_in_limit("limit1")
+        flow1.add_task("task2")
+
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    return bunch
+
+
+def get_changes(response):
+    return [(d.node_path, d.field, d.name, d.value) for d in response.deltas.deltas]
+
+
+def test_change_tracker(bunch):
+    task1 = bunch.find_node("/flow1/task1")
+    tracker = bunch.change_tracker
+
+    task1.set_meter("meter1", 1)
+    assert len(tracker.changed_nodes) == 0
+
+    calls = []
+    tracker.listener = lambda: calls.append(1)
+    task1.set_meter("meter1", 2)
+    task1.set_event("event1", True)
+    task1.suspend()
+    assert list(tracker.changed_nodes) == [task1]
+    assert calls == [1]
+
+    nodes, structure_changed = tracker.pop_changes()
+    assert nodes == [task1]
+    assert not structure_changed
+
+    bunch.find_node("/flow1").add_task("task3")
+    assert tracker.structure_changed
+    assert calls == [1, 1]
+
+
+def test_subscription_hub(bunch):
+    hub = SubscriptionHub(bunch)
+    hub.start()
+    task1 = bunch.find_node("/flow1/task1")
+
+    snapshot = hub.get_update(None).snapshot
+    assert snapshot.sequence == 0
+    assert [n.node_path for n in snapshot.nodes] == ["/flow1", "/flow1/task1", "/flow1/task2"]
+    assert [(a.kind, a.name, a.value) for a in snapshot.nodes[1].attributes] == [
+        ("event", "event1", "unset"), ("meter", "meter1", "0"),
+    ]
+    assert hub.get_update(0) is None
+
+    # no running loop, publish at once.
+    task1.set_meter("meter1", 3)
+    assert get_changes(hub.get_update(0)) == [("/flow1/task1", "meter", "meter1", "3")]
+
+    task1.init("1")
+    bunch.find_node("/flow1").find_limit("limit1").increment(1, "/flow1/task1")
+    assert get_changes(hub.get_update(1)) == [
+        ("/flow1/task1", "status", "", "active"),
+        ("/flow1", "status", "", "active"),
+        ("/flow1", "limit", "limit1", "1"),
+    ]
+
+    # resume from an old sequence.
+    changes = get_changes(hub.get_update(0))
+    assert changes[0] == ("/flow1/task1", "meter", "meter1", "3")
+    assert [d.sequence for d in hub.get_update(0).deltas.deltas] == list(range(1, hub.sequence + 1))
+
+    # node tree is changed, snapshot is required.
+    sequence = hub.sequence
+    bunch.find_node("/flow1").add_task("task3")
+    assert hub.get_update(sequence).HasField("snapshot")
+    assert hub.get_update(sequence).snapshot.sequence == sequence + 1
+
+    # repeat value
+    flow1 = bunch.find_node("/flow1")
+    flow1.add_repeat(RepeatDate("YMD", 20240101, 20240103))
+    flow1.requeue()
+    sequence = hub.sequence
+    flow1.repeat.increment()
+    flow1.requeue(reset_repeat=False)
+    assert ("/flow1", "repeat", "YMD", "20240102") in get_changes(hub.get_update(sequence))
+
+    hub.stop()
+    sequence = hub.sequence
+    task1.set_meter("meter1", 4)
+    assert hub.sequence == sequence
+
+
+def test_subscription_hub_max_deltas(bunch):
+    hub = SubscriptionHub(bunch, max_deltas=2)
+    hub.start()
+    task1 = bunch.find_node("/flow1/task1")
+    for i in range(4):
+        task1.set_meter("meter1", i + 1)
+    assert hub.get_update(0).HasField("snapshot")
+    assert get_changes(hub.get_update(2)) == [
+        ("/flow1/task1", "meter", "meter1", "3"),
+        ("/flow1/task1", "meter", "meter1", "4"),
+    ]
+
+
+def test_subscribe(bunch):
+    hub = SubscriptionHub(bunch)
+    hub.start()
+    task1 = bunch.find_node("/flow1/task1")
+    task2 = bunch.find_node("/flow1/task2")
+
+    async def watch(responses):
+        async for response in hub.subscribe():
+            responses.append(response)
+
+    async def run():
+        watchers = [[] for _ in range(3)]
+        tasks = [asyncio.create_task(watch(responses)) for responses in watchers]
+        await asyncio.sleep(0)
+        assert hub.subscriber_count == 3
+
+        # changes in one loop iteration are published together.
+        task1.set_meter("meter1", 5)
+        task1.set_event("event1", True)
+        task2.suspend()
+        await asyncio.sleep(0.01)
+        task2.resume()
+        await asyncio.sleep(0.01)
+
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert hub.subscriber_count == 0
+        return watchers
+
+    watchers = asyncio.run(run())
+    for responses in watchers:
+        assert len(responses) == 3
+        assert responses[0].HasField("snapshot")
+        assert get_changes(responses[1]) == [
+            ("/flow1/task1", "event", "event1", "set"),
+            ("/flow1/task1", "meter", "meter1", "5"),
+            ("/flow1/task2", "suspended", "", "true"),
+        ]
+        assert get_changes(responses[2]) == [("/flow1/task2", "suspended", "", "false")]
+    # the same message is shared by subscribers.
+    assert watchers[0][1] is watchers[1][1]
+    assert task1.state.node_status == NodeStatus.queued
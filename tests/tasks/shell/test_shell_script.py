@@ -1,11 +1,13 @@
 from pathlib import Path
+import asyncio
 import sys
 
 import pytest
 
-from takler.core import Bunch, Flow
+from takler.core import Bunch, Flow, NodeStatus
 from takler.tasks import ShellScriptTask
 from takler.tasks.shell.shell_render import ShellRender
+from takler.tasks.shell.shell_script_task import running_job_tasks
 
 
 pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="tests for linux only")
@@ -50,3 +52,31 @@ def test_script_with_include_render(scripts_directory, takler_home_directory, ta
 
     shell_script = ShellRender(node=task1)
     shell_script.render_script(script_path=task1_script_path)
+
+
+def test_submit_job_in_worker(scripts_directory, tmp_path):
+    with Flow("flow1") as flow1:
+        flow1.add_parameter("TAKLER_HOME", str(tmp_path))
+        flow1.add_parameter("TAKLER_SHELL_JOB_CMD", "true {{TAKLER_JOB}}")
+        flow1.add_parameter("SLEEP", 0)
+        flow1.add_task(ShellScriptTask("task1", str(Path(scripts_directory, "task1.takler"))))
+        flow1.add_task(ShellScriptTask("task2", str(Path(scripts_directory, "task_missing.takler"))))
+    bunch = Bunch()
+    bunch.add_flow(flow1)
+    flow1.requeue()
+    task1 = flow1.find_node("/flow1/task1")
+    task2 = flow1.find_node("/flow1/task2")
+
+    async def run():
+        task1.run()
+        task2.run()
+        # job scripts are created in worker threads.
+        assert task1.state.node_status == NodeStatus.submitted
+        assert task2.state.node_status == NodeStatus.submitted
+        await asyncio.gather(*running_job_tasks)
+
+    asyncio.run(run())
+    job_script = Path(tmp_path, "flow1", "task1.job1")
+    assert "sleep 0" in job_script.read_text()
+    assert task1.state.node_status == NodeStatus.submitted
+    assert task2.state.node_status == NodeStatus.aborted